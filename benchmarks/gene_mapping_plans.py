@@ -0,0 +1,169 @@
+"""Compare the old and new gene mapping queries on a synthetic gene table.
+
+The old query decided with a `PrefTrueCheck` CTE (a second self-join of the gene
+table) whether *any* source gene in the batch had a preferred target, and then
+filtered every source gene on that one answer. The new query (`gene_query.mapping`)
+picks one target per source gene with `DISTINCT ON` instead, in a single pass.
+
+This creates a throwaway `gwdb_bench` schema with a synthetic `gene` table, runs both
+queries through `EXPLAIN (ANALYZE, BUFFERS)`, prints their timings and how many source
+genes each one maps, and drops the schema again.
+
+Usage:
+    python benchmarks/gene_mapping_plans.py postgresql://user@host/db [--genes 200000]
+        [--batch 2000] [--repeat 5] [--without-preferred]
+"""
+
+import argparse
+import json
+import random
+import statistics
+
+import psycopg
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.query import gene as gene_query
+from psycopg.sql import SQL
+
+SCHEMA = "gwdb_bench"
+SPECIES = Species.MUS_MUSCULUS
+SOURCE_TYPE = GeneIdentifier.GENE_SYMBOL
+TARGET_TYPE = GeneIdentifier.ENSEMBLE_GENE
+
+OLD_MAPPING = SQL(
+    """
+    WITH PrefTrueCheck AS
+        (SELECT CASE
+                WHEN EXISTS(SELECT 1
+                            FROM extsrc.gene AS g1
+                                   JOIN extsrc.gene AS g2
+                                        ON g1.ode_gene_id = g2.ode_gene_id
+                                        AND g1.ode_ref_id != g2.ode_ref_id
+                                        AND g1.sp_id = g2.sp_id
+                             WHERE g1.ode_ref_id = ANY(%(source_ids)s)
+                               AND g2.gdb_id = %(target_gene_id_type)s
+                               AND g2.sp_id = %(species_id)s
+                               AND g2.ode_pref = True)
+                  THEN True ELSE False
+                  END AS PrefExists)
+    SELECT g1.ode_ref_id AS original_ref_id,
+           g2.ode_ref_id AS mapped_ref_id
+    FROM extsrc.gene AS g1
+             JOIN extsrc.gene AS g2
+                  ON g1.ode_gene_id = g2.ode_gene_id
+                  AND g1.ode_ref_id != g2.ode_ref_id
+                  AND g1.sp_id = g2.sp_id,
+         PrefTrueCheck
+    WHERE g1.ode_ref_id = ANY (%(source_ids)s)
+      AND g2.gdb_id = %(target_gene_id_type)s
+      AND g2.sp_id = %(species_id)s
+      AND (
+        (PrefTrueCheck.PrefExists AND g2.ode_pref = True)
+            OR
+        (NOT PrefTrueCheck.PrefExists)
+        )
+    """
+)
+
+
+def create_gene_table(connection: psycopg.Connection, genes: int) -> None:
+    """Create a synthetic gene table, with a symbol and 1-3 Ensembl ids per gene.
+
+    Half of the genes have a preferred Ensembl id, and the other half don't.
+    """
+    connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    connection.execute(f"CREATE SCHEMA {SCHEMA}")
+    connection.execute(
+        f"""
+        CREATE TABLE {SCHEMA}.gene (
+            ode_gene_id bigint, ode_ref_id varchar, gdb_id int, sp_id int,
+            ode_pref boolean
+        )
+        """
+    )
+    connection.execute(
+        f"""
+        INSERT INTO {SCHEMA}.gene
+        SELECT g, 'SYM' || g, %(source)s, %(species)s, true
+        FROM generate_series(1, %(genes)s) AS g
+        UNION ALL
+        SELECT g, 'ENS' || g || '.' || n, %(target)s, %(species)s,
+               g %% 2 = 0 AND n = 1
+        FROM generate_series(1, %(genes)s) AS g,
+             generate_series(1, 1 + g %% 3) AS n
+        """,
+        {
+            "genes": genes,
+            "source": int(SOURCE_TYPE),
+            "target": int(TARGET_TYPE),
+            "species": int(SPECIES),
+        },
+    )
+    connection.execute(f"CREATE INDEX ON {SCHEMA}.gene (ode_ref_id)")
+    connection.execute(f"CREATE INDEX ON {SCHEMA}.gene (ode_gene_id)")
+    connection.execute(f"ANALYZE {SCHEMA}.gene")
+
+
+def explain_analyze(connection: psycopg.Connection, query: str, params: dict) -> tuple:
+    """Run a query under `EXPLAIN (ANALYZE, BUFFERS)`.
+
+    :return: The execution time in ms, and the shared buffers the query touched.
+    """
+    plan = connection.execute(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params
+    ).fetchone()[0][0]
+    buffers = plan["Plan"]["Shared Hit Blocks"] + plan["Plan"]["Shared Read Blocks"]
+    return plan["Execution Time"], buffers
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dsn", help="A database to create the bench schema in.")
+    parser.add_argument("--genes", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--without-preferred",
+        action="store_true",
+        help="Only map genes without a preferred target, the old query's worst case.",
+    )
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True) as connection:
+        create_gene_table(connection, args.genes)
+        try:
+            step = 2 if args.without_preferred else 1
+            genes = range(1, args.genes + 1, step)
+            source_ids = [f"SYM{g}" for g in random.sample(genes, args.batch)]
+            new_query, params = gene_query.mapping(source_ids, SPECIES, TARGET_TYPE)
+            queries = {
+                "old (PrefTrueCheck)": OLD_MAPPING.as_string(connection),
+                "new (DISTINCT ON per gene)": new_query.as_string(connection),
+            }
+            for name, query in queries.items():
+                query = query.replace("extsrc.gene", f"{SCHEMA}.gene")
+                rows = connection.execute(query, params).fetchall()
+                timings, buffers = zip(
+                    *(
+                        explain_analyze(connection, query, params)
+                        for _ in range(args.repeat)
+                    )
+                )
+                print(
+                    json.dumps(
+                        {
+                            "query": name,
+                            "median_ms": round(statistics.median(timings), 2),
+                            "shared_buffers": buffers[0],
+                            "rows": len(rows),
+                            "mapped_source_ids": len({row[0] for row in rows}),
+                            "source_ids": len(source_ids),
+                        }
+                    )
+                )
+        finally:
+            connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark the cold import time of the geneweaver.db package.
+
+Each statement is run in a fresh interpreter, so nothing is cached in `sys.modules`
+between runs. The settings environment variables are filled in with placeholders if
+they are not already set, since some statements construct the settings object.
+
+Usage:
+    python benchmarks/import_time.py [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+STATEMENTS = {
+    "import geneweaver.db": "import geneweaver.db",
+    "import geneweaver.db.gene": "import geneweaver.db.gene",
+    "import geneweaver.db.aio": "import geneweaver.db.aio",
+    "import geneweaver.db.aio.gene": "import geneweaver.db.aio.gene",
+    "import geneweaver.db.core.settings": "import geneweaver.db.core.settings",
+    "get_settings()": (
+        "from geneweaver.db.core.settings import get_settings; get_settings()"
+    ),
+    "geneweaver.db.*, all submodules": (
+        "import geneweaver.db as db; [getattr(db, name) for name in db.__all__]"
+    ),
+}
+
+TIMER = (
+    "import time; _start = time.perf_counter(); {statement}; "
+    "print(time.perf_counter() - _start)"
+)
+
+
+def time_statement(statement: str, runs: int, env: Dict[str, str]) -> List[float]:
+    """Time a statement in `runs` fresh interpreters.
+
+    :param statement: The statement to time.
+    :param runs: The number of interpreters to run it in.
+    :param env: The environment to run the interpreters in.
+
+    :return: The time taken by each run, in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main() -> None:
+    """Run the benchmark and print the results as a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Interpreters per case.")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("GWDB_SERVER", "benchmark_host")
+    env.setdefault("GWDB_USERNAME", "benchmark_user")
+
+    print(f"{'statement':<40} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for label, statement in STATEMENTS.items():
+        timings = [t * 1000 for t in time_statement(statement, args.runs, env)]
+        print(
+            f"{label:<40} {statistics.median(timings):>10.2f} "
+            f"{min(timings):>10.2f} {max(timings):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark the query builders with and without the compiled query cache.
+
+Each case calls a query builder with the same filters (the same "shape") but varying
+values, as a web request handler would. The "cold" timings clear the compiled query
+cache and the cached filter fragments before every call, which is what every call
+cost before the cache existed. The "warm" timings reuse them.
+
+Usage:
+    python benchmarks/query_builder.py [--number 2000] [--repeat 5]
+"""
+
+import argparse
+import itertools
+import timeit
+from typing import Callable, Dict
+
+from geneweaver.core.enum import GenesetTier, ScoreType, Species
+from geneweaver.db.query.geneset import read
+from geneweaver.db.query.geneset.utils import _is_readable_sql
+from geneweaver.db.query.search import search
+from geneweaver.db.query.search.utils import _search_sql
+from geneweaver.db.query.utils import _filter_sql, compiled_queries
+
+_values = itertools.count()
+
+CASES: Dict[str, Callable[[], object]] = {
+    "geneset.get(gs_id)": lambda: read.get(gs_id=next(_values)),
+    "geneset.get(owner, tier, search, page)": lambda: read.get(
+        owner_id=next(_values),
+        curation_tier={GenesetTier.TIER1, GenesetTier.TIER2},
+        search_text="alcohol",
+        is_readable_by=1,
+        limit=25,
+        offset=next(_values),
+    ),
+    "search.genesets(text, species, page)": lambda: search.genesets(
+        "alcohol preference",
+        is_readable_by=next(_values),
+        species=Species.MUS_MUSCULUS,
+        score_type=ScoreType.P_VALUE,
+        lte_count=1000,
+        limit=25,
+        offset=next(_values),
+    ),
+}
+
+
+def clear_caches() -> None:
+    """Forget all cached queries and filter fragments."""
+    compiled_queries.clear()
+    _filter_sql.cache_clear()
+    _is_readable_sql.cache_clear()
+    _search_sql.cache_clear()
+
+
+def time_case(
+    case: Callable[[], object], number: int, repeat: int, cold: bool
+) -> float:
+    """Get the best time per call of a case, in microseconds.
+
+    :param case: The builder call to time.
+    :param number: The number of calls per repeat.
+    :param repeat: The number of repeats.
+    :param cold: Clear the caches before every call.
+
+    :return: The best (lowest) time per call.
+    """
+    if cold:
+
+        def run() -> None:
+            clear_caches()
+            case()
+
+    else:
+        clear_caches()
+        case()
+        run = case
+    timings = timeit.repeat(run, number=number, repeat=repeat)
+    return min(timings) / number * 1_000_000
+
+
+def main() -> None:
+    """Run the benchmark and print the results as a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per repeat.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per case.")
+    args = parser.parse_args()
+
+    print(f"{'builder':<42} {'cold us':>10} {'warm us':>10} {'speedup':>8}")
+    for label, case in CASES.items():
+        cold = time_case(case, args.number, args.repeat, cold=True)
+        warm = time_case(case, args.number, args.repeat, cold=False)
+        print(f"{label:<42} {cold:>10.1f} {warm:>10.1f} {cold / warm:>7.1f}x")
+    print(f"\ncompiled query cache: {compiled_queries.info()}")
+
+
+if __name__ == "__main__":
+    main()
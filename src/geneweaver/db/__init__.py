@@ -1,4 +1,39 @@
-"""The root of the geneweaver database package."""
+"""The root of the geneweaver database package.
 
-# ruff: noqa: F401
-from geneweaver.db import aio, exceptions, gene, geneset, publication, species, user
+Submodules are imported lazily, the first time they are accessed as attributes of
+this package (e.g. `geneweaver.db.gene`), so importing the package stays cheap.
+"""
+
+# ruff: noqa: ANN401
+import importlib
+from typing import Any, List
+
+__all__ = [
+    "aio",
+    "exceptions",
+    "gene",
+    "geneset",
+    "geneset_value",
+    "homology_index",
+    "ontology",
+    "permissions",
+    "pipeline",
+    "project",
+    "publication",
+    "search",
+    "species",
+    "threshold",
+    "user",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodules listed in `__all__` on first access."""
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    """List the lazily imported submodules along with the module's attributes."""
+    return sorted(set(globals()) | set(__all__))
@@ -1,4 +1,37 @@
-"""Async query functions for the database."""
+"""Async query functions for the database.
 
-# ruff: noqa: F401
-from geneweaver.db.aio import gene, geneset, publication, species
+Submodules are imported lazily, the first time they are accessed as attributes of
+this package (e.g. `geneweaver.db.aio.gene`).
+"""
+
+# ruff: noqa: ANN401
+import importlib
+from typing import Any, List
+
+__all__ = [
+    "fan_out",
+    "gene",
+    "geneset",
+    "geneset_value",
+    "ontology",
+    "permissions",
+    "pipeline",
+    "project",
+    "publication",
+    "search",
+    "species",
+    "threshold",
+    "user",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodules listed in `__all__` on first access."""
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    """List the lazily imported submodules along with the module's attributes."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,79 @@
+"""Run independent async database calls concurrently, each on its own connection.
+
+A single `AsyncCursor` can only run one statement at a time, so awaiting several
+lookups on it takes the sum of their durations. `fan_out` runs each call on a
+separate pooled cursor instead, so a page that needs several independent lookups
+waits about as long as the slowest one.
+
+Example:
+-------
+    from geneweaver.db import aio
+    from geneweaver.db.aio.fan_out import fan_out
+
+    results = await fan_out(
+        {
+            "geneset": lambda cur: aio.geneset.by_id(cur, gs_id),
+            "ontology": lambda cur: aio.ontology.by_geneset(cur, gs_id),
+            "publication": lambda cur: aio.publication.by_id(cur, pub_id),
+        }
+    )
+    results["geneset"], results["ontology"], results["publication"]
+
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from geneweaver.db.core.cursor import async_cursor
+from geneweaver.db.core.settings import get_settings
+from psycopg import AsyncCursor
+
+T = TypeVar("T")
+
+
+async def fan_out(
+    calls: Dict[str, Callable[[AsyncCursor], Awaitable[T]]],
+    max_concurrency: Optional[int] = None,
+    readonly: bool = False,
+    deadline: Optional[float] = None,
+) -> Dict[str, T]:
+    """Run independent database calls concurrently, on separate pooled cursors.
+
+    Each call is given its own cursor from `async_cursor`. If any call raises, the
+    calls that are still running are cancelled, and the error is raised once they
+    have stopped.
+
+    :param calls: A dict of name to a function that takes a cursor and returns an
+    awaitable, e.g. `lambda cur: aio.geneset.by_id(cur, 1)`.
+    :param max_concurrency: The most calls to run at once. Defaults to the
+    `ASYNC_POOL_MAX_SIZE` setting.
+    :param readonly: Run the calls on read replicas, if any are usable.
+    :param deadline: The longest, in seconds, that any statement may take.
+
+    :return: A dict of the same names to the result of each call.
+    """
+    if not calls:
+        return {}
+
+    limit = max_concurrency or get_settings().ASYNC_POOL_MAX_SIZE
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(call: Callable[[AsyncCursor], Awaitable[T]]) -> T:
+        async with semaphore:
+            async with async_cursor(readonly=readonly, deadline=deadline) as cursor:
+                return await call(cursor)
+
+    tasks = {name: asyncio.create_task(run(call)) for name, call in calls.items()}
+    try:
+        await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for task in tasks.values():
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    return {name: task.result() for name, task in tasks.items()}
@@ -1,9 +1,26 @@
 """Database interaction code relating to Gene IDs."""
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Union
 
 from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.core.mapping import AON_ID_TYPE_FOR_SPECIES
+from geneweaver.db.cache import (
+    GENEDB_INDEXES,
+    GENEDB_QUERY,
+    async_reference_table,
+    cache_mappings,
+    cached_mappings,
+    genedb_rows,
+    merge_mappings,
+)
+from geneweaver.db.core.prepared import prepared_statements
 from geneweaver.db.query import gene as gene_query
+from geneweaver.db.utils import (
+    Page,
+    aiter_query,
+    async_temp_id_table,
+    keyset_page,
+)
 from psycopg import AsyncCursor, rows
 
 
@@ -15,7 +32,9 @@ async def get(
     preferred: Optional[bool] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
-) -> List:
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+) -> Union[List, Page]:
     """Get genes from the database.
 
     :param cursor: An async database cursor.
@@ -25,10 +44,16 @@ async def get(
     :param preferred: Whether to search for preferred genes.
     :param limit: The limit of results to return.
     :param offset: The offset of results to return.
+    :param keyset: Sort the results by gene ID, gene database and reference ID, and
+    return a `Page` with a token for the next page instead of a list.
+    :param page_token: Return the page after the row of this page token (implies
+    `keyset`).
 
     :return: list of results using `.fetchall()`
     """
-    await cursor.execute(
+    await prepared_statements.async_execute(
+        cursor,
+        "gene.get",
         *gene_query.get(
             reference_id=reference_id,
             gene_database=gene_database,
@@ -36,10 +61,52 @@ async def get(
             preferred=preferred,
             limit=limit,
             offset=offset,
+            keyset=keyset,
+            page_token=page_token,
         )
     )
 
-    return await cursor.fetchall()
+    results = await cursor.fetchall()
+    if keyset or page_token is not None:
+        return keyset_page(results, gene_query.GENE_KEYSET, limit)
+    return results
+
+
+def iter_get(
+    cursor: AsyncCursor,
+    reference_id: Optional[str] = None,
+    gene_database: Optional[GeneIdentifier] = None,
+    species: Optional[Species] = None,
+    preferred: Optional[bool] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    itersize: Optional[int] = None,
+) -> AsyncIterator[rows.Row]:
+    """Stream genes from the database.
+
+    Like `get`, but rows are fetched from a server-side cursor in batches of
+    `itersize`, so memory use stays bounded for very large results.
+
+    :param cursor: An async database cursor.
+    :param reference_id: The reference id to search for.
+    :param gene_database: The gene database to search for.
+    :param species: The species to search for.
+    :param preferred: Whether to search for preferred genes.
+    :param limit: The limit of results to return.
+    :param offset: The offset of results to return.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: An async generator of results.
+    """
+    query, params = gene_query.get(
+        reference_id=reference_id,
+        gene_database=gene_database,
+        species=species,
+        preferred=preferred,
+        limit=limit,
+        offset=offset,
+    )
+    return aiter_query(cursor, query, params, itersize)
 
 
 async def get_preferred(
@@ -53,7 +120,9 @@ async def get_preferred(
 
     :return: The preferred gene using `.fetchone()`
     """
-    await cursor.execute(
+    await prepared_statements.async_execute(
+        cursor,
+        "gene.get",
         *gene_query.get(
             gene_id=gene_id,
             preferred=True,
@@ -63,38 +132,98 @@ async def get_preferred(
     return await cursor.fetchone()
 
 
+async def _fetch_mapping(
+    cursor: AsyncCursor,
+    source_ids: List[str],
+    species: Species,
+    target_gene_id_type: GeneIdentifier,
+) -> List:
+    """Run the gene mapping query, through a temp table for large batches."""
+    async with async_temp_id_table(cursor, source_ids) as source_table:
+        query, params = gene_query.mapping(
+            source_ids=source_ids,
+            species=species,
+            target_gene_id_type=target_gene_id_type,
+            source_table=source_table,
+        )
+        await cursor.execute(query, params)
+        return await cursor.fetchall()
+
+
 async def mapping(
     cursor: AsyncCursor,
     source_ids: List[str],
     species: Species,
     target_gene_id_type: GeneIdentifier,
+    use_cache: bool = False,
 ) -> List:
     """Get gene mappings from the database.
 
     This method works _within_ a species.
 
+    With `use_cache`, the rows of each source id are cached in process (see
+    `geneweaver.db.cache`), only the ids that aren't cached are sent to the database,
+    and the rows are returned in the order of the source ids.
+
     :param cursor: An async database cursor.
     :param source_ids: The list of gene ids to get mappings for.
     :param species: The species of the identifiers.
     :param target_gene_id_type: The gene id type to return.
+    :param use_cache: Serve the mappings from the in-process cache where possible.
 
     :return: list of results using `.fetchall()`
     """
-    await cursor.execute(
-        *gene_query.mapping(
+    if not use_cache:
+        return await _fetch_mapping(cursor, source_ids, species, target_gene_id_type)
+
+    found, missing = cached_mappings(
+        cursor.row_factory, source_ids, species, target_gene_id_type
+    )
+    if missing:
+        rows = await _fetch_mapping(cursor, missing, species, target_gene_id_type)
+        found.update(
+            cache_mappings(
+                cursor.row_factory, species, target_gene_id_type, missing, rows
+            )
+        )
+    return merge_mappings(source_ids, found)
+
+
+async def iter_mapping(
+    cursor: AsyncCursor,
+    source_ids: List[str],
+    species: Species,
+    target_gene_id_type: GeneIdentifier,
+    itersize: Optional[int] = None,
+) -> AsyncIterator[rows.Row]:
+    """Stream gene mappings from the database.
+
+    See `geneweaver.db.gene.iter_mapping` for details.
+
+    :param cursor: An async database cursor.
+    :param source_ids: The list of gene ids to get mappings for.
+    :param species: The species of the identifiers.
+    :param target_gene_id_type: The gene id type to return.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: An async generator of results.
+    """
+    async with async_temp_id_table(cursor, source_ids) as source_table:
+        query, params = gene_query.mapping(
             source_ids=source_ids,
             species=species,
             target_gene_id_type=target_gene_id_type,
+            source_table=source_table,
         )
-    )
-
-    return await cursor.fetchall()
+        async for row in aiter_query(cursor, query, params, itersize):
+            yield row
 
 
 async def aon_mapping(
     cursor: AsyncCursor,
     source_ids: List[str],
     species: Species,
+    use_cache: bool = False,
 ) -> List:
     """Get gene mappings in the default identifier type for that species in AON.
 
@@ -103,14 +232,108 @@ async def aon_mapping(
     :param cursor: An async database cursor.
     :param source_ids: The list of gene ids to get mappings for.
     :param species: The species of the identifiers.
+    :param use_cache: Serve the mappings from the in-process cache where possible.
+
+    :return: list of results using `.fetchall()`
+    """
+    return await mapping(
+        cursor,
+        source_ids,
+        species,
+        AON_ID_TYPE_FOR_SPECIES[species],
+        use_cache=use_cache,
+    )
+
+
+async def id_types(cursor: AsyncCursor, species: Optional[Species] = None) -> List:
+    """Get all the Gene ID types from the database.
+
+    :param cursor: An async database cursor.
+    :param species: Limit to additional species other than mouse
 
     :return: list of results using `.fetchall()`
     """
+    table = await async_reference_table(cursor, "genedb", GENEDB_QUERY, GENEDB_INDEXES)
+    if table is not None:
+        return genedb_rows(table, cursor.row_factory, species=species)
+
+    if species is None:
+        await cursor.execute("""SELECT * FROM odestatic.genedb ORDER BY gdb_id;""")
+    else:
+        await cursor.execute(
+            """SELECT * FROM odestatic.genedb
+            WHERE sp_id=0 OR sp_id=%(sp_id)s
+            ORDER BY gdb_id;""",
+            {"sp_id": int(species)},
+        )
+
+    return await cursor.fetchall()
+
+
+async def gene_database_by_id(cursor: AsyncCursor, genedb_id: GeneIdentifier) -> List:
+    """Get all gene database info by gene database id.
+
+    :param cursor: An async database cursor.
+    :param genedb_id: The gene database id to search for.
+
+    :return: list of results using `.fetchall()`
+    """
+    table = await async_reference_table(cursor, "genedb", GENEDB_QUERY, GENEDB_INDEXES)
+    if table is not None:
+        return genedb_rows(table, cursor.row_factory, genedb_id=genedb_id)
+
     await cursor.execute(
-        *gene_query.aon_mapping(
-            source_ids=source_ids,
-            species=species,
+        """SELECT * FROM odestatic.genedb WHERE gdb_id = %(gdb_id)s;""",
+        {"gdb_id": int(genedb_id)},
+    )
+    return await cursor.fetchall()
+
+
+async def gene_database_id(cursor: AsyncCursor, identifier: GeneIdentifier) -> List:
+    """Get all gene database info by gene database name.
+
+    :param cursor: An async database cursor.
+    :param identifier: The gene database name to search for.
+
+    :return: list of results using `.fetchall()`
+    """
+    table = await async_reference_table(cursor, "genedb", GENEDB_QUERY, GENEDB_INDEXES)
+    if table is not None:
+        return genedb_rows(
+            table, cursor.row_factory, name=str(identifier), columns=["gdb_id"]
         )
+
+    await cursor.execute(
+        """SELECT gdb_id FROM odestatic.genedb WHERE gdb_name = %(gdb_name)s;""",
+        {"gdb_name": str(identifier)},
     )
+    return await cursor.fetchall()
 
+
+async def symbols_by_project_id(cursor: AsyncCursor, project_id: int) -> List:
+    """Get all gene symbols associated with a specific project id.
+
+    :param cursor: An async database cursor.
+    :param project_id: The project id to search for.
+
+    :return: list of results using `.fetchall()`
+    """
+    await cursor.execute(*gene_query.symbols_by_project_id(project_id))
     return await cursor.fetchall()
+
+
+def iter_symbols_by_project_id(
+    cursor: AsyncCursor, project_id: int, itersize: Optional[int] = None
+) -> AsyncIterator[rows.Row]:
+    """Stream all gene symbols associated with a specific project id.
+
+    Like `symbols_by_project_id`, but rows are fetched from a server-side cursor in
+    batches of `itersize`, so memory use stays bounded for very large projects.
+
+    :param cursor: An async database cursor.
+    :param project_id: The project id to search for.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: An async generator of results.
+    """
+    return aiter_query(cursor, *gene_query.symbols_by_project_id(project_id), itersize)
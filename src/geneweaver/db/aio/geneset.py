@@ -1,17 +1,38 @@
 """Async database interaction code relating to Genesets."""
 
 from datetime import date
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 
 from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.gene import GeneValue
 from geneweaver.core.schema.geneset import GenesetUpload
 from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.aio.permissions import readable_genesets
+from geneweaver.db.core.prepared import prepared_statements
 from geneweaver.db.query import geneset as geneset_query
-from geneweaver.db.query.geneset.utils import geneset_upload_to_kwargs
-from geneweaver.db.utils import GenesetScoreTypeOrScoreTypes, GenesetTierOrTiers
+from geneweaver.db.query.geneset.const import (
+    COPY_GENESET_VALUES,
+    COPY_GENESET_VALUES_TYPES,
+    GENESET_KEYSET,
+)
+from geneweaver.db.query.geneset.utils import (
+    geneset_upload_to_kwargs,
+    geneset_value_rows,
+    upload_gene_ids,
+    upload_gene_keys,
+)
+from geneweaver.db.utils import (
+    GenesetScoreTypeOrScoreTypes,
+    GenesetTierOrTiers,
+    Page,
+    RowsWithTotal,
+    keyset_page,
+    row_value,
+    split_total,
+)
 from psycopg import AsyncCursor
 from psycopg.rows import Row
+from psycopg.sql import Composed
 
 
 async def get(
@@ -38,7 +59,11 @@ async def get(
     updated_before: Optional[date] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
-) -> List[Row]:
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
+    use_readable_cache: bool = False,
+) -> Union[List[Row], Page, RowsWithTotal]:
     """Get genesets from the database.
 
     :param cursor: An async database cursor.
@@ -65,10 +90,26 @@ async def get(
     :param created_after: Show only results updated before this date.
     :param limit: Limit the number of results.
     :param offset: Offset the results.
+    :param keyset: Sort the results by geneset ID, and return a `Page` with a token
+    for the next page instead of a list.
+    :param page_token: Return the page after the row of this page token (implies
+    `keyset`).
+    :param with_total: Also count the matching genesets, ignoring the limit and
+    offset, in the same query, and return `RowsWithTotal` instead of a list.
+    :param use_readable_cache: Filter on the materialized (and cached) readable
+    genesets of the `is_readable_by` user, instead of checking each geneset with
+    `geneset_is_readable2` (see `geneweaver.db.permissions`).
 
     :return: list of results using `.fetchall()`
     """
-    await cursor.execute(
+    readable = (
+        await readable_genesets(cursor, is_readable_by)
+        if use_readable_cache and is_readable_by is not None
+        else None
+    )
+    await prepared_statements.async_execute(
+        cursor,
+        "geneset.get",
         *geneset_query.get(
             is_readable_by=is_readable_by,
             gs_id=gs_id,
@@ -83,6 +124,10 @@ async def get(
             search_text=search_text,
             limit=limit,
             offset=offset,
+            keyset=keyset,
+            page_token=page_token,
+            with_total=with_total,
+            readable_genesets=readable,
             with_publication_info=with_publication_info,
             ontology_term=ontology_term,
             score_type=score_type,
@@ -92,10 +137,15 @@ async def get(
             created_before=created_before,
             updated_after=updated_after,
             updated_before=updated_before,
-        )
+        ),
     )
 
-    return await cursor.fetchall()
+    results = await cursor.fetchall()
+    if keyset or page_token is not None:
+        return keyset_page(results, GENESET_KEYSET, limit)
+    if with_total:
+        return split_total(results, offset)
+    return results
 
 
 async def by_id(
@@ -111,12 +161,14 @@ async def by_id(
     :param is_readable_by: A user ID to check if the user can read the results.
     :param with_publication_info: Include publication info in the return.
     """
-    await cursor.execute(
+    await prepared_statements.async_execute(
+        cursor,
+        "geneset.get",
         *geneset_query.get(
             gs_id=gs_id,
             is_readable_by=is_readable_by,
             with_publication_info=with_publication_info,
-        )
+        ),
     )
 
     return await cursor.fetchone()
@@ -271,6 +323,9 @@ async def add(
     :param publication_id: The (internal) publication ID associated with the Geneset.
     :return: The geneset ID.
     """
+    # This keeps the database's `reparse_geneset_file`, rather than going through
+    # `add_with_values`, since it also handles microarray probe IDs, and it keeps
+    # the values of the symbols that don't resolve to a gene.
     file_id = await add_geneset_file(
         cursor=cursor,
         values=geneset.gene_list,
@@ -285,3 +340,113 @@ async def add(
     await cursor.execute(*geneset_query.reparse_geneset_file(geneset_id=geneset_id))
     await cursor.execute(*geneset_query.process_thresholds(geneset_id=geneset_id))
     return geneset_id
+
+
+async def add_with_values(
+    cursor: AsyncCursor,
+    geneset: GenesetUpload,
+    owner_id: Optional[int] = None,
+    publication_id: Optional[int] = None,
+) -> int:
+    """Add a geneset, its file and its values to the database in one round trip.
+
+    The inserts are chained in a single statement, which is pipelined with the call
+    to the database's `process_thresholds` that marks the values within the
+    geneset's threshold, in the same transaction. Like `add_many` (and unlike `add`),
+    the values aren't re-parsed from the geneset file by the database, and symbols
+    that don't resolve to a gene are left out.
+
+    :param cursor: An async database cursor.
+    :param geneset: An instance of a GenesetUpload schema.
+    :param owner_id: The owner of the geneset.
+    :param publication_id: The (internal) publication ID associated with the Geneset.
+
+    :raises GeneweaverValueError: If the upload uses microarray probe IDs.
+
+    :return: The geneset ID.
+    """
+    query, params = geneset_query.add_with_values(
+        user_id=owner_id,
+        values=geneset.values,  # noqa: PD011
+        publication_id=publication_id,
+        **geneset_upload_to_kwargs(geneset),
+    )
+    async with cursor.connection.pipeline(), cursor.connection.transaction():
+        await cursor.execute(query, params)
+        # The function can't see the rows inserted by the statement that calls it,
+        # so it runs in the next one, on its own cursor to keep the inserted gs_id.
+        await cursor.connection.cursor().execute(
+            *geneset_query.process_thresholds_last_added()
+        )
+    return row_value(await cursor.fetchone(), "gs_id", 0)
+
+
+async def _insert_returning_ids(
+    cursor: AsyncCursor, queries: List[Tuple[Composed, dict]], column: str
+) -> List[int]:
+    """Run inserts of the same shape in one batch, and get the ID each returned."""
+    await cursor.executemany(
+        queries[0][0], [params for _, params in queries], returning=True
+    )
+    ids = [row_value(await cursor.fetchone(), column, 0)]
+    while cursor.nextset():
+        ids.append(row_value(await cursor.fetchone(), column, 0))
+    return ids
+
+
+async def add_many(
+    cursor: AsyncCursor,
+    genesets: Sequence[GenesetUpload],
+    owner_id: Optional[int] = None,
+    publication_id: Optional[int] = None,
+) -> List[int]:
+    """Add many genesets to the database, in one transaction.
+
+    See `geneweaver.db.geneset.add_many` for details.
+
+    :param cursor: An async database cursor.
+    :param genesets: The GenesetUploads to add.
+    :param owner_id: The owner of the genesets.
+    :param publication_id: The (internal) publication ID associated with the genesets.
+
+    :raises GeneweaverValueError: If an upload uses microarray probe IDs.
+
+    :return: The geneset IDs, in the order of the uploads.
+    """
+    if not genesets:
+        return []
+    keys = upload_gene_keys(genesets)
+
+    async with cursor.connection.transaction():
+        file_ids = await _insert_returning_ids(
+            cursor,
+            [geneset_query.add_geneset_file(values=gs.values) for gs in genesets],
+            "file_id",
+        )
+        geneset_ids = await _insert_returning_ids(
+            cursor,
+            [
+                geneset_query.add(
+                    user_id=owner_id,
+                    file_id=file_id,
+                    publication_id=publication_id,
+                    **geneset_upload_to_kwargs(geneset),
+                )
+                for file_id, geneset in zip(file_ids, genesets)
+            ],
+            "gs_id",
+        )
+
+        await cursor.execute(*geneset_query.gene_ids_for_upload_keys(keys))
+        gene_ids = upload_gene_ids(await cursor.fetchall())
+
+        today = date.today()
+        async with cursor.copy(COPY_GENESET_VALUES) as copy:
+            copy.set_types(COPY_GENESET_VALUES_TYPES)
+            for geneset_id, geneset in zip(geneset_ids, genesets):
+                for row in geneset_value_rows(geneset_id, geneset, gene_ids, today):
+                    await copy.write_row(row)
+
+        await cursor.execute(*geneset_query.process_thresholds_many(geneset_ids))
+
+    return geneset_ids
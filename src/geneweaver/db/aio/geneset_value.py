@@ -0,0 +1,141 @@
+"""Async database functions for geneset values."""
+
+from typing import AsyncIterator, List, Optional
+
+from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.geneset_value import GenesetValueColumns, geneset_value_columns
+from geneweaver.db.query import geneset_value as geneset_value_query
+from geneweaver.db.utils import aiter_query
+from psycopg import AsyncCursor
+from psycopg.rows import Row
+
+
+async def by_geneset_id(
+    cursor: AsyncCursor,
+    geneset_id: int,
+    identifier: Optional[GeneIdentifier] = None,
+    gsv_in_threshold: Optional[bool] = False,
+) -> List[Row]:
+    """Retrieve all geneset values associated with a geneset.
+
+    :param cursor: An async database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to return.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: A list of geneset values associated with the geneset.
+    """
+    if identifier is not None:
+        return await by_geneset_id_and_identifier(
+            cursor, geneset_id, identifier, gsv_in_threshold
+        )
+    else:
+        return await by_geneset_id_as_uploaded(cursor, geneset_id, gsv_in_threshold)
+
+
+def iter_by_geneset_id(
+    cursor: AsyncCursor,
+    geneset_id: int,
+    identifier: Optional[GeneIdentifier] = None,
+    gsv_in_threshold: Optional[bool] = False,
+    itersize: Optional[int] = None,
+) -> AsyncIterator[Row]:
+    """Stream all geneset values associated with a geneset.
+
+    Like `by_geneset_id`, but rows are fetched from a server-side cursor in batches
+    of `itersize`, so memory use stays bounded for very large genesets.
+
+    :param cursor: An async database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to return.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: An async generator of geneset values associated with the geneset.
+    """
+    if identifier is not None:
+        query, params = geneset_value_query.by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
+    else:
+        query, params = geneset_value_query.by_geneset_id_as_uploaded(
+            geneset_id, gsv_in_threshold
+        )
+    return aiter_query(cursor, query, params, itersize)
+
+
+async def by_geneset_id_columns(
+    cursor: AsyncCursor,
+    geneset_id: int,
+    identifier: Optional[GeneIdentifier] = None,
+    gsv_in_threshold: Optional[bool] = False,
+) -> GenesetValueColumns:
+    """Retrieve the geneset values of a geneset as NumPy arrays.
+
+    Like `by_geneset_id`, but the database packs each column into a single value,
+    so the arrays are built without creating a Python object per row.
+
+    :param cursor: An async database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to return.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: The `ode_gene_id`, `gsv_value`, `gsv_in_threshold` and `ode_ref_id`
+    columns of the geneset values.
+    """
+    await cursor.execute(
+        *geneset_value_query.by_geneset_id_columns(
+            geneset_id, identifier, gsv_in_threshold
+        ),
+        binary=True,
+    )
+    return geneset_value_columns(await cursor.fetchone())
+
+
+async def by_geneset_id_as_uploaded(
+    cursor: AsyncCursor, geneset_id: int, gsv_in_threshold: Optional[bool] = False
+) -> List[Row]:
+    """Retrieve all geneset values associated with a geneset.
+
+    :param cursor: An async database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: A list of geneset values associated with the geneset.
+    """
+    await cursor.execute(
+        *geneset_value_query.by_geneset_id_as_uploaded(geneset_id, gsv_in_threshold)
+    )
+    return await cursor.fetchall()
+
+
+async def by_geneset_id_and_identifier(
+    cursor: AsyncCursor,
+    geneset_id: int,
+    identifier: GeneIdentifier,
+    gsv_in_threshold: Optional[bool] = False,
+) -> List[Row]:
+    """Retrieve all geneset values associated with a geneset.
+
+    NOTE: If you are mapping identifiers across species, you will need to use the
+    `geneweaver.db.gene.get_homolog_ids_by_ode_id` function to get the homolog ids
+    for the geneset values after processing the results of this function.
+
+    :param cursor: An async database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to use.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: A list of geneset values associated with the geneset.
+    """
+    await cursor.execute(
+        *geneset_value_query.by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
+    )
+    return await cursor.fetchall()
@@ -0,0 +1,37 @@
+"""Materialized geneset permissions, cached per user.
+
+See `geneweaver.db.permissions` for details. The cache is shared with the sync
+functions, so `geneweaver.db.permissions.invalidate_readable_genesets` covers both.
+"""
+
+from geneweaver.db.cache import readable_genesets_cache
+from geneweaver.db.query import permissions as permissions_query
+from geneweaver.db.query.permissions import ReadableGenesets
+from psycopg import AsyncCursor
+
+
+async def readable_genesets(
+    cursor: AsyncCursor, user_id: int, use_cache: bool = True
+) -> ReadableGenesets:
+    """Get the genesets a user can read.
+
+    :param cursor: An async database cursor.
+    :param user_id: The user ID to get the readable genesets of.
+    :param use_cache: Serve the genesets from the in-process cache if they are
+    cached, and cache them if they aren't.
+
+    :return: The user's readable genesets.
+    """
+    cache = readable_genesets_cache()
+    if use_cache:
+        cached = cache.get(user_id)
+        if cached is not None:
+            return cached
+
+    await cursor.execute(*permissions_query.readable_genesets(user_id))
+    readable = permissions_query.readable_genesets_from_row(
+        user_id, await cursor.fetchone()
+    )
+    if use_cache:
+        cache.set(user_id, readable)
+    return readable
@@ -0,0 +1,43 @@
+"""Run several queries in a single network round trip using async pipeline mode."""
+
+from typing import List, Optional, Sequence
+
+from geneweaver.db.pipeline import BatchQuery
+from psycopg import AsyncCursor
+from psycopg.rows import Row
+
+
+async def execute_batch(
+    cursor: AsyncCursor, queries: Sequence[BatchQuery]
+) -> List[Optional[List[Row]]]:
+    """Execute a batch of queries in pipeline mode.
+
+    Each query is run on its own cursor on the same connection as `cursor`, using the
+    same row factory, so that all results can be collected after a single sync with
+    the server. If any query fails, the error is raised once the batch completes.
+
+    :param cursor: An async database cursor.
+    :param queries: A sequence of (query, params) tuples, as returned by builders in
+    `geneweaver.db.query`.
+
+    :return: A list with one entry per query, in order. Each entry is the result of
+    `.fetchall()`, or None if the query does not return rows.
+    """
+    connection = cursor.connection
+    batch_cursors = [connection.cursor(row_factory=cursor.row_factory) for _ in queries]
+    try:
+        async with connection.pipeline():
+            for batch_cursor, (query, params) in zip(batch_cursors, queries):
+                await batch_cursor.execute(query, params)
+
+        return [
+            (
+                await batch_cursor.fetchall()
+                if batch_cursor.description is not None
+                else None
+            )
+            for batch_cursor in batch_cursors
+        ]
+    finally:
+        for batch_cursor in batch_cursors:
+            await batch_cursor.close()
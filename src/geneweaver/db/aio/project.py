@@ -1,9 +1,10 @@
 """Database code for interacting with Project table."""
 
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from geneweaver.core.schema.project import ProjectCreate
 from geneweaver.db.query import project as project_query
+from geneweaver.db.utils import Page, RowsWithTotal, keyset_page, split_total
 from psycopg import AsyncCursor
 from psycopg.rows import Row
 
@@ -17,7 +18,10 @@ async def get(
     search_text: Optional[str] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
-) -> List[Row]:
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
+) -> Union[List[Row], Page, RowsWithTotal]:
     """Get projects from the database.
 
     :param cursor: A database async cursor.
@@ -29,6 +33,12 @@ async def get(
                         full-text search).
     :param limit: Limit the number of results.
     :param offset: Offset the results.
+    :param keyset: Sort the results by project ID, and return a `Page` with a token
+    for the next page instead of a list.
+    :param page_token: Return the page after the row of this page token (implies
+    `keyset`).
+    :param with_total: Also count the matching projects, ignoring the limit and
+    offset, in the same query, and return `RowsWithTotal` instead of a list.
     :return: list of results using `.fetchall()`
     """
     await cursor.execute(
@@ -40,10 +50,18 @@ async def get(
             search_text=search_text,
             limit=limit,
             offset=offset,
+            keyset=keyset,
+            page_token=page_token,
+            with_total=with_total,
         )
     )
 
-    return await cursor.fetchall()
+    results = await cursor.fetchall()
+    if keyset or page_token is not None:
+        return keyset_page(results, project_query.PROJECT_KEYSET, limit)
+    if with_total:
+        return split_total(results, offset)
+    return results
 
 
 async def shared_with_user(
@@ -1,13 +1,19 @@
 """Async database interaction code relating to searching."""
 
 from datetime import date
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Union
 
+from geneweaver.db.aio.permissions import readable_genesets
 from geneweaver.db.query import search
 from geneweaver.db.utils import (
     GenesetScoreTypeOrScoreTypes,
     GenesetTierOrTiers,
+    Page,
+    RowsWithTotal,
     SpeciesOrSpeciesSet,
+    aiter_query,
+    keyset_page,
+    split_total,
 )
 from psycopg import AsyncCursor
 from psycopg.rows import Row
@@ -31,7 +37,11 @@ async def genesets(
     limit: Optional[int] = None,
     offset: Optional[int] = None,
     _status: Optional[str] = "normal",
-) -> List[Row]:
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
+    use_readable_cache: bool = False,
+) -> Union[List[Row], Page, RowsWithTotal]:
     """Search genesets using all relevant metadata fields.
 
     :param cursor: An async database cursor.
@@ -51,7 +61,22 @@ async def genesets(
     :param limit: Limit the number of results.
     :param offset: Offset the results.
     :param _status: Show only results with this status. Default is "normal".
+    :param keyset: Sort the results by search rank (best first) and geneset ID, and
+    return a `Page` with a token for the next page instead of a list. The rank is
+    returned as `search_rank`.
+    :param page_token: Return the page after the row of this page token (implies
+    `keyset`).
+    :param with_total: Also count the matching genesets, ignoring the limit and
+    offset, in the same query, and return `RowsWithTotal` instead of a list.
+    :param use_readable_cache: Filter on the materialized (and cached) readable
+    genesets of the `is_readable_by` user, instead of checking each geneset with
+    `geneset_is_readable2` (see `geneweaver.db.permissions`).
     """
+    readable = (
+        await readable_genesets(cursor, is_readable_by)
+        if use_readable_cache and is_readable_by is not None
+        else None
+    )
     await cursor.execute(
         *search.genesets(
             search_text,
@@ -70,7 +95,83 @@ async def genesets(
             limit=limit,
             offset=offset,
             _status=_status,
+            keyset=keyset,
+            page_token=page_token,
+            with_total=with_total,
+            readable_genesets=readable,
         )
     )
 
-    return await cursor.fetchall()
+    results = await cursor.fetchall()
+    if keyset or page_token is not None:
+        return keyset_page(results, search.genesets_keyset(search_text), limit)
+    if with_total:
+        return split_total(results, offset)
+    return results
+
+
+def iter_genesets(
+    cursor: AsyncCursor,
+    search_text: str,
+    is_readable_by: Optional[int] = None,
+    publication_id: Optional[int] = None,
+    pubmed_id: Optional[int] = None,
+    species: Optional[SpeciesOrSpeciesSet] = None,
+    curation_tier: Optional[GenesetTierOrTiers] = None,
+    score_type: Optional[GenesetScoreTypeOrScoreTypes] = None,
+    lte_count: Optional[int] = None,
+    gte_count: Optional[int] = None,
+    created_before: Optional[date] = None,
+    created_after: Optional[date] = None,
+    updated_before: Optional[date] = None,
+    updated_after: Optional[date] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    _status: Optional[str] = "normal",
+    itersize: Optional[int] = None,
+) -> AsyncIterator[Row]:
+    """Stream geneset search results using all relevant metadata fields.
+
+    Like `genesets`, but rows are fetched from a server-side cursor in batches of
+    `itersize`, so memory use stays bounded for searches without a limit.
+
+    :param cursor: An async database cursor.
+    :param search_text: Return genesets that match this search text.
+    :param is_readable_by: A user ID to check if the user can read the results.
+    :param publication_id: Show only results with this publication ID (internal).
+    :param pubmed_id: Show only results with this PubMed ID.
+    :param species: Show only results associated with this species.
+    :param curation_tier: Show only results of this curation tier.
+    :param score_type: Show only results with given score type.
+    :param lte_count: less than or equal count.
+    :param gte_count: greater than or equal count.
+    :param created_before: Show only results created before this date.
+    :param created_after: Show only results updated before this date.
+    :param updated_before: Show only results updated before this date.
+    :param updated_after: Show only results updated after this date.
+    :param limit: Limit the number of results.
+    :param offset: Offset the results.
+    :param _status: Show only results with this status. Default is "normal".
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: An async generator of search results.
+    """
+    query, params = search.genesets(
+        search_text,
+        is_readable_by=is_readable_by,
+        publication_id=publication_id,
+        pubmed_id=pubmed_id,
+        species=species,
+        curation_tier=curation_tier,
+        score_type=score_type,
+        lte_count=lte_count,
+        gte_count=gte_count,
+        created_before=created_before,
+        created_after=created_after,
+        updated_before=updated_before,
+        updated_after=updated_after,
+        limit=limit,
+        offset=offset,
+        _status=_status,
+    )
+    return aiter_query(cursor, query, params, itersize)
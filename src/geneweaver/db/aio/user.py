@@ -10,6 +10,7 @@ The functions that return one or more entire user records are:
 from typing import Optional
 
 from geneweaver.core.schema.user import User
+from geneweaver.db.core.prepared import prepared_statements
 from geneweaver.db.query import user
 from geneweaver.db.utils import temp_override_row_factory
 from psycopg import AsyncCursor, rows
@@ -34,7 +35,9 @@ async def by_api_key(cursor: AsyncCursor, api_key: str) -> Optional[User]:
 
     :return: list of results using `.fetchall()`
     """
-    await cursor.execute(*user.by_api_key(api_key))
+    await prepared_statements.async_execute(
+        cursor, "user.by_api_key", *user.by_api_key(api_key)
+    )
     return await __fetch_and_return_user(cursor)
 
 
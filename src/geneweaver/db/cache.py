@@ -0,0 +1,440 @@
+"""In-process caches of database results, shared by the sync and aio functions.
+
+The gene mapping cache is created on first use, sized from the settings object, and
+is only used by functions that are called with `use_cache=True`. Each caller gets
+its own copies of the cached mapping rows, so they can be modified freely.
+
+The small, static reference tables (gene databases, species and ontology databases)
+are loaded in full the first time one of their functions is called with a cursor
+that uses the `dict_row` or `tuple_row` row factory, and are served from memory after
+that. Calls with other row factories still query the database.
+
+The groups and curator status each user's readable genesets are checked with (see
+`geneweaver.db.permissions`) are cached for `GWDB_READABLE_CACHE_TTL` seconds.
+
+Gene identifier data only changes with data releases, so call `invalidate_all()`
+after loading a release.
+"""
+
+# ruff: noqa: ANN101, ANN401
+import copy
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.core.cache import LRUCache
+from geneweaver.db.core.settings import get_settings
+from geneweaver.db.utils import row_value
+from psycopg import AsyncCursor, Cursor
+from psycopg.rows import Row, dict_row, tuple_row
+from psycopg.sql import SQL, Composable
+
+_caches: Dict[str, LRUCache] = {}
+_reference_tables: Dict[str, "ReferenceTable"] = {}
+_lock = threading.Lock()
+
+
+def _register(name: str, cache: LRUCache) -> LRUCache:
+    """Register a cache under a name, unless another thread registered one first."""
+    with _lock:
+        return _caches.setdefault(name, cache)
+
+
+def gene_mapping_cache() -> LRUCache:
+    """Get the cache of gene mapping rows, creating it on first use.
+
+    Keys are (row factory, species, target gene identifier type, source ref id), and
+    values are tuples of the rows that the source ref id maps to.
+
+    :return: The gene mapping cache.
+    """
+    cache = _caches.get("gene_mapping")
+    if cache is None:
+        settings = get_settings()
+        cache = _register(
+            "gene_mapping",
+            LRUCache(settings.MAPPING_CACHE_SIZE, settings.MAPPING_CACHE_TTL),
+        )
+    return cache
+
+
+def readable_genesets_cache() -> LRUCache:
+    """Get the cache of users' readable geneset checks, creating it on first use.
+
+    Keys are user IDs, and values are the `ReadableGenesets` of that user.
+
+    :return: The readable genesets cache.
+    """
+    cache = _caches.get("readable_genesets")
+    if cache is None:
+        settings = get_settings()
+        cache = _register(
+            "readable_genesets",
+            LRUCache(settings.READABLE_CACHE_SIZE, settings.READABLE_CACHE_TTL),
+        )
+    return cache
+
+
+def invalidate_all() -> None:
+    """Remove all values from every cache, e.g. after a data release."""
+    with _lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
+    reload_reference_tables()
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Get the hit and miss counters of every cache that has been created.
+
+    :return: A dict of cache name to the counters from `LRUCache.stats`.
+    """
+    with _lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def cached_mappings(
+    row_factory: Hashable,
+    source_ids: Iterable[str],
+    species: Species,
+    target_gene_id_type: GeneIdentifier,
+) -> Tuple[Dict[str, tuple], List[str]]:
+    """Look up the cached mapping rows of some gene ids.
+
+    :param row_factory: The row factory of the cursor the rows are for.
+    :param source_ids: The gene ids to get mappings for.
+    :param species: The species of the identifiers.
+    :param target_gene_id_type: The gene id type to map to.
+
+    :return: A dict of source id to its cached rows, and a list of the source ids that
+    weren't cached, in input order.
+    """
+    prefix = (row_factory, int(species), int(target_gene_id_type))
+    found, missing = gene_mapping_cache().get_many(
+        prefix + (source_id,) for source_id in source_ids
+    )
+    return {key[-1]: rows for key, rows in found.items()}, [key[-1] for key in missing]
+
+
+def cache_mappings(
+    row_factory: Hashable,
+    species: Species,
+    target_gene_id_type: GeneIdentifier,
+    source_ids: List[str],
+    rows: List,
+) -> Dict[str, tuple]:
+    """Cache the mapping rows fetched for some gene ids.
+
+    Ids that didn't map to anything are cached too, with no rows.
+
+    :param row_factory: The row factory of the cursor the rows were fetched with.
+    :param species: The species of the identifiers.
+    :param target_gene_id_type: The gene id type that was mapped to.
+    :param source_ids: The gene ids the rows were fetched for.
+    :param rows: The rows, with the source id as the "original_ref_id" column.
+
+    :return: A dict of source id to its rows.
+    """
+    grouped: Dict[str, List] = {source_id: [] for source_id in source_ids}
+    for row in rows:
+        grouped.setdefault(row_value(row, "original_ref_id", 0), []).append(row)
+    found = {source_id: tuple(group) for source_id, group in grouped.items()}
+
+    prefix = (row_factory, int(species), int(target_gene_id_type))
+    gene_mapping_cache().set_many(
+        {prefix + (source_id,): group for source_id, group in found.items()}
+    )
+    return found
+
+
+def _copy_row(row: Row) -> Row:
+    """Copy a cached row, unless it is a tuple and can't be modified anyway."""
+    if isinstance(row, tuple):
+        return row
+    if isinstance(row, dict):
+        return dict(row)
+    return copy.copy(row)
+
+
+def merge_mappings(source_ids: Iterable[str], found: Dict[str, tuple]) -> List:
+    """Combine the mapping rows of each gene id, in input order.
+
+    The rows are copies, so that callers can't change the rows in the cache.
+
+    :param source_ids: The gene ids that were requested.
+    :param found: A dict of source id to its rows.
+
+    :return: The rows of each distinct source id, in the order the ids were given.
+    """
+    return [
+        _copy_row(row)
+        for source_id in dict.fromkeys(source_ids)
+        for row in found[source_id]
+    ]
+
+
+class ReferenceTable:
+    """An immutable copy of a small table, with an index on some of its columns."""
+
+    def __init__(
+        self,
+        columns: Iterable[str],
+        rows: Iterable[Row],
+        indexes: Iterable[str] = (),
+    ) -> None:
+        """Copy the rows of a table.
+
+        :param columns: The column names, in order.
+        :param rows: The rows, as dicts or sequences.
+        :param indexes: The columns to index for `lookup`.
+        """
+        self.columns = tuple(columns)
+        self.records = tuple(
+            tuple(
+                row_value(row, column, position)
+                for position, column in enumerate(self.columns)
+            )
+            for row in rows
+        )
+        self._indexes: Dict[str, Dict[Any, Tuple[tuple, ...]]] = {}
+        for column in indexes:
+            position = self.columns.index(column)
+            grouped: Dict[Any, List[tuple]] = {}
+            for record in self.records:
+                grouped.setdefault(record[position], []).append(record)
+            self._indexes[column] = {
+                value: tuple(records) for value, records in grouped.items()
+            }
+
+    def value(self, record: tuple, column: str) -> Any:
+        """Get a column value from a record.
+
+        :param record: A record of this table.
+        :param column: The column name.
+
+        :return: The value.
+        """
+        return record[self.columns.index(column)]
+
+    def lookup(self, column: str, value: Any) -> Tuple[tuple, ...]:
+        """Get the records with a value in an indexed column.
+
+        :param column: The indexed column.
+        :param value: The value to look for.
+
+        :return: The matching records, in table order.
+        """
+        return self._indexes[column].get(value, ())
+
+    def rows(
+        self,
+        row_factory: Callable,
+        records: Optional[Iterable[tuple]] = None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> List[Row]:
+        """Build new rows, shaped as the given row factory would shape them.
+
+        :param row_factory: `dict_row` or `tuple_row`.
+        :param records: The records to build rows for (all of them by default).
+        :param columns: The columns to include (all of them by default).
+
+        :return: A list of dicts or tuples.
+        """
+        records = self.records if records is None else records
+        names = self.columns if columns is None else tuple(columns)
+        positions = [self.columns.index(name) for name in names]
+        if row_factory is dict_row:
+            return [
+                {name: record[pos] for name, pos in zip(names, positions)}
+                for record in records
+            ]
+        return [tuple(record[pos] for pos in positions) for record in records]
+
+
+def reference_tables_usable(cursor: Any) -> bool:
+    """Check if a cursor's rows can be served from the reference table cache.
+
+    :param cursor: A sync or async database cursor.
+
+    :return: True if the cursor uses the `dict_row` or `tuple_row` row factory.
+    """
+    row_factory = getattr(cursor, "row_factory", None)
+    return row_factory is dict_row or row_factory is tuple_row
+
+
+def _columns(cursor: Any) -> List[str]:
+    """Get the column names of the last result of a cursor."""
+    return [column.name for column in cursor.description]
+
+
+def _store_reference_table(name: str, table: ReferenceTable) -> ReferenceTable:
+    """Store a loaded table, unless another caller stored one first."""
+    with _lock:
+        return _reference_tables.setdefault(name, table)
+
+
+def reference_table(
+    cursor: Cursor,
+    name: str,
+    query: Union[Composable, Callable[[], Composable]],
+    indexes: Iterable[str] = (),
+) -> Optional[ReferenceTable]:
+    """Get a cached reference table, loading it with a query on first use.
+
+    :param cursor: The database cursor.
+    :param name: The name to cache the table under.
+    :param query: A query that selects every row of the table, or a function that
+    builds it.
+    :param indexes: The columns to index.
+
+    :return: The table, or None if the cursor's row factory can't be served from
+    the cache.
+    """
+    if not reference_tables_usable(cursor):
+        return None
+    table = _reference_tables.get(name)
+    if table is None:
+        cursor.execute(query() if callable(query) else query)
+        rows = cursor.fetchall()
+        table = _store_reference_table(
+            name, ReferenceTable(_columns(cursor), rows, indexes)
+        )
+    return table
+
+
+async def async_reference_table(
+    cursor: AsyncCursor,
+    name: str,
+    query: Union[Composable, Callable[[], Composable]],
+    indexes: Iterable[str] = (),
+) -> Optional[ReferenceTable]:
+    """Get a cached reference table, loading it with an async query on first use.
+
+    The sync and async functions share the same tables.
+
+    :param cursor: An async database cursor.
+    :param name: The name to cache the table under.
+    :param query: A query that selects every row of the table, or a function that
+    builds it.
+    :param indexes: The columns to index.
+
+    :return: The table, or None if the cursor's row factory can't be served from
+    the cache.
+    """
+    if not reference_tables_usable(cursor):
+        return None
+    table = _reference_tables.get(name)
+    if table is None:
+        await cursor.execute(query() if callable(query) else query)
+        rows = await cursor.fetchall()
+        table = _store_reference_table(
+            name, ReferenceTable(_columns(cursor), rows, indexes)
+        )
+    return table
+
+
+def reload_reference_tables() -> None:
+    """Drop the cached reference tables, so that they are loaded again on next use."""
+    with _lock:
+        _reference_tables.clear()
+
+
+GENEDB_QUERY = SQL("SELECT * FROM odestatic.genedb ORDER BY gdb_id")
+GENEDB_INDEXES = ("gdb_id", "gdb_name")
+SPECIES_INDEXES = ("id",)
+ONTOLOGY_DB_INDEXES = ("ontology_db_id",)
+
+
+def genedb_rows(
+    table: ReferenceTable,
+    row_factory: Callable,
+    species: Optional[Species] = None,
+    genedb_id: Optional[GeneIdentifier] = None,
+    name: Optional[str] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> List[Row]:
+    """Select rows of the cached `odestatic.genedb` table.
+
+    :param table: The table, from `reference_table(..., "genedb", GENEDB_QUERY)`.
+    :param row_factory: The row factory to shape the rows for.
+    :param species: Keep the gene databases of this species, and of all species.
+    :param genedb_id: Keep the gene database with this id.
+    :param name: Keep the gene database with this name (if no id is given).
+    :param columns: The columns to include (all of them by default).
+
+    :return: The rows, ordered by gdb_id.
+    """
+    records = table.records
+    if genedb_id is not None:
+        records = table.lookup("gdb_id", int(genedb_id))
+    elif name is not None:
+        records = table.lookup("gdb_name", name)
+    if species is not None:
+        species_ids = (0, int(species))
+        records = [r for r in records if table.value(r, "sp_id") in species_ids]
+    return table.rows(row_factory, records, columns)
+
+
+def species_rows(
+    table: ReferenceTable,
+    row_factory: Callable,
+    taxonomic_id: Optional[int] = None,
+    reference_gene_db_id: Optional[GeneIdentifier] = None,
+    species: Optional[Species] = None,
+) -> List[Row]:
+    """Select rows of the cached species table, as `species.get` would.
+
+    :param table: The table, loaded with the unfiltered `species_query.get()`.
+    :param row_factory: The row factory to shape the rows for.
+    :param taxonomic_id: The taxonomic id.
+    :param reference_gene_db_id: The reference gene database id.
+    :param species: The species id.
+
+    :return: The matching rows.
+    """
+    records = table.lookup("id", int(species)) if species else table.records
+    if taxonomic_id:
+        records = [r for r in records if table.value(r, "taxonomic_id") == taxonomic_id]
+    if reference_gene_db_id:
+        gdb_id = int(reference_gene_db_id)
+        records = [
+            r for r in records if table.value(r, "reference_gene_identifier") == gdb_id
+        ]
+    return table.rows(row_factory, records)
+
+
+def ontology_db_rows(
+    table: ReferenceTable,
+    row_factory: Callable,
+    ontology_db_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+) -> List[Row]:
+    """Select rows of the cached ontology database table.
+
+    :param table: The table, loaded with the unfiltered
+    `ontology_query.get_ontology_dbs()`.
+    :param row_factory: The row factory to shape the rows for.
+    :param ontology_db_id: Keep the ontology database with this id.
+    :param limit: Limit the number of results.
+    :param offset: Offset the results.
+
+    :return: The matching rows.
+    """
+    records = table.records
+    if ontology_db_id is not None:
+        records = table.lookup("ontology_db_id", ontology_db_id)
+    start = offset or 0
+    end = None if limit is None else start + limit
+    return table.rows(row_factory, records[start:end])
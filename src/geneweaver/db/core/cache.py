@@ -0,0 +1,169 @@
+"""A thread-safe, size-bounded LRU cache with an optional time to live.
+
+This is the building block for the in-process result caches in `geneweaver.db.cache`.
+"""
+
+# ruff: noqa: ANN101
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+D = TypeVar("D")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[K, V]):
+    """Keep up to `maxsize` values, evicting the least recently used first.
+
+    When `ttl` is set, values expire that many seconds after they were stored, and
+    are treated as misses from then on.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize an empty cache.
+
+        :param maxsize: The maximum number of values to keep.
+        :param ttl: How long values are kept, in seconds, or None to keep them until
+        they are evicted.
+        :param timer: The clock used for expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[K, Tuple[Optional[float], V]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _lookup(self, key: K, now: float) -> object:
+        """Get a value, or `_MISSING`, updating the counters. Needs the lock."""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at > now:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return value
+            del self._data[key]
+        self._misses += 1
+        return _MISSING
+
+    def get(self, key: K, default: Optional[D] = None) -> Union[V, D, None]:
+        """Get a value from the cache.
+
+        :param key: The key to look up.
+        :param default: What to return if the key isn't cached (or has expired).
+
+        :return: The cached value, or the default.
+        """
+        with self._lock:
+            value = self._lookup(key, self._timer())
+        return default if value is _MISSING else value
+
+    def get_many(self, keys: Iterable[K]) -> Tuple[Dict[K, V], List[K]]:
+        """Look up several keys at once.
+
+        :param keys: The keys to look up. Duplicates are only looked up once.
+
+        :return: A dict of the cached values, and a list of the keys that weren't
+        cached, in the order they were given.
+        """
+        found: Dict[K, V] = {}
+        missing: List[K] = []
+        with self._lock:
+            now = self._timer()
+            for key in dict.fromkeys(keys):
+                value = self._lookup(key, now)
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    found[key] = value
+        return found, missing
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value in the cache.
+
+        :param key: The key to store the value under.
+        :param value: The value to store.
+        """
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping[K, V]) -> None:
+        """Store several values in the cache.
+
+        :param items: The keys and values to store.
+        """
+        with self._lock:
+            expires_at = None if self.ttl is None else self._timer() + self.ttl
+            for key, value in items.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Remove a value from the cache, if it is cached.
+
+        :param key: The key to remove.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all values from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Get the hit and miss counters of the cache.
+
+        :return: A dict with "hits", "misses", "hit_rate", "evictions" and "size"
+        keys. The hit rate is 0.0 until the cache has been used.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "size": len(self._data),
+            }
+
+    def reset_stats(self) -> None:
+        """Reset the hit, miss and eviction counters."""
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        """Get the number of values in the cache, including any that have expired."""
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if a key is cached and hasn't expired, without counting a lookup."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[0] is None or entry[0] > self._timer())
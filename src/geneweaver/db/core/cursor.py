@@ -1,30 +1,97 @@
 """Convenience code for interacting with the database."""
 
 from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
 
 import psycopg
-from geneweaver.db.core.settings import settings
+from geneweaver.db.core.pool import get_async_pool, get_connection, get_pool
+from geneweaver.db.core.replica import async_replica_connection, replica_connection
+from geneweaver.db.core.settings import get_settings
+from geneweaver.db.core.slow_query import async_connect_kwargs, connect_kwargs
+from geneweaver.db.core.timeout import async_statement_timeout, statement_timeout
 
 
 @contextmanager
-def cursor() -> psycopg.Cursor:
-    """Get a cursor to the database."""
-    with psycopg.connect(settings.URI) as connection:
-        with connection.cursor() as _cursor:
-            yield _cursor
+def cursor(readonly: bool = False, deadline: Optional[float] = None) -> psycopg.Cursor:
+    """Get a cursor to the database.
+
+    The connection is taken from the process-wide pool, unless pooling has been
+    disabled with the `POOL_ENABLED` setting.
+
+    :param readonly: Use a connection to one of the `REPLICA_URIS`, if any of them is
+    usable, and otherwise to the primary.
+    :param deadline: The longest, in seconds, that any statement run on the cursor may
+    take before the server cancels it (see `geneweaver.db.core.timeout`).
+    """
+    settings = get_settings()
+    if readonly and settings.REPLICA_URIS:
+        with replica_connection() as connection:
+            if connection is not None:
+                with connection.cursor() as _cursor:
+                    with statement_timeout(_cursor, deadline):
+                        yield _cursor
+                return
+
+    if settings.POOL_ENABLED:
+        with get_pool().connection() as connection:
+            with connection.cursor() as _cursor:
+                with statement_timeout(_cursor, deadline):
+                    yield _cursor
+    else:
+        with psycopg.connect(settings.URI, **connect_kwargs()) as connection:
+            with connection.cursor() as _cursor:
+                with statement_timeout(_cursor, deadline):
+                    yield _cursor
 
 
 @asynccontextmanager
-async def async_cursor() -> psycopg.AsyncCursor:
-    """Get an async cursor to the database."""
-    async with await psycopg.AsyncConnection.connect(settings.URI) as connection:
-        async with connection.cursor() as _cursor:
-            yield _cursor
+async def async_cursor(
+    readonly: bool = False, deadline: Optional[float] = None
+) -> psycopg.AsyncCursor:
+    """Get an async cursor to the database.
+
+    The connection is taken from the pool bound to the running event loop, unless
+    pooling has been disabled with the `POOL_ENABLED` setting.
+
+    :param readonly: Use a connection to one of the `REPLICA_URIS`, if any of them is
+    usable, and otherwise to the primary.
+    :param deadline: The longest, in seconds, that any statement run on the cursor may
+    take before the server cancels it. If the task using the cursor is cancelled, the
+    running statement is cancelled too.
+    """
+    settings = get_settings()
+    if readonly and settings.REPLICA_URIS:
+        async with async_replica_connection() as connection:
+            if connection is not None:
+                async with connection.cursor() as _cursor:
+                    async with async_statement_timeout(_cursor, deadline):
+                        yield _cursor
+                return
+
+    if settings.POOL_ENABLED:
+        pool = await get_async_pool()
+        async with pool.connection() as connection:
+            async with connection.cursor() as _cursor:
+                async with async_statement_timeout(_cursor, deadline):
+                    yield _cursor
+    else:
+        async with await psycopg.AsyncConnection.connect(
+            settings.URI, **async_connect_kwargs()
+        ) as connection:
+            async with connection.cursor() as _cursor:
+                async with async_statement_timeout(_cursor, deadline):
+                    yield _cursor
 
 
 def make_connection() -> psycopg.Connection:
     """Make a connection to the database.
 
+    When pooling is enabled, the connection is checked out of the process-wide pool
+    and closing it returns it to the pool.
+
     Don't forget to close it!
     """
-    return psycopg.connect(settings.URI)
+    settings = get_settings()
+    if settings.POOL_ENABLED:
+        return get_connection()
+    return psycopg.connect(settings.URI, **connect_kwargs())
@@ -0,0 +1,240 @@
+"""Process-wide connection pools used by the cursor convenience functions.
+
+The pools are created lazily the first time they are needed, using the `POOL_*` and
+`ASYNC_POOL_*` values from the settings object. The sync pool is shared by every
+caller in the process, while async pools are bound to the event loop they were
+created on. Each read replica in `REPLICA_URIS` gets pools of its own, sized the same
+way as the primary's, but they give up on a replica that can't be reached after
+`REPLICA_CONNECT_TIMEOUT` seconds rather than `POOL_TIMEOUT`, so that callers can
+fall back to the primary quickly.
+"""
+
+# ruff: noqa: ANN001, ANN101, ANN204
+import asyncio
+import atexit
+import math
+import threading
+import weakref
+from typing import Any, Dict, MutableMapping, Optional
+
+import psycopg
+from geneweaver.db.core.settings import get_settings
+from geneweaver.db.core.slow_query import async_connect_kwargs, connect_kwargs
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+
+class PooledConnection(psycopg.Connection):
+    """A connection that can be handed out of the pool like a regular connection.
+
+    Connections handed out by `make_connection` are returned to the pool, rather
+    than closed, when `close()` is called or when they are used as a context manager.
+    Connections used through `ConnectionPool.connection()` behave as normal.
+    """
+
+    _release_on_close: bool = False
+
+    def close(self) -> None:
+        """Return the connection to its pool, or close it if it isn't pooled."""
+        pool = getattr(self, "_pool", None)
+        if self._release_on_close and pool is not None:
+            self._release_on_close = False
+            pool.putconn(self)
+        else:
+            super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Commit or rollback, then release the connection back to the pool."""
+        super().__exit__(exc_type, exc_val, exc_tb)
+        if self._release_on_close:
+            self.close()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool, creating it if needed.
+
+    :return: The open connection pool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _new_pool(get_settings().URI)
+                atexit.register(close_pool)
+    return _pool
+
+
+def _new_pool(conninfo: str, replica: bool = False) -> ConnectionPool:
+    """Create an open connection pool, configured from the settings object."""
+    settings = get_settings()
+    kwargs = connect_kwargs()
+    timeout = settings.POOL_TIMEOUT
+    if replica:
+        kwargs.update(replica_connect_kwargs())
+        timeout = settings.REPLICA_CONNECT_TIMEOUT
+    return ConnectionPool(
+        conninfo,
+        connection_class=PooledConnection,
+        kwargs=kwargs,
+        min_size=settings.POOL_MIN_SIZE,
+        max_size=settings.POOL_MAX_SIZE,
+        max_idle=settings.POOL_MAX_IDLE,
+        max_lifetime=settings.POOL_MAX_LIFETIME,
+        timeout=timeout,
+        open=True,
+    )
+
+
+def replica_connect_kwargs() -> Dict[str, Any]:
+    """Get the extra arguments for connecting to a read replica.
+
+    :return: The libpq `connect_timeout`, from `REPLICA_CONNECT_TIMEOUT` rounded up to
+    whole seconds.
+    """
+    return {"connect_timeout": math.ceil(get_settings().REPLICA_CONNECT_TIMEOUT)}
+
+
+def get_connection() -> PooledConnection:
+    """Check a connection out of the pool.
+
+    The connection is returned to the pool when it is closed.
+
+    :return: A connection from the pool.
+    """
+    connection = get_pool().getconn()
+    connection._release_on_close = True
+    return connection
+
+
+def close_pool() -> None:
+    """Close the process-wide connection pool, if it has been created.
+
+    A new pool will be created the next time one is needed.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+_replica_pools: Dict[str, ConnectionPool] = {}
+
+
+def get_replica_pool(conninfo: str) -> ConnectionPool:
+    """Get the process-wide connection pool for a read replica, creating it if needed.
+
+    :param conninfo: The connection string of the replica, from `REPLICA_URIS`.
+    :return: The open connection pool.
+    """
+    pool = _replica_pools.get(conninfo)
+    if pool is None:
+        with _pool_lock:
+            pool = _replica_pools.get(conninfo)
+            if pool is None:
+                if not _replica_pools:
+                    atexit.register(close_replica_pools)
+                pool = _replica_pools[conninfo] = _new_pool(conninfo, replica=True)
+    return pool
+
+
+def close_replica_pools() -> None:
+    """Close the process-wide connection pools for all read replicas."""
+    with _pool_lock:
+        while _replica_pools:
+            _, pool = _replica_pools.popitem()
+            pool.close()
+
+
+_async_pools: MutableMapping[asyncio.AbstractEventLoop, AsyncConnectionPool] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    """Get the connection pool bound to the running event loop, creating it if needed.
+
+    When more than `ASYNC_POOL_MAX_WAITING` clients are already waiting for a
+    connection, checking out another one raises `psycopg_pool.TooManyRequests`.
+
+    :return: The open async connection pool.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        pool = _async_pools[loop] = _new_async_pool(get_settings().URI)
+    if pool.closed:
+        # Opening is idempotent, so concurrent first callers can all await it.
+        await pool.open()
+    return pool
+
+
+def _new_async_pool(conninfo: str, replica: bool = False) -> AsyncConnectionPool:
+    """Create a closed async connection pool, configured from the settings object."""
+    settings = get_settings()
+    kwargs = async_connect_kwargs()
+    timeout = settings.POOL_TIMEOUT
+    if replica:
+        kwargs.update(replica_connect_kwargs())
+        timeout = settings.REPLICA_CONNECT_TIMEOUT
+    return AsyncConnectionPool(
+        conninfo,
+        kwargs=kwargs,
+        min_size=settings.ASYNC_POOL_MIN_SIZE,
+        max_size=settings.ASYNC_POOL_MAX_SIZE,
+        max_waiting=settings.ASYNC_POOL_MAX_WAITING,
+        max_idle=settings.POOL_MAX_IDLE,
+        max_lifetime=settings.POOL_MAX_LIFETIME,
+        timeout=timeout,
+        open=False,
+    )
+
+
+_async_replica_pools: MutableMapping[
+    asyncio.AbstractEventLoop, Dict[str, AsyncConnectionPool]
+] = weakref.WeakKeyDictionary()
+
+
+async def get_async_replica_pool(conninfo: str) -> AsyncConnectionPool:
+    """Get the pool for a read replica bound to the running event loop.
+
+    :param conninfo: The connection string of the replica, from `REPLICA_URIS`.
+    :return: The open async connection pool.
+    """
+    pools = _async_replica_pools.setdefault(asyncio.get_running_loop(), {})
+    pool = pools.get(conninfo)
+    if pool is None:
+        pool = pools[conninfo] = _new_async_pool(conninfo, replica=True)
+    if pool.closed:
+        await pool.open()
+    return pool
+
+
+async def open_async_pool(wait: bool = True) -> AsyncConnectionPool:
+    """Open the pool for the running event loop, e.g. during application startup.
+
+    :param wait: Wait until the pool holds `ASYNC_POOL_MIN_SIZE` connections.
+    :return: The open async connection pool.
+    """
+    pool = await get_async_pool()
+    if wait:
+        await pool.wait(timeout=get_settings().POOL_TIMEOUT)
+    return pool
+
+
+async def close_async_pool() -> None:
+    """Close the pools bound to the running event loop, e.g. during app shutdown.
+
+    This closes the primary's pool and the pools of any read replicas. Connections
+    that are currently checked out are closed when they are returned. New pools will
+    be created the next time they are needed on this loop.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.pop(loop, None)
+    if pool is not None:
+        await pool.close()
+    for replica_pool in _async_replica_pools.pop(loop, {}).values():
+        await replica_pool.close()
@@ -0,0 +1,128 @@
+"""An opt-in registry of server-side prepared statements for hot query shapes.
+
+Functions that run the same SQL many times with different parameters (such as
+`gene.get`, `geneset.by_id`, `species.get` and `user.by_api_key`) send their queries
+through the process-wide `prepared_statements` registry. While the registry is
+disabled (the default), queries are executed exactly as before. Once enabled, each
+query is prepared on the server the first time it is seen on a connection, and then
+executed by its prepared name on that connection, skipping parsing and planning.
+
+Prepared statements are per connection, so this works best together with the
+connection pools in `geneweaver.db.core.pool`. It should not be enabled when
+connecting through a transaction-mode bouncer that does not support them.
+
+Example:
+-------
+    from geneweaver.db.core.prepared import prepared_statements
+
+    prepared_statements.enable()
+    ...
+    prepared_statements.stats()
+    # {'gene.get': {'hits': 1520, 'misses': 4}, ...}
+
+"""
+
+# ruff: noqa: ANN101
+import threading
+import weakref
+from typing import Dict, MutableMapping, Set, Tuple, Union
+
+from psycopg import AsyncCursor, Connection, Cursor
+from psycopg.sql import Composable
+
+Query = Union[str, bytes, Composable]
+StatementKey = Tuple[str, bytes]
+
+
+class PreparedStatementRegistry:
+    """Prepare named statements once per connection, and count hits and misses.
+
+    A hit is an execution of a statement that was already prepared on the
+    connection, and a miss is an execution that had to prepare it first. The actual
+    preparation is delegated to psycopg (`execute(..., prepare=True)`), which caches
+    up to `Connection.prepared_max` statements per connection.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a disabled registry with empty statistics."""
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._prepared: MutableMapping[Connection, Set[StatementKey]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def enable(self) -> None:
+        """Start preparing statements that are executed through the registry."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop preparing statements, and execute queries as plain statements."""
+        self.enabled = False
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the prepare hit and miss counts for each statement name.
+
+        :return: A dict of statement name to a dict with "hits" and "misses" keys.
+        """
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Reset the hit and miss counts for all statement names."""
+        with self._lock:
+            self._stats.clear()
+
+    def execute(self, cursor: Cursor, name: str, query: Query, params: dict) -> Cursor:
+        """Execute a query, preparing it on the connection if the registry is enabled.
+
+        :param cursor: The database cursor.
+        :param name: The name to record statistics under, e.g. "gene.get".
+        :param query: The query to execute.
+        :param params: The query parameters.
+
+        :return: The cursor, as returned by `cursor.execute`.
+        """
+        if not self.enabled:
+            return cursor.execute(query, params)
+        self._record(cursor, name, query)
+        return cursor.execute(query, params, prepare=True)
+
+    async def async_execute(
+        self, cursor: AsyncCursor, name: str, query: Query, params: dict
+    ) -> AsyncCursor:
+        """Execute a query, preparing it on the connection if the registry is enabled.
+
+        :param cursor: An async database cursor.
+        :param name: The name to record statistics under, e.g. "gene.get".
+        :param query: The query to execute.
+        :param params: The query parameters.
+
+        :return: The cursor, as returned by `cursor.execute`.
+        """
+        if not self.enabled:
+            return await cursor.execute(query, params)
+        self._record(cursor, name, query)
+        return await cursor.execute(query, params, prepare=True)
+
+    def _record(
+        self, cursor: Union[Cursor, AsyncCursor], name: str, query: Query
+    ) -> None:
+        """Record a hit or a miss for the statement on the cursor's connection."""
+        if isinstance(query, Composable):
+            query = query.as_bytes(cursor)
+        elif isinstance(query, str):
+            query = query.encode()
+        key = (name, query)
+
+        with self._lock:
+            prepared = self._prepared.setdefault(cursor.connection, set())
+            counts = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+            if key in prepared:
+                counts["hits"] += 1
+            else:
+                counts["misses"] += 1
+                prepared.add(key)
+
+
+prepared_statements = PreparedStatementRegistry()
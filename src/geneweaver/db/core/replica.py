@@ -0,0 +1,192 @@
+"""Route read-only work to hot-standby replicas.
+
+Connections are handed out round-robin across the `REPLICA_URIS` from the settings
+object. When `REPLICA_MAX_LAG` is set, a replica is only used while its replication
+lag is within that many seconds. The lag is measured at most once every
+`REPLICA_LAG_CHECK_INTERVAL` seconds per replica, and the result is shared by all
+callers in the process. Replicas that can't be reached within
+`REPLICA_CONNECT_TIMEOUT` seconds are skipped until their next check is due.
+
+If no replica can be used, the connection context managers here yield `None` so that
+callers can fall back to the primary.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import psycopg
+from geneweaver.db.core.pool import (
+    get_async_replica_pool,
+    get_replica_pool,
+    replica_connect_kwargs,
+)
+from geneweaver.db.core.settings import get_settings
+from geneweaver.db.core.slow_query import async_connect_kwargs, connect_kwargs
+from psycopg.rows import tuple_row
+from psycopg.sql import SQL
+
+REPLICATION_LAG_SQL = SQL(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+_counter = itertools.count()
+_lock = threading.Lock()
+# Maps a replica connection string to (time of the last check, whether it's usable).
+_checks: Dict[str, Tuple[float, bool]] = {}
+
+
+def replica_order() -> List[str]:
+    """Get the configured replicas, rotated so that each call starts on the next one.
+
+    :return: The replica connection strings, in the order they should be tried.
+    """
+    uris = get_settings().REPLICA_URIS
+    if not uris:
+        return []
+    with _lock:
+        start = next(_counter) % len(uris)
+    return uris[start:] + uris[:start]
+
+
+def _cached_check(conninfo: str) -> Optional[bool]:
+    """Get the last result of checking a replica, or None if a new check is due."""
+    checked_at, usable = _checks.get(conninfo, (None, True))
+    if checked_at is None:
+        return None
+    if time.monotonic() - checked_at >= get_settings().REPLICA_LAG_CHECK_INTERVAL:
+        return None
+    return usable
+
+
+def _record_check(conninfo: str, usable: bool) -> None:
+    """Record the result of checking a replica."""
+    with _lock:
+        _checks[conninfo] = (time.monotonic(), usable)
+
+
+def reset_checks() -> None:
+    """Forget the results of all replica checks, so each replica is checked again."""
+    with _lock:
+        _checks.clear()
+
+
+def is_within_max_lag(lag: Optional[float]) -> bool:
+    """Check a replication lag against the `REPLICA_MAX_LAG` setting.
+
+    :param lag: The replication lag, in seconds.
+    :return: True if the replica is fresh enough to be used.
+    """
+    max_lag = get_settings().REPLICA_MAX_LAG
+    return max_lag is None or lag is None or float(lag) <= max_lag
+
+
+def _lag_check_needed(conninfo: str) -> bool:
+    """Check if the lag of a replica needs to be measured before it is used."""
+    return (
+        get_settings().REPLICA_MAX_LAG is not None and _cached_check(conninfo) is None
+    )
+
+
+def _connect(conninfo: str) -> ContextManager[psycopg.Connection]:
+    """Get a context manager for a connection to a replica."""
+    if get_settings().POOL_ENABLED:
+        return get_replica_pool(conninfo).connection()
+    return psycopg.connect(conninfo, **connect_kwargs(), **replica_connect_kwargs())
+
+
+@contextmanager
+def replica_connection() -> Iterator[Optional[psycopg.Connection]]:
+    """Get a connection to the next usable read replica.
+
+    :return: A context manager for the connection, which yields None if no replica
+    is configured or usable.
+    """
+    for conninfo in replica_order():
+        if _cached_check(conninfo) is False:
+            continue
+        stack = ExitStack()
+        usable = True
+        try:
+            connection = stack.enter_context(_connect(conninfo))
+            if _lag_check_needed(conninfo):
+                with connection.cursor(row_factory=tuple_row) as lag_cursor:
+                    lag_cursor.execute(REPLICATION_LAG_SQL)
+                    usable = is_within_max_lag(lag_cursor.fetchone()[0])
+                _record_check(conninfo, usable)
+        except psycopg.OperationalError:
+            stack.close()
+            _record_check(conninfo, False)
+            continue
+        if not usable:
+            stack.close()
+            continue
+        with stack:
+            yield connection
+        return
+    yield None
+
+
+async def _async_connect(
+    conninfo: str,
+) -> AsyncContextManager[psycopg.AsyncConnection]:
+    """Get an async context manager for a connection to a replica."""
+    if get_settings().POOL_ENABLED:
+        pool = await get_async_replica_pool(conninfo)
+        return pool.connection()
+    return await psycopg.AsyncConnection.connect(
+        conninfo, **async_connect_kwargs(), **replica_connect_kwargs()
+    )
+
+
+@asynccontextmanager
+async def async_replica_connection() -> (
+    AsyncIterator[Optional[psycopg.AsyncConnection]]
+):
+    """Get an async connection to the next usable read replica.
+
+    :return: An async context manager for the connection, which yields None if no
+    replica is configured or usable.
+    """
+    for conninfo in replica_order():
+        if _cached_check(conninfo) is False:
+            continue
+        stack = AsyncExitStack()
+        usable = True
+        try:
+            connection = await stack.enter_async_context(await _async_connect(conninfo))
+            if _lag_check_needed(conninfo):
+                async with connection.cursor(row_factory=tuple_row) as lag_cursor:
+                    await lag_cursor.execute(REPLICATION_LAG_SQL)
+                    usable = is_within_max_lag((await lag_cursor.fetchone())[0])
+                _record_check(conninfo, usable)
+        except psycopg.OperationalError:
+            await stack.aclose()
+            _record_check(conninfo, False)
+            continue
+        if not usable:
+            await stack.aclose()
+            continue
+        async with stack:
+            yield connection
+        return
+    yield None
@@ -1,5 +1,36 @@
-"""A utility namespace that holds a pre-initialized global configuration object."""
+"""A utility namespace that holds a lazily initialized global configuration object.
 
-from .settings_class import Settings
+The settings are read from the environment (and `.env` file) the first time they are
+needed, not when this module is imported. Library code calls `get_settings()`, while
+`from geneweaver.db.core.settings import settings` keeps working for applications.
+The `Settings` class (and pydantic with it) is also only imported on first use.
+"""
 
-settings = Settings()
+# ruff: noqa: ANN401
+import functools
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .settings_class import Settings
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings() -> "Settings":
+    """Get the global settings object, creating it on first use.
+
+    :return: The settings object.
+    """
+    from .settings_class import Settings
+
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    """Import `Settings` and create the global `settings` object on first access."""
+    if name == "settings":
+        return get_settings()
+    if name == "Settings":
+        from .settings_class import Settings
+
+        return Settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
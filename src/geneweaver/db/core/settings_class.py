@@ -7,10 +7,35 @@ GWDB_SERVER=your_server
 GWDB_USERNAME=your_user
 GWDB_PASSWORD=your_password
 GWDB_NAME=your_database_name
+
+Connection pooling is enabled by default and can be tuned with the `GWDB_POOL_*`
+variables (e.g. `GWDB_POOL_MAX_SIZE=20`), or disabled with `GWDB_POOL_ENABLED=false`.
+The async pool is sized separately with the `GWDB_ASYNC_POOL_*` variables.
+
+The `iter_*` functions stream results from a server-side cursor, fetching
+`GWDB_ITERSIZE` rows per round trip unless an `itersize` is passed explicitly.
+
+Read-only work can be routed to hot-standby replicas by listing their connection
+strings as a JSON array, e.g. `GWDB_REPLICA_URIS='["postgresql://replica1/db"]'`.
+Set `GWDB_REPLICA_MAX_LAG` (in seconds) to fall back to the primary when the
+replicas lag too far behind it. A replica that can't be reached within
+`GWDB_REPLICA_CONNECT_TIMEOUT` seconds is skipped in favour of the primary.
+
+Set `GWDB_SLOW_QUERY_THRESHOLD` (in seconds) to log statements that take longer than
+that, and `GWDB_SLOW_QUERY_EXPLAIN=true` to also log their query plans.
+
+The in-process cache used by `gene.mapping(..., use_cache=True)` holds up to
+`GWDB_MAPPING_CACHE_SIZE` identifiers for `GWDB_MAPPING_CACHE_TTL` seconds.
+
+The groups and curator status looked up by `geneweaver.db.permissions` are cached for
+up to `GWDB_READABLE_CACHE_SIZE` users, for `GWDB_READABLE_CACHE_TTL` seconds.
+
+Gene id lists of at least `GWDB_LARGE_BATCH_THRESHOLD` ids are loaded into a temp
+table instead of being sent as an array parameter.
 """
 
 # ruff: noqa: N805, ANN101, ANN401
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import PostgresDsn, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -31,6 +56,35 @@ class Settings(BaseSettings):
     PORT: int = 5432
     URI: Optional[str] = None
 
+    POOL_ENABLED: bool = True
+    POOL_MIN_SIZE: int = 1
+    POOL_MAX_SIZE: int = 10
+    POOL_MAX_IDLE: float = 600.0
+    POOL_MAX_LIFETIME: float = 3600.0
+    POOL_TIMEOUT: float = 30.0
+
+    ASYNC_POOL_MIN_SIZE: int = 1
+    ASYNC_POOL_MAX_SIZE: int = 10
+    ASYNC_POOL_MAX_WAITING: int = 100
+
+    ITERSIZE: int = 2000
+
+    REPLICA_URIS: List[str] = []
+    REPLICA_MAX_LAG: Optional[float] = None
+    REPLICA_LAG_CHECK_INTERVAL: float = 5.0
+    REPLICA_CONNECT_TIMEOUT: float = 2.0
+
+    SLOW_QUERY_THRESHOLD: Optional[float] = None
+    SLOW_QUERY_EXPLAIN: bool = False
+
+    MAPPING_CACHE_SIZE: int = 100_000
+    MAPPING_CACHE_TTL: Optional[float] = 86_400.0
+
+    READABLE_CACHE_SIZE: int = 1_000
+    READABLE_CACHE_TTL: Optional[float] = 300.0
+
+    LARGE_BATCH_THRESHOLD: Optional[int] = 5_000
+
     @field_validator("SERVER", mode="after")
     @classmethod
     def name_must_contain_space(cls: Type["Settings"], v: str) -> str:
@@ -55,6 +109,7 @@ class Settings(BaseSettings):
                     path=f"{self.NAME or ''}",
                 )
             )
+        self.REPLICA_URIS = [str(PostgresDsn(uri)) for uri in self.REPLICA_URIS]
         return self
 
     model_config = SettingsConfigDict(
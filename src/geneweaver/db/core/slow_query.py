@@ -0,0 +1,304 @@
+"""Log statements that take longer than the `SLOW_QUERY_THRESHOLD` setting.
+
+When the threshold is set, connections made by this package (through the pools,
+`cursor`, `async_cursor` and `make_connection`) use the cursor classes defined here.
+Each statement that runs for at least `SLOW_QUERY_THRESHOLD` seconds is logged to the
+"geneweaver.db.core.slow_query" logger, with:
+
+- the name of the query builder that made it (e.g.
+  "query.geneset_value.by_geneset_id_and_identifier"), as tagged by
+  `geneweaver.db.query.utils.query_builder`, or the name of the library function
+  that ran it for statements that aren't made by a builder,
+- the name of the library function that ran it (e.g.
+  "geneset_value.by_geneset_id_and_identifier"),
+- the shape of its parameters, with the values redacted,
+- its duration, and the number of rows it returned.
+
+Statements executed in pipeline mode (e.g. by `geneweaver.db.utils.execute_batch`)
+aren't timed, since `execute` returns before their results arrive.
+
+When `SLOW_QUERY_EXPLAIN` is also enabled, `EXPLAIN (FORMAT JSON)` is run for the same
+statement and parameters on a separate connection, and the plan is added to the log
+record. The statement is not executed again, since `ANALYZE` is not used. Note that
+the plan is made for the actual parameter values, so it may include some of them
+(e.g. in filter conditions).
+
+The same details are attached to the log record as the `builder`, `caller`,
+`params`, `duration`, `rows` and `plan` attributes, for structured log handlers.
+
+The threshold is read when a connection is made, so pools that were created before it
+was set are not affected.
+"""
+
+# ruff: noqa: ANN101, ANN401
+import logging
+import sys
+import time
+from typing import Any, Dict, Optional, Union
+
+import psycopg
+from geneweaver.db.core.settings import get_settings
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import tuple_row
+from psycopg.sql import SQL, Composable
+
+logger = logging.getLogger(__name__)
+
+Query = Union[str, bytes, Composable]
+Params = Optional[Union[dict, list, tuple]]
+
+# The attribute that query builders tag their queries with.
+BUILDER_ATTRIBUTE = "_geneweaver_builder"
+
+_INTERNAL_MODULES = (
+    "geneweaver.db.core.",
+    "geneweaver.db.monitor.",
+    "geneweaver.db.utils",
+)
+
+
+class SlowQueryCursor(psycopg.Cursor):
+    """A cursor that logs statements slower than the `SLOW_QUERY_THRESHOLD`."""
+
+    def execute(self, query: Query, params: Params = None, **kwargs: Any) -> Any:
+        """Execute a query, logging it if it is slow.
+
+        :param query: The query to execute.
+        :param params: The query parameters.
+        :param kwargs: Passed to `psycopg.Cursor.execute`.
+
+        :return: The cursor.
+        """
+        if self.connection._pipeline is not None:
+            return super().execute(query, params, **kwargs)
+        start = time.perf_counter()
+        result = super().execute(query, params, **kwargs)
+        duration = time.perf_counter() - start
+        threshold = get_settings().SLOW_QUERY_THRESHOLD
+        if threshold is not None and duration >= threshold:
+            plan = None
+            if get_settings().SLOW_QUERY_EXPLAIN:
+                plan = explain(self.connection, query, params)
+            caller = caller_name()
+            log_slow_query(
+                builder_name(query) or caller,
+                params,
+                duration,
+                self.rowcount,
+                plan,
+                caller=caller,
+            )
+        return result
+
+
+class AsyncSlowQueryCursor(psycopg.AsyncCursor):
+    """An async cursor that logs statements slower than the `SLOW_QUERY_THRESHOLD`."""
+
+    async def execute(self, query: Query, params: Params = None, **kwargs: Any) -> Any:
+        """Execute a query, logging it if it is slow.
+
+        :param query: The query to execute.
+        :param params: The query parameters.
+        :param kwargs: Passed to `psycopg.AsyncCursor.execute`.
+
+        :return: The cursor.
+        """
+        if self.connection._pipeline is not None:
+            return await super().execute(query, params, **kwargs)
+        start = time.perf_counter()
+        result = await super().execute(query, params, **kwargs)
+        duration = time.perf_counter() - start
+        threshold = get_settings().SLOW_QUERY_THRESHOLD
+        if threshold is not None and duration >= threshold:
+            plan = None
+            if get_settings().SLOW_QUERY_EXPLAIN:
+                plan = await async_explain(self.connection, query, params)
+            caller = caller_name()
+            log_slow_query(
+                builder_name(query) or caller,
+                params,
+                duration,
+                self.rowcount,
+                plan,
+                caller=caller,
+            )
+        return result
+
+
+def connect_kwargs() -> Dict[str, Any]:
+    """Get the extra arguments for `psycopg.connect`, based on the settings.
+
+    :return: The `cursor_factory` argument if `SLOW_QUERY_THRESHOLD` is set, and an
+    empty dict otherwise.
+    """
+    if get_settings().SLOW_QUERY_THRESHOLD is None:
+        return {}
+    return {"cursor_factory": SlowQueryCursor}
+
+
+def async_connect_kwargs() -> Dict[str, Any]:
+    """Get the extra arguments for `psycopg.AsyncConnection.connect`.
+
+    :return: The `cursor_factory` argument if `SLOW_QUERY_THRESHOLD` is set, and an
+    empty dict otherwise.
+    """
+    if get_settings().SLOW_QUERY_THRESHOLD is None:
+        return {}
+    return {"cursor_factory": AsyncSlowQueryCursor}
+
+
+def builder_name(query: Query) -> Optional[str]:
+    """Get the name of the query builder that made a query.
+
+    :param query: The query.
+
+    :return: The name the query was tagged with, e.g. "query.gene.mapping", or None
+    if it wasn't made by a tagged builder.
+    """
+    return getattr(query, BUILDER_ATTRIBUTE, None)
+
+
+def caller_name() -> str:
+    """Find the library function that is running the current statement.
+
+    This inspects the call stack, so it should only be used on the slow path.
+
+    :return: The function name relative to `geneweaver.db`, e.g. "gene.get" or
+    "aio.gene.get", or "<unknown>" if the statement didn't come from the library.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("geneweaver.db.") and not module.startswith(
+            _INTERNAL_MODULES
+        ):
+            return f"{module[len('geneweaver.db.'):]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def param_shape(params: Params) -> Any:
+    """Describe the query parameters, with their values redacted.
+
+    :param params: The query parameters.
+
+    :return: The parameters with each value replaced by its type name, and each list
+    replaced by its item type and length, e.g. `{"gs_id": "int", "ids": "list[str]
+    (len=1200)"}`.
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _value_shape(value) for key, value in params.items()}
+    return [_value_shape(value) for value in params]
+
+
+def _value_shape(value: Any) -> str:
+    """Describe a single parameter value, without the value itself."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        item_types = sorted({type(item).__name__ for item in value})
+        return f"{type(value).__name__}[{'|'.join(item_types)}](len={len(value)})"
+    return type(value).__name__
+
+
+def log_slow_query(
+    builder: str,
+    params: Params,
+    duration: float,
+    rows: int,
+    plan: Optional[Any] = None,
+    caller: Optional[str] = None,
+) -> None:
+    """Log a slow statement.
+
+    :param builder: The name of the query builder that made the statement.
+    :param params: The query parameters, which are redacted before logging.
+    :param duration: How long the statement took, in seconds.
+    :param rows: The number of rows the statement returned or affected.
+    :param plan: The `EXPLAIN (FORMAT JSON)` output for the statement, if captured.
+    :param caller: The name of the library function that ran the statement, if it
+    is different from the builder.
+    """
+    shape = param_shape(params)
+    caller = caller if caller is not None else builder
+    message = "Slow query %s in %s: %.3fs, %d rows, params %s"
+    args = [builder, caller, duration, rows, shape]
+    if plan is not None:
+        message += ", plan %s"
+        args.append(plan)
+    logger.warning(
+        message,
+        *args,
+        extra={
+            "builder": builder,
+            "caller": caller,
+            "params": shape,
+            "duration": duration,
+            "rows": rows,
+            "plan": plan,
+        },
+    )
+
+
+def _explain_query(query: Query) -> Composable:
+    """Prefix a query with `EXPLAIN (FORMAT JSON)`."""
+    if isinstance(query, bytes):
+        query = query.decode()
+    if isinstance(query, str):
+        query = SQL(query)
+    return SQL("EXPLAIN (FORMAT JSON) ") + query
+
+
+def _side_conninfo(connection: psycopg.BaseConnection) -> str:
+    """Get the connection string of a connection, including the password."""
+    password = connection.info.password
+    if password:
+        return make_conninfo(connection.info.dsn, password=password)
+    return connection.info.dsn
+
+
+def explain(connection: psycopg.Connection, query: Query, params: Params) -> Any:
+    """Get the plan of a query, using a new connection to the same database.
+
+    A separate connection is used so that the transaction of the original connection
+    isn't affected.
+
+    :param connection: The connection that ran the query.
+    :param query: The query to explain.
+    :param params: The query parameters.
+
+    :return: The `EXPLAIN (FORMAT JSON)` output, or None if it couldn't be captured.
+    """
+    try:
+        with psycopg.connect(
+            _side_conninfo(connection), autocommit=True
+        ) as side_connection:
+            with side_connection.cursor(row_factory=tuple_row) as side_cursor:
+                side_cursor.execute(_explain_query(query), params)
+                return side_cursor.fetchone()[0]
+    except psycopg.Error as error:
+        logger.info("Could not capture the plan of a slow query: %s", error)
+        return None
+
+
+async def async_explain(
+    connection: psycopg.AsyncConnection, query: Query, params: Params
+) -> Any:
+    """Get the plan of a query, using a new async connection to the same database.
+
+    :param connection: The connection that ran the query.
+    :param query: The query to explain.
+    :param params: The query parameters.
+
+    :return: The `EXPLAIN (FORMAT JSON)` output, or None if it couldn't be captured.
+    """
+    try:
+        async with await psycopg.AsyncConnection.connect(
+            _side_conninfo(connection), autocommit=True
+        ) as side_connection:
+            async with side_connection.cursor(row_factory=tuple_row) as side_cursor:
+                await side_cursor.execute(_explain_query(query), params)
+                return (await side_cursor.fetchone())[0]
+    except psycopg.Error as error:
+        logger.info("Could not capture the plan of a slow query: %s", error)
+        return None
@@ -0,0 +1,134 @@
+"""Bound how long the statements run on a cursor may take.
+
+`statement_timeout` and `async_statement_timeout` set the server-side
+`statement_timeout` of the cursor's connection for the duration of a `with` block, so
+the server cancels any statement that runs for longer than the deadline (raising
+`psycopg.errors.QueryCanceled`). The previous value is restored when the block exits.
+
+`cursor` and `async_cursor` in `geneweaver.db.core.cursor` accept a `deadline` that
+is applied this way to every statement run on the cursor they yield.
+
+Example:
+-------
+    from geneweaver.db import search
+    from geneweaver.db.core.cursor import cursor
+
+    with cursor(deadline=2.5) as cur:
+        results = search.genesets(cur, "alcohol")
+
+"""
+
+import math
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional, Union
+
+import psycopg
+from geneweaver.db.exceptions import GeneweaverValueError
+from psycopg.pq import TransactionStatus
+from psycopg.rows import tuple_row
+from psycopg.sql import SQL
+
+SET_TIMEOUT_SQL = SQL(
+    """
+    WITH previous AS MATERIALIZED (
+        SELECT current_setting('statement_timeout') AS setting
+    )
+    SELECT setting, set_config('statement_timeout', %(timeout)s, false)
+    FROM previous
+    """
+)
+
+RESTORE_TIMEOUT_SQL = SQL("SELECT set_config('statement_timeout', %(timeout)s, false)")
+
+
+def timeout_milliseconds(seconds: float) -> str:
+    """Convert a deadline to a `statement_timeout` value.
+
+    :param seconds: The deadline, in seconds.
+
+    :raises GeneweaverValueError: If the deadline is not positive.
+
+    :return: The deadline in whole milliseconds (rounded up), as a string.
+    """
+    if seconds <= 0:
+        raise GeneweaverValueError("The deadline must be a positive number of seconds.")
+    return str(math.ceil(seconds * 1000))
+
+
+def _can_restore(
+    connection: Union[psycopg.Connection, psycopg.AsyncConnection]
+) -> bool:
+    """Check if a connection can still run the statement that restores the timeout.
+
+    A connection in a failed transaction can't, but rolling that transaction back
+    also undoes the change to the timeout.
+    """
+    return (
+        not connection.closed
+        and connection.info.transaction_status != TransactionStatus.INERROR
+    )
+
+
+@contextmanager
+def statement_timeout(
+    cursor: psycopg.Cursor, seconds: Optional[float]
+) -> Iterator[psycopg.Cursor]:
+    """Cancel statements run on a cursor's connection that take too long.
+
+    :param cursor: The database cursor.
+    :param seconds: The longest a single statement may run for, or None to leave the
+    timeout unchanged.
+
+    :return: A context manager that yields the cursor.
+    """
+    if seconds is None:
+        yield cursor
+        return
+
+    connection = cursor.connection
+    with connection.cursor(row_factory=tuple_row) as timeout_cursor:
+        timeout_cursor.execute(
+            SET_TIMEOUT_SQL, {"timeout": timeout_milliseconds(seconds)}
+        )
+        previous = timeout_cursor.fetchone()[0]
+    try:
+        yield cursor
+    finally:
+        if _can_restore(connection):
+            with connection.cursor(row_factory=tuple_row) as timeout_cursor:
+                timeout_cursor.execute(RESTORE_TIMEOUT_SQL, {"timeout": previous})
+
+
+@asynccontextmanager
+async def async_statement_timeout(
+    cursor: psycopg.AsyncCursor, seconds: Optional[float]
+) -> AsyncIterator[psycopg.AsyncCursor]:
+    """Cancel statements run on an async cursor's connection that take too long.
+
+    If the task running the block is cancelled while a statement is running, psycopg
+    cancels the statement on the server. The previous timeout is still restored,
+    unless that leaves the connection in a failed transaction, whose rollback undoes
+    the change.
+
+    :param cursor: An async database cursor.
+    :param seconds: The longest a single statement may run for, or None to leave the
+    timeout unchanged.
+
+    :return: An async context manager that yields the cursor.
+    """
+    if seconds is None:
+        yield cursor
+        return
+
+    connection = cursor.connection
+    async with connection.cursor(row_factory=tuple_row) as timeout_cursor:
+        await timeout_cursor.execute(
+            SET_TIMEOUT_SQL, {"timeout": timeout_milliseconds(seconds)}
+        )
+        previous = (await timeout_cursor.fetchone())[0]
+    try:
+        yield cursor
+    finally:
+        if _can_restore(connection):
+            async with connection.cursor(row_factory=tuple_row) as timeout_cursor:
+                await timeout_cursor.execute(RESTORE_TIMEOUT_SQL, {"timeout": previous})
@@ -1,9 +1,27 @@
 """Database interaction code relating to Gene IDs."""
 
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional, Union
 
 from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.core.mapping import AON_ID_TYPE_FOR_SPECIES
+from geneweaver.db.cache import (
+    GENEDB_INDEXES,
+    GENEDB_QUERY,
+    cache_mappings,
+    cached_mappings,
+    genedb_rows,
+    merge_mappings,
+    reference_table,
+)
+from geneweaver.db.core.prepared import prepared_statements
 from geneweaver.db.query import gene as gene_query
+from geneweaver.db.utils import (
+    Page,
+    ids_filter,
+    iter_query,
+    keyset_page,
+    temp_id_table,
+)
 from psycopg import Cursor, rows
 from psycopg.sql import SQL
 
@@ -16,7 +34,9 @@ def get(
     preferred: Optional[bool] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
-) -> List:
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+) -> Union[List, Page]:
     """Get genes from the database.
 
     :param cursor: The database cursor.
@@ -26,10 +46,16 @@ def get(
     :param preferred: Whether to search for preferred genes.
     :param limit: The limit of results to return.
     :param offset: The offset of results to return.
+    :param keyset: Sort the results by gene ID, gene database and reference ID, and
+    return a `Page` with a token for the next page instead of a list.
+    :param page_token: Return the page after the row of this page token (implies
+    `keyset`).
 
     :return: list of results using `.fetchall()`
     """
-    cursor.execute(
+    prepared_statements.execute(
+        cursor,
+        "gene.get",
         *gene_query.get(
             reference_id=reference_id,
             gene_database=gene_database,
@@ -37,10 +63,52 @@ def get(
             preferred=preferred,
             limit=limit,
             offset=offset,
+            keyset=keyset,
+            page_token=page_token,
         )
     )
 
-    return cursor.fetchall()
+    results = cursor.fetchall()
+    if keyset or page_token is not None:
+        return keyset_page(results, gene_query.GENE_KEYSET, limit)
+    return results
+
+
+def iter_get(
+    cursor: Cursor,
+    reference_id: Optional[str] = None,
+    gene_database: Optional[GeneIdentifier] = None,
+    species: Optional[Species] = None,
+    preferred: Optional[bool] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    itersize: Optional[int] = None,
+) -> Iterator[rows.Row]:
+    """Stream genes from the database.
+
+    Like `get`, but rows are fetched from a server-side cursor in batches of
+    `itersize`, so memory use stays bounded for very large results.
+
+    :param cursor: The database cursor.
+    :param reference_id: The reference id to search for.
+    :param gene_database: The gene database to search for.
+    :param species: The species to search for.
+    :param preferred: Whether to search for preferred genes.
+    :param limit: The limit of results to return.
+    :param offset: The offset of results to return.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: A generator of results.
+    """
+    query, params = gene_query.get(
+        reference_id=reference_id,
+        gene_database=gene_database,
+        species=species,
+        preferred=preferred,
+        limit=limit,
+        offset=offset,
+    )
+    return iter_query(cursor, query, params, itersize)
 
 
 def get_preferred(
@@ -54,7 +122,9 @@ def get_preferred(
 
     :return: The preferred gene using `.fetchone()`
     """
-    cursor.execute(
+    prepared_statements.execute(
+        cursor,
+        "gene.get",
         *gene_query.get(
             gene_id=gene_id,
             preferred=True,
@@ -64,38 +134,100 @@ def get_preferred(
     return cursor.fetchone()
 
 
+def _fetch_mapping(
+    cursor: Cursor,
+    source_ids: List[str],
+    species: Species,
+    target_gene_id_type: GeneIdentifier,
+) -> List:
+    """Run the gene mapping query, through a temp table for large batches."""
+    with temp_id_table(cursor, source_ids) as source_table:
+        query, params = gene_query.mapping(
+            source_ids=source_ids,
+            species=species,
+            target_gene_id_type=target_gene_id_type,
+            source_table=source_table,
+        )
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
 def mapping(
     cursor: Cursor,
     source_ids: List[str],
     species: Species,
     target_gene_id_type: GeneIdentifier,
+    use_cache: bool = False,
 ) -> List:
     """Get gene mappings from the database.
 
     This method works _within_ a species.
 
+    With `use_cache`, the rows of each source id are cached in process (see
+    `geneweaver.db.cache`), only the ids that aren't cached are sent to the database,
+    and the rows are returned in the order of the source ids.
+
     :param cursor: An async database cursor.
     :param source_ids: The list of gene ids to get mappings for.
     :param species: The species of the identifiers.
     :param target_gene_id_type: The gene id type to return.
+    :param use_cache: Serve the mappings from the in-process cache where possible.
 
     :return: list of results using `.fetchall()`
     """
-    cursor.execute(
-        *gene_query.mapping(
+    if not use_cache:
+        return _fetch_mapping(cursor, source_ids, species, target_gene_id_type)
+
+    found, missing = cached_mappings(
+        cursor.row_factory, source_ids, species, target_gene_id_type
+    )
+    if missing:
+        rows = _fetch_mapping(cursor, missing, species, target_gene_id_type)
+        found.update(
+            cache_mappings(
+                cursor.row_factory, species, target_gene_id_type, missing, rows
+            )
+        )
+    return merge_mappings(source_ids, found)
+
+
+def iter_mapping(
+    cursor: Cursor,
+    source_ids: List[str],
+    species: Species,
+    target_gene_id_type: GeneIdentifier,
+    itersize: Optional[int] = None,
+) -> Iterator[rows.Row]:
+    """Stream gene mappings from the database.
+
+    Like `mapping` (without the cache), but rows are fetched from a server-side cursor
+    in batches of `itersize`, so memory use stays bounded for very large batches of
+    source ids. Large batches are joined through a temp table, which is kept until
+    the generator is exhausted or closed.
+
+    :param cursor: The database cursor.
+    :param source_ids: The list of gene ids to get mappings for.
+    :param species: The species of the identifiers.
+    :param target_gene_id_type: The gene id type to return.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: A generator of results.
+    """
+    with temp_id_table(cursor, source_ids) as source_table:
+        query, params = gene_query.mapping(
             source_ids=source_ids,
             species=species,
             target_gene_id_type=target_gene_id_type,
+            source_table=source_table,
         )
-    )
-
-    return cursor.fetchall()
+        yield from iter_query(cursor, query, params, itersize)
 
 
 def aon_mapping(
     cursor: Cursor,
     source_ids: List[str],
     species: Species,
+    use_cache: bool = False,
 ) -> List:
     """Get gene mappings in the default identifier type for that species in AON.
 
@@ -104,18 +236,18 @@ def aon_mapping(
     :param cursor: An async database cursor.
     :param source_ids: The list of gene ids to get mappings for.
     :param species: The species of the identifiers.
+    :param use_cache: Serve the mappings from the in-process cache where possible.
 
     :return: list of results using `.fetchall()`
     """
-    cursor.execute(
-        *gene_query.aon_mapping(
-            source_ids=source_ids,
-            species=species,
-        )
+    return mapping(
+        cursor,
+        source_ids,
+        species,
+        AON_ID_TYPE_FOR_SPECIES[species],
+        use_cache=use_cache,
     )
 
-    return cursor.fetchall()
-
 
 # --------------------------------------------------------------------------------------
 # NOTE: The following functions are not yet migrated to the new query/execute pattern.
@@ -130,6 +262,10 @@ def id_types(cursor: Cursor, species: Optional[Species] = None) -> List:
 
     :return: list of results using `.fetchall()`
     """
+    table = reference_table(cursor, "genedb", GENEDB_QUERY, GENEDB_INDEXES)
+    if table is not None:
+        return genedb_rows(table, cursor.row_factory, species=species)
+
     if species is None:
         cursor.execute("""SELECT * FROM odestatic.genedb ORDER BY gdb_id;""")
     else:
@@ -169,6 +305,10 @@ def gene_database_by_id(cursor: Cursor, genedb_id: GeneIdentifier) -> List:
 
     :return: list of results using `.fetchall()`
     """
+    table = reference_table(cursor, "genedb", GENEDB_QUERY, GENEDB_INDEXES)
+    if table is not None:
+        return genedb_rows(table, cursor.row_factory, genedb_id=genedb_id)
+
     cursor.execute(
         """SELECT * FROM odestatic.genedb WHERE gdb_id = %(gdb_id)s;""",
         {"gdb_id": int(genedb_id)},
@@ -184,6 +324,12 @@ def gene_database_id(cursor: Cursor, identifier: GeneIdentifier) -> List:
 
     :return: list of results using `.fetchall()`
     """
+    table = reference_table(cursor, "genedb", GENEDB_QUERY, GENEDB_INDEXES)
+    if table is not None:
+        return genedb_rows(
+            table, cursor.row_factory, name=str(identifier), columns=["gdb_id"]
+        )
+
     cursor.execute(
         """SELECT gdb_id FROM odestatic.genedb WHERE gdb_name = %(gdb_name)s;""",
         {"gdb_name": str(identifier)},
@@ -221,21 +367,27 @@ def symbols_by_project_id(cursor: Cursor, project_id: int) -> List:
 
     :return: list of results using `.fetchall()`
     """
-    cursor.execute(
-        """
-        SELECT g.ode_ref_id
-        FROM extsrc.gene g, extsrc.geneset_value gv
-        WHERE (gv.gs_id IN
-                (SELECT gs_id AS geneSetId
-                FROM production.project2geneset
-                WHERE pj_id = %(project_id)s))
-        AND gv.ode_gene_id=g.ode_gene_id AND g.gdb_id=7 AND ode_pref='t';
-    """,
-        {"project_id": project_id},
-    )
+    cursor.execute(*gene_query.symbols_by_project_id(project_id))
     return cursor.fetchall()
 
 
+def iter_symbols_by_project_id(
+    cursor: Cursor, project_id: int, itersize: Optional[int] = None
+) -> Iterator[rows.Row]:
+    """Stream all gene symbols associated with a specific project id.
+
+    Like `symbols_by_project_id`, but rows are fetched from a server-side cursor in
+    batches of `itersize`, so memory use stays bounded for very large projects.
+
+    :param cursor: The database cursor.
+    :param project_id: The project id to search for.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: A generator of results.
+    """
+    return iter_query(cursor, *gene_query.symbols_by_project_id(project_id), itersize)
+
+
 def get_homolog_ids_by_ode_id(
     cursor: Cursor, ode_gene_ids: Iterable[str], identifier: GeneIdentifier
 ) -> List:
@@ -274,6 +426,9 @@ def get_homolog_ids(
 ) -> list:
     """Get homologous GeneIDs for a list of source IDs.
 
+    Large lists of source IDs (see `geneweaver.db.utils.temp_id_table`) are loaded
+    into a temp table to join on.
+
     :param cursor: The database cursor.
     :param source_ids: The gene ids to search for.
     :param result_identifier: The identifier to return genes in.
@@ -283,42 +438,45 @@ def get_homolog_ids(
                            recommended).
     :param only_preferred_ids: Whether to return only genes with  preferred identifiers.
     """
-    base_query = SQL(
+    source_ids = list(source_ids)
+    with temp_id_table(cursor, source_ids) as source_table:
+        base_query = SQL(
+            """
+        SELECT DISTINCT source_gene.ode_ref_id AS source_ref_id,
+                        source_gene.sp_id AS source_sp_id,
+                        result_gene.ode_ref_id AS result_ref_id,
+                        result_gene.sp_id AS result_sp_id
+            FROM homology AS source_homology
+                INNER JOIN homology AS result_homology
+                    ON source_homology.hom_id = result_homology.hom_id
+                INNER JOIN gene AS result_gene
+                    ON result_gene.ode_gene_id = result_homology.ode_gene_id
+                INNER JOIN gene AS source_gene
+                    ON source_gene.ode_gene_id = source_homology.ode_gene_id
+            WHERE source_gene.ode_ref_id {source_filter}
+                AND result_gene.gdb_id = %(result_genedb_id)s
+                AND result_gene.ode_pref = %(ode_pref)s
         """
-    SELECT DISTINCT source_gene.ode_ref_id AS source_ref_id,
-                    source_gene.sp_id AS source_sp_id,
-                    result_gene.ode_ref_id AS result_ref_id,
-                    result_gene.sp_id AS result_sp_id
-        FROM homology AS source_homology
-            INNER JOIN homology AS result_homology
-                ON source_homology.hom_id = result_homology.hom_id
-            INNER JOIN gene AS result_gene
-                ON result_gene.ode_gene_id = result_homology.ode_gene_id
-            INNER JOIN gene AS source_gene
-                ON source_gene.ode_gene_id = source_homology.ode_gene_id
-        WHERE source_gene.ode_ref_id = ANY(%(source_ids)s)
-            AND result_gene.gdb_id = %(result_genedb_id)s
-            AND result_gene.ode_pref = %(ode_pref)s
-    """
-    )
+        ).format(source_filter=ids_filter("source_ids", source_table))
 
-    params = {
-        "source_ids": list(source_ids),
-        "result_genedb_id": int(result_identifier),
-        "ode_pref": "f" if only_preferred_ids is False else "t",
-    }
+        params = {
+            "result_genedb_id": int(result_identifier),
+            "ode_pref": "f" if only_preferred_ids is False else "t",
+        }
+        if source_table is None:
+            params["source_ids"] = source_ids
 
-    if source_identifier is not None:
-        base_query += SQL("AND source_gene.gdb_id = %(source_genedb_id)s")
-        params["source_genedb_id"] = int(source_identifier)
+        if source_identifier is not None:
+            base_query += SQL(" AND source_gene.gdb_id = %(source_genedb_id)s")
+            params["source_genedb_id"] = int(source_identifier)
 
-    if result_species is not None:
-        base_query += SQL("AND result_gene.sp_id = %(result_sp_id)s")
-        params["result_sp_id"] = int(result_species)
+        if result_species is not None:
+            base_query += SQL(" AND result_gene.sp_id = %(result_sp_id)s")
+            params["result_sp_id"] = int(result_species)
 
-    if source_species is not None:
-        base_query += SQL("AND source_gene.sp_id = %(source_sp_id)s")
-        params["source_sp_id"] = int(source_species)
+        if source_species is not None:
+            base_query += SQL(" AND source_gene.sp_id = %(source_sp_id)s")
+            params["source_sp_id"] = int(source_species)
 
-    cursor.execute(base_query, params)
-    return cursor.fetchall()
+        cursor.execute(base_query, params)
+        return cursor.fetchall()
@@ -1,21 +1,40 @@
 """Geneset database functions."""
 
 from datetime import date
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 
 from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
 from geneweaver.core.schema.gene import GeneValue
 from geneweaver.core.schema.geneset import GenesetUpload
 from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.core.prepared import prepared_statements
+from geneweaver.db.permissions import readable_genesets
 from geneweaver.db.query import geneset as geneset_query
-from geneweaver.db.query.geneset.utils import geneset_upload_to_kwargs
+from geneweaver.db.query.geneset.const import (
+    COPY_GENESET_VALUES,
+    COPY_GENESET_VALUES_TYPES,
+    GENESET_KEYSET,
+)
+from geneweaver.db.query.geneset.utils import (
+    geneset_upload_to_kwargs,
+    geneset_value_rows,
+    upload_gene_ids,
+    upload_gene_keys,
+)
 from geneweaver.db.utils import (
     GenesetScoreTypeOrScoreTypes,
     GenesetTierOrTiers,
+    Page,
+    RowsWithTotal,
+    commit,
+    keyset_page,
+    row_value,
+    split_total,
     temp_override_row_factory,
 )
 from psycopg import Cursor, rows
 from psycopg.rows import Row
+from psycopg.sql import Composed
 
 
 def get(
@@ -33,6 +52,9 @@ def get(
     search_text: Optional[str] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
     with_publication_info: bool = True,
     ontology_term: Optional[str] = None,
     score_type: Optional[GenesetScoreTypeOrScoreTypes] = None,
@@ -42,7 +64,8 @@ def get(
     created_before: Optional[date] = None,
     updated_after: Optional[date] = None,
     updated_before: Optional[date] = None,
-) -> List[Row]:
+    use_readable_cache: bool = False,
+) -> Union[List[Row], Page, RowsWithTotal]:
     """Get genesets from the database.
 
     :param cursor: A database cursor.
@@ -69,10 +92,26 @@ def get(
     :param created_after: Show only results updated before this date.
     :param limit: Limit the number of results.
     :param offset: Offset the results.
+    :param keyset: Sort the results by geneset ID, and return a `Page` with a token
+    for the next page instead of a list.
+    :param page_token: Return the page after the row of this page token (implies
+    `keyset`).
+    :param with_total: Also count the matching genesets, ignoring the limit and
+    offset, in the same query, and return `RowsWithTotal` instead of a list.
+    :param use_readable_cache: Filter on the materialized (and cached) readable
+    genesets of the `is_readable_by` user, instead of checking each geneset with
+    `geneset_is_readable2` (see `geneweaver.db.permissions`).
 
     :return: list of results using `.fetchall()`
     """
-    cursor.execute(
+    readable = (
+        readable_genesets(cursor, is_readable_by)
+        if use_readable_cache and is_readable_by is not None
+        else None
+    )
+    prepared_statements.execute(
+        cursor,
+        "geneset.get",
         *geneset_query.get(
             is_readable_by=is_readable_by,
             gs_id=gs_id,
@@ -87,6 +126,10 @@ def get(
             search_text=search_text,
             limit=limit,
             offset=offset,
+            keyset=keyset,
+            page_token=page_token,
+            with_total=with_total,
+            readable_genesets=readable,
             with_publication_info=with_publication_info,
             ontology_term=ontology_term,
             score_type=score_type,
@@ -96,10 +139,15 @@ def get(
             created_before=created_before,
             updated_after=updated_after,
             updated_before=updated_before,
-        )
+        ),
     )
 
-    return cursor.fetchall()
+    results = cursor.fetchall()
+    if keyset or page_token is not None:
+        return keyset_page(results, GENESET_KEYSET, limit)
+    if with_total:
+        return split_total(results, offset)
+    return results
 
 
 def by_id(
@@ -115,12 +163,14 @@ def by_id(
     :param is_readable_by: A user ID to check if the user can read the results.
     :param with_publication_info: Include publication info in the return.
     """
-    cursor.execute(
+    prepared_statements.execute(
+        cursor,
+        "geneset.get",
         *geneset_query.get(
             gs_id=gs_id,
             is_readable_by=is_readable_by,
             with_publication_info=with_publication_info,
-        )
+        ),
     )
 
     return cursor.fetchone()
@@ -275,6 +325,9 @@ def add(
     :param publication_id: The (internal) publication ID associated with the Geneset.
     :return: The geneset ID.
     """
+    # This keeps the database's `reparse_geneset_file`, rather than going through
+    # `add_with_values`, since it also handles microarray probe IDs, and it keeps
+    # the values of the symbols that don't resolve to a gene.
     file_id = add_geneset_file(
         cursor=cursor,
         values=geneset.gene_list,
@@ -291,6 +344,119 @@ def add(
     return geneset_id
 
 
+def add_with_values(
+    cursor: Cursor,
+    geneset: GenesetUpload,
+    owner_id: Optional[int] = None,
+    publication_id: Optional[int] = None,
+) -> int:
+    """Add a geneset, its file and its values to the database in one round trip.
+
+    The inserts are chained in a single statement, which is pipelined with the call
+    to the database's `process_thresholds` that marks the values within the
+    geneset's threshold, in the same transaction. Like `add_many` (and unlike `add`),
+    the values aren't re-parsed from the geneset file by the database, and symbols
+    that don't resolve to a gene are left out.
+
+    :param cursor: A database cursor.
+    :param geneset: An instance of a GenesetUpload schema.
+    :param owner_id: The owner of the geneset.
+    :param publication_id: The (internal) publication ID associated with the Geneset.
+
+    :raises GeneweaverValueError: If the upload uses microarray probe IDs.
+
+    :return: The geneset ID.
+    """
+    query, params = geneset_query.add_with_values(
+        user_id=owner_id,
+        values=geneset.values,  # noqa: PD011
+        publication_id=publication_id,
+        **geneset_upload_to_kwargs(geneset),
+    )
+    with cursor.connection.pipeline(), cursor.connection.transaction():
+        cursor.execute(query, params)
+        # The function can't see the rows inserted by the statement that calls it,
+        # so it runs in the next one, on its own cursor to keep the inserted gs_id.
+        cursor.connection.cursor().execute(
+            *geneset_query.process_thresholds_last_added()
+        )
+    return row_value(cursor.fetchone(), "gs_id", 0)
+
+
+def _insert_returning_ids(
+    cursor: Cursor, queries: List[Tuple[Composed, dict]], column: str
+) -> List[int]:
+    """Run inserts of the same shape in one batch, and get the ID each returned."""
+    cursor.executemany(queries[0][0], [params for _, params in queries], returning=True)
+    ids = [row_value(cursor.fetchone(), column, 0)]
+    while cursor.nextset():
+        ids.append(row_value(cursor.fetchone(), column, 0))
+    return ids
+
+
+def add_many(
+    cursor: Cursor,
+    genesets: Sequence[GenesetUpload],
+    owner_id: Optional[int] = None,
+    publication_id: Optional[int] = None,
+) -> List[int]:
+    """Add many genesets to the database, in one transaction.
+
+    Unlike `add`, the values aren't re-parsed from the geneset files by the database.
+    The gene symbols of all the uploads are resolved to gene IDs in one query, and the
+    `geneset_value` rows are copied in with `COPY`. Then the database's
+    `process_thresholds` marks the values within each geneset's threshold, in one
+    more round trip for all of them. Symbols that don't resolve to a gene are left
+    out.
+
+    :param cursor: A database cursor.
+    :param genesets: The GenesetUploads to add.
+    :param owner_id: The owner of the genesets.
+    :param publication_id: The (internal) publication ID associated with the genesets.
+
+    :raises GeneweaverValueError: If an upload uses microarray probe IDs.
+
+    :return: The geneset IDs, in the order of the uploads.
+    """
+    if not genesets:
+        return []
+    keys = upload_gene_keys(genesets)
+
+    with cursor.connection.transaction():
+        file_ids = _insert_returning_ids(
+            cursor,
+            [geneset_query.add_geneset_file(values=gs.values) for gs in genesets],
+            "file_id",
+        )
+        geneset_ids = _insert_returning_ids(
+            cursor,
+            [
+                geneset_query.add(
+                    user_id=owner_id,
+                    file_id=file_id,
+                    publication_id=publication_id,
+                    **geneset_upload_to_kwargs(geneset),
+                )
+                for file_id, geneset in zip(file_ids, genesets)
+            ],
+            "gs_id",
+        )
+
+        cursor.execute(*geneset_query.gene_ids_for_upload_keys(keys))
+        gene_ids = upload_gene_ids(cursor.fetchall())
+
+        today = date.today()
+        with cursor.copy(COPY_GENESET_VALUES) as copy:
+            copy.set_types(COPY_GENESET_VALUES_TYPES)
+            for geneset_id, geneset in zip(geneset_ids, genesets):
+                for row in geneset_value_rows(geneset_id, geneset, gene_ids, today):
+                    copy.write_row(row)
+
+        cursor.execute(*geneset_query.process_thresholds_many(geneset_ids))
+
+    return geneset_ids
+
+
 # --------------------------------------------------------------------------------------
 # The following functions are not yet implemented in the aio/concurrent paradigm.
 # They are subject to change and may be deprecated in the future.
@@ -353,7 +519,7 @@ def update_date(cursor: Cursor, geneset_id: int) -> str:
         """,
         {"geneset_id": geneset_id},
     )
-    cursor.connection.commit()
+    commit(cursor)
     return cursor.fetchone()[0]
 
 
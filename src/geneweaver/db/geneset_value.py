@@ -1,12 +1,64 @@
 """Database functions for geneset values."""
 
-from typing import List, Optional
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
 from geneweaver.core.enum import GeneIdentifier
 from geneweaver.core.schema.batch import GenesetValueInput
 from geneweaver.db.exceptions import GeneweaverTypeError
+from geneweaver.db.query import geneset_value as geneset_value_query
+from geneweaver.db.query.geneset.const import (
+    COPY_GENESET_VALUES,
+    COPY_GENESET_VALUES_TEXT_TYPES,
+    SERVER_DATE,
+)
+from geneweaver.db.query.utils import array_literal
+from geneweaver.db.utils import commit, iter_query, row_value
 from psycopg import Cursor
-from psycopg.sql import SQL
+from psycopg.rows import Row
+
+
+class GenesetValueColumns(NamedTuple):
+    """The geneset values of a geneset, as one NumPy array per column.
+
+    The arrays all have the same length and order, so index `i` of each array
+    belongs to the same geneset value.
+    """
+
+    ode_gene_id: np.ndarray
+    gsv_value: np.ndarray
+    gsv_in_threshold: np.ndarray
+    ode_ref_id: np.ndarray
+
+
+def geneset_value_columns(row: Optional[Row]) -> GenesetValueColumns:
+    """Unpack the row returned by `query.geneset_value.by_geneset_id_columns`.
+
+    :param row: The row, from a cursor with any row factory.
+
+    :return: The int64 gene ids, float64 values (NaN where there is no value), bool
+    thresholds and str reference ids of the geneset values.
+    """
+    if row is None or not row_value(row, "value_count", 0):
+        return GenesetValueColumns(
+            ode_gene_id=np.empty(0, dtype=np.int64),
+            gsv_value=np.empty(0, dtype=np.float64),
+            gsv_in_threshold=np.empty(0, dtype=np.bool_),
+            ode_ref_id=np.empty(0, dtype=np.str_),
+        )
+    ref_ids = row_value(row, "ode_ref_id", 4)
+    return GenesetValueColumns(
+        ode_gene_id=np.frombuffer(row_value(row, "ode_gene_id", 1), dtype=">i8").astype(
+            np.int64
+        ),
+        gsv_value=np.frombuffer(row_value(row, "gsv_value", 2), dtype=">f8").astype(
+            np.float64
+        ),
+        gsv_in_threshold=np.frombuffer(
+            row_value(row, "gsv_in_threshold", 3), dtype=np.bool_
+        ).copy(),
+        ode_ref_id=np.array(ref_ids.split(geneset_value_query.REF_ID_SEPARATOR)),
+    )
 
 
 def format_geneset_values_for_file_insert(
@@ -56,7 +108,7 @@ def insert_file(
         (len(formatted_geneset_values), formatted_geneset_values, comments),
     )
 
-    cursor.connection.commit()
+    commit(cursor)
 
     return cursor.fetchone()[0]
 
@@ -84,6 +136,47 @@ def get_file(cursor: Cursor, file_id: int) -> str:
     return contents[0]
 
 
+def insert_geneset_values(
+    cursor: Cursor,
+    geneset_id: int,
+    values: Iterable[Tuple[int, Union[str, float], str, bool]],
+) -> int:
+    """Insert many geneset values into the database, with one COPY and one commit.
+
+    The values are passed on as text, so the server parses them into the numeric
+    columns as given, and the rows are dated by the server, as `NOW()` would.
+
+    :param cursor: The database cursor.
+    :param geneset_id: The geneset ID to insert the values into.
+    :param values: (gene_id, value, name, within_threshold) tuples, where the gene ID
+    is an ode_gene_id and the name is a gene name or symbol (typically an ode_ref_id).
+
+    :return: The number of geneset values inserted.
+    """
+    count = 0
+    with cursor.copy(COPY_GENESET_VALUES) as copy:
+        copy.set_types(COPY_GENESET_VALUES_TEXT_TYPES)
+        for gene_id, value, name, within_threshold in values:
+            value = str(value)
+            copy.write_row(
+                (
+                    geneset_id,
+                    gene_id,
+                    value,
+                    array_literal([name]),
+                    array_literal([value]),
+                    within_threshold,
+                    0,
+                    SERVER_DATE,
+                )
+            )
+            count += 1
+
+    commit(cursor)
+
+    return count
+
+
 def insert_geneset_value(
     cursor: Cursor,
     geneset_id: int,
@@ -94,6 +187,10 @@ def insert_geneset_value(
 ) -> int:
     """Insert a geneset value into the database.
 
+    This is `insert_geneset_values` with a single row, so both store the value the
+    same way. To insert more than one value, call `insert_geneset_values` directly,
+    which inserts them all at once.
+
     :param cursor: The database cursor.
     :param geneset_id: The geneset ID to insert the value into.
     :param gene_id: The gene ID (ode_gene_id) to insert the value into.
@@ -101,27 +198,12 @@ def insert_geneset_value(
     :param name: A gene name or symbol (typically an ode_ref_id).
     :param within_threshold: Whether the value is within the threshold.
 
-    :return: The geneset value ID of the inserted value.
+    :return: The geneset ID the value was inserted into.
     """
-    cursor.execute(
-        """
-        INSERT INTO geneset_value
-
-            (gs_id, ode_gene_id, gsv_value, gsv_source_list,
-            gsv_value_list, gsv_in_threshold, gsv_hits, gsv_date)
-
-        VALUES
-
-            (%s, %s, %s, %s, %s, %s, 0, NOW())
-
-        RETURNING gs_id;
-        """,
-        (geneset_id, gene_id, value, [name], [float(value)], within_threshold),
+    insert_geneset_values(
+        cursor, geneset_id, [(gene_id, value, name, within_threshold)]
     )
-
-    cursor.connection.commit()
-
-    return cursor.fetchone()[0]
+    return geneset_id
 
 
 def by_geneset_id(
@@ -148,6 +230,68 @@ def by_geneset_id(
         return by_geneset_id_as_uploaded(cursor, geneset_id, gsv_in_threshold)
 
 
+def iter_by_geneset_id(
+    cursor: Cursor,
+    geneset_id: int,
+    identifier: Optional[GeneIdentifier] = None,
+    gsv_in_threshold: Optional[bool] = False,
+    itersize: Optional[int] = None,
+) -> Iterator[Row]:
+    """Stream all geneset values associated with a geneset.
+
+    Like `by_geneset_id`, but rows are fetched from a server-side cursor in batches
+    of `itersize`, so memory use stays bounded for very large genesets.
+
+    :param cursor: The database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to return.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+    :param itersize: The number of rows to fetch per round trip.
+
+    :return: A generator of geneset values associated with the geneset.
+    """
+    if identifier is not None:
+        query, params = geneset_value_query.by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
+    else:
+        query, params = geneset_value_query.by_geneset_id_as_uploaded(
+            geneset_id, gsv_in_threshold
+        )
+    return iter_query(cursor, query, params, itersize)
+
+
+def by_geneset_id_columns(
+    cursor: Cursor,
+    geneset_id: int,
+    identifier: Optional[GeneIdentifier] = None,
+    gsv_in_threshold: Optional[bool] = False,
+) -> GenesetValueColumns:
+    """Retrieve the geneset values of a geneset as NumPy arrays.
+
+    Like `by_geneset_id`, but the database packs each column into a single value,
+    so the arrays are built without creating a Python object per row. This is much
+    cheaper for genesets with many values.
+
+    :param cursor: The database cursor.
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to return.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: The `ode_gene_id`, `gsv_value`, `gsv_in_threshold` and `ode_ref_id`
+    columns of the geneset values.
+    """
+    cursor.execute(
+        *geneset_value_query.by_geneset_id_columns(
+            geneset_id, identifier, gsv_in_threshold
+        ),
+        binary=True,
+    )
+    return geneset_value_columns(cursor.fetchone())
+
+
 def by_geneset_id_as_uploaded(
     cursor: Cursor, geneset_id: int, gsv_in_threshold: Optional[bool] = False
 ) -> list:
@@ -160,22 +304,9 @@ def by_geneset_id_as_uploaded(
 
     :return: A list of geneset values associated with the geneset.
     """
-    base_query = SQL(
-        """
-        SELECT DISTINCT ON (gv.ode_gene_id) gv.*, g.ode_ref_id
-        FROM        extsrc.geneset_value gv
-        INNER JOIN  extsrc.gene g
-        USING       (ode_gene_id)
-        WHERE  gs_id = %(geneset_id)s
-        """
+    cursor.execute(
+        *geneset_value_query.by_geneset_id_as_uploaded(geneset_id, gsv_in_threshold)
     )
-    params = {"geneset_id": geneset_id}
-
-    if gsv_in_threshold:
-        base_query += SQL("AND gv.gsv_in_threshold = %(gsv_in_threshold)s")
-        params["gsv_in_threshold"] = gsv_in_threshold
-
-    cursor.execute(base_query, params)
     return cursor.fetchall()
 
 
@@ -199,69 +330,9 @@ def by_geneset_id_and_identifier(
     :return: A list of geneset values associated with the geneset.
 
     """
-    base_query = SQL(
-        """
-            SELECT gsv.gs_id, gsv.ode_gene_id, gsv.gsv_value, gsv.gsv_hits,
-                   gsv.gsv_source_list, gsv.gsv_value_list,
-                   gsv.gsv_in_threshold, gsv.gsv_date, h.hom_id, gi.gene_rank,
-                   gsv.ode_ref_id, gsv.gdb_id
-
-            --
-            -- Use a subquery here so we can prevent duplicate gene identifiers
-            -- of the same type from being returned (the DISTINCT ON section)
-            -- otherwise when we try to change identifier types from the view
-            -- GS page, duplicate entries screw things up
-            --
-            FROM (
-                SELECT DISTINCT ON (g.ode_gene_id, g.gdb_id)
-                        gsv.*, g.ode_ref_id, g.gdb_id, g.ode_pref
-                FROM    geneset_value as gsv, gene as g
-                WHERE   gsv.gs_id = %(geneset_id)s AND
-                        g.ode_gene_id = gsv.ode_gene_id AND
-                        g.gdb_id = (SELECT COALESCE (
-                            (SELECT gdb_id
-                             FROM   gene AS g2
-                             WHERE g2.ode_gene_id = gsv.ode_gene_id AND
-                                   g2.gdb_id = %(gdb_id)s
-                             LIMIT 1),
-                            (SELECT gdb_id
-                             FROM   gene AS g2
-                             WHERE g2.ode_gene_id = gsv.ode_gene_id AND
-                                   g2.gdb_id = 7
-                             LIMIT 1)
-                        )) AND
-
-                        --
-                        -- When viewing symbols, always pick the preferred gene symbol
-                        --
-                        CASE
-                            WHEN g.gdb_id = 7 THEN g.ode_pref = 't'
-                            ELSE true
-                        END
-            ) gsv
-
-            --
-            -- gene_info necessary for the priority scores
-            --
-            INNER JOIN  gene_info AS gi
-            ON          gsv.ode_gene_id = gi.ode_gene_id
-
-            --
-            -- Have to use a left outer join because some genes may not have homologs
-            --
-            LEFT OUTER JOIN homology AS h
-            ON          gsv.ode_gene_id = h.ode_gene_id
-
-            WHERE (h.hom_source_name = 'Homologene' OR
-                  -- In case the gene doesn't have any homologs
-                  h.hom_source_name IS NULL)
-        """
+    cursor.execute(
+        *geneset_value_query.by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
     )
-    params = {"geneset_id": geneset_id, "gdb_id": int(identifier)}
-
-    if gsv_in_threshold:
-        base_query += SQL("AND gsv.gsv_in_threshold = %(gsv_in_threshold)s")
-        params["gsv_in_threshold"] = gsv_in_threshold
-
-    cursor.execute(base_query, params)
     return cursor.fetchall()
@@ -0,0 +1,393 @@
+"""An optional in-memory index of the homology and gene tables.
+
+`gene.get_homolog_ids` and `gene.get_homolog_ids_by_ode_id` join `homology` and
+`gene` twice for every call. For services that translate many gene lists across
+species, `HomologyIndex` loads a snapshot of both tables into compact arrays once,
+and answers the same lookups in process with binary searches:
+
+- gene rows sorted by (species, ode_gene_id), with the offsets of each species,
+- homology pairs sorted by ode_gene_id, and again by hom_id,
+- the reference ids stored once each, in a sorted list, with an index from each
+  reference id to its gene rows.
+
+The index is empty until it is loaded with `refresh` (or `async_refresh`), and can
+be refreshed at any time, e.g. after a data release. Lookups that run during a
+refresh keep using the previous snapshot. Genes without a reference id or a species,
+and homology rows without a gene, are left out.
+
+Example:
+-------
+    from geneweaver.core.enum import GeneIdentifier, Species
+    from geneweaver.db.core.cursor import cursor
+    from geneweaver.db.homology_index import homology_index
+
+    with cursor() as cur:
+        homology_index.refresh(cur)
+
+    homology_index.homolog_ids(
+        ["Pax6"], GeneIdentifier.ENSEMBLE_GENE, result_species=Species.HOMO_SAPIENS
+    )
+
+"""
+
+# ruff: noqa: ANN101
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.exceptions import GeneweaverError
+from geneweaver.db.utils import aiter_query, iter_query
+from psycopg import AsyncCursor, Cursor
+from psycopg.rows import tuple_row
+from psycopg.sql import SQL
+
+GENE_ROWS_QUERY = SQL(
+    """
+    SELECT ode_gene_id, ode_ref_id, gdb_id, sp_id, ode_pref
+    FROM extsrc.gene
+    WHERE ode_ref_id IS NOT NULL AND sp_id IS NOT NULL
+    ORDER BY sp_id, ode_gene_id
+    """
+)
+
+HOMOLOGY_ROWS_QUERY = SQL(
+    """
+    SELECT hom_id, ode_gene_id
+    FROM extsrc.homology
+    WHERE hom_id IS NOT NULL AND ode_gene_id IS NOT NULL
+    ORDER BY ode_gene_id, hom_id
+    """
+)
+
+# Stands in for NULL in the integer columns.
+_NULL = -1
+
+
+class _Snapshot(NamedTuple):
+    """The arrays that make up one loaded copy of the tables."""
+
+    gene_ids: array
+    gene_refs: array
+    gene_dbs: array
+    gene_species: array
+    gene_prefs: array
+    species_offsets: Dict[int, Tuple[int, int]]
+    refs: List[str]
+    ref_offsets: array
+    rows_by_ref: array
+    homology_by_gene_genes: array
+    homology_by_gene_homs: array
+    homology_by_hom_homs: array
+    homology_by_hom_genes: array
+
+
+def _nullable(value: Optional[int]) -> int:
+    """Store NULL as `_NULL` in an integer array."""
+    return _NULL if value is None else int(value)
+
+
+def _range(values: array, value: int, lo: int = 0, hi: Optional[int] = None) -> range:
+    """Get the positions of a value in a sorted array (or a slice of one)."""
+    hi = len(values) if hi is None else hi
+    return range(
+        bisect_left(values, value, lo, hi), bisect_right(values, value, lo, hi)
+    )
+
+
+def _build_snapshot(
+    gene_rows: Iterable[Sequence], homology_rows: Iterable[Sequence]
+) -> _Snapshot:
+    """Build the index arrays from the rows of the gene and homology tables.
+
+    :param gene_rows: (ode_gene_id, ode_ref_id, gdb_id, sp_id, ode_pref) rows, sorted
+    by sp_id and then ode_gene_id.
+    :param homology_rows: (hom_id, ode_gene_id) rows, sorted by ode_gene_id.
+
+    :return: The snapshot.
+    """
+    gene_ids, gene_dbs, gene_species = array("q"), array("i"), array("i")
+    gene_prefs, ref_names = array("b"), []
+    species_offsets: Dict[int, Tuple[int, int]] = {}
+    for position, (gene_id, ref, gdb_id, sp_id, pref) in enumerate(gene_rows):
+        gene_ids.append(gene_id)
+        gene_dbs.append(_nullable(gdb_id))
+        gene_species.append(sp_id)
+        gene_prefs.append(_nullable(pref))
+        ref_names.append(ref)
+        start, _ = species_offsets.get(sp_id, (position, position))
+        species_offsets[sp_id] = (start, position + 1)
+
+    refs = sorted(set(ref_names))
+    ref_positions = {ref: index for index, ref in enumerate(refs)}
+    gene_refs = array("i", (ref_positions[ref] for ref in ref_names))
+    del ref_names, ref_positions
+
+    # Rows grouped by reference id, like a CSR matrix: the rows of reference id i
+    # are rows_by_ref[ref_offsets[i]:ref_offsets[i + 1]].
+    ref_offsets = array("q", [0]) * (len(refs) + 1)
+    for ref in gene_refs:
+        ref_offsets[ref + 1] += 1
+    for index in range(len(refs)):
+        ref_offsets[index + 1] += ref_offsets[index]
+    rows_by_ref = array("q", [0]) * len(gene_refs)
+    next_slot = ref_offsets[:-1]
+    for row, ref in enumerate(gene_refs):
+        rows_by_ref[next_slot[ref]] = row
+        next_slot[ref] += 1
+
+    homology_by_gene_homs, homology_by_gene_genes = array("q"), array("q")
+    for hom_id, gene_id in homology_rows:
+        homology_by_gene_homs.append(hom_id)
+        homology_by_gene_genes.append(gene_id)
+    order = sorted(
+        range(len(homology_by_gene_homs)), key=homology_by_gene_homs.__getitem__
+    )
+    homology_by_hom_homs = array("q", (homology_by_gene_homs[i] for i in order))
+    homology_by_hom_genes = array("q", (homology_by_gene_genes[i] for i in order))
+
+    return _Snapshot(
+        gene_ids=gene_ids,
+        gene_refs=gene_refs,
+        gene_dbs=gene_dbs,
+        gene_species=gene_species,
+        gene_prefs=gene_prefs,
+        species_offsets=species_offsets,
+        refs=refs,
+        ref_offsets=ref_offsets,
+        rows_by_ref=rows_by_ref,
+        homology_by_gene_genes=homology_by_gene_genes,
+        homology_by_gene_homs=homology_by_gene_homs,
+        homology_by_hom_homs=homology_by_hom_homs,
+        homology_by_hom_genes=homology_by_hom_genes,
+    )
+
+
+class HomologyIndex:
+    """Answer homolog lookups from an in-memory snapshot of the database tables."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index. Call `refresh` to load it."""
+        self._snapshot: Optional[_Snapshot] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the index has been loaded."""
+        return self._snapshot is not None
+
+    def load_rows(
+        self, gene_rows: Iterable[Sequence], homology_rows: Iterable[Sequence]
+    ) -> "HomologyIndex":
+        """Replace the snapshot with one built from the given rows.
+
+        :param gene_rows: See `_build_snapshot`.
+        :param homology_rows: See `_build_snapshot`.
+
+        :return: The index.
+        """
+        snapshot = _build_snapshot(gene_rows, homology_rows)
+        self._snapshot, self.loaded_at = snapshot, time.time()
+        return self
+
+    def refresh(self, cursor: Cursor) -> "HomologyIndex":
+        """Load (or reload) the index from the database.
+
+        The tables are streamed through server-side cursors on the connection of
+        the given cursor.
+
+        :param cursor: The database cursor.
+
+        :return: The index.
+        """
+        with cursor.connection.cursor(row_factory=tuple_row) as tuple_cursor:
+            return self.load_rows(
+                iter_query(tuple_cursor, GENE_ROWS_QUERY),
+                iter_query(tuple_cursor, HOMOLOGY_ROWS_QUERY),
+            )
+
+    async def async_refresh(self, cursor: AsyncCursor) -> "HomologyIndex":
+        """Load (or reload) the index from the database, with an async cursor.
+
+        :param cursor: An async database cursor.
+
+        :return: The index.
+        """
+        async with cursor.connection.cursor(row_factory=tuple_row) as tuple_cursor:
+            gene_rows = [
+                row async for row in aiter_query(tuple_cursor, GENE_ROWS_QUERY)
+            ]
+            homology_rows = [
+                row async for row in aiter_query(tuple_cursor, HOMOLOGY_ROWS_QUERY)
+            ]
+        return self.load_rows(gene_rows, homology_rows)
+
+    def _get_snapshot(self) -> _Snapshot:
+        """Get the current snapshot, which lookups use from start to finish."""
+        if self._snapshot is None:
+            raise GeneweaverError("The homology index has not been loaded.")
+        return self._snapshot
+
+    @staticmethod
+    def _gene_rows(
+        snapshot: _Snapshot, gene_id: int, species: Optional[Species] = None
+    ) -> Iterable[int]:
+        """Get the positions of the gene rows with an ode_gene_id."""
+        if species is None:
+            segments = snapshot.species_offsets.values()
+        else:
+            segments = [snapshot.species_offsets.get(int(species), (0, 0))]
+        for start, end in segments:
+            yield from _range(snapshot.gene_ids, gene_id, start, end)
+
+    @staticmethod
+    def _homolog_gene_ids(snapshot: _Snapshot, gene_id: int) -> Iterable[int]:
+        """Get the ode_gene_ids in the same homology groups as a gene."""
+        for position in _range(snapshot.homology_by_gene_genes, gene_id):
+            hom_id = snapshot.homology_by_gene_homs[position]
+            for hom_position in _range(snapshot.homology_by_hom_homs, hom_id):
+                yield snapshot.homology_by_hom_genes[hom_position]
+
+    def homolog_ids_by_ode_id(
+        self, ode_gene_ids: Iterable[int], identifier: GeneIdentifier
+    ) -> List[Tuple[int, str]]:
+        """Get all homolog ids associated with some gene ids.
+
+        This matches `geneweaver.db.gene.get_homolog_ids_by_ode_id`.
+
+        :param ode_gene_ids: The gene ids to search for.
+        :param identifier: The identifier to return genes in.
+
+        :return: The distinct (ode_gene_id, ode_ref_id) pairs.
+        """
+        snapshot = self._get_snapshot()
+        gdb_id = int(identifier)
+        results: Dict[Tuple[int, str], None] = {}
+        for gene_id in dict.fromkeys(int(gene_id) for gene_id in ode_gene_ids):
+            for homolog_id in self._homolog_gene_ids(snapshot, gene_id):
+                for row in self._gene_rows(snapshot, homolog_id):
+                    if snapshot.gene_dbs[row] == gdb_id:
+                        ref = snapshot.refs[snapshot.gene_refs[row]]
+                        results[(gene_id, ref)] = None
+        return list(results)
+
+    def homolog_ids(
+        self,
+        source_ids: Iterable[str],
+        result_identifier: GeneIdentifier,
+        source_identifier: Optional[GeneIdentifier] = None,
+        result_species: Optional[Species] = None,
+        source_species: Optional[Species] = None,
+        only_preferred_ids: bool = True,
+    ) -> List[Tuple[str, int, str, int]]:
+        """Get homologous GeneIDs for a list of source IDs.
+
+        This matches `geneweaver.db.gene.get_homolog_ids`, including that
+        `only_preferred_ids=False` returns only the genes that are not preferred.
+
+        :param source_ids: The gene ids to search for.
+        :param result_identifier: The identifier to return genes in.
+        :param source_identifier: The identifier to search for genes in (optional).
+        :param result_species: The species to return genes in (optional).
+        :param source_species: The species to search for genes in (optional).
+        :param only_preferred_ids: Whether to return only genes with preferred
+        identifiers.
+
+        :return: The distinct (source_ref_id, source_sp_id, result_ref_id,
+        result_sp_id) rows, in the order of the source ids.
+        """
+        snapshot = self._get_snapshot()
+        result_gdb_id = int(result_identifier)
+        source_gdb_id = None if source_identifier is None else int(source_identifier)
+        source_sp_id = None if source_species is None else int(source_species)
+        result_pref = 0 if only_preferred_ids is False else 1
+
+        results: Dict[Tuple[str, int, str, int], None] = {}
+        for source_id in dict.fromkeys(source_ids):
+            ref = bisect_left(snapshot.refs, source_id)
+            if ref == len(snapshot.refs) or snapshot.refs[ref] != source_id:
+                continue
+            source_rows = snapshot.rows_by_ref[
+                snapshot.ref_offsets[ref] : snapshot.ref_offsets[ref + 1]
+            ]
+            for source_row in source_rows:
+                if (
+                    source_gdb_id is not None
+                    and snapshot.gene_dbs[source_row] != source_gdb_id
+                ) or (
+                    source_sp_id is not None
+                    and snapshot.gene_species[source_row] != source_sp_id
+                ):
+                    continue
+                source_row_sp_id = snapshot.gene_species[source_row]
+                gene_id = snapshot.gene_ids[source_row]
+                for homolog_id in self._homolog_gene_ids(snapshot, gene_id):
+                    for row in self._gene_rows(snapshot, homolog_id, result_species):
+                        if (
+                            snapshot.gene_dbs[row] == result_gdb_id
+                            and snapshot.gene_prefs[row] == result_pref
+                        ):
+                            result = (
+                                source_id,
+                                source_row_sp_id,
+                                snapshot.refs[snapshot.gene_refs[row]],
+                                snapshot.gene_species[row],
+                            )
+                            results[result] = None
+        return list(results)
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """Estimate the memory used by the index.
+
+        :return: The size in bytes of the gene arrays ("genes"), the reference id
+        strings ("refs"), the reference id index ("ref_index"), the homology arrays
+        ("homology"), and their "total".
+        """
+        footprint = {"genes": 0, "refs": 0, "ref_index": 0, "homology": 0}
+        snapshot = self._snapshot
+        if snapshot is not None:
+            footprint["genes"] = sum(
+                _array_size(values)
+                for values in (
+                    snapshot.gene_ids,
+                    snapshot.gene_refs,
+                    snapshot.gene_dbs,
+                    snapshot.gene_species,
+                    snapshot.gene_prefs,
+                )
+            )
+            footprint["refs"] = sys.getsizeof(snapshot.refs) + sum(
+                sys.getsizeof(ref) for ref in snapshot.refs
+            )
+            footprint["ref_index"] = _array_size(snapshot.ref_offsets) + _array_size(
+                snapshot.rows_by_ref
+            )
+            footprint["homology"] = sum(
+                _array_size(values)
+                for values in (
+                    snapshot.homology_by_gene_genes,
+                    snapshot.homology_by_gene_homs,
+                    snapshot.homology_by_hom_homs,
+                    snapshot.homology_by_hom_genes,
+                )
+            )
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+
+def _array_size(values: array) -> int:
+    """Get the size of the data in an array, in bytes."""
+    return len(values) * values.itemsize
+
+
+homology_index = HomologyIndex()
@@ -0,0 +1,436 @@
+"""Optional per-function latency instrumentation for the database functions.
+
+When enabled, every public function in the submodules listed in the `__all__` of
+`geneweaver.db` and `geneweaver.db.aio` that takes a cursor or connection as its first
+parameter is replaced by a wrapper that records, under the function's name (e.g.
+"gene.get" or "aio.gene.get"), the wall time of each call, the number of rows it
+returned and whether it raised an error. The records are passed to a `Sink`, by
+default an `InMemorySink` that aggregates them into call counts, a wall time
+histogram, row counts and error counts. The public methods of objects that a
+submodule creates at import time are instrumented the same way, under names such as
+"homology_index.homology_index.refresh".
+
+Only the outermost instrumented call is recorded, so a database function that calls
+another one (e.g. `geneset.add` calling `geneset_value.insert_geneset_values`) is
+counted once, under its own name.
+
+Disabling the instrumentation restores the original functions, so there is no
+overhead at all while it is disabled.
+
+Functions are replaced on their modules, so code that imported a function directly
+(e.g. `from geneweaver.db.gene import get`) before the instrumentation was enabled
+keeps calling the original function.
+
+Example:
+-------
+    from geneweaver.db.monitor import instrumentation
+
+    sink = instrumentation.enable()
+    ...
+    sink.snapshot()
+    # {'gene.get': {'count': 1520, 'errors': 0, 'rows': 3040, ...}, ...}
+    instrumentation.disable()
+
+"""
+
+# ruff: noqa: ANN002, ANN003, ANN101, ANN401
+import contextvars
+import functools
+import importlib
+import inspect
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from types import ModuleType
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import geneweaver.db
+import geneweaver.db.aio
+from geneweaver.db.geneset_value import GenesetValueColumns
+from geneweaver.db.utils import Page, RowsWithTotal
+
+# Upper bounds of the wall time histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Submodules in `geneweaver.db.__all__` that don't hold database functions.
+_NOT_INSTRUMENTED = ("aio", "exceptions")
+
+SYNC_MODULES = tuple(
+    name for name in geneweaver.db.__all__ if name not in _NOT_INSTRUMENTED
+)
+ASYNC_MODULES = tuple(f"aio.{name}" for name in geneweaver.db.aio.__all__)
+
+# The names of the first parameter of the functions that access the database.
+DATABASE_PARAMETERS = ("cursor", "conn", "connection")
+
+
+class Sink(ABC):
+    """Receives a record for every call of an instrumented function."""
+
+    @abstractmethod
+    def record(
+        self,
+        name: str,
+        duration: float,
+        rows: Optional[int],
+        error: Optional[BaseException],
+    ) -> None:
+        """Record a call of an instrumented function.
+
+        :param name: The name of the function, e.g. "gene.get".
+        :param duration: The wall time of the call, in seconds.
+        :param rows: The number of rows returned, or None if the call failed.
+        :param error: The error raised by the call, if any.
+        """
+
+
+class InMemorySink(Sink):
+    """Aggregate calls in memory, keyed by function name.
+
+    The number of rows returned by a call is the length of a list or tuple result
+    (or of the rows of a page or of a geneset's value columns), the number of items
+    yielded by a generator result, 0 for a None result and 1 for
+    any other result.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize an empty sink.
+
+        :param buckets: The upper bounds of the wall time histogram buckets, in
+        seconds. Calls slower than the last bound are counted in a final "inf"
+        bucket.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(
+        self,
+        name: str,
+        duration: float,
+        rows: Optional[int],
+        error: Optional[BaseException],
+    ) -> None:
+        """Add a call of an instrumented function to the aggregates.
+
+        :param name: The name of the function, e.g. "gene.get".
+        :param duration: The wall time of the call, in seconds.
+        :param rows: The number of rows returned, or None if the call failed.
+        :param error: The error raised by the call, if any.
+        """
+        bucket = bisect_left(self.buckets, duration)
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {
+                    "count": 0,
+                    "errors": 0,
+                    "rows": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                    "histogram": [0] * (len(self.buckets) + 1),
+                }
+            stats["count"] += 1
+            stats["total_time"] += duration
+            stats["max_time"] = max(stats["max_time"], duration)
+            stats["histogram"][bucket] += 1
+            if error is not None:
+                stats["errors"] += 1
+            if rows is not None:
+                stats["rows"] += rows
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get a copy of the aggregates for each function.
+
+        :return: A dict of function name to a dict with "count", "errors", "rows",
+        "total_time" and "max_time" keys, and a "histogram" dict of bucket upper
+        bound (in seconds) to the number of calls in that bucket.
+        """
+        bounds = self.buckets + (float("inf"),)
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "histogram": dict(zip(bounds, stats["histogram"])),
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        """Forget all recorded calls."""
+        with self._lock:
+            self._stats.clear()
+
+
+_lock = threading.Lock()
+_sink: Optional[Sink] = None
+# The original functions, for each (module or object, attribute name) that was
+# replaced.
+_originals: Dict[Tuple[Any, str], Callable] = {}
+# Set while an instrumented call runs, so that the calls it makes aren't recorded.
+_in_call: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "instrumentation_in_call", default=False
+)
+
+
+def enable(sink: Optional[Sink] = None) -> Sink:
+    """Instrument every public database function, replacing any previous sink.
+
+    :param sink: The sink to record calls to. A new `InMemorySink` by default.
+
+    :return: The sink that calls are recorded to.
+    """
+    global _sink
+    sink = sink if sink is not None else InMemorySink()
+    with _lock:
+        _restore()
+        for module_name in SYNC_MODULES + ASYNC_MODULES:
+            module = importlib.import_module(f"geneweaver.db.{module_name}")
+            for attr, func in public_functions(module):
+                _originals[(module, attr)] = func
+                setattr(module, attr, instrument(func, f"{module_name}.{attr}", sink))
+            for attr, obj in public_instances(module):
+                for method_name, method in public_methods(obj):
+                    _originals[(obj, method_name)] = method
+                    name = f"{module_name}.{attr}.{method_name}"
+                    setattr(obj, method_name, instrument(method, name, sink))
+        _sink = sink
+    return sink
+
+
+def disable() -> None:
+    """Restore the original database functions."""
+    global _sink
+    with _lock:
+        _restore()
+        _sink = None
+
+
+def is_enabled() -> bool:
+    """Check if the database functions are currently instrumented.
+
+    :return: True if the instrumentation is enabled.
+    """
+    return _sink is not None
+
+
+def get_sink() -> Optional[Sink]:
+    """Get the sink that calls are currently recorded to.
+
+    :return: The sink, or None if the instrumentation is disabled.
+    """
+    return _sink
+
+
+def _restore() -> None:
+    """Put the original functions back on their modules."""
+    while _originals:
+        (target, attr), func = _originals.popitem()
+        if isinstance(target, ModuleType):
+            setattr(target, attr, func)
+        else:
+            # The wrapper shadows the method of the object's class.
+            delattr(target, attr)
+
+
+def public_functions(module: ModuleType) -> List[Tuple[str, Callable]]:
+    """Get the public functions defined in a module.
+
+    :param module: The module to inspect.
+
+    :return: The attribute name and function of each public function.
+    """
+    return [
+        (attr, func)
+        for attr, func in vars(module).items()
+        if not attr.startswith("_")
+        and inspect.isfunction(func)
+        and func.__module__ == module.__name__
+        and takes_database(func)
+    ]
+
+
+def public_instances(module: ModuleType) -> List[Tuple[str, Any]]:
+    """Get the public objects that a module creates from its own classes.
+
+    :param module: The module to inspect.
+
+    :return: The attribute name and value of each object, e.g. the
+    `homology_index` of the `homology_index` module.
+    """
+    return [
+        (attr, obj)
+        for attr, obj in vars(module).items()
+        if not attr.startswith("_")
+        and not inspect.isclass(obj)
+        and type(obj).__module__ == module.__name__
+    ]
+
+
+def public_methods(obj: Any) -> List[Tuple[str, Callable]]:
+    """Get the public methods of an object, bound to the object.
+
+    :param obj: The object to inspect.
+
+    :return: The attribute name and bound method of each public method.
+    """
+    return [
+        (attr, getattr(obj, attr))
+        for attr, func in vars(type(obj)).items()
+        if not attr.startswith("_")
+        and inspect.isfunction(func)
+        and takes_database(getattr(obj, attr))
+    ]
+
+
+def takes_database(func: Callable) -> bool:
+    """Check if a function takes a cursor or connection as its first parameter.
+
+    :param func: The function (or bound method) to inspect.
+
+    :return: True if the first parameter is named as in `DATABASE_PARAMETERS`.
+    """
+    parameters = list(inspect.signature(func).parameters)
+    return bool(parameters) and parameters[0] in DATABASE_PARAMETERS
+
+
+def instrument(func: Callable, name: str, sink: Sink) -> Callable:
+    """Wrap a function so that each call is recorded to a sink.
+
+    Calls that return a generator (or async generator) are recorded once the
+    generator is exhausted or closed, with the number of items it yielded.
+
+    Calls made while another instrumented call runs aren't recorded.
+
+    :param func: The function to wrap.
+    :param name: The name to record calls under.
+    :param sink: The sink to record calls to.
+
+    :return: The wrapped function.
+    """
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs) -> Any:
+            if _in_call.get():
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            token = _in_call.set(True)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as error:
+                sink.record(name, time.perf_counter() - start, None, error)
+                raise
+            finally:
+                _in_call.reset(token)
+            sink.record(name, time.perf_counter() - start, count_rows(result), None)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        if _in_call.get():
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        token = _in_call.set(True)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            sink.record(name, time.perf_counter() - start, None, error)
+            raise
+        finally:
+            _in_call.reset(token)
+        if inspect.isgenerator(result):
+            return _instrument_generator(result, name, sink, start)
+        if inspect.isasyncgen(result):
+            return _instrument_async_generator(result, name, sink, start)
+        sink.record(name, time.perf_counter() - start, count_rows(result), None)
+        return result
+
+    return wrapper
+
+
+def count_rows(result: Any) -> int:
+    """Count the rows returned by a database function.
+
+    :param result: The result of the function.
+
+    :return: The number of rows.
+    """
+    if result is None:
+        return 0
+    if isinstance(result, (Page, RowsWithTotal)):
+        return len(result.rows)
+    if isinstance(result, GenesetValueColumns):
+        return len(result.ode_gene_id)
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1
+
+
+def _instrument_generator(
+    generator: Iterator, name: str, sink: Sink, start: float
+) -> Generator:
+    """Yield from a generator, then record the call once it is done."""
+    rows = 0
+    error = None
+    try:
+        while True:
+            token = _in_call.set(True)
+            try:
+                item = next(generator)
+            except StopIteration:
+                break
+            finally:
+                _in_call.reset(token)
+            rows += 1
+            yield item
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        generator.close()
+        sink.record(
+            name, time.perf_counter() - start, rows if error is None else None, error
+        )
+
+
+async def _instrument_async_generator(
+    generator: AsyncIterator, name: str, sink: Sink, start: float
+) -> AsyncGenerator:
+    """Yield from an async generator, then record the call once it is done."""
+    rows = 0
+    error = None
+    try:
+        while True:
+            token = _in_call.set(True)
+            try:
+                item = await generator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                _in_call.reset(token)
+            rows += 1
+            yield item
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        await generator.aclose()
+        sink.record(
+            name, time.perf_counter() - start, rows if error is None else None, error
+        )
@@ -2,6 +2,7 @@
 
 from typing import List, Optional
 
+from geneweaver.db.cache import ONTOLOGY_DB_INDEXES, ontology_db_rows, reference_table
 from geneweaver.db.query import ontology as ontology_query
 from psycopg import Cursor
 from psycopg.rows import Row
@@ -117,6 +118,21 @@ def get_ontology_dbs(
     :param offset: Offset the results.
     :return: list of results using `.fetchall()`
     """
+    table = reference_table(
+        cursor,
+        "ontologydb",
+        lambda: ontology_query.get_ontology_dbs()[0],
+        ONTOLOGY_DB_INDEXES,
+    )
+    if table is not None:
+        return ontology_db_rows(
+            table,
+            cursor.row_factory,
+            ontology_db_id=ontology_db_id,
+            limit=limit,
+            offset=offset,
+        )
+
     cursor.execute(
         *ontology_query.get_ontology_dbs(
             ontology_db_id=ontology_db_id,
@@ -0,0 +1,62 @@
+"""Materialized geneset permissions, cached per user.
+
+Checking `production.geneset_is_readable2` for every candidate row is slow on listings
+and searches, because Postgres can't use an index through the function, and runs it
+for every geneset it filters out. Instead, `readable_genesets` looks up the inputs of
+the check that belong to the user (whether they are a curator, and their groups, see
+`geneweaver.db.query.permissions.ReadableGenesets`) and keeps them in the in-process
+cache for `GWDB_READABLE_CACHE_TTL` seconds. Listings that are called with
+`use_readable_cache=True` compare them with the tier, owner and groups of each
+geneset.
+
+The tier, owner and groups of genesets are read from the geneset table by every
+query, so adding, curating, sharing or transferring genesets takes effect right
+away. When users join or leave groups, or their curator status changes, call
+`invalidate_readable_genesets` for the affected users (or for everyone).
+"""
+
+from typing import Iterable, Optional
+
+from geneweaver.db.cache import readable_genesets_cache
+from geneweaver.db.query import permissions as permissions_query
+from geneweaver.db.query.permissions import ReadableGenesets
+from psycopg import Cursor
+
+
+def readable_genesets(
+    cursor: Cursor, user_id: int, use_cache: bool = True
+) -> ReadableGenesets:
+    """Get the genesets a user can read.
+
+    :param cursor: The database cursor.
+    :param user_id: The user ID to get the readable genesets of.
+    :param use_cache: Serve the genesets from the in-process cache if they are
+    cached, and cache them if they aren't.
+
+    :return: The user's readable genesets.
+    """
+    cache = readable_genesets_cache()
+    if use_cache:
+        cached = cache.get(user_id)
+        if cached is not None:
+            return cached
+
+    cursor.execute(*permissions_query.readable_genesets(user_id))
+    readable = permissions_query.readable_genesets_from_row(user_id, cursor.fetchone())
+    if use_cache:
+        cache.set(user_id, readable)
+    return readable
+
+
+def invalidate_readable_genesets(user_ids: Optional[Iterable[int]] = None) -> None:
+    """Remove users' readable genesets from the cache.
+
+    :param user_ids: The users to remove, or None to remove every user, e.g. after
+    users join or leave a group, or their curator status changes.
+    """
+    cache = readable_genesets_cache()
+    if user_ids is None:
+        cache.clear()
+        return
+    for user_id in user_ids:
+        cache.invalidate(user_id)
@@ -0,0 +1,61 @@
+"""Run several queries in a single network round trip using pipeline mode.
+
+Every query builder in `geneweaver.db.query` returns a `(query, params)` tuple. This
+module takes a list of those tuples and sends them to the server together, instead of
+waiting for each result before sending the next query.
+
+For example, to load the data for a geneset page in one round trip:
+
+    from geneweaver.db.query import geneset as geneset_query
+    from geneweaver.db.query import ontology as ontology_query
+    from geneweaver.db.query import publication as publication_query
+
+    genesets, ontologies, publications = execute_batch(
+        cursor,
+        [
+            geneset_query.get(gs_id=gs_id),
+            ontology_query.by_geneset(geneset_id=gs_id),
+            publication_query.by_geneset_id(geneset_id=gs_id),
+        ],
+    )
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from psycopg import Cursor
+from psycopg.rows import Row
+from psycopg.sql import Composable
+
+BatchQuery = Tuple[Composable, dict]
+
+
+def execute_batch(
+    cursor: Cursor, queries: Sequence[BatchQuery]
+) -> List[Optional[List[Row]]]:
+    """Execute a batch of queries in pipeline mode.
+
+    Each query is run on its own cursor on the same connection as `cursor`, using the
+    same row factory, so that all results can be collected after a single sync with
+    the server. If any query fails, the error is raised once the batch completes.
+
+    :param cursor: The database cursor.
+    :param queries: A sequence of (query, params) tuples, as returned by builders in
+    `geneweaver.db.query`.
+
+    :return: A list with one entry per query, in order. Each entry is the result of
+    `.fetchall()`, or None if the query does not return rows.
+    """
+    connection = cursor.connection
+    batch_cursors = [connection.cursor(row_factory=cursor.row_factory) for _ in queries]
+    try:
+        with connection.pipeline():
+            for batch_cursor, (query, params) in zip(batch_cursors, queries):
+                batch_cursor.execute(query, params)
+
+        return [
+            batch_cursor.fetchall() if batch_cursor.description is not None else None
+            for batch_cursor in batch_cursors
+        ]
+    finally:
+        for batch_cursor in batch_cursors:
+            batch_cursor.close()
@@ -1,7 +1,11 @@
 """Consts for query module."""
 
-from geneweaver.db.utils import format_sql_fields
-from psycopg.sql import SQL, Identifier, Placeholder
+# ruff: noqa: ANN401
+import functools
+from typing import Any
+
+from geneweaver.db.utils import LazySQLFields
+from psycopg.sql import SQL, Composed, Identifier, Placeholder
 
 PUB_FIELD_MAP = {
     "pub_id": "id",
@@ -16,9 +20,14 @@ PUB_FIELD_MAP = {
     "pub_pubmed": "pubmed_id",
 }
 
-PUB_FIELDS = format_sql_fields(PUB_FIELD_MAP, query_table="publication")
+PUB_FIELDS = LazySQLFields(PUB_FIELD_MAP, query_table="publication")
+
+
+@functools.lru_cache(maxsize=None)
+def pub_query() -> Composed:
+    """Get the base query to select publications, building it on first use."""
+    return SQL("SELECT") + SQL(",").join(PUB_FIELDS) + SQL("FROM publication")
 
-PUB_QUERY = SQL("SELECT") + SQL(",").join(PUB_FIELDS) + SQL("FROM publication")
 
 PUB_INSERT_COLS = SQL(",").join(
     [Identifier(k) for k in PUB_FIELD_MAP.keys() if k != "pub_id"]
@@ -27,3 +36,10 @@ PUB_INSERT_VALS = SQL(",").join(
     [Placeholder(k) for k in PUB_FIELD_MAP.keys() if k != "pub_id"]
 )
 PUB_TSVECTOR = (Identifier("publication") + Identifier("pub_tsvector")).join(".")
+
+
+def __getattr__(name: str) -> Any:
+    """Build `PUB_QUERY` lazily, the first time it is accessed."""
+    if name == "PUB_QUERY":
+        return pub_query()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
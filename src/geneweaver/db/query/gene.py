@@ -4,8 +4,15 @@ from typing import List, Optional, Tuple
 
 from geneweaver.core.enum import GeneIdentifier, Species
 from geneweaver.core.mapping import AON_ID_TYPE_FOR_SPECIES
-from geneweaver.db.utils import format_sql_fields, limit_and_offset
-from psycopg.sql import SQL, Composed
+from geneweaver.db.query.utils import (
+    Keyset,
+    add_keyset_filter,
+    check_keyset_offset,
+    order_by_keyset,
+    query_builder,
+)
+from geneweaver.db.utils import LazySQLFields, ids_filter, limit_and_offset
+from psycopg.sql import SQL, Composed, Identifier
 
 GENE_FIELDS_MAP = {
     "ode_gene_id": "id",
@@ -30,10 +37,23 @@ GENE_INFO_FIELDS_MAP = {
     "gene_rank": "rank",
 }
 
-GENE_FIELDS = format_sql_fields(GENE_FIELDS_MAP, query_table="gene")
-GENE_INFO_FIELDS = format_sql_fields(GENE_INFO_FIELDS_MAP, query_table="gene_info")
+GENE_FIELDS = LazySQLFields(GENE_FIELDS_MAP, query_table="gene")
+GENE_INFO_FIELDS = LazySQLFields(GENE_INFO_FIELDS_MAP, query_table="gene_info")
 
+# A gene ID has a row per reference ID (in each gene database), so genes are paged
+# by all three. They are the first of the `GENE_FIELDS`.
+GENE_KEYSET = Keyset(
+    columns=(
+        Identifier("gene", "ode_gene_id"),
+        Identifier("gene", "gdb_id"),
+        Identifier("gene", "ode_ref_id"),
+    ),
+    fields=("id", "gene_database", "reference_id"),
+    indexes=(0, 2, 1),
+)
 
+
+@query_builder
 def get(
     gene_id: Optional[int] = None,
     reference_id: Optional[str] = None,
@@ -42,6 +62,8 @@ def get(
     preferred: Optional[bool] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    keyset: bool = False,
+    page_token: Optional[str] = None,
 ) -> Tuple[Composed, dict]:
     """Create a psycopg query to Get genes from the database.
 
@@ -52,9 +74,15 @@ def get(
     :param preferred: Whether to search for preferred genes.
     :param limit: The limit of results to return.
     :param offset: The offset of results to return.
+    :param keyset: Sort the results by `GENE_KEYSET`, to be paged with page tokens
+    instead of an offset.
+    :param page_token: Return only results after the row of this page token (implies
+    `keyset`).
 
     :return:  A query (and params) that can be executed on a cursor.
     """
+    keyset = keyset or page_token is not None
+    offset = check_keyset_offset(keyset, offset)
     params = {}
     query = (
         SQL("SELECT")
@@ -85,75 +113,90 @@ def get(
         filtering.append(SQL("ode_pref = %(preferred)s"))
         params["preferred"] = preferred
 
+    if keyset:
+        filtering, params = add_keyset_filter(
+            filtering, params, GENE_KEYSET, page_token
+        )
+
     if len(filtering) > 0:
         query += SQL("WHERE") + SQL(" AND ").join(filtering)
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    if keyset:
+        query = order_by_keyset(query, GENE_KEYSET)
+
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
 
 
+@query_builder
 def mapping(
     source_ids: List[str],
     species: Species,
     target_gene_id_type: GeneIdentifier,
+    source_table: Optional[Identifier] = None,
 ) -> Tuple[Composed, dict]:
     """Create a query to get a list of gene IDs in an alternate identifier type.
 
+    Each source gene ID maps to exactly one ID of the target type: a preferred one
+    if it has any, and the lowest one (by reference ID) among ties. This is decided
+    per source ID with `DISTINCT ON`, in a single pass over the joined genes.
+
     :param source_ids: The list of gene IDs to map.
     :param target_gene_id_type: The gene identifier type to map to.
     :param species: The species of the identifiers.
+    :param source_table: A temp table (from `geneweaver.db.utils.temp_id_table`)
+    that holds the gene IDs, to filter on instead of the `source_ids` array.
     :return: A query (and params) that can be executed on a cursor.
     """
-    query = (
-        SQL(
-            """
-    WITH PrefTrueCheck AS
-        (SELECT CASE
-                WHEN EXISTS(SELECT 1
-                            FROM extsrc.gene AS g1
-                                   JOIN extsrc.gene AS g2
-                                        ON g1.ode_gene_id = g2.ode_gene_id
-                                        AND g1.ode_ref_id != g2.ode_ref_id
-                                        AND g1.sp_id = g2.sp_id
-                             WHERE g1.ode_ref_id = ANY(%(source_ids)s)
-                               AND g2.gdb_id = %(target_gene_id_type)s
-                               AND g2.sp_id = %(species_id)s
-                               AND g2.ode_pref = True)
-                  THEN True ELSE False
-                  END AS PrefExists)
-    """
-        )
-        + SQL(
-            """
-    SELECT g1.ode_ref_id AS original_ref_id,
+    query = SQL(
+        """
+    SELECT DISTINCT ON (g1.ode_ref_id)
+           g1.ode_ref_id AS original_ref_id,
            g2.ode_ref_id AS mapped_ref_id
     FROM extsrc.gene AS g1
              JOIN extsrc.gene AS g2
                   ON g1.ode_gene_id = g2.ode_gene_id
                   AND g1.ode_ref_id != g2.ode_ref_id
-                  AND g1.sp_id = g2.sp_id,
-         PrefTrueCheck
-    WHERE g1.ode_ref_id = ANY (%(source_ids)s)
+                  AND g1.sp_id = g2.sp_id
+    WHERE g1.ode_ref_id {source_filter}
       AND g2.gdb_id = %(target_gene_id_type)s
       AND g2.sp_id = %(species_id)s
-      AND (
-        (PrefTrueCheck.PrefExists AND g2.ode_pref = True)
-            OR
-        (NOT PrefTrueCheck.PrefExists)
-        );
+    ORDER BY g1.ode_ref_id, g2.ode_pref IS TRUE DESC, g2.ode_ref_id
     """
-        )
-    ).join(" ")
+    ).format(source_filter=ids_filter("source_ids", source_table))
 
     params = {
-        "source_ids": source_ids,
         "target_gene_id_type": int(target_gene_id_type),
         "species_id": int(species),
     }
+    if source_table is None:
+        params["source_ids"] = source_ids
     return query, params
 
 
+@query_builder
+def symbols_by_project_id(project_id: int) -> Tuple[SQL, dict]:
+    """Create a query to get the preferred gene symbols of a project's genesets.
+
+    :param project_id: The project id to search for.
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = SQL(
+        """
+        SELECT g.ode_ref_id
+        FROM extsrc.gene g, extsrc.geneset_value gv
+        WHERE (gv.gs_id IN
+                (SELECT gs_id AS geneSetId
+                FROM production.project2geneset
+                WHERE pj_id = %(project_id)s))
+        AND gv.ode_gene_id=g.ode_gene_id AND g.gdb_id=7 AND ode_pref='t'
+        """
+    )
+    return query, {"project_id": project_id}
+
+
+@query_builder
 def aon_mapping(
     source_ids: List[str],
     species: Species,
@@ -12,6 +12,10 @@ from geneweaver.db.query.geneset.write import (
     add,
     add_geneset_file,
     add_geneset_file_raw,
+    add_with_values,
+    gene_ids_for_upload_keys,
     process_thresholds,
+    process_thresholds_last_added,
+    process_thresholds_many,
     reparse_geneset_file,
 )
@@ -1,7 +1,8 @@
 """Constants for use in geneset queries."""
 
 from geneweaver.db.query.const import PUB_FIELD_MAP
-from geneweaver.db.utils import format_sql_fields
+from geneweaver.db.query.utils import Keyset
+from geneweaver.db.utils import LazySQLFields
 from psycopg.sql import SQL, Identifier
 
 GENESET_FIELDS_MAP = {
@@ -24,12 +25,17 @@ GENESET_FIELDS_MAP = {
     "gs_updated": "updated",
 }
 
-GENESET_FIELDS = format_sql_fields(GENESET_FIELDS_MAP, query_table="geneset")
-PUB_FIELDS = format_sql_fields(
+GENESET_FIELDS = LazySQLFields(GENESET_FIELDS_MAP, query_table="geneset")
+PUB_FIELDS = LazySQLFields(
     PUB_FIELD_MAP, query_table="publication", resp_prefix="publication"
 )
 GENESET_TSVECTOR = (Identifier("geneset") + Identifier("gs_tsvector")).join(".")
 
+# Genesets are paged by ID, which is the first of the `GENESET_FIELDS`.
+GENESET_KEYSET = Keyset(
+    columns=(Identifier("geneset", "gs_id"),), fields=("id",), indexes=(0,)
+)
+
 COPY_GENESET_VALUES = SQL(
     """
                 COPY geneset_value
@@ -44,3 +50,34 @@ COPY_GENESET_VALUES = SQL(
                 FROM STDIN
                 """
 )
+
+# The types to dump the `COPY_GENESET_VALUES` columns as, so that the copy doesn't
+# have to work out how to dump every value of every row. The source and value lists
+# are written as `array_literal`s, which the server parses into the column types.
+COPY_GENESET_VALUES_TYPES = (
+    "int8",
+    "int8",
+    "float8",
+    "text",
+    "text",
+    "bool",
+    "int8",
+    "date",
+)
+
+# The types to dump the `COPY_GENESET_VALUES` columns as when the values are given as
+# text, which the server parses into the numeric columns without a float round trip.
+COPY_GENESET_VALUES_TEXT_TYPES = (
+    "int8",
+    "int8",
+    "text",
+    "text",
+    "text",
+    "bool",
+    "int8",
+    "text",
+)
+
+# The "now" special input of the date type, for a `gsv_date` set by the server, in
+# the same way as `NOW()` would set it.
+SERVER_DATE = "now"
@@ -4,7 +4,7 @@ from datetime import date
 from typing import Optional, Tuple
 
 from geneweaver.core.enum import GeneIdentifier, Species
-from geneweaver.db.query.geneset.const import GENESET_TSVECTOR
+from geneweaver.db.query.geneset.const import GENESET_KEYSET, GENESET_TSVECTOR
 from geneweaver.db.query.geneset.utils import (
     add_ontology_parameter,
     add_ontology_query,
@@ -13,19 +13,29 @@ from geneweaver.db.query.geneset.utils import (
     restrict_score_type,
     restrict_tier,
 )
+from geneweaver.db.query.permissions import ReadableGenesets
 from geneweaver.db.query.search.utils import search
 from geneweaver.db.query.utils import (
+    add_keyset_filter,
     add_op_filters,
+    check_keyset_offset,
+    check_total_keyset,
+    compiled_queries,
     construct_filters,
+    order_by_keyset,
+    query_builder,
+    total_count_field,
 )
 from geneweaver.db.utils import (
     GenesetScoreTypeOrScoreTypes,
     GenesetTierOrTiers,
+    bind_limit_and_offset,
     limit_and_offset,
 )
 from psycopg.sql import SQL, Composed
 
 
+@query_builder
 def get(
     gs_id: Optional[int] = None,
     owner_id: Optional[int] = None,
@@ -50,6 +60,10 @@ def get(
     created_before: Optional[date] = None,
     updated_after: Optional[date] = None,
     updated_before: Optional[date] = None,
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
+    readable_genesets: Optional[ReadableGenesets] = None,
 ) -> Tuple[Composed, dict]:
     """Get genesets.
 
@@ -77,24 +91,32 @@ def get(
     :param updated_after: Show only results updated after this date.
     :param created_before: Show only results created before this date.
     :param created_after: Show only results updated before this date.
+    :param keyset: Sort the results by geneset ID, to be paged with page tokens
+    instead of an offset.
+    :param page_token: Show only results after the row of this page token (implies
+    `keyset`).
+    :param with_total: Return the number of matching genesets, ignoring the limit
+    and offset, as a last `total_count` field.
+    :param readable_genesets: The materialized readable genesets of the
+    `is_readable_by` user (see `geneweaver.db.permissions`), to filter by instead of
+    checking each geneset with `geneset_is_readable2`.
     """
+    keyset = keyset or page_token is not None
+    offset = check_keyset_offset(keyset, offset)
+    check_total_keyset(with_total, keyset)
     params = {}
     filtering = []
-    query = format_select_query(
-        with_publication_info=with_publication_info,
-        with_publication_join=pubmed_id is not None,
-    )
 
-    # expand query to include ontology term if needed
     if ontology_term:
-        query = add_ontology_query(query=query)
         filtering, params = add_ontology_parameter(
             existing_filters=filtering,
             existing_params=params,
             ontology_term=ontology_term,
         )
 
-    filtering, params = is_readable(filtering, params, is_readable_by)
+    filtering, params = is_readable(
+        filtering, params, is_readable_by, readable_genesets=readable_genesets
+    )
     filtering, params = search(filtering, params, GENESET_TSVECTOR, search_text)
     filtering, params = restrict_tier(filtering, params, curation_tier)
     filtering, params = restrict_score_type(filtering, params, score_type)
@@ -124,15 +146,40 @@ def get(
         updated_before=updated_before,
         updated_after=updated_after,
     )
+    if keyset:
+        filtering, params = add_keyset_filter(
+            filtering, params, GENESET_KEYSET, page_token
+        )
+    params = bind_limit_and_offset(params, limit, offset)
 
-    if len(filtering) > 0:
-        query += SQL("WHERE") + SQL("AND").join(filtering)
+    def build() -> Composed:
+        query = format_select_query(
+            with_publication_info=with_publication_info,
+            with_publication_join=pubmed_id is not None,
+            extra_fields=[total_count_field()] if with_total else None,
+        )
+
+        # expand query to include ontology term if needed
+        if ontology_term:
+            query = add_ontology_query(query=query)
+
+        if len(filtering) > 0:
+            query += SQL("WHERE") + SQL("AND").join(filtering)
+
+        if keyset:
+            query = order_by_keyset(query, GENESET_KEYSET)
+
+        return limit_and_offset(query, limit, offset, params).join(" ")
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    # Every part of the query that varies is reflected in the parameter names, and
+    # in the keyset and total flags, which add no parameters.
+    shape = ("geneset.read.get", with_publication_info, keyset, with_total, *params)
+    query = compiled_queries.get_or_build(shape, build)
 
     return query, params
 
 
+@query_builder
 def shared_with_user(
     user_id: int,
     limit: Optional[int] = None,
@@ -146,6 +193,7 @@ def shared_with_user(
     raise NotImplementedError()
 
 
+@query_builder
 def by_project_id(
     project_id: int,
     limit: Optional[int] = None,
@@ -175,6 +223,6 @@ def by_project_id(
 
     if len(filtering) > 0:
         query += SQL("WHERE") + SQL("AND").join(filtering)
-    query = limit_and_offset(query, limit, offset).join(" ")
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
@@ -1,28 +1,49 @@
 """Utility functions for the geneset query."""
 
-from typing import Optional, Tuple
+import functools
+from datetime import date
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-from geneweaver.core.enum import GenesetTier, ScoreType, Species
+from geneweaver.core.enum import GenesetTier, Microarray, ScoreType, Species
 from geneweaver.core.schema.geneset import GenesetUpload
+from geneweaver.db.exceptions import GeneweaverValueError
 from geneweaver.db.query.geneset.const import (
     GENESET_FIELDS,
     PUB_FIELDS,
 )
+from geneweaver.db.query.permissions import ReadableGenesets, readable_filter
+from geneweaver.db.query.threshold import value_in_threshold
 from geneweaver.db.query.utils import (
     ParamDict,
     SQLList,
+    array_literal,
 )
 from geneweaver.db.utils import (
     GenesetScoreTypeOrScoreTypes,
     GenesetTierOrTiers,
     SpeciesOrSpeciesSet,
+    row_value,
 )
+from psycopg.rows import Row
 from psycopg.sql import SQL, Composed, Identifier
 
+# A gene symbol, with the gene ID type and species it is resolved in.
+UploadGeneKey = Tuple[str, int, int]
+
 
 def format_select_query(
     with_publication_info: bool = False,
     with_publication_join: bool = False,
+    extra_fields: Optional[SQLList] = None,
 ) -> Composed:
     """Format the geneset query.
 
@@ -38,26 +59,31 @@ def format_select_query(
 
     :param with_publication_info: Whether to include publication info in return.
     :param with_publication_join: Whether to include publication for querying.
+    :param extra_fields: More fields to return, after the geneset (and publication)
+    fields.
 
     :return: The formatted query.
     """
+    extra_fields = extra_fields or []
     query = SQL("SELECT")
     if with_publication_info:
         query = (
             query
-            + SQL(",").join(GENESET_FIELDS + PUB_FIELDS)
+            + SQL(",").join(GENESET_FIELDS + PUB_FIELDS + extra_fields)
             + SQL("FROM geneset LEFT OUTER JOIN publication")
             + SQL("ON geneset.pub_id = publication.pub_id")
         )
     elif with_publication_join:
         query = (
             query
-            + SQL(",").join(GENESET_FIELDS)
+            + SQL(",").join(GENESET_FIELDS + extra_fields)
             + SQL("FROM geneset LEFT OUTER JOIN publication")
             + SQL("ON geneset.pub_id = publication.pub_id")
         )
     else:
-        query = query + SQL(",").join(GENESET_FIELDS) + SQL("FROM geneset")
+        query = (
+            query + SQL(",").join(GENESET_FIELDS + extra_fields) + SQL("FROM geneset")
+        )
     return query
 
 
@@ -94,6 +120,7 @@ def is_readable(
     existing_params: ParamDict,
     is_readable_by: Optional[int] = None,
     gs_id_table: str = "geneset",
+    readable_genesets: Optional[ReadableGenesets] = None,
 ) -> Tuple[SQLList, ParamDict]:
     """Add the is_readable filter to the query.
 
@@ -101,17 +128,28 @@ def is_readable(
     :param existing_params: The existing parameters.
     :param is_readable_by: The user ID to filter by.
     :param gs_id_table: The table to filter by.
+    :param readable_genesets: The materialized readable genesets of the user, to
+    filter by instead of calling `geneset_is_readable2` for every row.
     """
-    if is_readable_by is not None:
-        existing_filters.append(
-            SQL(
-                "production.geneset_is_readable2(%(is_readable_by)s, {table}.gs_id)"
-            ).format(table=Identifier(gs_id_table))
-        )
+    if readable_genesets is not None:
+        readable_sql, readable_params = readable_filter(readable_genesets, gs_id_table)
+        if readable_sql is not None:
+            existing_filters.append(readable_sql)
+            existing_params.update(readable_params)
+    elif is_readable_by is not None:
+        existing_filters.append(_is_readable_sql(gs_id_table))
         existing_params["is_readable_by"] = is_readable_by
     return existing_filters, existing_params
 
 
+@functools.lru_cache(maxsize=None)
+def _is_readable_sql(gs_id_table: str) -> Composed:
+    """Format the is_readable filter for a table."""
+    return SQL(
+        "production.geneset_is_readable2(%(is_readable_by)s, {table}.gs_id)"
+    ).format(table=Identifier(gs_id_table))
+
+
 def restrict_tier(
     existing_filters: SQLList,
     existing_params: ParamDict,
@@ -186,3 +224,88 @@ def geneset_upload_to_kwargs(geneset: GenesetUpload) -> dict:
         "gene_id_type": geneset.gene_id_type,
         "description": geneset.description,
     }
+
+
+def _upload_gene_id_type_and_species(geneset: GenesetUpload) -> Tuple[int, int]:
+    """Get the gene ID type and species that the symbols of an upload resolve in."""
+    return int(geneset.gene_id_type), int(geneset.species)
+
+
+def upload_gene_keys(genesets: Sequence[GenesetUpload]) -> List[UploadGeneKey]:
+    """Get the distinct gene keys of many geneset uploads, to resolve in one batch.
+
+    :param genesets: The geneset uploads.
+
+    :raises GeneweaverValueError: If an upload uses microarray probe IDs, which aren't
+    resolved through the gene table.
+
+    :return: The distinct keys, in the order they were first seen.
+    """
+    keys: Dict[UploadGeneKey, None] = {}
+    for geneset in genesets:
+        if isinstance(geneset.gene_id_type, Microarray):
+            raise GeneweaverValueError(
+                "Genesets of microarray probe IDs can't be added in bulk."
+            )
+        gene_id_type, species = _upload_gene_id_type_and_species(geneset)
+        for value in geneset.values:  # noqa: PD011
+            keys[(value.symbol, gene_id_type, species)] = None
+    return list(keys)
+
+
+def upload_gene_ids(rows: Iterable[Row]) -> Dict[UploadGeneKey, List[int]]:
+    """Group the rows of `gene_ids_for_upload_keys` by their gene key.
+
+    :param rows: The rows, from a cursor with any row factory.
+    :return: The gene IDs that each gene key resolved to.
+    """
+    gene_ids: Dict[UploadGeneKey, List[int]] = {}
+    for row in rows:
+        key = (
+            row_value(row, "ode_ref_id", 0),
+            row_value(row, "gdb_id", 1),
+            row_value(row, "sp_id", 2),
+        )
+        gene_ids.setdefault(key, []).append(row_value(row, "ode_gene_id", 3))
+    return gene_ids
+
+
+def geneset_value_rows(
+    geneset_id: int,
+    geneset: GenesetUpload,
+    gene_ids: Mapping[UploadGeneKey, List[int]],
+    value_date: date,
+) -> Iterator[tuple]:
+    """Build the `geneset_value` rows of a geneset upload, for `COPY_GENESET_VALUES`.
+
+    Symbols that don't resolve to a gene are left out. When several symbols resolve
+    to the same gene, they share one row, which lists all of their symbols and
+    values, and takes its value from the first of them. The `gsv_in_threshold` of
+    each row is only an estimate until `process_thresholds_many` runs on the geneset.
+
+    :param geneset_id: The ID of the inserted geneset.
+    :param geneset: The geneset upload.
+    :param gene_ids: The gene IDs of each gene key.
+    :param value_date: The date to record the values under.
+    :return: The rows, in the column order (and `COPY_GENESET_VALUES_TYPES`) of
+    `COPY_GENESET_VALUES`.
+    """
+    gene_id_type, species = _upload_gene_id_type_and_species(geneset)
+    values_by_gene: Dict[int, Tuple[List[str], List[float]]] = {}
+    for value in geneset.values:  # noqa: PD011
+        for gene_id in gene_ids.get((value.symbol, gene_id_type, species), ()):
+            symbols, values = values_by_gene.setdefault(gene_id, ([], []))
+            symbols.append(value.symbol)
+            values.append(value.value)
+
+    for gene_id, (symbols, values) in values_by_gene.items():
+        yield (
+            geneset_id,
+            gene_id,
+            values[0],
+            array_literal(symbols),
+            array_literal(values),
+            value_in_threshold(geneset.score, values[0]),
+            0,
+            value_date,
+        )
@@ -1,13 +1,42 @@
 """SQL query generation code for writing genesets."""
 
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-from geneweaver.core.enum import GeneIdentifier, GenesetTier, Species
+from geneweaver.core.enum import GeneIdentifier, GenesetTier, Microarray, Species
 from geneweaver.core.schema.gene import GeneValue
 from geneweaver.core.schema.score import GenesetScoreType
-from psycopg.sql import SQL, Composed
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.query.threshold import value_in_threshold
+from geneweaver.db.query.utils import array_literal, query_builder
+from psycopg.sql import SQL, Composable, Composed
 
 
+def _add_geneset_sql(file_id: Composable) -> Composed:
+    """Get the geneset insert of `add`, taking its file ID from `file_id`."""
+    query_cols = SQL(
+        """
+        (usr_id, file_id, gs_name, gs_abbreviation, pub_id, cur_id,
+        gs_description, sp_id, gs_count, gs_threshold_type,
+        gs_threshold, gs_groups, gs_gene_id_type, gs_created,
+        gs_attribution)
+    """
+    )
+    query_vals = SQL(
+        """
+        VALUES
+        (%(usr_id)s, {file_id}, %(gs_name)s, %(gs_abbreviation)s,
+        %(pub_id)s, %(cur_id)s, %(gs_description)s, %(sp_id)s,
+        %(gs_count)s, %(gs_threshold_type)s, %(gs_threshold)s,
+        %(gs_groups)s, %(gs_gene_id_type)s, %(gs_created)s,
+        %(gs_attribution)s)
+    """
+    ).format(file_id=file_id)
+    return (
+        SQL("INSERT INTO geneset") + query_cols + query_vals + SQL("RETURNING gs_id")
+    ).join(" ")
+
+
+@query_builder
 def add(
     user_id: int,
     file_id: int,
@@ -39,28 +68,7 @@ def add(
 
     :return: A query (and params) that can be executed on a cursor.
     """
-    query_cols = SQL(
-        """
-        (usr_id, file_id, gs_name, gs_abbreviation, pub_id, cur_id,
-        gs_description, sp_id, gs_count, gs_threshold_type,
-        gs_threshold, gs_groups, gs_gene_id_type, gs_created,
-        gs_attribution)
-    """
-    )
-    query_vals = SQL(
-        """
-        VALUES
-        (%(usr_id)s, %(file_id)s, %(gs_name)s, %(gs_abbreviation)s,
-        %(pub_id)s, %(cur_id)s, %(gs_description)s, %(sp_id)s,
-        %(gs_count)s, %(gs_threshold_type)s, %(gs_threshold)s,
-        %(gs_groups)s, %(gs_gene_id_type)s, %(gs_created)s,
-        %(gs_attribution)s
-    """
-    )
-
-    query = (
-        SQL("INSERT INTO geneset") + query_cols + query_vals + SQL("RETURNING gs_id")
-    ).join(" ")
+    query = _add_geneset_sql(SQL("%(file_id)s"))
 
     params = {
         "usr_id": user_id,
@@ -83,6 +91,7 @@ def add(
     return query, params
 
 
+@query_builder
 def add_geneset_file(
     values: List[GeneValue],
     comments: str = "",
@@ -101,6 +110,7 @@ def add_geneset_file(
     return add_geneset_file_raw(size, contents, comments)
 
 
+@query_builder
 def add_geneset_file_raw(
     size: int,
     contents: str,
@@ -123,6 +133,7 @@ def add_geneset_file_raw(
     return query, params
 
 
+@query_builder
 def reparse_geneset_file(geneset_id: int) -> Tuple[Composed, dict]:
     """Call the `reparse_geneset_file` function in the database.
 
@@ -137,6 +148,7 @@ def reparse_geneset_file(geneset_id: int) -> Tuple[Composed, dict]:
     return query, params
 
 
+@query_builder
 def process_thresholds(geneset_id: int) -> Tuple[Composed, dict]:
     """Call the `process_thresholds` function in the database.
 
@@ -149,3 +161,179 @@ def process_thresholds(geneset_id: int) -> Tuple[Composed, dict]:
     ).join(" ")
     params = {"process_thresholds__geneset_id": geneset_id}
     return query, params
+
+
+@query_builder
+def process_thresholds_many(geneset_ids: Iterable[int]) -> Tuple[SQL, dict]:
+    """Call the `process_thresholds` function in the database for many genesets.
+
+    :param geneset_ids: The IDs of the genesets to process.
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = SQL(
+        """
+        SELECT production.process_thresholds(gs_id)
+        FROM unnest(%(geneset_ids)s::bigint[]) AS gs_id
+        """
+    )
+    return query, {"geneset_ids": list(geneset_ids)}
+
+
+@query_builder
+def process_thresholds_last_added() -> Tuple[SQL, dict]:
+    """Call the `process_thresholds` function on the last geneset added by the session.
+
+    The geneset ID is read from the current value of the `gs_id` sequence, so the
+    call can be sent before the result of the insert is read, e.g. in a pipeline.
+
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = SQL(
+        """
+        SELECT production.process_thresholds(
+            currval(pg_get_serial_sequence('geneset', 'gs_id'))
+        )
+        """
+    )
+    return query, {}
+
+
+@query_builder
+def gene_ids_for_upload_keys(keys: Sequence[Tuple[str, int, int]]) -> Tuple[SQL, dict]:
+    """Resolve the gene symbols of many geneset uploads to gene IDs in one query.
+
+    The (symbol, gene ID type, species) keys are matched against the `ode_ref_id`,
+    `gdb_id` and `sp_id` of the gene table. A key can match several genes, or none.
+
+    :param keys: The keys of the gene symbols to resolve.
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = SQL(
+        """
+        SELECT DISTINCT upload.ode_ref_id, upload.gdb_id, upload.sp_id,
+                        gene.ode_gene_id
+        FROM unnest(%(symbols)s::text[], %(gene_id_types)s::int[],
+                    %(species)s::int[]) AS upload (ode_ref_id, gdb_id, sp_id)
+        JOIN gene ON gene.ode_ref_id = upload.ode_ref_id
+                 AND gene.gdb_id = upload.gdb_id
+                 AND gene.sp_id = upload.sp_id
+        """
+    )
+    params = {
+        "symbols": array_literal(key[0] for key in keys),
+        "gene_id_types": array_literal(key[1] for key in keys),
+        "species": array_literal(key[2] for key in keys),
+    }
+    return query, params
+
+
+@query_builder
+def add_with_values(
+    user_id: int,
+    name: str,
+    abbreviation: str,
+    tier: GenesetTier,
+    species: Species,
+    count: int,
+    score: GenesetScoreType,
+    gene_id_type: GeneIdentifier,
+    values: List[GeneValue],
+    description: str = "",
+    publication_id: Optional[int] = None,
+    attribution: Optional[str] = None,
+) -> Tuple[Composed, dict]:
+    """Add a geneset, its file and its values to the database in one statement.
+
+    The file and geneset inserts of `add_geneset_file` and `add` are chained in a
+    data-modifying CTE, which goes on to resolve the gene symbols of the values to
+    gene IDs and insert the `geneset_value` rows, like `add_many` does. Symbols that
+    don't resolve to a gene are left out, and symbols that resolve to the same gene
+    share one row. Their `gsv_in_threshold` is only an estimate until
+    `process_thresholds_last_added` runs after the statement.
+
+    :param user_id: The user ID of the geneset owner.
+    :param name: The name of the geneset.
+    :param abbreviation: The abbreviation of the geneset.
+    :param tier: The curation tier of the geneset.
+    :param species: The species of the geneset.
+    :param count: The count of the geneset.
+    :param score: The threshold type and amount of the geneset.
+    :param gene_id_type: The gene ID type of the geneset.
+    :param values: The gene values of the geneset.
+    :param description: The description of the geneset.
+    :param publication_id: The publication ID of the geneset.
+    :param attribution: The attribution of the geneset.
+
+    :raises GeneweaverValueError: If the gene ID type is a microarray, since probe IDs
+    aren't resolved through the gene table.
+
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    if isinstance(gene_id_type, Microarray):
+        raise GeneweaverValueError(
+            "Genesets of microarray probe IDs can't be added in one statement."
+        )
+
+    file_query, file_params = add_geneset_file(values)
+    _, geneset_params = add(
+        user_id=user_id,
+        file_id=0,
+        name=name,
+        abbreviation=abbreviation,
+        tier=tier,
+        species=species,
+        count=count,
+        score=score,
+        gene_id_type=gene_id_type,
+        description=description,
+        publication_id=publication_id,
+        attribution=attribution,
+    )
+    del geneset_params["file_id"]
+
+    query = SQL(
+        """
+        WITH new_file AS ({file_insert}),
+        new_geneset AS ({geneset_insert}),
+        upload AS (
+            SELECT upload.symbol, upload.value, upload.in_threshold, upload.ord,
+                   gene.ode_gene_id
+            FROM unnest(%(symbols)s::text[], %(values)s::numeric[],
+                        %(in_threshold)s::bool[])
+                 WITH ORDINALITY AS upload (symbol, value, in_threshold, ord)
+            JOIN LATERAL (
+                SELECT DISTINCT ode_gene_id FROM gene
+                WHERE gene.ode_ref_id = upload.symbol
+                  AND gene.gdb_id = %(gs_gene_id_type)s
+                  AND gene.sp_id = %(sp_id)s
+            ) AS gene ON true
+        ),
+        new_values AS (
+            INSERT INTO geneset_value
+            (gs_id, ode_gene_id, gsv_value, gsv_source_list, gsv_value_list,
+             gsv_in_threshold, gsv_hits, gsv_date)
+            SELECT new_geneset.gs_id, upload.ode_gene_id,
+                   (array_agg(upload.value ORDER BY upload.ord))[1],
+                   array_agg(upload.symbol ORDER BY upload.ord),
+                   array_agg(upload.value ORDER BY upload.ord),
+                   (array_agg(upload.in_threshold ORDER BY upload.ord))[1],
+                   0, CURRENT_DATE
+            FROM new_geneset CROSS JOIN upload
+            GROUP BY new_geneset.gs_id, upload.ode_gene_id
+        )
+        SELECT gs_id FROM new_geneset
+        """
+    ).format(
+        file_insert=file_query,
+        geneset_insert=_add_geneset_sql(SQL("(SELECT file_id FROM new_file)")),
+    )
+    params = {
+        **file_params,
+        **geneset_params,
+        "symbols": array_literal(value.symbol for value in values),
+        "values": array_literal(value.value for value in values),
+        "in_threshold": array_literal(
+            value_in_threshold(score, value.value) for value in values
+        ),
+    }
+    return query, params
@@ -0,0 +1,174 @@
+"""Generate SQL queries to get geneset value information."""
+
+from typing import Optional, Tuple
+
+from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.query.utils import query_builder
+from psycopg.sql import SQL, Composable
+
+# The ASCII unit separator, which gene reference ids never contain.
+REF_ID_SEPARATOR = "\x1f"
+
+
+@query_builder
+def by_geneset_id_as_uploaded(
+    geneset_id: int, gsv_in_threshold: Optional[bool] = False
+) -> Tuple[Composable, dict]:
+    """Create a query to get the geneset values of a geneset, as they were uploaded.
+
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = SQL(
+        """
+        SELECT DISTINCT ON (gv.ode_gene_id) gv.*, g.ode_ref_id
+        FROM        extsrc.geneset_value gv
+        INNER JOIN  extsrc.gene g
+        USING       (ode_gene_id)
+        WHERE  gs_id = %(geneset_id)s
+        """
+    )
+    params = {"geneset_id": geneset_id}
+
+    if gsv_in_threshold:
+        query += SQL("AND gv.gsv_in_threshold = %(gsv_in_threshold)s")
+        params["gsv_in_threshold"] = gsv_in_threshold
+
+    return query, params
+
+
+@query_builder
+def by_geneset_id_and_identifier(
+    geneset_id: int,
+    identifier: GeneIdentifier,
+    gsv_in_threshold: Optional[bool] = False,
+) -> Tuple[Composable, dict]:
+    """Create a query to get the geneset values of a geneset in a gene identifier.
+
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to use.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = SQL(
+        """
+            SELECT gsv.gs_id, gsv.ode_gene_id, gsv.gsv_value, gsv.gsv_hits,
+                   gsv.gsv_source_list, gsv.gsv_value_list,
+                   gsv.gsv_in_threshold, gsv.gsv_date, h.hom_id, gi.gene_rank,
+                   gsv.ode_ref_id, gsv.gdb_id
+
+            --
+            -- Use a subquery here so we can prevent duplicate gene identifiers
+            -- of the same type from being returned (the DISTINCT ON section)
+            -- otherwise when we try to change identifier types from the view
+            -- GS page, duplicate entries screw things up
+            --
+            FROM (
+                SELECT DISTINCT ON (g.ode_gene_id, g.gdb_id)
+                        gsv.*, g.ode_ref_id, g.gdb_id, g.ode_pref
+                FROM    geneset_value as gsv, gene as g
+                WHERE   gsv.gs_id = %(geneset_id)s AND
+                        g.ode_gene_id = gsv.ode_gene_id AND
+                        g.gdb_id = (SELECT COALESCE (
+                            (SELECT gdb_id
+                             FROM   gene AS g2
+                             WHERE g2.ode_gene_id = gsv.ode_gene_id AND
+                                   g2.gdb_id = %(gdb_id)s
+                             LIMIT 1),
+                            (SELECT gdb_id
+                             FROM   gene AS g2
+                             WHERE g2.ode_gene_id = gsv.ode_gene_id AND
+                                   g2.gdb_id = 7
+                             LIMIT 1)
+                        )) AND
+
+                        --
+                        -- When viewing symbols, always pick the preferred gene symbol
+                        --
+                        CASE
+                            WHEN g.gdb_id = 7 THEN g.ode_pref = 't'
+                            ELSE true
+                        END
+            ) gsv
+
+            --
+            -- gene_info necessary for the priority scores
+            --
+            INNER JOIN  gene_info AS gi
+            ON          gsv.ode_gene_id = gi.ode_gene_id
+
+            --
+            -- Have to use a left outer join because some genes may not have homologs
+            --
+            LEFT OUTER JOIN homology AS h
+            ON          gsv.ode_gene_id = h.ode_gene_id
+
+            WHERE (h.hom_source_name = 'Homologene' OR
+                  -- In case the gene doesn't have any homologs
+                  h.hom_source_name IS NULL)
+        """
+    )
+    params = {"geneset_id": geneset_id, "gdb_id": int(identifier)}
+
+    if gsv_in_threshold:
+        query += SQL("AND gsv.gsv_in_threshold = %(gsv_in_threshold)s")
+        params["gsv_in_threshold"] = gsv_in_threshold
+
+    return query, params
+
+
+@query_builder
+def by_geneset_id_columns(
+    geneset_id: int,
+    identifier: Optional[GeneIdentifier] = None,
+    gsv_in_threshold: Optional[bool] = False,
+) -> Tuple[Composable, dict]:
+    """Create a query to get the geneset values of a geneset as packed columns.
+
+    The query returns a single row: the number of values, the `ode_gene_id`,
+    `gsv_value` and `gsv_in_threshold` columns as bytea of big-endian int8, float8
+    and bool values, and the `ode_ref_id` column as one string separated by
+    `REF_ID_SEPARATOR`. The columns are all in the same order. Missing values and
+    thresholds are packed as NaN and false, and missing reference ids as "".
+
+    :param geneset_id: The geneset ID to retrieve values for.
+    :param identifier: The gene identifier to use, or None for the identifiers the
+    values were uploaded with.
+    :param gsv_in_threshold: optional. filter for geneset value that
+     are/aren't in the geneset’s threshold.
+
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    if identifier is not None:
+        values_query, params = by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
+    else:
+        values_query, params = by_geneset_id_as_uploaded(geneset_id, gsv_in_threshold)
+
+    query = SQL(
+        """
+        SELECT
+            count(*) AS value_count,
+            string_agg(int8send(ode_gene_id::int8), ''
+                       ORDER BY value_position) AS ode_gene_id,
+            string_agg(float8send(COALESCE(gsv_value::float8, 'NaN')), ''
+                       ORDER BY value_position) AS gsv_value,
+            string_agg(boolsend(COALESCE(gsv_in_threshold, false)), ''
+                       ORDER BY value_position) AS gsv_in_threshold,
+            string_agg(COALESCE(ode_ref_id, ''), %(ref_id_separator)s
+                       ORDER BY value_position) AS ode_ref_id
+        FROM (
+            SELECT gsv.*, row_number() OVER () AS value_position
+            FROM ({values_query}) AS gsv
+        ) AS gsv
+        """
+    ).format(values_query=values_query)
+    params["ref_id_separator"] = REF_ID_SEPARATOR
+
+    return query, params
@@ -2,10 +2,12 @@
 
 from typing import Optional, Tuple
 
+from geneweaver.db.query.utils import query_builder
 from geneweaver.db.utils import limit_and_offset
 from psycopg.sql import SQL, Composed
 
 
+@query_builder
 def by_geneset(
     geneset_id: int,
     limit: Optional[int] = None,
@@ -38,11 +40,12 @@ def by_geneset(
     ).join(" ")
     params = {"gs_id": geneset_id}
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
 
 
+@query_builder
 def insert_geneset_ontology_term_association(
     ontology_term_id: int, geneset_id: int, gso_ref_type: str
 ) -> Tuple[Composed, dict]:
@@ -69,6 +72,7 @@ def insert_geneset_ontology_term_association(
     return query, params
 
 
+@query_builder
 def delete_geneset_ontology_term_association(
     ontology_term_id: int, geneset_id: int, gso_ref_type: str
 ) -> Tuple[Composed, dict]:
@@ -97,6 +101,7 @@ def delete_geneset_ontology_term_association(
     return query, params
 
 
+@query_builder
 def by_ontology_db(
     ontology_db_id: int,
     limit: Optional[int] = None,
@@ -126,11 +131,12 @@ def by_ontology_db(
     ).join(" ")
     params = {"ontology_db_id": ontology_db_id}
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
 
 
+@query_builder
 def get_ontology_dbs(
     ontology_db_id: Optional[int] = None,
     limit: Optional[int] = None,
@@ -158,11 +164,12 @@ def get_ontology_dbs(
         query = (query + SQL("WHERE onto_db.ontdb_id = %(ontology_db_id)s")).join(" ")
         params["ontology_db_id"] = ontology_db_id
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
 
 
+@query_builder
 def by_ontology_term(onto_ref_term_id: str) -> Tuple[Composed, dict]:
     """Create a psycopg query to get ontology term by ontology reference id.
 
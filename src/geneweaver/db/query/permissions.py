@@ -0,0 +1,101 @@
+"""SQL query generation code for materialized geneset permissions."""
+
+import functools
+from typing import NamedTuple, Optional, Tuple
+
+from geneweaver.core.enum import GenesetTierInt
+from geneweaver.db.query.user import is_curator_or_higher__query
+from geneweaver.db.query.utils import query_builder
+from geneweaver.db.utils import row_value
+from psycopg.rows import Row
+from psycopg.sql import SQL, Composed, Identifier
+
+# The group that every user is a member of, for genesets shared with everyone.
+PUBLIC_GROUP_ID = -1
+
+# The curation tiers of the genesets that every user can read.
+PUBLIC_TIERS = (GenesetTierInt.TIER1, GenesetTierInt.TIER2, GenesetTierInt.TIER3)
+
+
+class ReadableGenesets(NamedTuple):
+    """The inputs of the geneset readable check for a user, materialized.
+
+    A user can read every geneset if they are a curator or an admin. Otherwise, they
+    can read the genesets of the curated tiers (`PUBLIC_TIERS`), the genesets they
+    own, and the genesets shared (through `gs_groups`) with one of their groups or
+    with everyone.
+    """
+
+    user_id: int
+    admin: bool
+    group_ids: str
+
+
+@query_builder
+def readable_genesets(user_id: int) -> Tuple[Composed, dict]:
+    """Get the inputs of the geneset readable check for a user.
+
+    The query returns one row, with whether the user is a curator or an admin, and
+    their group IDs as an array literal, including `PUBLIC_GROUP_ID`.
+
+    :param user_id: The user ID to get the inputs for.
+    :return: A query (and params) that can be executed on a cursor.
+    """
+    query = (
+        SQL("SELECT")
+        + is_curator_or_higher__query()
+        + SQL("AS admin,")
+        + SQL("array_prepend(%(public_group_id)s::int,")
+        + SQL("ARRAY(SELECT grp_id FROM usr2grp WHERE usr_id = %(user_id)s))::text")
+        + SQL("AS group_ids")
+    ).join(" ")
+    return query, {"user_id": user_id, "public_group_id": PUBLIC_GROUP_ID}
+
+
+def readable_genesets_from_row(user_id: int, row: Optional[Row]) -> ReadableGenesets:
+    """Unpack the row returned by `readable_genesets`.
+
+    :param user_id: The user ID the row was fetched for.
+    :param row: The row, from a cursor with any row factory.
+    :return: The user's readable genesets.
+    """
+    if row is None:
+        return ReadableGenesets(user_id, False, f"{{{PUBLIC_GROUP_ID}}}")
+    return ReadableGenesets(
+        user_id=user_id,
+        admin=bool(row_value(row, "admin", 0)),
+        group_ids=row_value(row, "group_ids", 1),
+    )
+
+
+def readable_filter(
+    readable: ReadableGenesets, gs_id_table: str = "geneset"
+) -> Tuple[Optional[Composed], dict]:
+    """Filter a query to the genesets a user can read, using their materialized inputs.
+
+    :param readable: The user's readable genesets.
+    :param gs_id_table: The geneset table (or its alias) to filter on.
+    :return: A filter (and params) to add to a query, or None (and no params) if the
+    user can read every geneset.
+    """
+    if readable.admin:
+        return None, {}
+    params = {
+        "readable_public_tiers": [int(tier) for tier in PUBLIC_TIERS],
+        "is_readable_by": readable.user_id,
+        "readable_group_ids": readable.group_ids,
+    }
+    return _readable_filter_sql(gs_id_table), params
+
+
+@functools.lru_cache(maxsize=None)
+def _readable_filter_sql(gs_id_table: str) -> Composed:
+    """Format the materialized readable filter for a table."""
+    return SQL(
+        """
+        ({table}.cur_id = ANY(%(readable_public_tiers)s)
+         OR {table}.usr_id = %(is_readable_by)s
+         OR string_to_array({table}.gs_groups, ',')::int[]
+            && %(readable_group_ids)s::int[])
+        """
+    ).format(table=Identifier(gs_id_table))
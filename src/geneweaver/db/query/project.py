@@ -3,8 +3,17 @@
 from typing import Optional, Tuple
 
 from geneweaver.db.query.search.utils import search
-from geneweaver.db.query.utils import construct_filters
-from geneweaver.db.utils import format_sql_fields, limit_and_offset
+from geneweaver.db.query.utils import (
+    Keyset,
+    add_keyset_filter,
+    check_keyset_offset,
+    check_total_keyset,
+    construct_filters,
+    order_by_keyset,
+    query_builder,
+    total_count_field,
+)
+from geneweaver.db.utils import LazySQLFields, limit_and_offset
 from psycopg.sql import SQL, Composed, Identifier
 
 PROJECT_TSVECTOR = (Identifier("project") + Identifier("pj_tsvector")).join(".")
@@ -18,9 +27,15 @@ PROJECT_FIELD_MAP = {
     "pj_created": "created",
     "pj_star": "star",
 }
-PROJECT_FIELDS = format_sql_fields(PROJECT_FIELD_MAP, query_table="project")
+PROJECT_FIELDS = LazySQLFields(PROJECT_FIELD_MAP, query_table="project")
 
+# Projects are paged by ID, which is the first of the `PROJECT_FIELDS`.
+PROJECT_KEYSET = Keyset(
+    columns=(Identifier("project", "pj_id"),), fields=("id",), indexes=(0,)
+)
 
+
+@query_builder
 def get(
     project_id: Optional[int] = None,
     owner_id: Optional[int] = None,
@@ -29,6 +44,9 @@ def get(
     search_text: Optional[str] = None,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
 ) -> Tuple[Composed, dict]:
     """Get projects by any filtering criteria.
 
@@ -40,13 +58,23 @@ def get(
                         full-text search).
     :param limit: Limit the number of results.
     :param offset: Offset the results.
+    :param keyset: Sort the results by project ID, to be paged with page tokens
+    instead of an offset.
+    :param page_token: Show only results after the row of this page token (implies
+    `keyset`).
+    :param with_total: Return the number of matching projects, ignoring the limit
+    and offset, as a last `total_count` field.
 
     :return: A query (and params) that can be executed on a cursor.
     """
+    keyset = keyset or page_token is not None
+    offset = check_keyset_offset(keyset, offset)
+    check_total_keyset(with_total, keyset)
     params = {}
     filtering = []
+    fields = PROJECT_FIELDS + [total_count_field()] if with_total else PROJECT_FIELDS
     query = SQL("SELECT")
-    query = query + SQL(",").join(PROJECT_FIELDS) + SQL("FROM project")
+    query = query + SQL(",").join(fields) + SQL("FROM project")
 
     filtering, params = search(filtering, params, PROJECT_TSVECTOR, search_text)
 
@@ -55,15 +83,23 @@ def get(
         params,
         {"id": project_id, "usr_id": owner_id, "name": name, "star": starred},
     )
+    if keyset:
+        filtering, params = add_keyset_filter(
+            filtering, params, PROJECT_KEYSET, page_token
+        )
 
     if len(filtering) > 0:
         query += SQL("WHERE") + SQL("AND").join(filtering)
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    if keyset:
+        query = order_by_keyset(query, PROJECT_KEYSET)
+
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
 
 
+@query_builder
 def shared_with_user(
     user_id: int,
     limit: Optional[int] = None,
@@ -96,10 +132,11 @@ def shared_with_user(
     ).join(" ")
     params = {"user_id": user_id}
 
-    query = limit_and_offset(query, limit, offset).join("")
+    query = limit_and_offset(query, limit, offset, params).join(" ")
     return query, params
 
 
+@query_builder
 def add(
     user_id: int,
     name: str,
@@ -128,6 +165,7 @@ def add(
     return query, params
 
 
+@query_builder
 def insert_geneset_to_project(
     project_id: int, geneset_id: int
 ) -> Tuple[Composed, dict]:
@@ -149,6 +187,7 @@ def insert_geneset_to_project(
     return query, params
 
 
+@query_builder
 def remove_geneset_from_project(
     project_id: int, geneset_id: int
 ) -> Tuple[Composed, dict]:
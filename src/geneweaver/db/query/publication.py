@@ -5,20 +5,22 @@ from typing import Iterable, Optional, Tuple
 from geneweaver.db.query.const import (
     PUB_INSERT_COLS,
     PUB_INSERT_VALS,
-    PUB_QUERY,
     PUB_TSVECTOR,
+    pub_query,
 )
 from geneweaver.db.query.search import utils
 from geneweaver.db.query.utils import (
     ParamDict,
     SQLList,
     construct_filters,
+    query_builder,
 )
 from geneweaver.db.utils import limit_and_offset
 from psycopg import rows
 from psycopg.sql import SQL, Composed
 
 
+@query_builder
 def get(
     pub_id: Optional[int] = None,
     authors: Optional[str] = None,
@@ -54,7 +56,7 @@ def get(
     """
     params = {}
     filtering = []
-    query = PUB_QUERY
+    query = pub_query()
 
     filtering, params = search(filtering, params, search_text)
 
@@ -78,11 +80,12 @@ def get(
     if len(filtering) > 0:
         query += SQL("WHERE") + SQL("AND").join(filtering)
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    query = limit_and_offset(query, limit, offset, params).join(" ")
 
     return query, params
 
 
+@query_builder
 def by_id(pub_id: int) -> Optional[rows.Row]:
     """Create a psycopg query to get a publication by ID.
 
@@ -90,11 +93,12 @@ def by_id(pub_id: int) -> Optional[rows.Row]:
 
     :return: A query (and params) that can be executed on a cursor.
     """
-    query = (PUB_QUERY + SQL("WHERE pub_id = %(pub_id)s")).join(" ")
+    query = (pub_query() + SQL("WHERE pub_id = %(pub_id)s")).join(" ")
     params = {"pub_id": pub_id}
     return query, params
 
 
+@query_builder
 def by_geneset_id(geneset_id: int) -> Tuple[Composed, dict]:
     """Create a psycopg query to get a publication by geneset ID.
 
@@ -103,7 +107,7 @@ def by_geneset_id(geneset_id: int) -> Tuple[Composed, dict]:
     :return: A query (and params) that can be executed on a cursor.
     """
     query = (
-        PUB_QUERY
+        pub_query()
         + SQL("JOIN geneset ON publication.pub_id = geneset.pub_id")
         + SQL("WHERE gs_id = %(geneset_id)s")
     ).join(" ")
@@ -112,6 +116,7 @@ def by_geneset_id(geneset_id: int) -> Tuple[Composed, dict]:
     return query, params
 
 
+@query_builder
 def by_pubmed_id(pubmed_id: int) -> Tuple[Composed, dict]:
     """Create a psycopg query to get a publication by PubMed ID.
 
@@ -119,12 +124,13 @@ def by_pubmed_id(pubmed_id: int) -> Tuple[Composed, dict]:
 
     :return: A query (and params) that can be executed on a cursor.
     """
-    query = (PUB_QUERY + SQL("WHERE pub_pubmed = %(pmid)s")).join(" ")
+    query = (pub_query() + SQL("WHERE pub_pubmed = %(pmid)s")).join(" ")
     # PubMed IDs are integers, but are stored as strings in the database.
     params = {"pmid": str(pubmed_id)}
     return query, params
 
 
+@query_builder
 def by_pubmed_ids(pubmed_ids: Iterable[int]) -> Tuple[Composed, dict]:
     """Create a psycopg query to get publications by a list of PubMed IDs.
 
@@ -132,11 +138,12 @@ def by_pubmed_ids(pubmed_ids: Iterable[int]) -> Tuple[Composed, dict]:
 
     :return: A query (and params) that can be executed on a cursor.
     """
-    query = (PUB_QUERY + SQL("WHERE pub_pubmed = ANY(%(pubmed_ids)s)")).join(" ")
+    query = (pub_query() + SQL("WHERE pub_pubmed = ANY(%(pubmed_ids)s)")).join(" ")
     params = {"pubmed_ids": list(pubmed_ids)}
     return query, params
 
 
+@query_builder
 def add(
     authors: str,
     title: str,
@@ -189,6 +196,7 @@ def add(
     return query, params
 
 
+@query_builder
 def search(
     existing_filters: SQLList,
     existing_params: ParamDict,
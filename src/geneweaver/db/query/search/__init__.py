@@ -1,3 +1,4 @@
 """Module for search related query generation functions."""
 
 from .search import genesets as genesets
+from .search import genesets_keyset as genesets_keyset
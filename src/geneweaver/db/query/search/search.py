@@ -1,8 +1,10 @@
 """Full general search of Geneweaver Database."""
 
+import functools
 from datetime import date
 from typing import Optional, Tuple
 
+from geneweaver.db.query.geneset.const import GENESET_FIELDS_MAP, GENESET_KEYSET
 from geneweaver.db.query.geneset.utils import (
     format_select_query,
     is_readable,
@@ -10,18 +12,61 @@ from geneweaver.db.query.geneset.utils import (
     restrict_species,
     restrict_tier,
 )
+from geneweaver.db.query.permissions import ReadableGenesets
 from geneweaver.db.query.search import const
-from geneweaver.db.query.search.utils import search
-from geneweaver.db.query.utils import add_op_filters, construct_filters
+from geneweaver.db.query.search.utils import search, search_rank
+from geneweaver.db.query.utils import (
+    Keyset,
+    add_keyset_filter,
+    add_op_filters,
+    check_keyset_offset,
+    check_total_keyset,
+    compiled_queries,
+    construct_filters,
+    order_by_keyset,
+    query_builder,
+    total_count_field,
+)
 from geneweaver.db.utils import (
     GenesetScoreTypeOrScoreTypes,
     GenesetTierOrTiers,
     SpeciesOrSpeciesSet,
+    bind_limit_and_offset,
     limit_and_offset,
 )
-from psycopg.sql import SQL, Composed
+from psycopg.sql import SQL, Composed, Identifier
+
+
+def genesets_keyset(search_text: Optional[str]) -> Keyset:
+    """Get the sort key that geneset search results are paged by.
+
+    Results are sorted by their search rank (best first), and then by geneset ID.
+    Without search text, they are sorted by geneset ID, like `geneset.get`.
+
+    :param search_text: The search text of the query.
+
+    :return: The sort key.
+    """
+    if search_text is None:
+        return GENESET_KEYSET
+    return _ranked_genesets_keyset()
 
 
+@functools.lru_cache(maxsize=None)
+def _ranked_genesets_keyset() -> Keyset:
+    """Sort by the `search_rank` field, which follows the `GENESET_FIELDS`."""
+    return Keyset(
+        columns=(
+            search_rank(const.SEARCH_COMBINED_COL),
+            Identifier("geneset", "gs_id"),
+        ),
+        fields=("search_rank", "id"),
+        indexes=(len(GENESET_FIELDS_MAP), 0),
+        descending=True,
+    )
+
+
+@query_builder
 def genesets(
     search_text: str,
     is_readable_by: Optional[int] = None,
@@ -39,6 +84,10 @@ def genesets(
     limit: Optional[int] = 25,
     offset: Optional[int] = 0,
     _status: Optional[str] = "normal",
+    keyset: bool = False,
+    page_token: Optional[str] = None,
+    with_total: bool = False,
+    readable_genesets: Optional[ReadableGenesets] = None,
 ) -> Tuple[Composed, dict]:
     """Search genesets using all relevant metadata fields.
 
@@ -58,15 +107,26 @@ def genesets(
     :param limit: Limit the number of results.
     :param offset: Offset the results.
     :param _status: Show only results with this status. Default is "normal".
+    :param keyset: Sort the results by `genesets_keyset`, to be paged with page
+    tokens instead of an offset. The search rank is returned as `search_rank`.
+    :param page_token: Show only results after the row of this page token (implies
+    `keyset`).
+    :param with_total: Return the number of matching genesets, ignoring the limit
+    and offset, as a last `total_count` field.
+    :param readable_genesets: The materialized readable genesets of the
+    `is_readable_by` user (see `geneweaver.db.permissions`), to filter by instead of
+    checking each geneset with `geneset_is_readable2`.
     """
+    keyset = keyset or page_token is not None
+    offset = check_keyset_offset(keyset, offset)
+    check_total_keyset(with_total, keyset)
+    sort_key = genesets_keyset(search_text)
     params = {}
     filtering = []
 
-    query = format_select_query() + SQL(
-        "JOIN geneset_search ON geneset_search.gs_id = geneset.gs_id"
+    filtering, params = is_readable(
+        filtering, params, is_readable_by, readable_genesets=readable_genesets
     )
-
-    filtering, params = is_readable(filtering, params, is_readable_by)
     filtering, params = search(
         filtering, params, const.SEARCH_COMBINED_COL, search_text
     )
@@ -105,9 +165,32 @@ def genesets(
         table="geneset_search",
     )
 
-    if len(filtering) > 0:
-        query += SQL("WHERE") + SQL("AND").join(filtering)
+    if keyset:
+        filtering, params = add_keyset_filter(filtering, params, sort_key, page_token)
+    params = bind_limit_and_offset(params, limit, offset)
+
+    def build() -> Composed:
+        extra_fields = []
+        if keyset and sort_key is not GENESET_KEYSET:
+            extra_fields.append(
+                SQL("{rank} AS search_rank").format(rank=sort_key.columns[0])
+            )
+        if with_total:
+            extra_fields.append(total_count_field())
+        query = format_select_query(extra_fields=extra_fields) + SQL(
+            "JOIN geneset_search ON geneset_search.gs_id = geneset.gs_id"
+        )
+        if len(filtering) > 0:
+            query += SQL("WHERE") + SQL("AND").join(filtering)
+
+        if keyset:
+            query = order_by_keyset(query, sort_key)
+
+        return limit_and_offset(query, limit, offset, params).join(" ")
 
-    query = limit_and_offset(query, limit, offset).join(" ")
+    # Every part of the query that varies is reflected in the parameter names, and
+    # in the keyset and total flags, which add no parameters.
+    shape = ("search.genesets", keyset, with_total, *params)
+    query = compiled_queries.get_or_build(shape, build)
 
     return query, params
@@ -1,5 +1,6 @@
 """Functions for generating search queries."""
 
+import functools
 from enum import Enum
 from typing import Optional, Tuple
 
@@ -55,10 +56,16 @@ def search_query(
     :param search_config: The search configuration to use.
     :param query_type: The query type to use.
     """
-    query = SEARCH_QUERIES[query_type].format(search_config=str(search_config))
+    query = _search_sql(query_type, search_config)
     return search_column + query, {"search": search_string}
 
 
+@functools.lru_cache(maxsize=None)
+def _search_sql(query_type: QueryType, search_config: SearchConfig) -> Composed:
+    """Format the search operator for a query type and search configuration."""
+    return SEARCH_QUERIES[query_type].format(search_config=str(search_config))
+
+
 def search(
     existing_filters: SQLList,
     existing_params: ParamDict,
@@ -79,3 +86,18 @@ def search(
         existing_filters.append(search_sql)
         existing_params.update(search_params)
     return existing_filters, existing_params
+
+
+def search_rank(tsvector_col: Composed) -> Composed:
+    """Rank how well rows match the search text of the `search` filter.
+
+    The rank is cast to double precision, so that it can be compared exactly with
+    the value it was read as (e.g. from a page token).
+
+    :param tsvector_col: The tsvector column that is searched.
+
+    :return: The rank expression, which uses the `search` parameter.
+    """
+    return SQL(
+        "ts_rank({tsvector_col}, plainto_tsquery({search_config}, %(search)s))::float8"
+    ).format(tsvector_col=tsvector_col, search_config=str(SearchConfig.ENGLISH))
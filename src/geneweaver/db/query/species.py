@@ -3,7 +3,8 @@
 from typing import Optional, Tuple
 
 from geneweaver.core.enum import GeneIdentifier, Species
-from geneweaver.db.utils import format_sql_fields
+from geneweaver.db.query.utils import query_builder
+from geneweaver.db.utils import LazySQLFields
 from psycopg.sql import SQL, Composed
 
 SPECIES_FIELD_MAP = {
@@ -14,9 +15,10 @@ SPECIES_FIELD_MAP = {
 }
 
 
-SPECIES_FIELDS = format_sql_fields(SPECIES_FIELD_MAP, query_table="species")
+SPECIES_FIELDS = LazySQLFields(SPECIES_FIELD_MAP, query_table="species")
 
 
+@query_builder
 def get(
     taxonomic_id: Optional[int] = None,
     reference_gene_db_id: Optional[GeneIdentifier] = None,
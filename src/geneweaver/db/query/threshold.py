@@ -4,9 +4,11 @@ from typing import Tuple
 
 from geneweaver.core.schema.score import GenesetScoreType
 from geneweaver.db.query import user
+from geneweaver.db.query.utils import query_builder
 from psycopg.sql import SQL, Composed
 
 
+@query_builder
 def set_geneset_threshold(
     geneset_id: int,
     geneset_score_type: GenesetScoreType,
@@ -47,6 +49,7 @@ def set_geneset_threshold(
     return query, params
 
 
+@query_builder
 def set_geneset_value_threshold(
     geneset_id: int,
     geneset_score_type: GenesetScoreType,
@@ -103,6 +106,23 @@ def set_geneset_value_threshold(
     return query, params
 
 
+def value_in_threshold(geneset_score_type: GenesetScoreType, value: float) -> bool:
+    """Check if a geneset value is within the threshold of its geneset.
+
+    This is the test that `set_geneset_value_threshold` runs in the database. Values
+    that are added with a new geneset are marked by the database's
+    `process_thresholds` instead, which has the final say for them.
+
+    :param geneset_score_type: The score type (and threshold) of the geneset.
+    :param value: The geneset value.
+    :return: True if the value is within the threshold.
+    """
+    if geneset_score_type.threshold_low is not None:
+        return geneset_score_type.threshold_low <= value <= geneset_score_type.threshold
+    return value < geneset_score_type.threshold
+
+
+@query_builder
 def user_can_set_threshold(user_id: int, geneset_id: int) -> Tuple[Composed, dict]:
     """Check if a user can set the threshold of a geneset.
 
@@ -1,8 +1,11 @@
 """Query Builder for Users DB functions."""
 
-from typing import Tuple
+# ruff: noqa: ANN401
+import functools
+from typing import Any, Tuple
 
-from geneweaver.db.utils import format_sql_fields
+from geneweaver.db.query.utils import query_builder
+from geneweaver.db.utils import LazySQLFields
 from psycopg.sql import SQL, Composed
 
 USER_FIELD_MAP = {
@@ -20,47 +23,65 @@ USER_FIELD_MAP = {
     "usr_sso_id": "sso_id",
 }
 
-USER_FIELDS = format_sql_fields(USER_FIELD_MAP, query_table="usr")
+USER_FIELDS = LazySQLFields(USER_FIELD_MAP, query_table="usr")
 
 
-USER_QUERY = SQL("SELECT") + SQL(",").join(USER_FIELDS) + SQL("FROM usr")
+@functools.lru_cache(maxsize=None)
+def user_query() -> Composed:
+    """Get the base query to select users, building it on first use."""
+    return SQL("SELECT") + SQL(",").join(USER_FIELDS) + SQL("FROM usr")
 
 
+def __getattr__(name: str) -> Any:
+    """Build `USER_QUERY` lazily, the first time it is accessed."""
+    if name == "USER_QUERY":
+        return user_query()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@query_builder
 def by_id(user_id: int) -> Tuple[Composed, dict]:
     """Get user by id."""
-    query = USER_QUERY + SQL("WHERE usr_id = %(user_id)s;")
+    query = user_query() + SQL("WHERE usr_id = %(user_id)s;")
     params = {"user_id": user_id}
     return query.join(" "), params
 
 
+@query_builder
 def by_sso_id(sso_id: str) -> Tuple[Composed, dict]:
     """Get user by sso id."""
-    query = USER_QUERY + SQL("WHERE usr_sso_id = %(user_id)s;")
+    query = user_query() + SQL("WHERE usr_sso_id = %(user_id)s;")
     params = {"sso_id": sso_id}
     return query.join(" "), params
 
 
+@query_builder
 def by_email(email: str) -> Tuple[Composed, dict]:
     """Get user by email."""
-    query = USER_QUERY + SQL("WHERE usr_email = %(email)s;")
+    query = user_query() + SQL("WHERE usr_email = %(email)s;")
     params = {"email": email}
     return query.join(" "), params
 
 
+@query_builder
 def by_sso_id_and_email(sso_id: str, email: str) -> Tuple[Composed, dict]:
     """Get user by sso id and email."""
-    query = USER_QUERY + SQL("WHERE usr_sso_id = %(sso_id)s AND usr_email = %(email)s;")
+    query = user_query() + SQL(
+        "WHERE usr_sso_id = %(sso_id)s AND usr_email = %(email)s;"
+    )
     params = {"sso_id": sso_id, "email": email}
     return query.join(" "), params
 
 
+@query_builder
 def by_api_key(api_key: str) -> Tuple[Composed, dict]:
     """Get user by api key."""
-    query = USER_QUERY + SQL("WHERE apikey = %(api_key)s;")
+    query = user_query() + SQL("WHERE apikey = %(api_key)s;")
     params = {"api_key": api_key}
     return query.join(" "), params
 
 
+@query_builder
 def email_exists(email: str) -> Tuple[Composed, dict]:
     """Check if email exists."""
     query = SQL("SELECT") + SQL(
@@ -70,6 +91,7 @@ def email_exists(email: str) -> Tuple[Composed, dict]:
     return query.join(" "), params
 
 
+@query_builder
 def sso_id_exists(sso_id: str) -> Tuple[Composed, dict]:
     """Check if sso id exists."""
     query = SQL("SELECT") + SQL(
@@ -102,6 +124,7 @@ def is_assigned_curation__query() -> Composed:
     )
 
 
+@query_builder
 def is_curator_or_higher(user_id: int) -> Tuple[Composed, dict]:
     """Check if user is a curator or higher."""
     query = SQL("SELECT") + is_curator_or_higher__query() + SQL(";")
@@ -109,6 +132,7 @@ def is_curator_or_higher(user_id: int) -> Tuple[Composed, dict]:
     return query.join(" "), params
 
 
+@query_builder
 def is_assigned_curation(user_id: int, geneset_id: int) -> Tuple[Composed, dict]:
     """Check if user is assigned curation."""
     query = SQL("SELECT") + is_assigned_curation__query() + SQL(";")
@@ -1,15 +1,60 @@
 """Utility functions for the SQL generation functions."""
 
+# ruff: noqa: ANN101, ANN401
+import base64
+import binascii
+import functools
+import json
+import threading
+from collections import OrderedDict
 from datetime import date
-from typing import Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from psycopg.sql import SQL, Composed, Identifier, Placeholder
+from geneweaver.db.core.slow_query import BUILDER_ATTRIBUTE
+from geneweaver.db.exceptions import GeneweaverValueError
+from psycopg.sql import SQL, Composable, Composed, Identifier, Placeholder
 from typing_extensions import LiteralString
 
 SQLList = List[Union[Composed, SQL]]
 ParamDict = Dict[str, Union[str, int, list]]
 OptionalParamDict = Dict[str, Optional[Union[str, int]]]
 OptionalParamTuple = Tuple[str, Optional[Union[str, int]]]
+KeyValue = Union[int, float, str]
+
+BuilderT = TypeVar("BuilderT", bound=Callable)
+
+
+def query_builder(func: BuilderT) -> BuilderT:
+    """Tag the queries that a builder returns with its name, for the slow-query log.
+
+    :param func: A function that returns a query, or a query and its params.
+
+    :return: The function, wrapped.
+    """
+    name = f"{func.__module__[len('geneweaver.db.'):]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = func(*args, **kwargs)
+        query = result[0] if isinstance(result, tuple) else result
+        if isinstance(query, Composable):
+            setattr(query, BUILDER_ATTRIBUTE, name)
+        return result
+
+    return wrapper  # type: ignore[return-value]
 
 
 def construct_filter(
@@ -38,23 +83,32 @@ def construct_filter(
         place_holder = filter_name
 
     if filter_value is not None:
-        if table:
-            filter_str = SQL("{table}.{filter_name} {operator} {param_name}")
-        else:
-            filter_str = SQL("{filter_name} {operator} {param_name}")
-
-        filters.append(
-            filter_str.format(
-                filter_name=Identifier(filter_name),
-                param_name=Placeholder(place_holder),
-                operator=SQL(operator),
-                table=Identifier(table) if table else None,
-            )
-        )
+        filters.append(_filter_sql(filter_name, operator, place_holder, table))
         params[place_holder] = filter_value
     return filters, params
 
 
+@functools.lru_cache(maxsize=512)
+def _filter_sql(
+    filter_name: str,
+    operator: LiteralString,
+    place_holder: str,
+    table: Optional[str],
+) -> Composed:
+    """Format the SQL of a simple filter, which only depends on its arguments."""
+    if table:
+        filter_str = SQL("{table}.{filter_name} {operator} {param_name}")
+    else:
+        filter_str = SQL("{filter_name} {operator} {param_name}")
+
+    return filter_str.format(
+        filter_name=Identifier(filter_name),
+        param_name=Placeholder(place_holder),
+        operator=SQL(operator),
+        table=Identifier(table) if table else None,
+    )
+
+
 def construct_filters(
     filters: SQLList,
     params: ParamDict,
@@ -177,3 +231,264 @@ def construct_op_filters(
         )
 
     return filters, params
+
+
+class Keyset(NamedTuple):
+    """The sort key of a listing that is paged with keyset ("seek") pagination.
+
+    Each page continues after the key of the last row of the previous page, which
+    is passed around as an opaque page token. Unlike `OFFSET`, this doesn't scan and
+    discard the rows of the previous pages, so deep pages are as fast as the first.
+    The key must be unique across the rows of the listing.
+
+    :param columns: The SQL expressions to sort by, most significant first.
+    :param fields: The names of the same values in rows from a `dict_row` cursor.
+    :param indexes: The positions of the same values in rows from a `tuple_row`
+    cursor.
+    :param descending: Sort by the key in descending, rather than ascending, order.
+    """
+
+    columns: Tuple[Composable, ...]
+    fields: Tuple[str, ...]
+    indexes: Tuple[int, ...]
+    descending: bool = False
+
+
+def _is_key_value(value: object) -> bool:
+    """Check if a value can be part of a page token."""
+    return isinstance(value, (int, float, str)) and not isinstance(value, bool)
+
+
+def encode_page_token(key: Sequence[KeyValue]) -> str:
+    """Encode the sort key of the last row of a page as a page token.
+
+    :param key: The values of the sort key, in the order of its columns.
+
+    :raises GeneweaverValueError: If a value isn't an int, float or str.
+
+    :return: An opaque, URL-safe page token.
+    """
+    if not all(_is_key_value(value) for value in key):
+        raise GeneweaverValueError(f"Can't create a page token from {key!r}.")
+    encoded = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(encoded).decode().rstrip("=")
+
+
+def decode_page_token(page_token: str, keyset: Keyset) -> List[KeyValue]:
+    """Decode a page token created by `encode_page_token`.
+
+    :param page_token: The page token.
+    :param keyset: The sort key of the listing that the token is for.
+
+    :raises GeneweaverValueError: If the token is malformed, or isn't a key of the
+    listing.
+
+    :return: The values of the sort key.
+    """
+    try:
+        padded = page_token + "=" * (-len(page_token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (AttributeError, TypeError, ValueError, binascii.Error) as error:
+        raise GeneweaverValueError("Invalid page token.") from error
+
+    if (
+        not isinstance(key, list)
+        or len(key) != len(keyset.columns)
+        or not all(_is_key_value(value) for value in key)
+    ):
+        raise GeneweaverValueError("Invalid page token.")
+    return key
+
+
+def add_keyset_filter(
+    filters: SQLList,
+    params: ParamDict,
+    keyset: Keyset,
+    page_token: Optional[str] = None,
+) -> Tuple[SQLList, ParamDict]:
+    """Add the filter that continues a listing after the row of a page token.
+
+    The key is compared as a row value, e.g. `(a, b) > (%(after_a)s, %(after_b)s)`,
+    which the planner can answer from an index on the key columns.
+
+    :param filters: The existing filters.
+    :param params: The existing parameters.
+    :param keyset: The sort key of the listing.
+    :param page_token: The page token, or None for the first page.
+
+    :raises GeneweaverValueError: If the page token isn't valid for the listing.
+
+    :return: The filters and parameters, with the keyset filter added.
+    """
+    if page_token is None:
+        return filters, params
+
+    key = decode_page_token(page_token, keyset)
+    names = [f"after_{field}" for field in keyset.fields]
+    filters.append(
+        SQL("({columns}) {operator} ({values})").format(
+            columns=SQL(", ").join(keyset.columns),
+            operator=SQL("<" if keyset.descending else ">"),
+            values=SQL(", ").join(Placeholder(name) for name in names),
+        )
+    )
+    params.update(zip(names, key))
+    return filters, params
+
+
+def order_by_keyset(query: Composed, keyset: Keyset) -> Composed:
+    """Sort a query by the sort key of its listing.
+
+    :param query: The query to sort.
+    :param keyset: The sort key of the listing.
+
+    :return: The query with an `ORDER BY` clause.
+    """
+    direction = SQL(" DESC") if keyset.descending else SQL("")
+    return (
+        query
+        + SQL("ORDER BY")
+        + SQL(", ").join(column + direction for column in keyset.columns)
+    )
+
+
+def check_keyset_offset(keyset: bool, offset: Optional[int]) -> Optional[int]:
+    """Check that an offset isn't combined with keyset pagination.
+
+    :param keyset: Whether the listing is paged by its keyset.
+    :param offset: The offset that was passed.
+
+    :raises GeneweaverValueError: If both are set.
+
+    :return: The offset to use, which is None when paging by the keyset.
+    """
+    if not keyset:
+        return offset
+    if offset:
+        raise GeneweaverValueError(
+            "Keyset pagination (a page token) can't be combined with an offset."
+        )
+    return None
+
+
+def _array_element(value: Union[str, int, float]) -> str:
+    """Format one element of an array literal, quoting (and escaping) strings."""
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return repr(value)
+
+
+def array_literal(values: Iterable[Union[str, int, float]]) -> str:
+    """Format values as the text of a Postgres array, e.g. `{"a","b"}` or `{1.5,2}`.
+
+    psycopg works out how to dump a list one element at a time, which adds up when a
+    COPY writes a few small arrays in each of many rows. A literal is dumped as
+    plain text instead, for the server to parse into the array type of the column.
+
+    :param values: The strings or numbers to format.
+
+    :return: The array literal.
+    """
+    return "{" + ",".join(_array_element(value) for value in values) + "}"
+
+
+TOTAL_COUNT_FIELD = "total_count"
+
+
+def total_count_field() -> Composed:
+    """Format a field with the number of rows that match a query, ignoring its limit.
+
+    The window is evaluated after the WHERE clause but before the LIMIT and OFFSET,
+    so every row of a page carries the total of the whole listing.
+
+    :return: `count(*) OVER () AS total_count`
+    """
+    return SQL("count(*) OVER () AS {field}").format(
+        field=Identifier(TOTAL_COUNT_FIELD)
+    )
+
+
+def check_total_keyset(with_total: bool, keyset: bool) -> None:
+    """Check that a total count isn't combined with keyset pagination.
+
+    The keyset filter is part of the WHERE clause, so the count would only include
+    the rows after the page token.
+
+    :param with_total: Whether the total count was requested.
+    :param keyset: Whether the listing is paged by its keyset.
+
+    :raises GeneweaverValueError: If both are set.
+    """
+    if with_total and keyset:
+        raise GeneweaverValueError(
+            "A total count can't be combined with keyset pagination (a page token)."
+        )
+
+
+class CompiledQueryCache:
+    """A bounded cache of assembled queries, keyed by the shape of the query.
+
+    Query builders add a filter (and its parameter) for each argument that is set, so
+    the SQL they assemble only depends on which arguments are set, and not on their
+    values. Builders that use this cache describe that "shape" as a key, e.g. the
+    builder name, any flags that change the query and the names of the parameters,
+    and only assemble the query the first time that shape is seen.
+
+    The least recently used queries are evicted once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """Initialize an empty cache.
+
+        :param maxsize: The maximum number of queries to keep.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._queries: "OrderedDict[Hashable, Composed]" = OrderedDict()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Composed]) -> Composed:
+        """Get the query assembled for a shape, assembling it if it isn't cached.
+
+        :param key: The shape of the query.
+        :param build: A function that assembles the query.
+
+        :return: The assembled query.
+        """
+        with self._lock:
+            query = self._queries.get(key)
+            if query is not None:
+                self._queries.move_to_end(key)
+                self.hits += 1
+                return query
+            self.misses += 1
+
+        query = build()
+        with self._lock:
+            self._queries[key] = query
+            if len(self._queries) > self.maxsize:
+                self._queries.popitem(last=False)
+        return query
+
+    def info(self) -> Dict[str, int]:
+        """Get the hit and miss counts, and the number of cached queries.
+
+        :return: A dict with "hits", "misses" and "size" keys.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def clear(self) -> None:
+        """Remove all cached queries, and reset the hit and miss counts."""
+        with self._lock:
+            self._queries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Get the number of cached queries."""
+        return len(self._queries)
+
+
+compiled_queries = CompiledQueryCache()
@@ -3,10 +3,24 @@
 from typing import List, Optional
 
 from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.cache import (
+    SPECIES_INDEXES,
+    ReferenceTable,
+    reference_table,
+    species_rows,
+)
+from geneweaver.db.core.prepared import prepared_statements
 from geneweaver.db.query import species as species_query
 from psycopg import Cursor, rows
 
 
+def _species_table(cursor: Cursor) -> Optional[ReferenceTable]:
+    """Get the cached species table, if the cursor can use it."""
+    return reference_table(
+        cursor, "species", lambda: species_query.get()[0], SPECIES_INDEXES
+    )
+
+
 def get(
     cursor: Cursor,
     taxonomic_id: Optional[int] = None,
@@ -22,7 +36,19 @@ def get(
 
     :return: All species that match the queries.
     """
-    cursor.execute(
+    table = _species_table(cursor)
+    if table is not None:
+        return species_rows(
+            table,
+            cursor.row_factory,
+            taxonomic_id=taxonomic_id,
+            reference_gene_db_id=reference_gene_db_id,
+            species=species,
+        )
+
+    prepared_statements.execute(
+        cursor,
+        "species.get",
         *species_query.get(
             taxonomic_id=taxonomic_id,
             reference_gene_db_id=reference_gene_db_id,
@@ -43,6 +69,13 @@ def get_by_id(
     :param species: The species enum to query info for.
     :return: The species info for the provided enum.
     """
-    cursor.execute(*species_query.get(species=species))
+    table = _species_table(cursor)
+    if table is not None:
+        matches = species_rows(table, cursor.row_factory, species=species)
+        return matches[0] if matches else None
+
+    prepared_statements.execute(
+        cursor, "species.get", *species_query.get(species=species)
+    )
 
     return cursor.fetchone()
@@ -22,8 +22,9 @@ The functions that return a single value from a user record are:
 from typing import Optional
 
 from geneweaver.core.schema.user import User
+from geneweaver.db.core.prepared import prepared_statements
 from geneweaver.db.query import user
-from geneweaver.db.utils import temp_override_row_factory
+from geneweaver.db.utils import commit, temp_override_row_factory
 from psycopg import Cursor, rows
 
 
@@ -80,7 +81,7 @@ def by_api_key(cursor: Cursor, api_key: str) -> Optional[User]:
 
     :return: list of results using `.fetchall()`
     """
-    cursor.execute(*user.by_api_key(api_key))
+    prepared_statements.execute(cursor, "user.by_api_key", *user.by_api_key(api_key))
     return __fetch_and_return_user(cursor)
 
 
@@ -213,7 +214,7 @@ def link_user_id_with_sso_id(cursor: Cursor, user_id: int, sso_id: str) -> int:
        """,
         (sso_id, user_id),
     )
-    cursor.connection.commit()
+    commit(cursor)
     return cursor.fetchone()[0]
 
 
@@ -250,6 +251,6 @@ def create_sso_user(cursor: Cursor, name: str, email: str, sso_id: str) -> int:
             "user_sso_id": sso_id,
         },
     )
-    cursor.connection.commit()
+    commit(cursor)
 
     return cursor.fetchone()[0]
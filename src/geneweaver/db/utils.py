@@ -1,13 +1,34 @@
 """Utilities for the GeneWeaver database functions."""
 
-# ruff: noqa: ANN001, ANN002, ANN003, ANN201, ANN202
+# ruff: noqa: ANN001, ANN002, ANN003, ANN101, ANN201, ANN202, ANN204, D105
 import functools
-from typing import List, Optional, Set, Union
+import uuid
+from collections.abc import Mapping, Sequence
+from contextlib import (
+    AsyncExitStack,
+    asynccontextmanager,
+    contextmanager,
+    nullcontext,
+)
+from contextvars import ContextVar
+from typing import (
+    AsyncIterator,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from geneweaver.core.enum import GenesetTier, ScoreType, Species
+from geneweaver.db.core.settings import get_settings
 from geneweaver.db.exceptions import GeneweaverDoesNotExistError, GeneweaverValueError
-from psycopg import sql
-from psycopg.rows import Row
+from geneweaver.db.query.utils import TOTAL_COUNT_FIELD, Keyset, encode_page_token
+from psycopg import AsyncConnection, AsyncCursor, Connection, Cursor, sql
+from psycopg.pq import TransactionStatus
+from psycopg.rows import Row, tuple_row
 
 SpeciesOrSpeciesSet = Union[Species, Set[Species]]
 GenesetTierOrTiers = Union[GenesetTier, Set[GenesetTier]]
@@ -33,6 +54,20 @@ def unpack_one_item_fetchall_results(results: List[Row]) -> List:
     return [t[0] for t in results]
 
 
+def row_value(row: Row, key: str, index: int):
+    """Get a column value from a row, whatever the row factory of its cursor.
+
+    :param row: A row, as a mapping (e.g. from `dict_row`) or a sequence.
+    :param key: The column name, used for mapping rows.
+    :param index: The column position, used for sequence rows.
+
+    :return: The column value.
+    """
+    if isinstance(row, Mapping):
+        return row[key]
+    return row[index]
+
+
 def temp_override_row_factory(row_factory):
     """Temporarily override the row factory for a function.
 
@@ -74,6 +109,302 @@ def temp_override_row_factory(row_factory):
     return decorator
 
 
+def _itersize_or_default(itersize: Optional[int]) -> int:
+    """Get the number of rows to fetch per round trip from a server-side cursor."""
+    if itersize is not None:
+        return itersize
+    return get_settings().ITERSIZE
+
+
+def _server_cursor_name() -> str:
+    """Get a unique name for a server-side cursor."""
+    return f"gw_iter_{uuid.uuid4().hex}"
+
+
+def iter_query(
+    cursor: Cursor,
+    query: sql.Composable,
+    params: Optional[dict] = None,
+    itersize: Optional[int] = None,
+) -> Iterator[Row]:
+    """Stream the results of a query through a named, server-side cursor.
+
+    Rows are fetched `itersize` at a time, so memory use stays bounded no matter how
+    large the result is. The server-side cursor is opened on the connection of the
+    given cursor and uses its row factory. It lives until the generator is exhausted
+    or closed, so the connection should not be used for anything else in between.
+
+    :param cursor: The database cursor.
+    :param query: The query to execute.
+    :param params: The query parameters.
+    :param itersize: The number of rows to fetch per round trip (defaults to the
+    `ITERSIZE` setting).
+
+    :return: A generator of result rows.
+    """
+    connection = cursor.connection
+    # Server-side cursors need a transaction, which autocommit connections don't
+    # implicitly start.
+    transaction = connection.transaction() if connection.autocommit else nullcontext()
+    with transaction:
+        with connection.cursor(
+            name=_server_cursor_name(), row_factory=cursor.row_factory
+        ) as server_cursor:
+            server_cursor.itersize = _itersize_or_default(itersize)
+            server_cursor.execute(query, params)
+            yield from server_cursor
+
+
+async def aiter_query(
+    cursor: AsyncCursor,
+    query: sql.Composable,
+    params: Optional[dict] = None,
+    itersize: Optional[int] = None,
+) -> AsyncIterator[Row]:
+    """Stream the results of a query through a named, async server-side cursor.
+
+    See `iter_query` for details.
+
+    :param cursor: An async database cursor.
+    :param query: The query to execute.
+    :param params: The query parameters.
+    :param itersize: The number of rows to fetch per round trip (defaults to the
+    `ITERSIZE` setting).
+
+    :return: An async generator of result rows.
+    """
+    connection = cursor.connection
+    async with AsyncExitStack() as stack:
+        if connection.autocommit:
+            await stack.enter_async_context(connection.transaction())
+        async with connection.cursor(
+            name=_server_cursor_name(), row_factory=cursor.row_factory
+        ) as server_cursor:
+            server_cursor.itersize = _itersize_or_default(itersize)
+            await server_cursor.execute(query, params)
+            async for row in server_cursor:
+                yield row
+
+
+def is_large_batch(ids: Sequence) -> bool:
+    """Check if a list of ids is large enough to be sent through a temp table.
+
+    :param ids: The ids that a query filters on.
+
+    :return: True if there are at least `LARGE_BATCH_THRESHOLD` ids (and the
+    threshold is set).
+    """
+    threshold = get_settings().LARGE_BATCH_THRESHOLD
+    return threshold is not None and len(ids) >= threshold
+
+
+def ids_filter(param: str, table: Optional[sql.Identifier] = None) -> sql.Composed:
+    """Format the right hand side of a filter on a list of ids.
+
+    :param param: The name of the query parameter that holds the ids as an array.
+    :param table: A temp table made by `temp_id_table` that holds the ids instead.
+
+    :return: `= ANY(%(param)s)`, or `IN (SELECT id FROM table)` if a table is given.
+    """
+    if table is None:
+        return sql.SQL("= ANY({param})").format(param=sql.Placeholder(param))
+    return sql.SQL("IN (SELECT id FROM {table})").format(table=table)
+
+
+def _temp_id_table_statements(
+    table: sql.Identifier,
+) -> Tuple[sql.Composed, sql.Composed, sql.Composed, sql.Composed]:
+    """Get the statements that create, fill, analyze and drop a temp id table."""
+    return (
+        sql.SQL("CREATE TEMPORARY TABLE {table} (id text PRIMARY KEY)").format(
+            table=table
+        ),
+        sql.SQL("COPY {table} (id) FROM STDIN").format(table=table),
+        sql.SQL("ANALYZE {table}").format(table=table),
+        sql.SQL("DROP TABLE IF EXISTS {table}").format(table=table),
+    )
+
+
+# Temp tables can't be made on a hot standby, or in a read-only transaction.
+_READ_ONLY_QUERY = sql.SQL(
+    "SELECT pg_is_in_recovery() OR current_setting('transaction_read_only')::bool"
+)
+
+
+def _temp_table_name() -> sql.Identifier:
+    """Get a unique name for a temp id table."""
+    return sql.Identifier(f"gw_ids_{uuid.uuid4().hex}")
+
+
+@contextmanager
+def temp_id_table(
+    cursor: Cursor, ids: Sequence[str]
+) -> Iterator[Optional[sql.Identifier]]:
+    """Load a large batch of ids into an indexed temp table for a query to join on.
+
+    Big `= ANY(array)` filters plan badly, so when `is_large_batch(ids)`, the
+    (distinct) ids are copied into a session temp table with a primary key, which is
+    analyzed so that the planner knows its size. The block runs in a transaction (or
+    a savepoint, if one is already open), and the table is dropped when it exits.
+
+    Small batches don't need a table, and None is yielded instead, so that the
+    query can use `ids_filter` either way. None is also yielded when the table can't
+    be made, because the server is a hot standby (e.g. for `cursor(readonly=True)`)
+    or the transaction is read-only.
+
+    :param cursor: The database cursor.
+    :param ids: The ids to load.
+
+    :return: A context manager that yields the table name, or None.
+    """
+    if not is_large_batch(ids):
+        yield None
+        return
+
+    table = _temp_table_name()
+    create, copy, analyze, drop = _temp_id_table_statements(table)
+    connection = cursor.connection
+    with connection.transaction():
+        with connection.cursor(row_factory=tuple_row) as temp_cursor:
+            temp_cursor.execute(_READ_ONLY_QUERY)
+            read_only = temp_cursor.fetchone()[0]
+            if not read_only:
+                temp_cursor.execute(create)
+                with temp_cursor.copy(copy) as copier:
+                    for id_ in dict.fromkeys(ids):
+                        copier.write_row((id_,))
+                temp_cursor.execute(analyze)
+        if read_only:
+            yield None
+            return
+        yield table
+        with connection.cursor() as temp_cursor:
+            temp_cursor.execute(drop)
+
+
+@asynccontextmanager
+async def async_temp_id_table(
+    cursor: AsyncCursor, ids: Sequence[str]
+) -> AsyncIterator[Optional[sql.Identifier]]:
+    """Load a large batch of ids into an indexed temp table for a query to join on.
+
+    See `temp_id_table` for details.
+
+    :param cursor: An async database cursor.
+    :param ids: The ids to load.
+
+    :return: An async context manager that yields the table name, or None.
+    """
+    if not is_large_batch(ids):
+        yield None
+        return
+
+    table = _temp_table_name()
+    create, copy, analyze, drop = _temp_id_table_statements(table)
+    connection = cursor.connection
+    async with connection.transaction():
+        async with connection.cursor(row_factory=tuple_row) as temp_cursor:
+            await temp_cursor.execute(_READ_ONLY_QUERY)
+            read_only = (await temp_cursor.fetchone())[0]
+            if not read_only:
+                await temp_cursor.execute(create)
+                async with temp_cursor.copy(copy) as copier:
+                    for id_ in dict.fromkeys(ids):
+                        await copier.write_row((id_,))
+                await temp_cursor.execute(analyze)
+        if read_only:
+            yield None
+            return
+        yield table
+        async with connection.cursor() as temp_cursor:
+            await temp_cursor.execute(drop)
+
+
+# The connections with an open `transaction` block in the current context, whose
+# commits are deferred to the end of that block.
+_deferred_commits: ContextVar[Tuple[Union[Connection, AsyncConnection], ...]] = (
+    ContextVar("gwdb_deferred_commits", default=())
+)
+
+
+def commits_deferred(cursor: Union[Cursor, AsyncCursor]) -> bool:
+    """Check whether the cursor's connection is inside a `transaction` block.
+
+    :param cursor: The database cursor.
+
+    :return: True if the connection's commits are deferred.
+    """
+    return any(conn is cursor.connection for conn in _deferred_commits.get())
+
+
+def commit(cursor: Cursor) -> None:
+    """Commit the cursor's connection, unless a `transaction` block defers it.
+
+    :param cursor: The database cursor.
+    """
+    if not commits_deferred(cursor):
+        cursor.connection.commit()
+
+
+@contextmanager
+def _deferring_commits(connection: Union[Connection, AsyncConnection]) -> Iterator:
+    """Defer the connection's commits for the duration of the block."""
+    token = _deferred_commits.set(_deferred_commits.get() + (connection,))
+    try:
+        yield
+    finally:
+        _deferred_commits.reset(token)
+
+
+@contextmanager
+def transaction(cursor: Cursor) -> Iterator[Cursor]:
+    """Run a multi-step write workflow as a single unit of work.
+
+    The functions in this package that commit on their own (e.g.
+    `geneset_value.insert_file`) skip their commit inside the block, and the
+    connection is committed once when the block exits, or rolled back if it raises.
+    Nested blocks run in a savepoint and leave the commit to the outermost block.
+
+    :param cursor: The database cursor.
+
+    :return: A context manager that yields the cursor.
+    """
+    connection = cursor.connection
+    if commits_deferred(cursor):
+        with connection.transaction():
+            yield cursor
+        return
+
+    with _deferring_commits(connection), connection.transaction():
+        yield cursor
+    # A block opened inside an already started transaction only gets a savepoint.
+    if connection.info.transaction_status == TransactionStatus.INTRANS:
+        connection.commit()
+
+
+@asynccontextmanager
+async def async_transaction(cursor: AsyncCursor) -> AsyncIterator[AsyncCursor]:
+    """Run a multi-step write workflow as a single unit of work.
+
+    See `transaction` for details.
+
+    :param cursor: An async database cursor.
+
+    :return: An async context manager that yields the cursor.
+    """
+    connection = cursor.connection
+    if commits_deferred(cursor):
+        async with connection.transaction():
+            yield cursor
+        return
+
+    with _deferring_commits(connection):
+        async with connection.transaction():
+            yield cursor
+    if connection.info.transaction_status == TransactionStatus.INTRANS:
+        await connection.commit()
+
+
 def format_sql_fields(
     fields_map: dict,
     query_table: Optional[str] = None,
@@ -93,15 +424,171 @@ def format_sql_fields(
     ]
 
 
+class LazySQLFields(Sequence):
+    """A list of formatted SQL fields that is only built the first time it is used.
+
+    This keeps `format_sql_fields` out of module import time for the field lists that
+    the query modules define as constants. It can be used anywhere the formatted list
+    could be, e.g. `SQL(",").join(FIELDS)` or `FIELDS + OTHER_FIELDS`.
+    """
+
+    def __init__(
+        self,
+        fields_map: dict,
+        query_table: Optional[str] = None,
+        resp_prefix: Optional[str] = None,
+    ) -> None:
+        """Store the arguments for `format_sql_fields`, without formatting yet."""
+        self._args = (fields_map, query_table, resp_prefix)
+        self._fields: Optional[List[sql.Composed]] = None
+
+    @property
+    def fields(self) -> List[sql.Composed]:
+        """Get the formatted SQL fields, formatting them on first use."""
+        if self._fields is None:
+            self._fields = format_sql_fields(*self._args)
+        return self._fields
+
+    def __getitem__(self, index):
+        return self.fields[index]
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __add__(self, other) -> List[sql.Composed]:
+        return self.fields + list(other)
+
+    def __radd__(self, other) -> List[sql.Composed]:
+        return list(other) + self.fields
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, LazySQLFields)):
+            return self.fields == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazySQLFields({self.fields!r})"
+
+
 def limit_and_offset(
     query: sql.Composed,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    params: Optional[dict] = None,
 ) -> sql.Composed:
-    """Format SQL limit and offset clauses."""
+    """Format SQL limit and offset clauses.
+
+    When `params` is given, the limit and offset are added to it and bound as the
+    `limit` and `offset` query parameters, so the text of the query (and the plan the
+    server caches for it) doesn't change with their values. Otherwise, they are
+    rendered into the query as literals.
+
+    :param query: The query to add the clauses to.
+    :param limit: The maximum number of rows to return.
+    :param offset: The number of rows to skip.
+    :param params: The query parameters to bind the limit and offset to.
+
+    :return: The query with the limit and offset clauses.
+    """
+    if params is not None:
+        bind_limit_and_offset(params, limit, offset)
+        if limit is not None:
+            query = query + sql.SQL("LIMIT %(limit)s")
+        if offset is not None:
+            query = query + sql.SQL("OFFSET %(offset)s")
+        return query
+
     if limit is not None:
         query = query + sql.SQL("LIMIT {limit}").format(limit=limit)
     if offset is not None:
         query = query + sql.SQL("OFFSET {offset}").format(offset=offset)
 
     return query
+
+
+def bind_limit_and_offset(
+    params: dict, limit: Optional[int] = None, offset: Optional[int] = None
+) -> dict:
+    """Add the limit and offset query parameters used by `limit_and_offset`.
+
+    :param params: The query parameters to add to.
+    :param limit: The maximum number of rows to return.
+    :param offset: The number of rows to skip.
+
+    :return: The query parameters.
+    """
+    if limit is not None:
+        params["limit"] = limit
+    if offset is not None:
+        params["offset"] = offset
+    return params
+
+
+class Page(NamedTuple):
+    """A page of a listing that is paged with keyset pagination.
+
+    :param rows: The rows of the page.
+    :param next_page_token: The token to pass to get the next page, or None if this
+    is the last page.
+    """
+
+    rows: List[Row]
+    next_page_token: Optional[str]
+
+
+def keyset_page(rows: List[Row], keyset: Keyset, limit: Optional[int]) -> Page:
+    """Create the page of a listing from its rows.
+
+    :param rows: The rows of the page, sorted by the keyset.
+    :param keyset: The sort key of the listing.
+    :param limit: The page size that was requested. A page with fewer rows is the
+    last page.
+
+    :return: The page, with the token of its last row if it is full.
+    """
+    if limit is None or not rows or len(rows) < limit:
+        return Page(rows, None)
+    last = rows[-1]
+    return Page(
+        rows,
+        encode_page_token(
+            [
+                row_value(last, field, index)
+                for field, index in zip(keyset.fields, keyset.indexes)
+            ]
+        ),
+    )
+
+
+class RowsWithTotal(NamedTuple):
+    """The rows of a listing, along with the number of rows that match it in total.
+
+    :param rows: The rows of the listing (after its limit and offset).
+    :param total: The number of rows that match the listing, ignoring its limit and
+    offset, or None if it isn't known (an empty page past the end of the listing).
+    """
+
+    rows: List[Row]
+    total: Optional[int]
+
+
+def _without_total(row: Row) -> Row:
+    """Remove the `total_count` field (the last column) from a row."""
+    if isinstance(row, Mapping):
+        return {key: value for key, value in row.items() if key != TOTAL_COUNT_FIELD}
+    return row[:-1]
+
+
+def split_total(rows: List[Row], offset: Optional[int] = None) -> RowsWithTotal:
+    """Take the `total_count_field` of a listing out of its rows.
+
+    :param rows: The rows of the listing, which end with the `total_count` field.
+    :param offset: The offset of the listing. When a page past the end is empty,
+    there is no row to read the total from, and it is reported as None.
+
+    :return: The rows, without the field, and the total.
+    """
+    if not rows:
+        return RowsWithTotal([], None if offset else 0)
+    total = row_value(rows[0], TOTAL_COUNT_FIELD, -1)
+    return RowsWithTotal([_without_total(row) for row in rows], total)
@@ -0,0 +1 @@
+"""Test the in-process result caches."""
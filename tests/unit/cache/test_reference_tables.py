@@ -0,0 +1,167 @@
+"""Test the reference table cache and the functions it serves."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db import gene, ontology, species
+from geneweaver.db.aio import gene as async_gene
+from geneweaver.db.aio import ontology as async_ontology
+from geneweaver.db.aio import species as async_species
+from geneweaver.db.cache import (
+    ReferenceTable,
+    invalidate_all,
+    reference_tables_usable,
+    reload_reference_tables,
+)
+from psycopg import AsyncCursor, Cursor
+from psycopg.rows import dict_row, namedtuple_row, tuple_row
+
+GENEDB_COLUMNS = ["gdb_id", "gdb_name", "sp_id"]
+GENEDB_ROWS = [(2, "Ensembl Gene", 0), (7, "Gene Symbol", 0), (10, "MGI", 1)]
+
+SPECIES_COLUMNS = ["id", "name", "taxonomic_id", "reference_gene_identifier"]
+SPECIES_ROWS = [(1, "Mus musculus", 10090, 10), (2, "Homo sapiens", 9606, 11)]
+
+ONTOLOGY_DB_COLUMNS = ["ontology_db_id", "name", "prefix", "url"]
+ONTOLOGY_DB_ROWS = [(n, f"onto {n}", f"O{n}", None) for n in range(1, 6)]
+
+
+def table_cursor(columns, rows, row_factory=tuple_row) -> MagicMock:
+    """Create a mock cursor that returns a whole table."""
+    cursor = MagicMock(spec=Cursor)
+    cursor.row_factory = row_factory
+    cursor.description = [SimpleNamespace(name=column) for column in columns]
+    if row_factory is dict_row:
+        rows = [dict(zip(columns, row)) for row in rows]
+    cursor.fetchall.return_value = rows
+    return cursor
+
+
+def async_table_cursor(columns, rows, row_factory=tuple_row) -> AsyncMock:
+    """Create a mock async cursor that returns a whole table."""
+    cursor = AsyncMock(spec=AsyncCursor)
+    cursor.row_factory = row_factory
+    cursor.description = [SimpleNamespace(name=column) for column in columns]
+    cursor.fetchall.return_value = rows
+    return cursor
+
+
+def test_reference_table_lookup_and_rows():
+    """Test the index and the rows built for each row factory."""
+    table = ReferenceTable(GENEDB_COLUMNS, GENEDB_ROWS, indexes=["gdb_id"])
+    assert table.lookup("gdb_id", 7) == ((7, "Gene Symbol", 0),)
+    assert table.lookup("gdb_id", 99) == ()
+    assert table.rows(dict_row, table.lookup("gdb_id", 7), ["gdb_id"]) == [
+        {"gdb_id": 7}
+    ]
+    assert table.rows(tuple_row) == GENEDB_ROWS
+
+
+def test_reference_table_rows_are_copies():
+    """Test that callers can't change the cached rows."""
+    table = ReferenceTable(GENEDB_COLUMNS, GENEDB_ROWS)
+    table.rows(dict_row)[0]["gdb_id"] = 1000
+    assert table.rows(dict_row)[0]["gdb_id"] == 2
+
+
+def test_reference_tables_usable():
+    """Test that only dict and tuple rows are served from the cache."""
+    assert reference_tables_usable(SimpleNamespace(row_factory=dict_row))
+    assert reference_tables_usable(SimpleNamespace(row_factory=tuple_row))
+    assert not reference_tables_usable(SimpleNamespace(row_factory=namedtuple_row))
+    assert not reference_tables_usable(MagicMock(spec=Cursor))
+
+
+@pytest.mark.parametrize("row_factory", [dict_row, tuple_row])
+def test_gene_database_functions_share_one_load(row_factory):
+    """Test that the genedb table is loaded once, and served from memory after."""
+    cursor = table_cursor(GENEDB_COLUMNS, GENEDB_ROWS, row_factory)
+    all_rows = gene.id_types(cursor)
+    assert len(all_rows) == 3
+    assert gene.id_types(cursor, Species.MUS_MUSCULUS) == all_rows
+    assert len(gene.id_types(cursor, Species.HOMO_SAPIENS)) == 2
+    by_id = gene.gene_database_by_id(cursor, GeneIdentifier.GENE_SYMBOL)
+    assert by_id == [all_rows[1]]
+    by_name = gene.gene_database_id(cursor, GeneIdentifier.GENE_SYMBOL)
+    assert by_name == ([{"gdb_id": 7}] if row_factory is dict_row else [(7,)])
+    assert cursor.execute.call_count == 1
+
+
+async def test_async_functions_share_the_sync_cache():
+    """Test that the aio functions use the tables loaded by the sync ones."""
+    gene.id_types(table_cursor(GENEDB_COLUMNS, GENEDB_ROWS))
+    async_cursor = async_table_cursor(GENEDB_COLUMNS, [])
+    assert await async_gene.id_types(async_cursor) == GENEDB_ROWS
+    assert await async_gene.gene_database_by_id(async_cursor, GeneIdentifier.MGI) == [
+        (10, "MGI", 1)
+    ]
+    assert await async_gene.gene_database_id(async_cursor, GeneIdentifier.MGI) == [
+        (10,)
+    ]
+    async_cursor.execute.assert_not_called()
+
+
+def test_species_functions():
+    """Test that species lookups are served from the cached table."""
+    cursor = table_cursor(SPECIES_COLUMNS, SPECIES_ROWS)
+    assert species.get(cursor) == SPECIES_ROWS
+    assert species.get(cursor, taxonomic_id=9606) == [SPECIES_ROWS[1]]
+    assert species.get(cursor, reference_gene_db_id=GeneIdentifier.MGI) == [
+        SPECIES_ROWS[0]
+    ]
+    assert species.get(cursor, 9606, species=Species.MUS_MUSCULUS) == []
+    assert species.get_by_id(cursor, Species.HOMO_SAPIENS) == SPECIES_ROWS[1]
+    assert species.get_by_id(cursor, Species.RATTUS_NORVEGICUS) is None
+    assert cursor.execute.call_count == 1
+
+
+async def test_async_species_functions():
+    """Test the async species lookups."""
+    cursor = async_table_cursor(SPECIES_COLUMNS, SPECIES_ROWS)
+    assert await async_species.get(cursor, taxonomic_id=10090) == [SPECIES_ROWS[0]]
+    assert await async_species.get_by_id(cursor, Species.MUS_MUSCULUS) == (
+        SPECIES_ROWS[0]
+    )
+    assert cursor.execute.await_count == 1
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [
+        ({}, ONTOLOGY_DB_ROWS),
+        ({"ontology_db_id": 3}, ONTOLOGY_DB_ROWS[2:3]),
+        ({"limit": 2}, ONTOLOGY_DB_ROWS[:2]),
+        ({"limit": 2, "offset": 2}, ONTOLOGY_DB_ROWS[2:4]),
+        ({"offset": 4}, ONTOLOGY_DB_ROWS[4:]),
+        ({"ontology_db_id": 3, "offset": 1}, []),
+    ],
+)
+async def test_ontology_dbs(kwargs, expected):
+    """Test that the ontology databases are filtered and paged in memory."""
+    cursor = table_cursor(ONTOLOGY_DB_COLUMNS, ONTOLOGY_DB_ROWS)
+    assert ontology.get_ontology_dbs(cursor, **kwargs) == expected
+    async_cursor = async_table_cursor(ONTOLOGY_DB_COLUMNS, [])
+    assert await async_ontology.get_ontology_dbs(async_cursor, **kwargs) == expected
+    async_cursor.execute.assert_not_called()
+
+
+@pytest.mark.parametrize("reload", [reload_reference_tables, invalidate_all])
+def test_reload(reload):
+    """Test that the tables are loaded again after a reload."""
+    cursor = table_cursor(GENEDB_COLUMNS, GENEDB_ROWS)
+    gene.id_types(cursor)
+    reload()
+    cursor.fetchall.return_value = GENEDB_ROWS[:1]
+    assert gene.id_types(cursor) == GENEDB_ROWS[:1]
+    assert cursor.execute.call_count == 2
+
+
+def test_other_row_factories_query_the_database():
+    """Test that cursors with other row factories aren't served from the cache."""
+    cursor = table_cursor(GENEDB_COLUMNS, GENEDB_ROWS)
+    gene.id_types(cursor)
+    other = table_cursor(GENEDB_COLUMNS, ["row"], namedtuple_row)
+    assert gene.id_types(other) == ["row"]
+    assert "ORDER BY gdb_id" in other.execute.call_args[0][0]
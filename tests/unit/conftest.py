@@ -1,9 +1,11 @@
 """Fixtures for all db unit tests."""
 
 import random
+from typing import Iterator
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from geneweaver.db.cache import reload_reference_tables
 from psycopg import AsyncCursor, Cursor
 
 from tests.unit.const import (
@@ -25,6 +27,14 @@ def base_psycopg_errors(request):
     return request.param
 
 
+@pytest.fixture(autouse=True)
+def _clear_reference_tables() -> Iterator[None]:
+    """Start each test without any cached reference tables."""
+    reload_reference_tables()
+    yield
+    reload_reference_tables()
+
+
 # We want random but repeatable tests.
 random.seed(0)
 
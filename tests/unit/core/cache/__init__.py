@@ -0,0 +1 @@
+"""Test the core LRU cache."""
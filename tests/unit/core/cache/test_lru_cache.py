@@ -0,0 +1,93 @@
+"""Test the LRUCache class."""
+
+from geneweaver.db.core.cache import LRUCache
+
+
+class FakeTimer:
+    """A clock that only moves when told to."""
+
+    def __init__(self) -> None:  # noqa: ANN101
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:  # noqa: ANN101
+        """Get the current time."""
+        return self.now
+
+
+def test_get_and_set():
+    """Test that stored values can be read back."""
+    cache = LRUCache(10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "default") == "default"
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 1
+
+
+def test_least_recently_used_is_evicted():
+    """Test that the least recently used value is evicted first."""
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_values_expire_after_ttl():
+    """Test that values are treated as misses once they have expired."""
+    timer = FakeTimer()
+    cache = LRUCache(10, ttl=5, timer=timer)
+    cache.set("a", 1)
+    timer.now = 4.9
+    assert cache.get("a") == 1
+    timer.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_get_many_keeps_order_and_dedupes():
+    """Test that get_many returns the missing keys once each, in input order."""
+    cache = LRUCache(10)
+    cache.set_many({"b": 2, "d": 4})
+    found, missing = cache.get_many(["e", "b", "a", "e", "d", "c"])
+    assert found == {"b": 2, "d": 4}
+    assert missing == ["e", "a", "c"]
+
+
+def test_stats():
+    """Test the hit and miss counters."""
+    cache = LRUCache(10)
+    assert cache.stats()["hit_rate"] == 0.0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats() == {
+        "hits": 3,
+        "misses": 1,
+        "hit_rate": 0.75,
+        "evictions": 0,
+        "size": 1,
+    }
+    cache.reset_stats()
+    assert cache.stats()["hits"] == 0
+
+
+def test_invalidate_and_clear():
+    """Test that values can be removed from the cache."""
+    cache = LRUCache(10)
+    cache.set_many({"a": 1, "b": 2})
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert "a" not in cache
+    assert "b" in cache
+    cache.clear()
+    assert len(cache) == 0
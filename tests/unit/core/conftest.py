@@ -1,12 +1,21 @@
 """Fixtures for the core module unit tests."""
 
+from typing import Iterator
+
 import pytest
+from geneweaver.db.core.settings import get_settings
 
 
 @pytest.fixture()
-def _monkeypatch_settings_env(monkeypatch) -> None:
-    """Monkeypatch the environment variables used by the settings.config module."""
+def _monkeypatch_settings_env(monkeypatch) -> Iterator[None]:
+    """Monkeypatch the environment variables used by the settings.config module.
+
+    The global settings object is re-created from these variables for each test.
+    """
     monkeypatch.setenv("GWDB_USERNAME", "test_username")
     monkeypatch.setenv("GWDB_PASSWORD", "test_password")
     monkeypatch.setenv("GWDB_NAME", "test_db_name")
     monkeypatch.setenv("GWDB_SERVER", "test_host")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
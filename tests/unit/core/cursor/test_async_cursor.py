@@ -1,12 +1,13 @@
 """Test the async convenience cursor context manager."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from psycopg.cursor_async import AsyncCursor
 
 
-@patch("geneweaver.db.core.cursor.settings.URI", "test_uri")
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", False)
+@patch("geneweaver.db.core.settings.settings.URI", "test_uri")
 @patch("geneweaver.db.core.cursor.psycopg.AsyncConnection.connect")
 @pytest.mark.usefixtures("_monkeypatch_settings_env")
 async def test_async_cursor(mock_connect):
@@ -26,3 +27,79 @@ async def test_async_cursor(mock_connect):
 
     assert mock_connection.cursor.called is True
     assert mock_connection.cursor.call_args[0] == ()
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.cursor.psycopg.AsyncConnection.connect")
+@patch("geneweaver.db.core.cursor.get_async_pool", new_callable=AsyncMock)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+async def test_async_cursor_uses_pool(mock_get_async_pool, mock_connect):
+    """Test the async cursor context manager draws connections from the pool."""
+    from geneweaver.db.core.cursor import async_cursor
+
+    mock_pool = MagicMock()
+    mock_connection = MagicMock()
+    mock_cursor = MagicMock(spec=AsyncCursor)
+    mock_get_async_pool.return_value = mock_pool
+    mock_pool.connection.return_value.__aenter__.return_value = mock_connection
+    mock_connection.cursor.return_value.__aenter__.return_value = mock_cursor
+
+    async with async_cursor() as cursor_:
+        assert mock_cursor == cursor_
+
+    assert mock_get_async_pool.await_count == 1
+    assert mock_pool.connection.called is True
+    assert mock_pool.connection.return_value.__aexit__.called is True
+    assert mock_connect.called is False
+
+
+@pytest.mark.parametrize("usable", [True, False])
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.settings.settings.REPLICA_URIS", ["replica_uri"])
+@patch("geneweaver.db.core.cursor.get_async_pool", new_callable=AsyncMock)
+@patch("geneweaver.db.core.cursor.async_replica_connection")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+async def test_readonly_async_cursor(
+    mock_replica_connection, mock_get_async_pool, usable
+):
+    """Test that readonly async cursors prefer a replica, then the primary."""
+    from geneweaver.db.core.cursor import async_cursor
+
+    replica_connection = MagicMock()
+    replica_cursor = MagicMock(spec=AsyncCursor)
+    replica_connection.cursor.return_value.__aenter__.return_value = replica_cursor
+    mock_replica_connection.return_value.__aenter__.return_value = (
+        replica_connection if usable else None
+    )
+    primary_cursor = MagicMock(spec=AsyncCursor)
+    primary_connection = MagicMock()
+    mock_get_async_pool.return_value = MagicMock()
+    pool_connection = mock_get_async_pool.return_value.connection.return_value
+    pool_connection.__aenter__.return_value = primary_connection
+    primary_connection.cursor.return_value.__aenter__.return_value = primary_cursor
+
+    async with async_cursor(readonly=True) as cursor_:
+        assert cursor_ == (replica_cursor if usable else primary_cursor)
+
+    assert mock_get_async_pool.await_count == (0 if usable else 1)
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.cursor.async_statement_timeout")
+@patch("geneweaver.db.core.cursor.get_async_pool", new_callable=AsyncMock)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+async def test_async_cursor_deadline(mock_get_async_pool, mock_statement_timeout):
+    """Test that the deadline is applied to the async cursor."""
+    from geneweaver.db.core.cursor import async_cursor
+
+    mock_pool = MagicMock()
+    mock_connection = MagicMock()
+    mock_cursor = MagicMock(spec=AsyncCursor)
+    mock_get_async_pool.return_value = mock_pool
+    mock_pool.connection.return_value.__aenter__.return_value = mock_connection
+    mock_connection.cursor.return_value.__aenter__.return_value = mock_cursor
+
+    async with async_cursor(deadline=2.5):
+        pass
+
+    mock_statement_timeout.assert_called_once_with(mock_cursor, 2.5)
@@ -5,7 +5,8 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 
-@patch("geneweaver.db.core.cursor.settings.URI", "test_uri")
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", False)
+@patch("geneweaver.db.core.settings.settings.URI", "test_uri")
 @patch("geneweaver.db.core.cursor.psycopg.connect")
 @pytest.mark.usefixtures("_monkeypatch_settings_env")
 def test_cursor(mock_connect):
@@ -25,3 +26,84 @@ def test_cursor(mock_connect):
 
     assert mock_connection.cursor.called is True
     assert mock_connection.cursor.call_args[0] == ()
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.cursor.psycopg.connect")
+@patch("geneweaver.db.core.cursor.get_pool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_cursor_uses_pool(mock_get_pool, mock_connect):
+    """Test the cursor context manager draws connections from the pool."""
+    from geneweaver.db.core.cursor import cursor
+
+    mock_connection = MagicMock()
+    mock_cursor = MagicMock()
+    mock_pool = mock_get_pool.return_value
+    mock_pool.connection.return_value.__enter__.return_value = mock_connection
+    mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+
+    with cursor() as cursor_:
+        assert mock_cursor == cursor_
+
+    assert mock_pool.connection.called is True
+    assert mock_pool.connection.return_value.__exit__.called is True
+    assert mock_connect.called is False
+
+
+@patch("geneweaver.db.core.settings.settings.REPLICA_URIS", ["replica_uri"])
+@patch("geneweaver.db.core.cursor.get_pool")
+@patch("geneweaver.db.core.cursor.replica_connection")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_readonly_cursor_uses_replica(mock_replica_connection, mock_get_pool):
+    """Test that readonly cursors use a replica connection when one is usable."""
+    from geneweaver.db.core.cursor import cursor
+
+    mock_connection = mock_replica_connection.return_value.__enter__.return_value
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+    with cursor(readonly=True) as cursor_:
+        assert cursor_ == mock_cursor
+
+    assert mock_get_pool.called is False
+
+
+@pytest.mark.parametrize("replica_uris", [[], ["replica_uri"]])
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.cursor.get_pool")
+@patch("geneweaver.db.core.cursor.replica_connection")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_readonly_cursor_falls_back_to_primary(
+    mock_replica_connection, mock_get_pool, replica_uris
+):
+    """Test that readonly cursors use the primary when no replica is usable."""
+    from geneweaver.db.core.cursor import cursor
+
+    mock_replica_connection.return_value.__enter__.return_value = None
+    mock_connection = mock_get_pool.return_value.connection.return_value.__enter__()
+    mock_cursor = mock_connection.cursor.return_value.__enter__.return_value
+
+    with patch("geneweaver.db.core.settings.settings.REPLICA_URIS", replica_uris):
+        with cursor(readonly=True) as cursor_:
+            assert cursor_ == mock_cursor
+
+    assert mock_replica_connection.called is bool(replica_uris)
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.cursor.statement_timeout")
+@patch("geneweaver.db.core.cursor.get_pool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_cursor_deadline(mock_get_pool, mock_statement_timeout):
+    """Test that the deadline is applied to the cursor."""
+    from geneweaver.db.core.cursor import cursor
+
+    mock_connection = MagicMock()
+    mock_cursor = MagicMock()
+    mock_pool = mock_get_pool.return_value
+    mock_pool.connection.return_value.__enter__.return_value = mock_connection
+    mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+
+    with cursor(deadline=2.5):
+        pass
+
+    mock_statement_timeout.assert_called_once_with(mock_cursor, 2.5)
@@ -5,7 +5,8 @@ from unittest.mock import patch
 import pytest
 
 
-@patch("geneweaver.db.core.cursor.settings.URI", "test_uri")
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", False)
+@patch("geneweaver.db.core.settings.settings.URI", "test_uri")
 @patch("geneweaver.db.core.cursor.psycopg.connect")
 @pytest.mark.usefixtures("_monkeypatch_settings_env")
 def test_make_connection(mock_connect):
@@ -19,3 +20,20 @@ def test_make_connection(mock_connect):
     assert mock_connect.called is True
     assert mock_connect.call_args[0][0] == "test_uri"
     assert connection == "test_connection"
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", True)
+@patch("geneweaver.db.core.cursor.psycopg.connect")
+@patch("geneweaver.db.core.cursor.get_connection")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_make_connection_uses_pool(mock_get_connection, mock_connect):
+    """Test the make_connection function checks connections out of the pool."""
+    from geneweaver.db.core.cursor import make_connection
+
+    mock_get_connection.return_value = "test_pooled_connection"
+
+    connection = make_connection()
+
+    assert mock_get_connection.called is True
+    assert mock_connect.called is False
+    assert connection == "test_pooled_connection"
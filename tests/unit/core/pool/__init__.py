@@ -0,0 +1 @@
+"""Tests for the connection pool module."""
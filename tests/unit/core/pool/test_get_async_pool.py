@@ -0,0 +1,140 @@
+"""Test the event loop bound async connection pool factory."""
+
+import asyncio
+from typing import Iterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture()
+def _reset_async_pools() -> Iterator[None]:
+    """Make sure each test starts and ends without any async pools."""
+    from geneweaver.db.core import pool
+
+    pool._async_pools.clear()
+    pool._async_replica_pools.clear()
+    yield
+    pool._async_pools.clear()
+    pool._async_replica_pools.clear()
+
+
+def _mock_pool_class() -> MagicMock:
+    """Create a mock AsyncConnectionPool class that creates closed pools."""
+    mock_pool_class = MagicMock()
+    mock_pool_class.return_value.closed = True
+    mock_pool_class.return_value.open = AsyncMock()
+    mock_pool_class.return_value.close = AsyncMock()
+    mock_pool_class.return_value.wait = AsyncMock()
+    return mock_pool_class
+
+
+@patch("geneweaver.db.core.settings.settings.URI", "test_uri")
+@patch("geneweaver.db.core.settings.settings.ASYNC_POOL_MIN_SIZE", 2)
+@patch("geneweaver.db.core.settings.settings.ASYNC_POOL_MAX_SIZE", 5)
+@patch("geneweaver.db.core.settings.settings.ASYNC_POOL_MAX_WAITING", 7)
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_async_pools")
+async def test_get_async_pool_uses_settings():
+    """Test that the async pool is configured from the settings object."""
+    from geneweaver.db.core.pool import get_async_pool
+
+    mock_pool_class = _mock_pool_class()
+    with patch("geneweaver.db.core.pool.AsyncConnectionPool", mock_pool_class):
+        pool = await get_async_pool()
+
+    assert pool == mock_pool_class.return_value
+    assert mock_pool_class.call_args[0][0] == "test_uri"
+    kwargs = mock_pool_class.call_args[1]
+    assert kwargs["min_size"] == 2
+    assert kwargs["max_size"] == 5
+    assert kwargs["max_waiting"] == 7
+    assert kwargs["open"] is False
+    assert pool.open.await_count == 1
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_async_pools")
+async def test_get_async_pool_is_reused_on_the_same_loop():
+    """Test that the same pool is shared within an event loop."""
+    from geneweaver.db.core.pool import get_async_pool
+
+    mock_pool_class = _mock_pool_class()
+    with patch("geneweaver.db.core.pool.AsyncConnectionPool", mock_pool_class):
+        first = await get_async_pool()
+        first.closed = False
+        second = await get_async_pool()
+
+    assert first is second
+    assert mock_pool_class.call_count == 1
+    assert first.open.await_count == 1
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_async_pools")
+def test_get_async_pool_is_bound_to_the_event_loop():
+    """Test that each event loop gets its own pool."""
+    from geneweaver.db.core.pool import get_async_pool
+
+    mock_pool_class = MagicMock(side_effect=lambda *a, **kw: _mock_pool_class()())
+    with patch("geneweaver.db.core.pool.AsyncConnectionPool", mock_pool_class):
+        first = asyncio.run(get_async_pool())
+        second = asyncio.run(get_async_pool())
+
+    assert first is not second
+    assert mock_pool_class.call_count == 2
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_async_pools")
+async def test_open_and_close_async_pool():
+    """Test the startup and shutdown hooks for the async pool."""
+    from geneweaver.db.core import pool as pool_module
+
+    mock_pool_class = _mock_pool_class()
+    with patch("geneweaver.db.core.pool.AsyncConnectionPool", mock_pool_class):
+        pool = await pool_module.open_async_pool()
+        assert pool.wait.await_count == 1
+
+        await pool_module.close_async_pool()
+        assert pool.close.await_count == 1
+        assert len(pool_module._async_pools) == 0
+
+        await pool_module.get_async_pool()
+        assert mock_pool_class.call_count == 2
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_async_pools")
+async def test_get_async_replica_pool():
+    """Test that each replica gets its own pool, which is closed with the others."""
+    from geneweaver.db.core import pool as pool_module
+
+    mock_pool_class = MagicMock(side_effect=lambda *a, **kw: _mock_pool_class()())
+    with patch("geneweaver.db.core.pool.AsyncConnectionPool", mock_pool_class):
+        first = await pool_module.get_async_replica_pool("postgresql://replica1")
+        first.closed = False
+        second = await pool_module.get_async_replica_pool("postgresql://replica2")
+
+        assert first is not second
+        assert (
+            await pool_module.get_async_replica_pool("postgresql://replica1") is first
+        )
+        assert mock_pool_class.call_count == 2
+        assert first.open.await_count == 1
+
+        await pool_module.close_async_pool()
+        assert first.close.await_count == 1
+        assert second.close.await_count == 1
+        assert len(pool_module._async_replica_pools) == 0
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_TIMEOUT", 30.0)
+@patch("geneweaver.db.core.settings.settings.REPLICA_CONNECT_TIMEOUT", 3.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_async_pools")
+async def test_get_async_replica_pool_uses_replica_connect_timeout():
+    """Test that an unreachable replica is given up on before `POOL_TIMEOUT`."""
+    from geneweaver.db.core.pool import get_async_replica_pool
+
+    mock_pool_class = _mock_pool_class()
+    with patch("geneweaver.db.core.pool.AsyncConnectionPool", mock_pool_class):
+        await get_async_replica_pool("postgresql://replica1")
+
+    kwargs = mock_pool_class.call_args[1]
+    assert kwargs["timeout"] == 3.0
+    assert kwargs["kwargs"] == {"connect_timeout": 3}
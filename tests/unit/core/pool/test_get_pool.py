@@ -0,0 +1,132 @@
+"""Test the process-wide connection pool factory."""
+
+from typing import Iterator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture()
+def _reset_pool() -> Iterator[None]:
+    """Make sure each test starts and ends without a pool."""
+    from geneweaver.db.core import pool
+
+    pool._pool = None
+    pool._replica_pools.clear()
+    yield
+    pool._pool = None
+    pool._replica_pools.clear()
+
+
+@patch("geneweaver.db.core.settings.settings.URI", "test_uri")
+@patch("geneweaver.db.core.settings.settings.POOL_MIN_SIZE", 2)
+@patch("geneweaver.db.core.settings.settings.POOL_MAX_SIZE", 5)
+@patch("geneweaver.db.core.settings.settings.POOL_MAX_IDLE", 10.0)
+@patch("geneweaver.db.core.settings.settings.POOL_MAX_LIFETIME", 20.0)
+@patch("geneweaver.db.core.settings.settings.POOL_TIMEOUT", 3.0)
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_get_pool_uses_settings(mock_pool_class):
+    """Test that the pool is configured from the settings object."""
+    from geneweaver.db.core.pool import PooledConnection, get_pool
+
+    pool = get_pool()
+
+    assert pool == mock_pool_class.return_value
+    assert mock_pool_class.call_args[0][0] == "test_uri"
+    kwargs = mock_pool_class.call_args[1]
+    assert kwargs["connection_class"] is PooledConnection
+    assert kwargs["min_size"] == 2
+    assert kwargs["max_size"] == 5
+    assert kwargs["max_idle"] == 10.0
+    assert kwargs["max_lifetime"] == 20.0
+    assert kwargs["timeout"] == 3.0
+    assert kwargs["kwargs"] == {}
+
+
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_get_pool_is_created_once(mock_pool_class):
+    """Test that the same pool is shared between calls."""
+    from geneweaver.db.core.pool import get_pool
+
+    assert get_pool() is get_pool()
+    assert mock_pool_class.call_count == 1
+
+
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_close_pool(mock_pool_class):
+    """Test that closing the pool allows a new one to be created."""
+    from geneweaver.db.core.pool import close_pool, get_pool
+
+    get_pool()
+    close_pool()
+
+    assert mock_pool_class.return_value.close.call_count == 1
+
+    get_pool()
+    assert mock_pool_class.call_count == 2
+
+
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_get_connection_marks_connection(mock_pool_class):
+    """Test that connections from get_connection return to the pool on close."""
+    from geneweaver.db.core.pool import get_connection
+
+    connection = get_connection()
+
+    assert connection == mock_pool_class.return_value.getconn.return_value
+    assert connection._release_on_close is True
+
+
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_get_replica_pool(mock_pool_class):
+    """Test that each replica gets its own pool, created once."""
+    from geneweaver.db.core.pool import close_replica_pools, get_replica_pool
+
+    mock_pool_class.side_effect = lambda *args, **kwargs: MagicMock()
+
+    first = get_replica_pool("postgresql://replica1")
+    second = get_replica_pool("postgresql://replica2")
+
+    assert first is not second
+    assert get_replica_pool("postgresql://replica1") is first
+    assert mock_pool_class.call_count == 2
+    assert mock_pool_class.call_args_list[0][0][0] == "postgresql://replica1"
+
+    close_replica_pools()
+    assert first.close.call_count == 1
+    assert second.close.call_count == 1
+    assert get_replica_pool("postgresql://replica1") is not first
+
+
+@patch("geneweaver.db.core.settings.settings.POOL_TIMEOUT", 30.0)
+@patch("geneweaver.db.core.settings.settings.REPLICA_CONNECT_TIMEOUT", 1.5)
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_get_replica_pool_uses_replica_connect_timeout(mock_pool_class):
+    """Test that an unreachable replica is given up on before `POOL_TIMEOUT`."""
+    from geneweaver.db.core.pool import get_replica_pool
+
+    get_replica_pool("postgresql://replica1")
+
+    kwargs = mock_pool_class.call_args[1]
+    assert kwargs["timeout"] == 1.5
+    assert kwargs["kwargs"] == {"connect_timeout": 2}
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.5)
+@patch("geneweaver.db.core.pool.ConnectionPool")
+@pytest.mark.usefixtures("_monkeypatch_settings_env", "_reset_pool")
+def test_get_pool_logs_slow_queries(mock_pool_class):
+    """Test that pooled connections use the slow query cursor when configured."""
+    from geneweaver.db.core.pool import get_pool
+    from geneweaver.db.core.slow_query import SlowQueryCursor
+
+    get_pool()
+
+    kwargs = mock_pool_class.call_args[1]
+    assert kwargs["kwargs"] == {"cursor_factory": SlowQueryCursor}
@@ -0,0 +1,56 @@
+"""Test the pooled connection class."""
+
+from unittest.mock import MagicMock, patch
+
+import psycopg
+import pytest
+
+
+def _pooled_connection(release_on_close: bool) -> psycopg.Connection:
+    """Create a PooledConnection without connecting to a database."""
+    from geneweaver.db.core.pool import PooledConnection
+
+    connection = PooledConnection.__new__(PooledConnection)
+    connection._pool = MagicMock()
+    connection._release_on_close = release_on_close
+    return connection
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_close_returns_connection_to_pool():
+    """Test that a released connection is returned to its pool."""
+    connection = _pooled_connection(release_on_close=True)
+    pool = connection._pool
+
+    with patch("psycopg.Connection.close") as mock_close:
+        connection.close()
+
+    assert pool.putconn.call_args[0][0] is connection
+    assert connection._release_on_close is False
+    assert mock_close.called is False
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_close_without_release_closes_connection():
+    """Test that a connection not marked for release is really closed."""
+    connection = _pooled_connection(release_on_close=False)
+    pool = connection._pool
+
+    with patch("psycopg.Connection.close") as mock_close:
+        connection.close()
+
+    assert pool.putconn.called is False
+    assert mock_close.call_count == 1
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_exit_returns_connection_to_pool():
+    """Test that leaving a `with` block returns the connection to the pool."""
+    connection = _pooled_connection(release_on_close=True)
+    pool = connection._pool
+
+    with patch("psycopg.Connection.__exit__") as mock_exit:
+        connection.__exit__(None, None, None)
+
+    assert mock_exit.call_count == 1
+    assert pool.putconn.call_args[0][0] is connection
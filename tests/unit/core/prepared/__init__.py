@@ -0,0 +1 @@
+"""Tests for the prepared statement registry."""
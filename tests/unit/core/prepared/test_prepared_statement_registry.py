@@ -0,0 +1,97 @@
+"""Test the PreparedStatementRegistry class."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from geneweaver.db.core.prepared import PreparedStatementRegistry
+from psycopg import AsyncCursor, Connection, Cursor
+
+
+def _cursor(connection=None) -> MagicMock:
+    """Create a mock cursor on a (possibly shared) mock connection."""
+    cursor = MagicMock(spec=Cursor)
+    cursor.connection = connection or MagicMock(spec=Connection)
+    return cursor
+
+
+def test_disabled_registry_executes_plain_statements():
+    """Test that a disabled registry doesn't prepare or record anything."""
+    registry = PreparedStatementRegistry()
+    cursor = _cursor()
+
+    registry.execute(cursor, "gene.get", "SELECT 1", {"a": 1})
+
+    assert cursor.execute.call_args[0] == ("SELECT 1", {"a": 1})
+    assert cursor.execute.call_args[1] == {}
+    assert registry.stats() == {}
+
+
+def test_enabled_registry_prepares_statements():
+    """Test that an enabled registry asks psycopg to prepare the statement."""
+    registry = PreparedStatementRegistry()
+    registry.enable()
+    cursor = _cursor()
+
+    registry.execute(cursor, "gene.get", "SELECT 1", {"a": 1})
+
+    assert cursor.execute.call_args[0] == ("SELECT 1", {"a": 1})
+    assert cursor.execute.call_args[1] == {"prepare": True}
+
+
+def test_hits_and_misses_are_tracked_per_connection():
+    """Test that statements are counted as prepared once per connection."""
+    registry = PreparedStatementRegistry()
+    registry.enable()
+    first = _cursor()
+    second = _cursor()
+
+    registry.execute(first, "user.by_api_key", "SELECT 1", {"a": 1})
+    registry.execute(first, "user.by_api_key", "SELECT 1", {"a": 2})
+    registry.execute(_cursor(first.connection), "user.by_api_key", "SELECT 1", {})
+    registry.execute(second, "user.by_api_key", "SELECT 1", {"a": 3})
+
+    assert registry.stats() == {"user.by_api_key": {"hits": 2, "misses": 2}}
+
+
+def test_different_query_shapes_are_prepared_separately():
+    """Test that different SQL under the same name is a separate statement."""
+    registry = PreparedStatementRegistry()
+    registry.enable()
+    cursor = _cursor()
+
+    registry.execute(cursor, "gene.get", "SELECT * FROM gene WHERE a = %(a)s", {})
+    registry.execute(cursor, "gene.get", "SELECT * FROM gene WHERE a = %(a)s", {})
+    registry.execute(cursor, "gene.get", "SELECT * FROM gene WHERE b = %(b)s", {})
+
+    assert registry.stats() == {"gene.get": {"hits": 1, "misses": 2}}
+
+
+def test_reset_stats_and_disable():
+    """Test that stats can be reset and the registry disabled again."""
+    registry = PreparedStatementRegistry()
+    registry.enable()
+    registry.execute(_cursor(), "species.get", "SELECT 1", {})
+
+    registry.reset_stats()
+    registry.disable()
+    cursor = _cursor()
+    registry.execute(cursor, "species.get", "SELECT 1", {})
+
+    assert registry.stats() == {}
+    assert cursor.execute.call_args[1] == {}
+
+
+async def test_async_execute():
+    """Test that the async variant prepares statements and records stats."""
+    registry = PreparedStatementRegistry()
+    cursor = AsyncMock(spec=AsyncCursor)
+    cursor.connection = MagicMock()
+
+    await registry.async_execute(cursor, "gene.get", "SELECT 1", {})
+    assert cursor.execute.call_args[1] == {}
+
+    registry.enable()
+    await registry.async_execute(cursor, "gene.get", "SELECT 1", {})
+    await registry.async_execute(cursor, "gene.get", "SELECT 1", {})
+
+    assert cursor.execute.call_args[1] == {"prepare": True}
+    assert registry.stats() == {"gene.get": {"hits": 1, "misses": 1}}
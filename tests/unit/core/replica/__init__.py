@@ -0,0 +1 @@
+"""Tests for the read replica routing."""
@@ -0,0 +1,168 @@
+"""Test routing read-only connections to replicas (sync and async)."""
+
+from typing import Iterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import psycopg
+import pytest
+
+REPLICAS = ["postgresql://replica1", "postgresql://replica2"]
+
+
+@pytest.fixture()
+def _replicas(_monkeypatch_settings_env) -> Iterator[None]:
+    """Configure two replicas, and reset the routing state around each test."""
+    from geneweaver.db.core import replica
+    from geneweaver.db.core.settings import get_settings
+
+    replica.reset_checks()
+    settings = get_settings()
+    with patch.object(settings, "REPLICA_URIS", REPLICAS), patch.object(
+        settings, "POOL_ENABLED", True
+    ):
+        yield
+    replica.reset_checks()
+
+
+def _mock_lag_connection(lag: float) -> MagicMock:
+    """Create a mock connection that reports a replication lag."""
+    connection = MagicMock()
+    lag_cursor = connection.cursor.return_value.__enter__.return_value
+    lag_cursor.fetchone.return_value = (lag,)
+    return connection
+
+
+def _mock_async_lag_connection(lag: float) -> MagicMock:
+    """Create a mock async connection that reports a replication lag."""
+    connection = MagicMock()
+    lag_cursor = connection.cursor.return_value.__aenter__.return_value
+    lag_cursor.execute = AsyncMock()
+    lag_cursor.fetchone = AsyncMock(return_value=(lag,))
+    return connection
+
+
+@pytest.mark.usefixtures("_replicas")
+@patch("geneweaver.db.core.replica.get_replica_pool")
+def test_replica_connection_round_robin(mock_get_replica_pool):
+    """Test that connections alternate between the replicas."""
+    from geneweaver.db.core.replica import replica_connection
+
+    used = []
+    for _ in range(4):
+        with replica_connection() as connection:
+            assert connection is not None
+        used.append(mock_get_replica_pool.call_args[0][0])
+
+    assert used[0] != used[1]
+    assert used[0] == used[2]
+    assert used[1] == used[3]
+    assert set(used) == set(REPLICAS)
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_replica_connection_without_replicas():
+    """Test that None is yielded when no replicas are configured."""
+    from geneweaver.db.core.replica import replica_connection
+
+    with replica_connection() as connection:
+        assert connection is None
+
+
+@pytest.mark.usefixtures("_replicas")
+@patch("geneweaver.db.core.replica.get_replica_pool")
+def test_replica_connection_skips_unreachable_replicas(mock_get_replica_pool):
+    """Test that unreachable replicas are skipped until their next check."""
+    from geneweaver.db.core.replica import replica_connection
+
+    good = MagicMock()
+    bad = MagicMock()
+    bad.connection.return_value.__enter__.side_effect = psycopg.OperationalError()
+    mock_get_replica_pool.side_effect = lambda uri: bad if uri == REPLICAS[0] else good
+
+    for _ in range(4):
+        with replica_connection() as connection:
+            assert connection is good.connection.return_value.__enter__.return_value
+
+    assert bad.connection.call_count == 1
+
+
+@pytest.mark.usefixtures("_replicas")
+@pytest.mark.parametrize(("lag", "expected"), [(0.0, True), (1.5, True), (9.0, False)])
+@patch("geneweaver.db.core.settings.settings.REPLICA_MAX_LAG", 2.0)
+@patch("geneweaver.db.core.replica.get_replica_pool")
+def test_replica_connection_max_lag(mock_get_replica_pool, lag, expected):
+    """Test that lagging replicas are not used."""
+    from geneweaver.db.core.replica import replica_connection
+
+    connection = _mock_lag_connection(lag)
+    pool = mock_get_replica_pool.return_value
+    pool.connection.return_value.__enter__.return_value = connection
+
+    with replica_connection() as replica:
+        assert (replica is connection) is expected
+        assert (replica is None) is not expected
+
+    # Each replica is only checked once per check interval.
+    with replica_connection():
+        pass
+    assert connection.cursor.call_count == 2
+
+
+@pytest.mark.usefixtures("_replicas")
+@patch("geneweaver.db.core.settings.settings.REPLICA_MAX_LAG", None)
+@patch("geneweaver.db.core.replica.get_replica_pool")
+def test_replica_connection_no_lag_check_by_default(mock_get_replica_pool):
+    """Test that the replication lag isn't checked unless a maximum is set."""
+    from geneweaver.db.core.replica import replica_connection
+
+    with replica_connection() as connection:
+        assert connection.cursor.call_count == 0
+
+
+@pytest.mark.usefixtures("_replicas")
+@patch("geneweaver.db.core.settings.settings.POOL_ENABLED", False)
+@patch("geneweaver.db.core.replica.psycopg.connect")
+def test_replica_connection_without_pool(mock_connect):
+    """Test that replicas are connected to directly when pooling is disabled."""
+    from geneweaver.db.core.replica import replica_connection
+
+    with replica_connection() as connection:
+        assert connection is mock_connect.return_value.__enter__.return_value
+
+    assert mock_connect.call_args[0][0] in REPLICAS
+    assert mock_connect.call_args[1]["connect_timeout"] == 2
+
+
+@pytest.mark.usefixtures("_replicas")
+@pytest.mark.parametrize(("lag", "expected"), [(0.0, True), (9.0, False)])
+@patch("geneweaver.db.core.settings.settings.REPLICA_MAX_LAG", 2.0)
+@patch("geneweaver.db.core.replica.get_async_replica_pool", new_callable=AsyncMock)
+async def test_async_replica_connection(mock_get_pool, lag, expected):
+    """Test that async connections come from a replica that isn't lagging."""
+    from geneweaver.db.core.replica import async_replica_connection
+
+    connection = _mock_async_lag_connection(lag)
+    mock_get_pool.return_value = MagicMock()
+    mock_get_pool.return_value.connection.return_value.__aenter__.return_value = (
+        connection
+    )
+
+    async with async_replica_connection() as replica:
+        assert (replica is connection) is expected
+
+    assert mock_get_pool.await_count == (1 if expected else len(REPLICAS))
+
+
+@pytest.mark.usefixtures("_replicas")
+@patch("geneweaver.db.core.replica.get_async_replica_pool", new_callable=AsyncMock)
+async def test_async_replica_connection_skips_unreachable(mock_get_pool):
+    """Test that None is yielded when no async replica can be reached."""
+    from geneweaver.db.core.replica import async_replica_connection
+
+    pool = mock_get_pool.return_value = MagicMock()
+    pool.connection.return_value.__aenter__.side_effect = psycopg.OperationalError()
+
+    async with async_replica_connection() as replica:
+        assert replica is None
+
+    assert pool.connection.call_count == len(REPLICAS)
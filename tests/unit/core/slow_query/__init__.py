@@ -0,0 +1 @@
+"""Tests for the slow query log."""
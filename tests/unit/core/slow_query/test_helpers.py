@@ -0,0 +1,72 @@
+"""Test the helper functions of the slow query log."""
+
+from unittest.mock import patch
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.core.slow_query import builder_name, caller_name, param_shape
+from psycopg.sql import SQL
+
+
+@pytest.mark.parametrize(
+    ("params", "shape"),
+    [
+        (None, None),
+        ({"gs_id": 1}, {"gs_id": "int"}),
+        ({"name": "a", "ids": [1, 2, 3]}, {"name": "str", "ids": "list[int](len=3)"}),
+        ({"ids": ["a", 1]}, {"ids": "list[int|str](len=2)"}),
+        ({"ids": []}, {"ids": "list[](len=0)"}),
+        ((1, "a"), ["int", "str"]),
+    ],
+)
+def test_param_shape(params, shape):
+    """Test that parameter values are replaced by their shapes."""
+    assert param_shape(params) == shape
+
+
+def test_caller_name_finds_the_library_function(cursor):
+    """Test that the library function that ran a statement is found."""
+    from geneweaver.db import species
+
+    names = []
+    cursor.execute.side_effect = lambda *args, **kwargs: names.append(caller_name())
+
+    species.get(cursor)
+
+    assert names == ["species.get"]
+
+
+def test_builder_name_of_tagged_queries():
+    """Test that queries are tagged with the name of the builder that made them."""
+    from geneweaver.db.query import gene, geneset_value
+
+    assert builder_name(gene.symbols_by_project_id(1)[0]) == (
+        "query.gene.symbols_by_project_id"
+    )
+    query, _ = geneset_value.by_geneset_id_and_identifier(1, GeneIdentifier.ENTREZ)
+    assert builder_name(query) == "query.geneset_value.by_geneset_id_and_identifier"
+    assert builder_name(SQL("SELECT 1")) is None
+    assert builder_name("SELECT 1") is None
+
+
+def test_caller_name_outside_the_library():
+    """Test the name used for statements that don't come from the library."""
+    assert caller_name() == "<unknown>"
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_connect_kwargs():
+    """Test that the cursor classes are only used when a threshold is set."""
+    from geneweaver.db.core.slow_query import (
+        AsyncSlowQueryCursor,
+        SlowQueryCursor,
+        async_connect_kwargs,
+        connect_kwargs,
+    )
+
+    assert connect_kwargs() == {}
+    assert async_connect_kwargs() == {}
+
+    with patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.5):
+        assert connect_kwargs() == {"cursor_factory": SlowQueryCursor}
+        assert async_connect_kwargs() == {"cursor_factory": AsyncSlowQueryCursor}
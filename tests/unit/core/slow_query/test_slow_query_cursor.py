@@ -0,0 +1,191 @@
+"""Test the cursors that log slow queries (sync and async)."""
+
+import logging
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import psycopg
+import pytest
+
+PLAN = [{"Plan": {"Node Type": "Seq Scan"}}]
+
+
+@pytest.fixture()
+def slow_cursor():
+    """Create a slow query cursor whose statements don't reach the database."""
+    from geneweaver.db.core.slow_query import SlowQueryCursor
+
+    connection = MagicMock()
+    connection._pipeline = None
+    _cursor = SlowQueryCursor(connection)
+    with patch.object(psycopg.Cursor, "execute", return_value=_cursor), patch.object(
+        SlowQueryCursor, "rowcount", 3
+    ):
+        yield _cursor
+
+
+@pytest.fixture()
+def async_slow_cursor():
+    """Create an async slow query cursor whose statements don't reach the database."""
+    from geneweaver.db.core.slow_query import AsyncSlowQueryCursor
+
+    connection = MagicMock()
+    connection._pipeline = None
+    _cursor = AsyncSlowQueryCursor(connection)
+    with patch.object(
+        psycopg.AsyncCursor, "execute", AsyncMock(return_value=_cursor)
+    ), patch.object(AsyncSlowQueryCursor, "rowcount", 3):
+        yield _cursor
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@patch("geneweaver.db.core.slow_query.explain")
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_slow_query_is_logged(mock_explain, slow_cursor, caplog):
+    """Test that statements over the threshold are logged, with redacted params."""
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        result = slow_cursor.execute("SELECT %(gs_id)s", {"gs_id": 12345})
+
+    assert result is slow_cursor
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    assert record.rows == 3
+    assert record.params == {"gs_id": "int"}
+    assert record.plan is None
+    assert "12345" not in record.getMessage()
+    assert mock_explain.called is False
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_slow_query_is_logged_with_its_builder(slow_cursor, caplog):
+    """Test that the query builder that tagged a statement is logged."""
+    from geneweaver.db.query import user
+
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        slow_cursor.execute(*user.by_id(1))
+
+    record = caplog.records[0]
+    assert record.builder == "query.user.by_id"
+    assert record.caller == "<unknown>"
+    assert "query.user.by_id" in record.getMessage()
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_untagged_query_is_logged_with_its_caller(slow_cursor, caplog):
+    """Test that statements without a builder are logged under their caller."""
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        slow_cursor.execute("SELECT 1")
+
+    assert caplog.records[0].builder == caplog.records[0].caller == "<unknown>"
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_pipeline_query_is_not_timed(slow_cursor, caplog):
+    """Test that statements sent in pipeline mode aren't logged."""
+    slow_cursor.connection._pipeline = MagicMock()
+
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        result = slow_cursor.execute("SELECT 1")
+
+    assert result is slow_cursor
+    assert caplog.records == []
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+async def test_async_pipeline_query_is_not_timed(async_slow_cursor, caplog):
+    """Test that async statements sent in pipeline mode aren't logged."""
+    async_slow_cursor.connection._pipeline = MagicMock()
+
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        await async_slow_cursor.execute("SELECT 1")
+
+    assert caplog.records == []
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 60.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_fast_query_is_not_logged(slow_cursor, caplog):
+    """Test that statements under the threshold are not logged."""
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        slow_cursor.execute("SELECT 1")
+
+    assert caplog.records == []
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_EXPLAIN", True)
+@patch("geneweaver.db.core.slow_query.explain", return_value=PLAN)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_slow_query_plan_is_captured(mock_explain, slow_cursor, caplog):
+    """Test that the plan of a slow statement is logged when enabled."""
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        slow_cursor.execute("SELECT %(gs_id)s", {"gs_id": 1})
+
+    mock_explain.assert_called_once_with(
+        slow_cursor.connection, "SELECT %(gs_id)s", {"gs_id": 1}
+    )
+    assert caplog.records[0].plan == PLAN
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 0.0)
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_EXPLAIN", True)
+@patch("geneweaver.db.core.slow_query.async_explain", return_value=PLAN)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+async def test_async_slow_query_is_logged(mock_explain, async_slow_cursor, caplog):
+    """Test that slow async statements are logged with their plan."""
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        result = await async_slow_cursor.execute("SELECT %s", ["a"])
+
+    assert result is async_slow_cursor
+    assert mock_explain.await_count == 1
+    record = caplog.records[0]
+    assert record.params == ["str"]
+    assert record.plan == PLAN
+
+
+@patch("geneweaver.db.core.settings.settings.SLOW_QUERY_THRESHOLD", 60.0)
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+async def test_async_fast_query_is_not_logged(async_slow_cursor, caplog):
+    """Test that fast async statements are not logged."""
+    with caplog.at_level(logging.WARNING, logger="geneweaver.db.core.slow_query"):
+        await async_slow_cursor.execute("SELECT 1")
+
+    assert caplog.records == []
+
+
+@patch("geneweaver.db.core.slow_query.psycopg.connect")
+def test_explain_uses_a_side_connection(mock_connect):
+    """Test that EXPLAIN runs on a new connection to the same database."""
+    from geneweaver.db.core.slow_query import explain
+
+    connection = MagicMock()
+    connection.info.dsn = "host=db user=gw"
+    connection.info.password = ""
+    side_cursor = mock_connect.return_value.__enter__.return_value.cursor.return_value
+    side_cursor.__enter__.return_value.fetchone.return_value = (PLAN,)
+
+    plan = explain(connection, "SELECT %(gs_id)s", {"gs_id": 1})
+
+    assert plan == PLAN
+    assert mock_connect.call_args[0][0] == "host=db user=gw"
+    query, params = side_cursor.__enter__.return_value.execute.call_args[0]
+    assert "EXPLAIN (FORMAT JSON)" in str(query)
+    assert params == {"gs_id": 1}
+    assert connection.cursor.called is False
+
+
+@patch("geneweaver.db.core.slow_query.psycopg.connect")
+def test_explain_failure_returns_none(mock_connect):
+    """Test that a plan that can't be captured doesn't raise."""
+    from geneweaver.db.core.slow_query import explain
+
+    mock_connect.side_effect = psycopg.OperationalError("Error message")
+    connection = MagicMock()
+    connection.info.dsn = "host=db user=gw"
+    connection.info.password = "secret"
+
+    assert explain(connection, "SELECT 1", None) is None
+    assert "password=secret" in mock_connect.call_args[0][0]
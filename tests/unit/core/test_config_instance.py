@@ -10,3 +10,24 @@ def test_is_importable_and_initialized():
 
     assert settings is not None
     assert isinstance(settings, Settings)
+
+
+@pytest.mark.usefixtures("_monkeypatch_settings_env")
+def test_settings_are_created_once_on_first_use():
+    """Test that the global settings object is created lazily, and then reused."""
+    from geneweaver.db.core import settings as settings_module
+
+    assert "settings" not in vars(settings_module)
+    assert settings_module.get_settings.cache_info().currsize == 0
+
+    first = settings_module.settings
+    assert first is settings_module.get_settings()
+    assert settings_module.get_settings.cache_info().currsize == 1
+
+
+def test_settings_module_has_no_other_lazy_attributes():
+    """Test that unknown attributes still raise an AttributeError."""
+    from geneweaver.db.core import settings as settings_module
+
+    with pytest.raises(AttributeError):
+        _ = settings_module.not_a_setting
@@ -108,3 +108,30 @@ def test_settings_from_env(monkeypatch):
     assert settings.USERNAME == "admin", "Incorrect value for USER"
     assert settings.PASSWORD == "secret", "Incorrect value for PASSWORD"
     assert settings.NAME == "database", "Incorrect value for NAME"
+
+
+def test_settings_class_replica_uris(monkeypatch):
+    """Test that replica URIs are read from a JSON list and validated."""
+    monkeypatch.setenv(
+        "GWDB_REPLICA_URIS", '["postgresql://a@replica1/db", "postgresql://a@replica2"]'
+    )
+    settings = Settings(SERVER="localhost", USERNAME="admin", _env_file=None)
+
+    assert settings.REPLICA_URIS == [
+        "postgresql://a@replica1/db",
+        "postgresql://a@replica2",
+    ]
+    assert settings.REPLICA_MAX_LAG is None
+
+
+def test_settings_class_slow_query_log(monkeypatch):
+    """Test that the slow query log is disabled by default and can be enabled."""
+    settings = Settings(SERVER="localhost", USERNAME="admin", _env_file=None)
+    assert settings.SLOW_QUERY_THRESHOLD is None
+    assert settings.SLOW_QUERY_EXPLAIN is False
+
+    monkeypatch.setenv("GWDB_SLOW_QUERY_THRESHOLD", "0.25")
+    monkeypatch.setenv("GWDB_SLOW_QUERY_EXPLAIN", "true")
+    settings = Settings(SERVER="localhost", USERNAME="admin", _env_file=None)
+    assert settings.SLOW_QUERY_THRESHOLD == 0.25
+    assert settings.SLOW_QUERY_EXPLAIN is True
@@ -0,0 +1 @@
+"""Tests for the statement deadline helpers."""
@@ -0,0 +1,151 @@
+"""Test the statement_timeout context managers (sync and async)."""
+
+import asyncio
+from typing import Tuple
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.db.core.timeout import (
+    RESTORE_TIMEOUT_SQL,
+    SET_TIMEOUT_SQL,
+    async_statement_timeout,
+    statement_timeout,
+    timeout_milliseconds,
+)
+from geneweaver.db.exceptions import GeneweaverValueError
+from psycopg.pq import TransactionStatus
+
+
+def _mock_connection(
+    status=TransactionStatus.INTRANS,
+) -> Tuple[MagicMock, MagicMock]:
+    """Create a mock connection whose timeout cursor reports the previous timeout."""
+    connection = MagicMock()
+    connection.closed = False
+    connection.info.transaction_status = status
+    timeout_cursor = connection.cursor.return_value.__enter__.return_value
+    timeout_cursor.fetchone.return_value = ("0", "1500ms")
+    return connection, timeout_cursor
+
+
+def _mock_async_connection(
+    status=TransactionStatus.INTRANS,
+) -> Tuple[MagicMock, MagicMock]:
+    """Create a mock async connection that reports the previous timeout."""
+    connection = MagicMock()
+    connection.closed = False
+    connection.info.transaction_status = status
+    timeout_cursor = connection.cursor.return_value.__aenter__.return_value
+    timeout_cursor.execute = AsyncMock()
+    timeout_cursor.fetchone = AsyncMock(return_value=("0", "1500ms"))
+    return connection, timeout_cursor
+
+
+@pytest.mark.parametrize(
+    ("seconds", "milliseconds"),
+    [(1.5, "1500"), (0.0001, "1"), (2, "2000"), (0.0015, "2")],
+)
+def test_timeout_milliseconds(seconds, milliseconds):
+    """Test that deadlines are converted to whole milliseconds, rounding up."""
+    assert timeout_milliseconds(seconds) == milliseconds
+
+
+@pytest.mark.parametrize("seconds", [0, -1, -0.5])
+def test_timeout_milliseconds_must_be_positive(seconds):
+    """Test that deadlines that aren't positive are rejected."""
+    with pytest.raises(GeneweaverValueError):
+        timeout_milliseconds(seconds)
+
+
+def test_statement_timeout_sets_and_restores(cursor):
+    """Test that the timeout is set for the block and then restored."""
+    connection, timeout_cursor = _mock_connection()
+    cursor.connection = connection
+
+    with statement_timeout(cursor, 1.5) as cursor_:
+        assert cursor_ is cursor
+        timeout_cursor.execute.assert_called_once_with(
+            SET_TIMEOUT_SQL, {"timeout": "1500"}
+        )
+
+    timeout_cursor.execute.assert_called_with(RESTORE_TIMEOUT_SQL, {"timeout": "0"})
+    assert cursor.execute.called is False
+
+
+def test_statement_timeout_none_does_nothing(cursor):
+    """Test that no statements are run without a deadline."""
+    with statement_timeout(cursor, None) as cursor_:
+        assert cursor_ is cursor
+
+    assert cursor.connection.cursor.called is False
+
+
+def test_statement_timeout_skips_restore_in_failed_transaction(cursor):
+    """Test that a failed transaction is left for the rollback to restore."""
+    connection, timeout_cursor = _mock_connection()
+    cursor.connection = connection
+
+    def run_failing_statement() -> None:
+        with statement_timeout(cursor, 1.5):
+            connection.info.transaction_status = TransactionStatus.INERROR
+            raise RuntimeError("Query canceled")
+
+    with pytest.raises(RuntimeError):
+        run_failing_statement()
+
+    assert timeout_cursor.execute.call_count == 1
+
+
+async def test_async_statement_timeout_sets_and_restores(async_cursor):
+    """Test that the timeout is set for the block and then restored."""
+    connection, timeout_cursor = _mock_async_connection()
+    async_cursor.connection = connection
+
+    async with async_statement_timeout(async_cursor, 1.5) as cursor_:
+        assert cursor_ is async_cursor
+        timeout_cursor.execute.assert_awaited_once_with(
+            SET_TIMEOUT_SQL, {"timeout": "1500"}
+        )
+
+    timeout_cursor.execute.assert_awaited_with(RESTORE_TIMEOUT_SQL, {"timeout": "0"})
+
+
+async def test_async_statement_timeout_none_does_nothing(async_cursor):
+    """Test that no statements are run without a deadline."""
+    async_cursor.connection = MagicMock()
+
+    async with async_statement_timeout(async_cursor, None) as cursor_:
+        assert cursor_ is async_cursor
+
+    assert async_cursor.connection.cursor.called is False
+
+
+@pytest.mark.parametrize(
+    ("status", "restored"),
+    [(TransactionStatus.IDLE, True), (TransactionStatus.INERROR, False)],
+)
+async def test_async_statement_timeout_restores_after_cancellation(
+    async_cursor, status, restored
+):
+    """Test that the timeout is restored when the task running the block is cancelled.
+
+    psycopg cancels the running statement itself, leaving the connection idle (in
+    autocommit mode) or in a failed transaction, whose rollback undoes the change.
+    """
+    connection, timeout_cursor = _mock_async_connection()
+    async_cursor.connection = connection
+
+    async def run_cancelled_statement() -> None:
+        async with async_statement_timeout(async_cursor, 1.5):
+            connection.info.transaction_status = status
+            raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_cancelled_statement()
+
+    assert connection.cancel.called is False
+    assert timeout_cursor.execute.await_count == (2 if restored else 1)
+    if restored:
+        timeout_cursor.execute.assert_awaited_with(
+            RESTORE_TIMEOUT_SQL, {"timeout": "0"}
+        )
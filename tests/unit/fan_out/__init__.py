@@ -0,0 +1 @@
+"""Tests for the aio fan-out helper."""
@@ -0,0 +1,154 @@
+"""Test the aio fan_out helper."""
+
+# ruff: noqa: ANN101
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+from geneweaver.db.aio.fan_out import fan_out
+
+
+class FakeCursors:
+    """Stand in for `async_cursor`, handing out a new mock cursor each time."""
+
+    def __init__(self) -> None:
+        """Track the cursors handed out, and how many are in use at once."""
+        self.cursors: List[MagicMock] = []
+        self.calls: List[dict] = []
+        self.in_use = 0
+        self.max_in_use = 0
+
+    @asynccontextmanager
+    async def __call__(self, **kwargs: object) -> AsyncIterator[MagicMock]:
+        """Yield a new cursor, counting it as in use until it is released."""
+        self.calls.append(kwargs)
+        cursor = MagicMock()
+        self.cursors.append(cursor)
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        try:
+            yield cursor
+        finally:
+            self.in_use -= 1
+
+
+@pytest.fixture()
+def fake_cursors():
+    """Patch the cursors used by fan_out."""
+    cursors = FakeCursors()
+    with patch("geneweaver.db.aio.fan_out.async_cursor", cursors):
+        yield cursors
+
+
+async def _value_after(cursor, value, delay=0.01) -> Tuple[object, MagicMock]:
+    """Return a value after a delay, like a query would."""
+    await asyncio.sleep(delay)
+    return value, cursor
+
+
+async def test_fan_out_returns_results_by_name(fake_cursors):
+    """Test that each call gets its own cursor, and results are keyed by name."""
+    results = await fan_out(
+        {
+            "geneset": lambda cur: _value_after(cur, "geneset"),
+            "ontology": lambda cur: _value_after(cur, "ontology"),
+        },
+        max_concurrency=2,
+    )
+
+    assert results["geneset"][0] == "geneset"
+    assert results["ontology"][0] == "ontology"
+    assert results["geneset"][1] is not results["ontology"][1]
+    assert len(fake_cursors.cursors) == 2
+
+
+async def test_fan_out_runs_calls_concurrently(fake_cursors):
+    """Test that the calls overlap, so the total time is about the slowest call."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    await fan_out(
+        {str(i): lambda cur: _value_after(cur, None, delay=0.1) for i in range(5)},
+        max_concurrency=5,
+    )
+
+    assert loop.time() - start < 0.3
+    assert fake_cursors.max_in_use == 5
+
+
+async def test_fan_out_caps_concurrency(fake_cursors):
+    """Test that no more than max_concurrency calls run at once."""
+    await fan_out(
+        {str(i): lambda cur: _value_after(cur, None) for i in range(10)},
+        max_concurrency=3,
+    )
+
+    assert fake_cursors.max_in_use == 3
+    assert len(fake_cursors.cursors) == 10
+
+
+async def test_fan_out_passes_cursor_options(fake_cursors):
+    """Test that readonly and deadline are used for every cursor."""
+    await fan_out(
+        {"a": lambda cur: _value_after(cur, None)},
+        max_concurrency=1,
+        readonly=True,
+        deadline=2.5,
+    )
+
+    assert fake_cursors.calls == [{"readonly": True, "deadline": 2.5}]
+
+
+async def test_fan_out_cancels_siblings_on_error(fake_cursors):
+    """Test that a failing call cancels the others, and its error is raised."""
+    cancelled = asyncio.Event()
+
+    async def slow(cursor) -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def failing(cursor) -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("Error message")
+
+    with pytest.raises(ValueError, match="Error message"):
+        await fan_out({"slow": slow, "failing": failing}, max_concurrency=2)
+
+    assert cancelled.is_set()
+    assert fake_cursors.in_use == 0
+
+
+async def test_fan_out_cancelled_cancels_calls(fake_cursors):
+    """Test that cancelling the caller cancels the running calls."""
+    task = asyncio.create_task(
+        fan_out(
+            {str(i): lambda cur: _value_after(cur, None, delay=10) for i in range(3)},
+            max_concurrency=3,
+        )
+    )
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert fake_cursors.in_use == 0
+
+
+@patch("geneweaver.db.aio.fan_out.get_settings")
+async def test_fan_out_defaults_to_pool_size(mock_get_settings, fake_cursors):
+    """Test that concurrency is capped at the async pool size by default."""
+    mock_get_settings.return_value.ASYNC_POOL_MAX_SIZE = 2
+    await fan_out({str(i): lambda cur: _value_after(cur, None) for i in range(4)})
+
+    assert fake_cursors.max_in_use == 2
+
+
+async def test_fan_out_no_calls():
+    """Test that no calls gives no results."""
+    assert await fan_out({}) == {}
@@ -4,6 +4,9 @@ import random
 from typing import List
 
 import pytest
+from geneweaver.db.cache import _caches
+from geneweaver.db.core.cache import LRUCache
+from geneweaver.db.core.settings_class import Settings
 
 from tests.unit.gene.const import GENE_SYMBOLS_01, GENE_SYMBOLS_02
 
@@ -15,3 +18,19 @@ random.seed(0)
 def geneset_gene_symbols(request) -> List[str]:
     """Return a list of geneset genes."""
     return random.sample(GENE_SYMBOLS_01 + GENE_SYMBOLS_02, request.param)
+
+
+@pytest.fixture()
+def mapping_cache(monkeypatch) -> LRUCache:
+    """Provide an empty gene mapping cache that isn't sized from the settings."""
+    cache = LRUCache(100)
+    monkeypatch.setitem(_caches, "gene_mapping", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def gene_settings(monkeypatch) -> Settings:
+    """Provide settings for the batch size checks of the gene functions."""
+    settings = Settings(SERVER="test_host", USERNAME="test_username")
+    monkeypatch.setattr("geneweaver.db.utils.get_settings", lambda: settings)
+    return settings
@@ -1,8 +1,10 @@
 """Test the aon_mapping gene db exec functions (sync and async)."""
 
 from geneweaver.core.enum import Species
+from geneweaver.core.mapping import AON_ID_TYPE_FOR_SPECIES
 from geneweaver.db.aio.gene import aon_mapping as async_aon_mapping
 from geneweaver.db.gene import aon_mapping
+from psycopg.rows import dict_row
 
 from tests.unit.testing_utils import (
     async_create_execute_raises_error_test,
@@ -26,3 +28,28 @@ test_async_aon_mapping_execute_raises_error = async_create_execute_raises_error_
 test_async_aon_mapping_fetchall_raises_error = async_create_fetchall_raises_error_test(
     async_aon_mapping, ["a", "b", "c"], Species.GALLUS_GALLUS
 )
+
+
+def test_aon_mapping_use_cache(cursor, mapping_cache):
+    """Test that aon_mapping uses the mapping cache for the species' AON id type."""
+    cursor.row_factory = dict_row
+    cursor.fetchall.return_value = [{"original_ref_id": "a", "mapped_ref_id": "A1"}]
+    aon_mapping(cursor, ["a"], Species.MUS_MUSCULUS, use_cache=True)
+    result = aon_mapping(cursor, ["a"], Species.MUS_MUSCULUS, use_cache=True)
+    assert result == [{"original_ref_id": "a", "mapped_ref_id": "A1"}]
+    assert cursor.execute.call_count == 1
+    params = cursor.execute.call_args[0][1]
+    assert params["target_gene_id_type"] == int(
+        AON_ID_TYPE_FOR_SPECIES[Species.MUS_MUSCULUS]
+    )
+
+
+async def test_async_aon_mapping_use_cache(async_cursor, mapping_cache):
+    """Test that aon_mapping uses the mapping cache (async)."""
+    async_cursor.row_factory = dict_row
+    async_cursor.fetchall.return_value = [
+        {"original_ref_id": "a", "mapped_ref_id": "A1"}
+    ]
+    await async_aon_mapping(async_cursor, ["a"], Species.MUS_MUSCULUS, use_cache=True)
+    await async_aon_mapping(async_cursor, ["a"], Species.MUS_MUSCULUS, use_cache=True)
+    assert async_cursor.execute.call_count == 1
@@ -1,8 +1,12 @@
 """Test the get db exec functions (sync and async)."""
 
+import pytest
 from geneweaver.core.enum import Species
 from geneweaver.db.aio.gene import get as async_get
 from geneweaver.db.gene import get
+from geneweaver.db.query.gene import GENE_KEYSET
+from geneweaver.db.query.utils import decode_page_token, encode_page_token
+from geneweaver.db.utils import Page
 
 from tests.unit.testing_utils import (
     async_create_execute_raises_error_test,
@@ -26,3 +30,41 @@ test_async_get_execute_raises_error = async_create_execute_raises_error_test(
 test_async_get_fetchall_raises_error = async_create_fetchall_raises_error_test(
     async_get, ["a", "b", "c"], Species.GALLUS_GALLUS
 )
+
+
+@pytest.mark.parametrize(
+    "rows", [[(1, "A", 2), (1, "B", 7), (4, "C", 2)], [(1, "A", 2)]]
+)
+def test_get_keyset_page(rows, cursor):
+    """Test that a keyset page gets the token of its last row, if it is full."""
+    cursor.fetchall.return_value = rows
+
+    result = get(cursor, limit=3, keyset=True)
+
+    assert isinstance(result, Page)
+    assert result.rows == rows
+    if len(rows) == 3:
+        assert decode_page_token(result.next_page_token, GENE_KEYSET) == [4, 2, "C"]
+    else:
+        assert result.next_page_token is None
+    assert "offset" not in cursor.execute.call_args[0][1]
+
+
+async def test_async_get_keyset_page(async_cursor):
+    """Test that an async page token continues the listing."""
+    async_cursor.fetchall.return_value = [(1, "A", 2), (1, "B", 7), (4, "C", 2)]
+
+    result = await async_get(
+        async_cursor, limit=3, page_token=encode_page_token([1, 2, "A"])
+    )
+
+    assert isinstance(result, Page)
+    assert decode_page_token(result.next_page_token, GENE_KEYSET) == [4, 2, "C"]
+    assert async_cursor.execute.call_args[0][1]["after_id"] == [1, 2, "A"][0]
+
+
+def test_get_without_keyset_returns_rows(cursor):
+    """Test that the results are a plain list when not paging by the keyset."""
+    cursor.fetchall.return_value = [(1, "A", 2), (1, "B", 7), (4, "C", 2)]
+
+    assert get(cursor, limit=3) == [(1, "A", 2), (1, "B", 7), (4, "C", 2)]
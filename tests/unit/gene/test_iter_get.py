@@ -0,0 +1,51 @@
+"""Test the iter_get db exec functions (sync and async)."""
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.aio.gene import iter_get as async_iter_get
+from geneweaver.db.gene import iter_get
+from geneweaver.db.query import gene as gene_query
+
+from tests.unit.testing_utils import async_mock_server_cursor, mock_server_cursor
+
+GENES = [{"id": 1}, {"id": 2}]
+
+
+@pytest.mark.parametrize("reference_id", [None, "ENSG00000139618"])
+@pytest.mark.parametrize("gene_database", [None, GeneIdentifier.ENSEMBLE_GENE])
+@pytest.mark.parametrize("species", [None, Species.HOMO_SAPIENS])
+@pytest.mark.parametrize("preferred", [None, True])
+@pytest.mark.parametrize("limit", [None, 10])
+def test_iter_get(reference_id, gene_database, species, preferred, limit, cursor):
+    """Test that genes are streamed from a server-side cursor."""
+    server_cursor = mock_server_cursor(cursor, GENES)
+    kwargs = {
+        "reference_id": reference_id,
+        "gene_database": gene_database,
+        "species": species,
+        "preferred": preferred,
+        "limit": limit,
+    }
+
+    assert list(iter_get(cursor, **kwargs, itersize=50)) == GENES
+    assert server_cursor.itersize == 50
+    assert server_cursor.execute.call_args[0] == gene_query.get(**kwargs)
+    assert cursor.execute.call_count == 0
+
+
+@pytest.mark.parametrize("species", [None, Species.HOMO_SAPIENS])
+@pytest.mark.parametrize("preferred", [None, True])
+async def test_async_iter_get(species, preferred, async_cursor):
+    """Test that genes are streamed from an async server-side cursor."""
+    server_cursor = async_mock_server_cursor(async_cursor, GENES)
+
+    result = async_iter_get(
+        async_cursor, species=species, preferred=preferred, itersize=50
+    )
+
+    assert [row async for row in result] == GENES
+    assert server_cursor.itersize == 50
+    assert server_cursor.execute.call_args[0] == gene_query.get(
+        species=species, preferred=preferred
+    )
+    assert async_cursor.execute.call_count == 0
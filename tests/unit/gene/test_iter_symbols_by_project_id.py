@@ -0,0 +1,33 @@
+"""Test the gene.iter_symbols_by_project_id functions (sync and async)."""
+
+from geneweaver.db.aio.gene import (
+    iter_symbols_by_project_id as async_iter_symbols_by_project_id,
+)
+from geneweaver.db.gene import iter_symbols_by_project_id
+from geneweaver.db.query import gene as gene_query
+
+from tests.unit.testing_utils import async_mock_server_cursor, mock_server_cursor
+
+
+def test_iter_symbols_by_project_id(geneset_gene_symbols, cursor):
+    """Test that project gene symbols are streamed from a server-side cursor."""
+    server_cursor = mock_server_cursor(cursor, geneset_gene_symbols)
+
+    result = iter_symbols_by_project_id(cursor, 1, itersize=100)
+
+    assert list(result) == geneset_gene_symbols
+    assert server_cursor.itersize == 100
+    assert server_cursor.execute.call_args[0] == gene_query.symbols_by_project_id(1)
+    assert cursor.execute.call_count == 0
+    assert cursor.fetchall.call_count == 0
+
+
+async def test_async_iter_symbols_by_project_id(geneset_gene_symbols, async_cursor):
+    """Test that project gene symbols are streamed from an async server cursor."""
+    server_cursor = async_mock_server_cursor(async_cursor, geneset_gene_symbols)
+
+    result = async_iter_symbols_by_project_id(async_cursor, 1, itersize=100)
+
+    assert [row async for row in result] == geneset_gene_symbols
+    assert server_cursor.execute.call_args[0] == gene_query.symbols_by_project_id(1)
+    assert async_cursor.execute.call_count == 0
@@ -1,14 +1,21 @@
 """Test the mapping gene db exec functions (sync and async)."""
 
+from unittest.mock import patch
+
 from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.aio.gene import iter_mapping as async_iter_mapping
 from geneweaver.db.aio.gene import mapping as async_mapping
-from geneweaver.db.gene import mapping
+from geneweaver.db.gene import iter_mapping, mapping
+from psycopg.rows import dict_row, tuple_row
+from psycopg.sql import Identifier
 
 from tests.unit.testing_utils import (
     async_create_execute_raises_error_test,
     async_create_fetchall_raises_error_test,
+    async_mock_server_cursor,
     create_execute_raises_error_test,
     create_fetchall_raises_error_test,
+    mock_server_cursor,
 )
 
 test_mapping_execute_raises_error = create_execute_raises_error_test(
@@ -26,3 +33,199 @@ test_async_mapping_execute_raises_error = async_create_execute_raises_error_test
 test_async_mapping_fetchall_raises_error = async_create_fetchall_raises_error_test(
     async_mapping, ["a", "b", "c"], Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE
 )
+
+MAPPING_ROWS = [
+    {"original_ref_id": "a", "mapped_ref_id": "A1"},
+    {"original_ref_id": "a", "mapped_ref_id": "A2"},
+    {"original_ref_id": "c", "mapped_ref_id": "C1"},
+]
+
+
+def test_mapping_use_cache(cursor, mapping_cache):
+    """Test that cached mappings are not fetched again."""
+    cursor.row_factory = dict_row
+    cursor.fetchall.return_value = MAPPING_ROWS
+    args = (Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE)
+
+    result = mapping(cursor, ["c", "a", "b"], *args, use_cache=True)
+    assert result == [MAPPING_ROWS[2], MAPPING_ROWS[0], MAPPING_ROWS[1]]
+    assert cursor.execute.call_count == 1
+    assert cursor.execute.call_args[0][1]["source_ids"] == ["c", "a", "b"]
+
+    cursor.fetchall.return_value = [{"original_ref_id": "d", "mapped_ref_id": "D1"}]
+    result = mapping(cursor, ["a", "d", "b", "a"], *args, use_cache=True)
+    assert [row["mapped_ref_id"] for row in result] == ["A1", "A2", "D1"]
+    assert cursor.execute.call_count == 2
+    assert cursor.execute.call_args[0][1]["source_ids"] == ["d"]
+
+    mapping(cursor, ["a", "b", "c", "d"], *args, use_cache=True)
+    assert cursor.execute.call_count == 2
+    assert mapping_cache.stats()["hits"] == 6
+
+
+def test_mapping_cache_rows_are_copies(cursor, mapping_cache):
+    """Test that callers can't change the cached rows seen by other callers."""
+    cursor.row_factory = dict_row
+    cursor.fetchall.return_value = [dict(row) for row in MAPPING_ROWS]
+    args = (Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE)
+
+    first = mapping(cursor, ["a", "c"], *args, use_cache=True)
+    first[0]["mapped_ref_id"] = "changed"
+    second = mapping(cursor, ["a", "c"], *args, use_cache=True)
+    second[1]["mapped_ref_id"] = "changed"
+    third = mapping(cursor, ["a", "c"], *args, use_cache=True)
+
+    assert cursor.execute.call_count == 1
+    assert third == MAPPING_ROWS
+
+
+async def test_async_mapping_cache_rows_are_copies(async_cursor, mapping_cache):
+    """Test that callers can't change the cached rows seen by other callers (async)."""
+    async_cursor.row_factory = dict_row
+    async_cursor.fetchall.return_value = [dict(row) for row in MAPPING_ROWS]
+    args = (Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE)
+
+    first = await async_mapping(async_cursor, ["a", "c"], *args, use_cache=True)
+    first[2]["mapped_ref_id"] = "changed"
+    second = await async_mapping(async_cursor, ["a", "c"], *args, use_cache=True)
+
+    assert second == MAPPING_ROWS
+
+
+def test_mapping_cache_is_per_row_factory(cursor, mapping_cache):
+    """Test that rows cached for one row factory aren't used for another."""
+    cursor.row_factory = dict_row
+    cursor.fetchall.return_value = MAPPING_ROWS
+    args = (Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE)
+    mapping(cursor, ["a", "c"], *args, use_cache=True)
+
+    cursor.row_factory = tuple_row
+    cursor.fetchall.return_value = [("a", "A1"), ("a", "A2"), ("c", "C1")]
+    result = mapping(cursor, ["a", "c"], *args, use_cache=True)
+    assert result == [("a", "A1"), ("a", "A2"), ("c", "C1")]
+    assert cursor.execute.call_count == 2
+
+
+def test_mapping_without_cache(cursor, mapping_cache):
+    """Test that the cache isn't used unless asked for."""
+    cursor.fetchall.return_value = MAPPING_ROWS
+    args = (Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE)
+    mapping(cursor, ["a", "c"], *args)
+    mapping(cursor, ["a", "c"], *args)
+    assert cursor.execute.call_count == 2
+    assert len(mapping_cache) == 0
+
+
+async def test_async_mapping_use_cache(async_cursor, mapping_cache):
+    """Test that cached mappings are not fetched again (async)."""
+    async_cursor.row_factory = dict_row
+    async_cursor.fetchall.return_value = MAPPING_ROWS
+    args = (Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE)
+
+    result = await async_mapping(async_cursor, ["c", "a", "b"], *args, use_cache=True)
+    assert result == [MAPPING_ROWS[2], MAPPING_ROWS[0], MAPPING_ROWS[1]]
+
+    result = await async_mapping(async_cursor, ["a", "b", "c"], *args, use_cache=True)
+    assert result == MAPPING_ROWS
+    assert async_cursor.execute.call_count == 1
+
+
+def test_mapping_large_batch(cursor, gene_settings):
+    """Test that large batches are joined through a temp table."""
+    gene_settings.LARGE_BATCH_THRESHOLD = 3
+    cursor.fetchall.return_value = MAPPING_ROWS
+    temp_cursor = cursor.connection.cursor.return_value.__enter__.return_value
+    temp_cursor.fetchone.return_value = (False,)
+    result = mapping(
+        cursor,
+        ["a", "b", "c"],
+        Species.GALLUS_GALLUS,
+        GeneIdentifier.ENSEMBLE_GENE,
+    )
+    assert result == MAPPING_ROWS
+    cursor.connection.transaction.assert_called_once()
+    query, params = next(
+        call[0]
+        for call in cursor.execute.call_args_list
+        if len(call[0]) == 2 and "species_id" in call[0][1]
+    )
+    assert "source_ids" not in params
+    assert "gw_ids_" in repr(query)
+    # Only the unnamed cursors of the temp table, no server-side cursor.
+    assert all(not call[0] for call in cursor.connection.cursor.call_args_list)
+
+
+async def test_async_mapping_large_batch(async_cursor, gene_settings):
+    """Test that large batches are joined through a temp table (async)."""
+    gene_settings.LARGE_BATCH_THRESHOLD = 3
+    async_cursor.fetchall.return_value = MAPPING_ROWS
+
+    with patch("geneweaver.db.aio.gene.async_temp_id_table") as mock_table:
+        mock_table.return_value.__aenter__.return_value = Identifier("tmp")
+        result = await async_mapping(
+            async_cursor,
+            ["a", "b", "c"],
+            Species.GALLUS_GALLUS,
+            GeneIdentifier.ENSEMBLE_GENE,
+        )
+    assert result == MAPPING_ROWS
+    query, params = async_cursor.execute.call_args[0]
+    assert "source_ids" not in params
+    assert "tmp" in repr(query)
+
+
+def test_mapping_large_batch_read_only(cursor, gene_settings):
+    """Test that large batches use the array on a read-only connection."""
+    gene_settings.LARGE_BATCH_THRESHOLD = 3
+    cursor.fetchall.return_value = MAPPING_ROWS
+    temp_cursor = cursor.connection.cursor.return_value.__enter__.return_value
+    temp_cursor.fetchone.return_value = (True,)
+
+    result = mapping(
+        cursor, ["a", "b", "c"], Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE
+    )
+
+    assert result == MAPPING_ROWS
+    query, params = cursor.execute.call_args[0]
+    assert params["source_ids"] == ["a", "b", "c"]
+    assert "gw_ids_" not in repr(query)
+
+
+def test_iter_mapping_streams_large_batches(cursor, gene_settings):
+    """Test that iter_mapping streams the temp table join from a server cursor."""
+    gene_settings.LARGE_BATCH_THRESHOLD = 3
+    server_cursor = mock_server_cursor(cursor, MAPPING_ROWS)
+    server_cursor.fetchone.return_value = (False,)
+
+    results = iter_mapping(
+        cursor, ["a", "b", "c"], Species.GALLUS_GALLUS, GeneIdentifier.ENSEMBLE_GENE
+    )
+
+    assert list(results) == MAPPING_ROWS
+    # The temp table and the named cursor share the mocked connection cursor.
+    statements = [call[0] for call in server_cursor.execute.call_args_list]
+    query, params = next(args for args in statements if len(args) == 2)
+    assert "gw_ids_" in repr(query)
+    assert "source_ids" not in params
+    assert "DROP TABLE" in str(statements[-1][0])
+
+
+async def test_async_iter_mapping(async_cursor, gene_settings):
+    """Test that small batches are streamed with the array (async)."""
+    server_cursor = async_mock_server_cursor(async_cursor, MAPPING_ROWS)
+
+    results = [
+        row
+        async for row in async_iter_mapping(
+            async_cursor,
+            ["a", "b", "c"],
+            Species.GALLUS_GALLUS,
+            GeneIdentifier.ENSEMBLE_GENE,
+            itersize=10,
+        )
+    ]
+
+    assert results == MAPPING_ROWS
+    query, params = server_cursor.execute.call_args[0]
+    assert params["source_ids"] == ["a", "b", "c"]
+    assert server_cursor.itersize == 10
@@ -3,6 +3,7 @@
 from unittest.mock import Mock
 
 import pytest
+from geneweaver.db.aio.gene import symbols_by_project_id as async_symbols_by_project_id
 from geneweaver.db.gene import symbols_by_project_id
 
 
@@ -38,3 +39,12 @@ def test_symbols_by_project_id_fetchall_raises_error(all_psycopg_errors):
 
     assert cursor.execute.call_count == 1
     assert cursor.fetchall.call_count == 1
+
+
+async def test_async_symbols_by_project_id(geneset_gene_symbols, async_cursor):
+    """Test the async symbols_by_project_id using a mock cursor."""
+    async_cursor.fetchall.return_value = geneset_gene_symbols
+    result = await async_symbols_by_project_id(async_cursor, 1)
+    assert result == geneset_gene_symbols
+    assert async_cursor.execute.call_args[0][1] == {"project_id": 1}
+    assert async_cursor.fetchall.call_count == 1
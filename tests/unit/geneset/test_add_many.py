@@ -0,0 +1,106 @@
+"""Test the geneset.add_many function."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier, Microarray, ScoreType, Species
+from geneweaver.core.schema.gene import GeneValue
+from geneweaver.core.schema.geneset import GenesetUpload
+from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.aio.geneset import add_many as async_add_many
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.geneset import add_many
+from geneweaver.db.query.geneset.const import COPY_GENESET_VALUES
+
+UPLOADS = [
+    GenesetUpload(
+        score=GenesetScoreType(score_type=ScoreType.P_VALUE, threshold=0.05),
+        species=Species.MUS_MUSCULUS,
+        gene_id_type=GeneIdentifier.GENE_SYMBOL,
+        abbreviation=f"abbr {i}",
+        name=f"name {i}",
+        values=[GeneValue(symbol="A", value=0.01), GeneValue(symbol="B", value=0.5)],
+    )
+    for i in range(2)
+]
+GENE_ROWS = [("A", 7, 1, 10), ("B", 7, 1, 11)]
+
+
+def _assert_inserts(cursor: MagicMock, copier: MagicMock) -> None:
+    """Check the batched inserts, gene lookup, copy and thresholds of UPLOADS."""
+    files, genesets = cursor.executemany.call_args_list
+    assert "INSERT INTO file" in str(files[0][0])
+    assert len(files[0][1]) == 2
+    assert "INSERT INTO geneset" in str(genesets[0][0])
+    assert [params["file_id"] for params in genesets[0][1]] == [1, 2]
+    assert all(call[1]["returning"] for call in (files, genesets))
+
+    lookup, thresholds = cursor.execute.call_args_list
+    assert lookup[0][1]["symbols"] == '{"A","B"}'
+    assert "production.process_thresholds" in str(thresholds[0][0])
+    assert thresholds[0][1] == {"geneset_ids": [101, 102]}
+    assert cursor.copy.call_args[0][0] == COPY_GENESET_VALUES
+    copied = [call[0][0] for call in copier.write_row.call_args_list]
+    assert [(row[0], row[1], row[5]) for row in copied] == [
+        (101, 10, True),
+        (101, 11, False),
+        (102, 10, True),
+        (102, 11, False),
+    ]
+
+
+def test_add_many():
+    """Test that the uploads are added with batched inserts and one copy."""
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [(1,), (2,), (101,), (102,)]
+    cursor.nextset.side_effect = [True, None, True, None]
+    cursor.fetchall.return_value = GENE_ROWS
+    copier = cursor.copy.return_value.__enter__.return_value
+
+    assert add_many(cursor, UPLOADS, owner_id=5) == [101, 102]
+
+    cursor.connection.transaction.return_value.__enter__.assert_called_once()
+    _assert_inserts(cursor, copier)
+
+
+async def test_async_add_many():
+    """Test that the uploads are added with batched inserts and one copy (async)."""
+    cursor = AsyncMock()
+    cursor.connection = MagicMock()
+    cursor.copy = MagicMock()
+    cursor.nextset = MagicMock(side_effect=[True, None, True, None])
+    cursor.fetchone.side_effect = [
+        {"file_id": 1},
+        {"file_id": 2},
+        {"gs_id": 101},
+        {"gs_id": 102},
+    ]
+    cursor.fetchall.return_value = GENE_ROWS
+    copier = AsyncMock()
+    copier.set_types = MagicMock()
+    cursor.copy.return_value.__aenter__.return_value = copier
+
+    assert await async_add_many(cursor, UPLOADS, owner_id=5) == [101, 102]
+
+    cursor.connection.transaction.return_value.__aenter__.assert_awaited_once()
+    _assert_inserts(cursor, copier)
+
+
+def test_add_many_without_uploads():
+    """Test that nothing is written when there are no uploads."""
+    cursor = MagicMock()
+
+    assert add_many(cursor, []) == []
+
+    cursor.connection.transaction.assert_not_called()
+
+
+def test_add_many_rejects_microarrays():
+    """Test that uploads of probe IDs are rejected before anything is written."""
+    upload = UPLOADS[0].model_copy(update={"gene_id_type": list(Microarray)[0]})
+    cursor = MagicMock()
+
+    with pytest.raises(GeneweaverValueError):
+        add_many(cursor, [upload])
+
+    cursor.executemany.assert_not_called()
@@ -0,0 +1,76 @@
+"""Test the geneset.add_with_values function."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier, Microarray, ScoreType, Species
+from geneweaver.core.schema.gene import GeneValue
+from geneweaver.core.schema.geneset import GenesetUpload
+from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.aio.geneset import add_with_values as async_add_with_values
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.geneset import add_with_values
+
+UPLOAD = GenesetUpload(
+    score=GenesetScoreType(score_type=ScoreType.P_VALUE, threshold=0.05),
+    species=Species.MUS_MUSCULUS,
+    gene_id_type=GeneIdentifier.GENE_SYMBOL,
+    abbreviation="abbr",
+    name="name",
+    values=[GeneValue(symbol="A", value=0.01), GeneValue(symbol="B", value=0.5)],
+)
+
+
+def _assert_statements(cursor: MagicMock) -> None:
+    """Check that the upload was added with one statement, pipelined with thresholds."""
+    cursor.connection.pipeline.assert_called_once()
+    (insert,) = cursor.execute.call_args_list
+    query, params = insert[0]
+    assert "WITH new_file AS" in str(query)
+    assert params["usr_id"] == 5
+    assert params["pub_id"] == 3
+    assert params["symbols"] == '{"A","B"}'
+    assert params["in_threshold"] == "{True,False}"
+    thresholds = cursor.connection.cursor.return_value.execute.call_args
+    assert "production.process_thresholds" in str(thresholds[0][0])
+    assert "currval(pg_get_serial_sequence('geneset', 'gs_id'))" in str(
+        thresholds[0][0]
+    )
+
+
+def test_add_with_values():
+    """Test that the upload is added and thresholded in one pipeline."""
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (101,)
+
+    assert add_with_values(cursor, UPLOAD, owner_id=5, publication_id=3) == 101
+
+    cursor.connection.transaction.return_value.__enter__.assert_called_once()
+    _assert_statements(cursor)
+    cursor.executemany.assert_not_called()
+    cursor.copy.assert_not_called()
+
+
+async def test_async_add_with_values():
+    """Test that the upload is added and thresholded in one pipeline (async)."""
+    cursor = AsyncMock()
+    cursor.connection = MagicMock()
+    cursor.connection.cursor.return_value = AsyncMock()
+    cursor.connection.transaction.return_value.__aenter__ = AsyncMock()
+    cursor.connection.transaction.return_value.__aexit__ = AsyncMock(return_value=None)
+    cursor.fetchone.return_value = {"gs_id": 101}
+
+    assert await async_add_with_values(cursor, UPLOAD, 5, 3) == 101
+
+    cursor.connection.transaction.return_value.__aenter__.assert_awaited_once()
+    _assert_statements(cursor)
+
+
+def test_add_with_values_microarray():
+    """Test that microarray uploads are rejected before running anything."""
+    cursor = MagicMock()
+    upload = UPLOAD.model_copy(update={"gene_id_type": list(Microarray)[0]})
+
+    with pytest.raises(GeneweaverValueError):
+        add_with_values(cursor, upload)
+    cursor.execute.assert_not_called()
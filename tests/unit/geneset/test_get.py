@@ -4,7 +4,12 @@ import datetime
 
 import pytest
 from geneweaver.db.aio.geneset import get as async_get
+from geneweaver.db.cache import _caches
+from geneweaver.db.core.cache import LRUCache
 from geneweaver.db.geneset import get
+from geneweaver.db.query.geneset.const import GENESET_KEYSET
+from geneweaver.db.query.utils import decode_page_token, encode_page_token
+from geneweaver.db.utils import Page, RowsWithTotal
 
 from tests.unit.testing_utils import (
     async_create_execute_raises_error_test,
@@ -64,3 +69,90 @@ def test_get_gs_gense_count_size(lte_count, gte_count, example_genesets, cursor)
     assert cursor.execute.call_count == 1
     assert cursor.fetchone.call_count == 0
     assert cursor.fetchall.call_count == 1
+
+
+@pytest.mark.parametrize("rows", [[{"id": 3}, {"id": 7}], [{"id": 3}]])
+def test_get_keyset_page(rows, cursor):
+    """Test that a keyset page gets the token of its last row, if it is full."""
+    cursor.fetchall.return_value = rows
+
+    result = get(cursor, limit=2, keyset=True)
+
+    assert isinstance(result, Page)
+    assert result.rows == rows
+    if len(rows) == 2:
+        assert decode_page_token(result.next_page_token, GENESET_KEYSET) == [7]
+    else:
+        assert result.next_page_token is None
+    assert "offset" not in cursor.execute.call_args[0][1]
+
+
+async def test_async_get_keyset_page(async_cursor):
+    """Test that an async page token continues the listing."""
+    async_cursor.fetchall.return_value = [{"id": 3}, {"id": 7}]
+
+    result = await async_get(async_cursor, limit=2, page_token=encode_page_token([1]))
+
+    assert isinstance(result, Page)
+    assert decode_page_token(result.next_page_token, GENESET_KEYSET) == [7]
+    assert async_cursor.execute.call_args[0][1]["after_id"] == 1
+
+
+def test_get_without_keyset_returns_rows(cursor):
+    """Test that the results are a plain list when not paging by the keyset."""
+    cursor.fetchall.return_value = [{"id": 3}, {"id": 7}]
+
+    assert get(cursor, limit=2) == [{"id": 3}, {"id": 7}]
+
+
+def test_get_with_total(cursor):
+    """Test that the total count is taken out of the rows."""
+    cursor.fetchall.return_value = [(3, 1, "a", 12), (7, 1, "b", 12)]
+
+    result = get(cursor, limit=2, offset=4, with_total=True)
+
+    assert result == RowsWithTotal([(3, 1, "a"), (7, 1, "b")], 12)
+    assert cursor.execute.call_count == 1
+
+
+async def test_async_get_with_total(async_cursor):
+    """Test that the async total count is taken out of the (dict) rows."""
+    async_cursor.fetchall.return_value = [{"id": 3, "total_count": 1}]
+
+    result = await async_get(async_cursor, limit=2, with_total=True)
+
+    assert result == RowsWithTotal([{"id": 3}], 1)
+
+
+def test_get_with_readable_cache(cursor, monkeypatch):
+    """Test that the user's groups are looked up once, then filtered on."""
+    monkeypatch.setitem(_caches, "readable_genesets", LRUCache(10))
+    cursor.fetchone.return_value = (False, "{-1,4}")
+    cursor.fetchall.return_value = [{"id": 9}]
+
+    assert get(cursor, is_readable_by=7, use_readable_cache=True) == [{"id": 9}]
+    assert get(cursor, is_readable_by=7, use_readable_cache=True) == [{"id": 9}]
+
+    assert cursor.execute.call_count == 3
+    assert cursor.execute.call_args[0][1]["readable_group_ids"] == "{-1,4}"
+
+
+async def test_async_get_with_readable_cache(async_cursor, monkeypatch):
+    """Test that curators aren't filtered when using the readable cache (async)."""
+    monkeypatch.setitem(_caches, "readable_genesets", LRUCache(10))
+    async_cursor.fetchone.return_value = {"admin": True, "group_ids": "{-1}"}
+    async_cursor.fetchall.return_value = []
+
+    result = await async_get(async_cursor, is_readable_by=7, use_readable_cache=True)
+
+    assert result == []
+    assert "is_readable_by" not in async_cursor.execute.call_args[0][1]
+
+
+def test_get_readable_cache_needs_a_user(cursor):
+    """Test that the readable cache isn't used without is_readable_by."""
+    cursor.fetchall.return_value = []
+
+    get(cursor, use_readable_cache=True)
+
+    assert cursor.execute.call_count == 1
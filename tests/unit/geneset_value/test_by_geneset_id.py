@@ -4,9 +4,12 @@ from unittest.mock import patch
 
 import pytest
 from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.aio.geneset_value import by_geneset_id as async_by_geneset_id
 from geneweaver.db.geneset_value import by_geneset_id
 
 from tests.unit.testing_utils import (
+    async_create_execute_raises_error_test,
+    async_create_fetchall_raises_error_test,
     create_execute_raises_error_test,
     create_fetchall_raises_error_test,
 )
@@ -37,6 +40,26 @@ def test_by_geneset_id(geneset_id, identifier, gsv_in_threshold, geneset_value,
     assert cursor.fetchall.call_count == 1
 
 
+@pytest.mark.parametrize("geneset_id", [406756, 105683, 56893])
+@pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+async def test_async_by_geneset_id(
+    geneset_id, identifier, gsv_in_threshold, async_cursor
+):
+    """Test the async geneset_values.by_geneset_id function."""
+    async_cursor.fetchall.return_value = ["a", "b", "c"]
+    result = await async_by_geneset_id(
+        async_cursor,
+        geneset_id=geneset_id,
+        identifier=identifier,
+        gsv_in_threshold=gsv_in_threshold,
+    )
+    assert result == ["a", "b", "c"]
+    assert async_cursor.execute.call_count == 1
+    assert async_cursor.fetchall.call_count == 1
+    assert async_cursor.execute.call_args[0][1]["geneset_id"] == geneset_id
+
+
 @patch("geneweaver.db.geneset_value.by_geneset_id_and_identifier")
 @patch("geneweaver.db.geneset_value.by_geneset_id_as_uploaded")
 def test_by_geneset_id_calls_correct_function(
@@ -81,3 +104,10 @@ test_by_geneset_id_w_identifier_fetchall_raises_error = (
         by_geneset_id, 1, identifier=GeneIdentifier.ENSEMBLE_GENE
     )
 )
+
+test_async_by_geneset_id_execute_raises_error = async_create_execute_raises_error_test(
+    async_by_geneset_id, 1
+)
+test_async_by_geneset_id_fetchall_raises_error = (
+    async_create_fetchall_raises_error_test(async_by_geneset_id, 1)
+)
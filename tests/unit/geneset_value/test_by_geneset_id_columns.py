@@ -0,0 +1,117 @@
+"""Test the geneset_value.by_geneset_id_columns functions (sync and async)."""
+
+import numpy as np
+import pytest
+from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.aio.geneset_value import (
+    by_geneset_id_columns as async_by_geneset_id_columns,
+)
+from geneweaver.db.geneset_value import by_geneset_id_columns, geneset_value_columns
+from geneweaver.db.query import geneset_value as geneset_value_query
+
+from tests.unit.testing_utils import (
+    async_create_execute_raises_error_test,
+    async_create_fetchone_raises_error_test,
+    create_execute_raises_error_test,
+    create_fetchone_raises_error_test,
+)
+
+GENE_IDS = [7, 12, 2**40]
+VALUES = [0.5, float("nan"), -1.25]
+THRESHOLDS = [True, False, True]
+REF_IDS = ["Pax6", "", "ENSMUSG00000027168"]
+
+PACKED_ROW = {
+    "value_count": 3,
+    "ode_gene_id": np.array(GENE_IDS, dtype=">i8").tobytes(),
+    "gsv_value": np.array(VALUES, dtype=">f8").tobytes(),
+    "gsv_in_threshold": bytes(THRESHOLDS),
+    "ode_ref_id": geneset_value_query.REF_ID_SEPARATOR.join(REF_IDS),
+}
+
+EMPTY_ROW = {
+    "value_count": 0,
+    "ode_gene_id": None,
+    "gsv_value": None,
+    "gsv_in_threshold": None,
+    "ode_ref_id": None,
+}
+
+
+def _assert_columns(columns) -> None:
+    """Check that the columns hold the values packed into `PACKED_ROW`."""
+    assert columns.ode_gene_id.dtype == np.int64
+    assert columns.gsv_value.dtype == np.float64
+    assert columns.gsv_in_threshold.dtype == np.bool_
+    np.testing.assert_array_equal(columns.ode_gene_id, GENE_IDS)
+    np.testing.assert_array_equal(columns.gsv_value, VALUES)
+    np.testing.assert_array_equal(columns.gsv_in_threshold, THRESHOLDS)
+    np.testing.assert_array_equal(columns.ode_ref_id, REF_IDS)
+    assert all(column.flags.c_contiguous for column in columns)
+    assert all(column.flags.writeable for column in columns)
+
+
+@pytest.mark.parametrize("row_factory", [dict, lambda row: tuple(row.values())])
+def test_geneset_value_columns(row_factory):
+    """Test unpacking the packed row, from dict and tuple rows."""
+    _assert_columns(geneset_value_columns(row_factory(PACKED_ROW)))
+
+
+@pytest.mark.parametrize("row", [None, EMPTY_ROW, tuple(EMPTY_ROW.values())])
+def test_geneset_value_columns_empty(row):
+    """Test that a geneset without values gives empty arrays."""
+    columns = geneset_value_columns(row)
+    assert [column.shape for column in columns] == [(0,)] * 4
+    assert columns.ode_gene_id.dtype == np.int64
+    assert columns.gsv_value.dtype == np.float64
+
+
+@pytest.mark.parametrize("geneset_id", [406756, 105683])
+@pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+def test_by_geneset_id_columns(geneset_id, identifier, gsv_in_threshold, cursor):
+    """Test getting the geneset values of a geneset as columns."""
+    cursor.fetchone.return_value = PACKED_ROW
+
+    result = by_geneset_id_columns(cursor, geneset_id, identifier, gsv_in_threshold)
+
+    _assert_columns(result)
+    assert cursor.execute.call_count == 1
+    assert cursor.fetchone.call_count == 1
+    assert cursor.fetchall.call_count == 0
+    assert cursor.execute.call_args[0] == geneset_value_query.by_geneset_id_columns(
+        geneset_id, identifier, gsv_in_threshold
+    )
+    assert cursor.execute.call_args[1] == {"binary": True}
+
+
+@pytest.mark.parametrize("geneset_id", [406756, 105683])
+@pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
+async def test_async_by_geneset_id_columns(geneset_id, identifier, async_cursor):
+    """Test getting the geneset values of a geneset as columns, asynchronously."""
+    async_cursor.fetchone.return_value = PACKED_ROW
+
+    result = await async_by_geneset_id_columns(async_cursor, geneset_id, identifier)
+
+    _assert_columns(result)
+    assert async_cursor.execute.call_count == 1
+    assert async_cursor.fetchone.call_count == 1
+    assert async_cursor.execute.call_args[0][1]["geneset_id"] == geneset_id
+    assert async_cursor.execute.call_args[1] == {"binary": True}
+
+
+test_by_geneset_id_columns_execute_raises_error = create_execute_raises_error_test(
+    by_geneset_id_columns, 1
+)
+
+test_by_geneset_id_columns_fetchone_raises_error = create_fetchone_raises_error_test(
+    by_geneset_id_columns, 1
+)
+
+test_async_by_geneset_id_columns_execute_raises_error = (
+    async_create_execute_raises_error_test(async_by_geneset_id_columns, 1)
+)
+
+test_async_by_geneset_id_columns_fetchone_raises_error = (
+    async_create_fetchone_raises_error_test(async_by_geneset_id_columns, 1)
+)
@@ -2,6 +2,7 @@
 
 import pytest
 from geneweaver.db.geneset_value import insert_geneset_value
+from geneweaver.db.query.geneset.const import COPY_GENESET_VALUES
 
 from tests.unit.testing_utils import get_magic_mock_cursor
 
@@ -13,8 +14,7 @@ from tests.unit.testing_utils import get_magic_mock_cursor
         "value",
         "name",
         "within_threshold",
-        "fetch_result",
-        "expected_result",
+        "expected_row",
     ),
     [
         # Test case 1
@@ -24,28 +24,40 @@ from tests.unit.testing_utils import get_magic_mock_cursor
             "3.5",  # value
             "gene1",  # name
             True,  # within_threshold
-            (10,),  # fetch_result
-            10,  # expected_result
+            (1, 2, "3.5", '{"gene1"}', '{"3.5"}', True, 0, "now"),  # expected_row
         ),
         # Test case 2
         (
             5,  # geneset_id
             6,  # gene_id
-            "7.5",  # value
+            "0.123456789012345678901",  # value
             "gene2",  # name
             False,  # within_threshold
-            (20,),  # fetch_result
-            20,  # expected_result
+            (
+                5,
+                6,
+                "0.123456789012345678901",
+                '{"gene2"}',
+                '{"0.123456789012345678901"}',
+                False,
+                0,
+                "now",
+            ),  # expected_row
         ),
         # Add more test cases as needed
     ],
 )
 def test_insert_geneset_value(
-    geneset_id, gene_id, value, name, within_threshold, fetch_result, expected_result
+    geneset_id, gene_id, value, name, within_threshold, expected_row
 ):
-    """Test the happy path using a mock cursor."""
-    mock_cursor = get_magic_mock_cursor(fetch_result)
+    """Test that the value is copied in as a one row batch, and committed."""
+    mock_cursor = get_magic_mock_cursor(None)
+    copier = mock_cursor.copy.return_value.__enter__.return_value
     result = insert_geneset_value(
         mock_cursor, geneset_id, gene_id, value, name, within_threshold
     )
-    assert result == expected_result
+    assert result == geneset_id
+    mock_cursor.copy.assert_called_once_with(COPY_GENESET_VALUES)
+    copier.write_row.assert_called_once_with(expected_row)
+    mock_cursor.execute.assert_not_called()
+    mock_cursor.connection.commit.assert_called_once()
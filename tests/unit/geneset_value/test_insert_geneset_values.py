@@ -0,0 +1,61 @@
+"""Test the insert_geneset_values function."""
+
+import pytest
+from geneweaver.db.geneset_value import insert_geneset_values
+from geneweaver.db.query.geneset.const import (
+    COPY_GENESET_VALUES,
+    COPY_GENESET_VALUES_TEXT_TYPES,
+)
+
+from tests.unit.testing_utils import get_magic_mock_cursor
+
+
+def test_insert_geneset_values():
+    """Test that all the values are copied in as text, and committed once."""
+    cursor = get_magic_mock_cursor(None)
+    copier = cursor.copy.return_value.__enter__.return_value
+    values = [
+        (10, "0.123456789012345678901", "Abc1", True),
+        (11, 0.5, "Def2", False),
+    ]
+
+    assert insert_geneset_values(cursor, 7, iter(values)) == 2
+
+    cursor.copy.assert_called_once_with(COPY_GENESET_VALUES)
+    copier.set_types.assert_called_once_with(COPY_GENESET_VALUES_TEXT_TYPES)
+    assert [call[0][0] for call in copier.write_row.call_args_list] == [
+        (
+            7,
+            10,
+            "0.123456789012345678901",
+            '{"Abc1"}',
+            '{"0.123456789012345678901"}',
+            True,
+            0,
+            "now",
+        ),
+        (7, 11, "0.5", '{"Def2"}', '{"0.5"}', False, 0, "now"),
+    ]
+    cursor.execute.assert_not_called()
+    cursor.connection.commit.assert_called_once()
+
+
+def test_insert_no_geneset_values():
+    """Test that an empty batch inserts nothing."""
+    cursor = get_magic_mock_cursor(None)
+
+    assert insert_geneset_values(cursor, 7, []) == 0
+
+    cursor.copy.return_value.__enter__.return_value.write_row.assert_not_called()
+
+
+def test_insert_geneset_values_error_is_not_committed():
+    """Test that nothing is committed when the copy fails."""
+    cursor = get_magic_mock_cursor(None)
+    copier = cursor.copy.return_value.__enter__.return_value
+    copier.write_row.side_effect = ValueError("bad row")
+
+    with pytest.raises(ValueError, match="bad row"):
+        insert_geneset_values(cursor, 7, [(10, "0.01", "Abc1", True)])
+
+    cursor.connection.commit.assert_not_called()
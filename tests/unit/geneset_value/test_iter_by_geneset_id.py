@@ -0,0 +1,84 @@
+"""Test the iter_by_geneset_id functions (sync and async)."""
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.aio.geneset_value import (
+    iter_by_geneset_id as async_iter_by_geneset_id,
+)
+from geneweaver.db.geneset_value import iter_by_geneset_id
+from geneweaver.db.query import geneset_value as geneset_value_query
+
+from tests.unit.testing_utils import async_mock_server_cursor, mock_server_cursor
+
+GENESET_VALUES = [{"ode_gene_id": 1}, {"ode_gene_id": 2}, {"ode_gene_id": 3}]
+
+
+def _expected_query(geneset_id, identifier, gsv_in_threshold) -> tuple:
+    """Get the query that should be streamed for the given arguments."""
+    if identifier is not None:
+        return geneset_value_query.by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
+    return geneset_value_query.by_geneset_id_as_uploaded(geneset_id, gsv_in_threshold)
+
+
+@pytest.mark.parametrize("geneset_id", [406756, 105683, 56893])
+@pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+@pytest.mark.parametrize("itersize", [10, 1000])
+def test_iter_by_geneset_id(geneset_id, identifier, gsv_in_threshold, itersize, cursor):
+    """Test that geneset values are streamed from a server-side cursor."""
+    server_cursor = mock_server_cursor(cursor, GENESET_VALUES)
+
+    result = iter_by_geneset_id(
+        cursor,
+        geneset_id,
+        identifier=identifier,
+        gsv_in_threshold=gsv_in_threshold,
+        itersize=itersize,
+    )
+
+    assert list(result) == GENESET_VALUES
+    assert server_cursor.itersize == itersize
+    assert server_cursor.execute.call_args[0] == _expected_query(
+        geneset_id, identifier, gsv_in_threshold
+    )
+    assert cursor.execute.call_count == 0
+    assert cursor.fetchall.call_count == 0
+
+
+@pytest.mark.parametrize("geneset_id", [406756, 105683, 56893])
+@pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+async def test_async_iter_by_geneset_id(
+    geneset_id, identifier, gsv_in_threshold, async_cursor
+):
+    """Test that geneset values are streamed from an async server-side cursor."""
+    server_cursor = async_mock_server_cursor(async_cursor, GENESET_VALUES)
+
+    result = async_iter_by_geneset_id(
+        async_cursor,
+        geneset_id,
+        identifier=identifier,
+        gsv_in_threshold=gsv_in_threshold,
+        itersize=10,
+    )
+
+    assert [row async for row in result] == GENESET_VALUES
+    assert server_cursor.execute.call_args[0] == _expected_query(
+        geneset_id, identifier, gsv_in_threshold
+    )
+    assert async_cursor.execute.call_count == 0
+    assert async_cursor.fetchall.call_count == 0
+
+
+def test_iter_by_geneset_id_execute_raises_error(cursor, all_psycopg_errors):
+    """Test that errors from the server-side cursor are raised while iterating."""
+    server_cursor = mock_server_cursor(cursor, GENESET_VALUES)
+    server_cursor.execute.side_effect = all_psycopg_errors("Error message")
+
+    result = iter_by_geneset_id(cursor, 1, itersize=10)
+    with pytest.raises(all_psycopg_errors, match="Error message"):
+        next(result)
+
+    assert server_cursor.__exit__.call_count == 1
@@ -0,0 +1 @@
+"""Test the in-memory homology index."""
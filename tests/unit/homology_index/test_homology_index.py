@@ -0,0 +1,129 @@
+"""Test the HomologyIndex class."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.exceptions import GeneweaverError
+from geneweaver.db.homology_index import HomologyIndex
+
+SYMBOL = GeneIdentifier.GENE_SYMBOL
+ENSEMBL = GeneIdentifier.ENSEMBLE_GENE
+MOUSE = Species.MUS_MUSCULUS
+HUMAN = Species.HOMO_SAPIENS
+
+# (ode_gene_id, ode_ref_id, gdb_id, sp_id, ode_pref), sorted by sp_id, ode_gene_id
+GENE_ROWS = sorted(
+    [
+        (1, "Pax6", int(SYMBOL), int(MOUSE), True),
+        (1, "ENSMUSG1", int(ENSEMBL), int(MOUSE), True),
+        (1, "ENSMUSG1b", int(ENSEMBL), int(MOUSE), False),
+        (2, "Shh", int(SYMBOL), int(MOUSE), True),
+        (11, "PAX6", int(SYMBOL), int(HUMAN), True),
+        (11, "ENSG11", int(ENSEMBL), int(HUMAN), True),
+        (12, "SHH", int(SYMBOL), int(HUMAN), True),
+        (12, "ENSG12", int(ENSEMBL), int(HUMAN), None),
+    ],
+    key=lambda row: (row[3], row[0]),
+)
+
+# (hom_id, ode_gene_id), sorted by ode_gene_id
+HOMOLOGY_ROWS = [(100, 1), (200, 2), (100, 11), (200, 12)]
+
+
+@pytest.fixture()
+def index() -> HomologyIndex:
+    """Provide an index loaded with the example rows."""
+    return HomologyIndex().load_rows(GENE_ROWS, HOMOLOGY_ROWS)
+
+
+def test_homolog_ids(index):
+    """Test cross species lookups of preferred ids."""
+    assert index.homolog_ids(["Pax6", "missing"], SYMBOL, result_species=HUMAN) == [
+        ("Pax6", int(MOUSE), "PAX6", int(HUMAN))
+    ]
+    assert sorted(index.homolog_ids(["Pax6"], ENSEMBL)) == [
+        ("Pax6", int(MOUSE), "ENSG11", int(HUMAN)),
+        ("Pax6", int(MOUSE), "ENSMUSG1", int(MOUSE)),
+    ]
+
+
+def test_homolog_ids_not_preferred(index):
+    """Test that only_preferred_ids=False returns only the non-preferred ids."""
+    assert index.homolog_ids(["Pax6"], ENSEMBL, only_preferred_ids=False) == [
+        ("Pax6", int(MOUSE), "ENSMUSG1b", int(MOUSE))
+    ]
+    # A NULL ode_pref is neither preferred nor not preferred.
+    assert index.homolog_ids(["Shh"], ENSEMBL, only_preferred_ids=False) == []
+
+
+def test_homolog_ids_source_filters(index):
+    """Test the source identifier and species filters."""
+    assert index.homolog_ids(["Pax6"], SYMBOL, source_identifier=ENSEMBL) == []
+    assert index.homolog_ids(["Pax6"], SYMBOL, source_species=HUMAN) == []
+    assert index.homolog_ids(
+        ["PAX6", "PAX6"], SYMBOL, source_species=HUMAN, result_species=MOUSE
+    ) == [("PAX6", int(HUMAN), "Pax6", int(MOUSE))]
+
+
+def test_homolog_ids_by_ode_id(index):
+    """Test lookups by ode_gene_id."""
+    assert sorted(index.homolog_ids_by_ode_id([2, "1"], SYMBOL)) == [
+        (1, "PAX6"),
+        (1, "Pax6"),
+        (2, "SHH"),
+        (2, "Shh"),
+    ]
+    assert index.homolog_ids_by_ode_id([3], SYMBOL) == []
+
+
+def test_not_loaded():
+    """Test that lookups on an index that hasn't been loaded raise an error."""
+    index = HomologyIndex()
+    assert not index.loaded
+    assert index.memory_footprint()["total"] == 0
+    with pytest.raises(GeneweaverError):
+        index.homolog_ids(["Pax6"], SYMBOL)
+
+
+def test_memory_footprint(index):
+    """Test that the footprint covers each part of the index."""
+    footprint = index.memory_footprint()
+    assert set(footprint) == {"genes", "refs", "ref_index", "homology", "total"}
+    assert all(footprint[key] > 0 for key in footprint)
+    assert footprint["total"] == sum(
+        value for key, value in footprint.items() if key != "total"
+    )
+    assert footprint["homology"] == 4 * len(HOMOLOGY_ROWS) * 8
+
+
+def test_refresh(cursor):
+    """Test that refresh replaces the snapshot with the rows from the database."""
+    index = HomologyIndex()
+    with patch("geneweaver.db.homology_index.iter_query") as mock_iter_query:
+        mock_iter_query.side_effect = [iter(GENE_ROWS), iter(HOMOLOGY_ROWS)]
+        index.refresh(cursor)
+    assert index.loaded
+    assert index.loaded_at is not None
+    assert mock_iter_query.call_count == 2
+
+    with patch("geneweaver.db.homology_index.iter_query") as mock_iter_query:
+        mock_iter_query.side_effect = [iter(GENE_ROWS[:1]), iter([])]
+        index.refresh(cursor)
+    assert index.homolog_ids(["Pax6"], SYMBOL) == []
+
+
+async def test_async_refresh():
+    """Test that async_refresh loads the rows from the database."""
+
+    async def rows(_, query):  # noqa: ANN001, ANN202
+        for row in GENE_ROWS if "extsrc.gene" in repr(query) else HOMOLOGY_ROWS:
+            yield row
+
+    cursor = MagicMock()
+    index = HomologyIndex()
+    with patch("geneweaver.db.homology_index.aiter_query", rows):
+        await index.async_refresh(cursor)
+    assert index.homolog_ids(["Shh"], SYMBOL, result_species=HUMAN) == [
+        ("Shh", int(MOUSE), "SHH", int(HUMAN))
+    ]
@@ -0,0 +1,247 @@
+"""Test the per-function latency instrumentation."""
+
+# ruff: noqa: ANN101
+
+import geneweaver.db
+import numpy as np
+import pytest
+from geneweaver.db import aio, gene, geneset_value, species, user
+from geneweaver.db.geneset_value import GenesetValueColumns
+from geneweaver.db.homology_index import HomologyIndex, homology_index
+from geneweaver.db.monitor import instrumentation
+from geneweaver.db.monitor.instrumentation import InMemorySink, Sink
+from geneweaver.db.utils import Page, RowsWithTotal
+from psycopg import errors
+
+from tests.unit.testing_utils import async_mock_server_cursor, mock_server_cursor
+
+
+@pytest.fixture()
+def sink():
+    """Enable the instrumentation for a test, and disable it afterwards."""
+    yield instrumentation.enable()
+    instrumentation.disable()
+
+
+def test_enable_wraps_and_disable_restores_functions():
+    """Test that enabling replaces public functions and disabling restores them."""
+    original_get, original_async_get = species.get, aio.species.get
+
+    instrumentation.enable()
+    try:
+        assert instrumentation.is_enabled()
+        assert species.get is not original_get
+        assert aio.species.get is not original_async_get
+        assert species.get.__wrapped__ is original_get
+    finally:
+        instrumentation.disable()
+
+    assert not instrumentation.is_enabled()
+    assert instrumentation.get_sink() is None
+    assert species.get is original_get
+    assert aio.species.get is original_async_get
+
+
+def test_enable_twice_does_not_double_wrap():
+    """Test that enabling with a new sink replaces the previous instrumentation."""
+    original_get = species.get
+    instrumentation.enable()
+    try:
+        new_sink = instrumentation.enable()
+        assert species.get.__wrapped__ is original_get
+        assert instrumentation.get_sink() is new_sink
+    finally:
+        instrumentation.disable()
+    assert species.get is original_get
+
+
+def test_enable_wraps_and_disable_restores_methods():
+    """Test that methods of module level objects are instrumented and restored."""
+    instrumentation.enable()
+    try:
+        assert "refresh" in vars(homology_index)
+        assert "async_refresh" in vars(homology_index)
+    finally:
+        instrumentation.disable()
+
+    assert "refresh" not in vars(homology_index)
+
+
+def test_records_method_calls(sink, cursor, monkeypatch):
+    """Test that method calls are recorded under the object's name."""
+    monkeypatch.setattr(HomologyIndex, "load_rows", lambda self, genes, pairs: self)
+
+    homology_index.refresh(cursor)
+
+    snapshot = sink.snapshot()
+    assert snapshot["homology_index.homology_index.refresh"]["count"] == 1
+
+
+def test_skips_functions_without_database_access():
+    """Test that only functions that take a cursor or connection are wrapped."""
+    original_format = geneset_value.format_geneset_values_for_file_insert
+    instrumentation.enable()
+    try:
+        assert geneset_value.format_geneset_values_for_file_insert is original_format
+        assert not hasattr(geneset_value.geneset_value_columns, "__wrapped__")
+        assert hasattr(geneset_value.insert_geneset_values, "__wrapped__")
+        assert "homolog_ids" not in vars(homology_index)
+        assert "memory_footprint" not in vars(homology_index)
+    finally:
+        instrumentation.disable()
+
+
+def test_records_nested_calls_once(sink, cursor):
+    """Test that a call made by another instrumented function isn't recorded."""
+    cursor.fetchone.side_effect = [(False,), (7,)]
+
+    user.link_user_id_with_sso_id(cursor, 7, "sso")
+
+    snapshot = sink.snapshot()
+    assert snapshot["user.link_user_id_with_sso_id"]["count"] == 1
+    assert "user.sso_id_exists" not in snapshot
+
+
+def test_modules_follow_package_all():
+    """Test that every database submodule in `__all__` is instrumented."""
+    assert "permissions" in instrumentation.SYNC_MODULES
+    assert "homology_index" in instrumentation.SYNC_MODULES
+    assert "aio" not in instrumentation.SYNC_MODULES
+    assert "exceptions" not in instrumentation.SYNC_MODULES
+    assert instrumentation.ASYNC_MODULES == tuple(f"aio.{name}" for name in aio.__all__)
+    assert set(instrumentation.SYNC_MODULES) <= set(geneweaver.db.__all__)
+
+
+def test_records_sync_calls(sink, cursor):
+    """Test that sync calls are counted along with the rows they return."""
+    cursor.fetchall.return_value = [{"sp_id": 1}, {"sp_id": 2}]
+
+    species.get(cursor)
+    species.get(cursor)
+
+    stats = sink.snapshot()["species.get"]
+    assert stats["count"] == 2
+    assert stats["rows"] == 4
+    assert stats["errors"] == 0
+    assert sum(stats["histogram"].values()) == 2
+    assert stats["total_time"] >= stats["max_time"] > 0
+
+
+def test_records_errors(sink, cursor):
+    """Test that calls that raise are recorded as errors, and re-raised."""
+    cursor.execute.side_effect = errors.QueryCanceled("Error message")
+
+    with pytest.raises(errors.QueryCanceled):
+        species.get(cursor)
+
+    stats = sink.snapshot()["species.get"]
+    assert stats["count"] == 1
+    assert stats["errors"] == 1
+    assert stats["rows"] == 0
+
+
+async def test_records_async_calls(sink, async_cursor):
+    """Test that async calls are recorded under their aio name."""
+    async_cursor.fetchone.return_value = {"sp_id": 1}
+
+    await aio.species.get_by_id(async_cursor, 1)
+
+    stats = sink.snapshot()["aio.species.get_by_id"]
+    assert stats["count"] == 1
+    assert stats["rows"] == 1
+
+
+def test_records_generators_when_exhausted(sink, cursor):
+    """Test that streaming calls are recorded once the generator is exhausted."""
+    mock_server_cursor(cursor, [{"ode_gene_id": 1}, {"ode_gene_id": 2}])
+
+    results = gene.iter_get(cursor, itersize=10)
+    assert "gene.iter_get" not in sink.snapshot()
+
+    assert len(list(results)) == 2
+    assert sink.snapshot()["gene.iter_get"]["rows"] == 2
+
+
+async def test_records_async_generators_when_exhausted(sink, async_cursor):
+    """Test that async streaming calls are recorded once the generator is done."""
+    async_mock_server_cursor(async_cursor, [{"ode_gene_id": 1}])
+
+    results = [row async for row in aio.gene.iter_get(async_cursor, itersize=10)]
+
+    assert len(results) == 1
+    assert sink.snapshot()["aio.gene.iter_get"]["rows"] == 1
+
+
+def test_custom_sink(cursor):
+    """Test that calls are passed to a custom sink."""
+
+    class ListSink(Sink):
+        def __init__(self) -> None:
+            self.records = []
+
+        def record(self, name, duration, rows, error) -> None:
+            self.records.append((name, rows, error))
+
+    custom_sink = ListSink()
+    cursor.fetchall.return_value = []
+    instrumentation.enable(custom_sink)
+    try:
+        species.get(cursor)
+    finally:
+        instrumentation.disable()
+
+    assert custom_sink.records == [("species.get", 0, None)]
+
+
+@pytest.mark.parametrize(
+    ("duration", "bucket"),
+    [(0.0005, 0.001), (0.001, 0.001), (0.2, 0.25), (60.0, float("inf"))],
+)
+def test_in_memory_sink_histogram(duration, bucket):
+    """Test that calls are counted in the right histogram bucket."""
+    sink = InMemorySink()
+    sink.record("gene.get", duration, 1, None)
+
+    histogram = sink.snapshot()["gene.get"]["histogram"]
+    assert histogram[bucket] == 1
+    assert sum(histogram.values()) == 1
+
+
+def test_in_memory_sink_reset():
+    """Test that resetting the sink forgets all calls."""
+    sink = InMemorySink()
+    sink.record("gene.get", 0.1, 1, None)
+    sink.reset()
+    assert sink.snapshot() == {}
+
+
+@pytest.mark.parametrize(
+    ("result", "rows"),
+    [
+        (None, 0),
+        ([], 0),
+        ([1, 2, 3], 3),
+        ((1,), 1),
+        ({"gs_id": 1}, 1),
+        (True, 1),
+        (
+            Page(rows=[{"gs_id": 1}, {"gs_id": 2}, {"gs_id": 3}], next_page_token="t"),
+            3,
+        ),
+        (Page(rows=[], next_page_token="token"), 0),
+        (RowsWithTotal(rows=[{"gs_id": 1}], total=120), 1),
+        (RowsWithTotal(rows=[], total=None), 0),
+        (
+            GenesetValueColumns(
+                ode_gene_id=np.arange(5),
+                gsv_value=np.zeros(5),
+                gsv_in_threshold=np.ones(5, dtype=np.bool_),
+                ode_ref_id=np.array(["a", "b", "c", "d", "e"]),
+            ),
+            5,
+        ),
+    ],
+)
+def test_count_rows(result, rows):
+    """Test how the rows returned by a function are counted."""
+    assert instrumentation.count_rows(result) == rows
@@ -0,0 +1 @@
+"""Test the materialized geneset permissions."""
@@ -0,0 +1,81 @@
+"""Test the permissions.readable_genesets function."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.db.aio.permissions import (
+    readable_genesets as async_readable_genesets,
+)
+from geneweaver.db.cache import _caches
+from geneweaver.db.core.cache import LRUCache
+from geneweaver.db.permissions import (
+    invalidate_readable_genesets,
+    readable_genesets,
+)
+from geneweaver.db.query.permissions import ReadableGenesets
+
+ROW = (False, "{-1,3,9}")
+READABLE = ReadableGenesets(7, False, "{-1,3,9}")
+
+
+@pytest.fixture(autouse=True)
+def readable_cache(monkeypatch) -> LRUCache:
+    """Provide an empty readable genesets cache that isn't sized from the settings."""
+    cache = LRUCache(100)
+    monkeypatch.setitem(_caches, "readable_genesets", cache)
+    return cache
+
+
+def test_readable_genesets_are_cached():
+    """Test that the user's groups are looked up once, then served from the cache."""
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ROW
+
+    assert readable_genesets(cursor, 7) == READABLE
+    assert readable_genesets(cursor, 7) == READABLE
+
+    cursor.execute.assert_called_once()
+    assert cursor.execute.call_args[0][1]["user_id"] == 7
+
+
+def test_readable_genesets_without_cache(readable_cache):
+    """Test that use_cache=False skips the cache."""
+    cursor = MagicMock()
+    cursor.fetchone.return_value = ROW
+    readable_cache.set(7, ReadableGenesets(7, True, "{-1}"))
+
+    assert readable_genesets(cursor, 7, use_cache=False) == READABLE
+    assert readable_cache.get(7) == ReadableGenesets(7, True, "{-1}")
+
+
+async def test_async_readable_genesets_are_cached():
+    """Test that the user's groups are looked up once, then cached (async)."""
+    cursor = AsyncMock()
+    cursor.fetchone.return_value = ROW
+
+    assert await async_readable_genesets(cursor, 7) == READABLE
+    assert await async_readable_genesets(cursor, 7) == READABLE
+
+    cursor.execute.assert_awaited_once()
+
+
+def test_invalidate_some_users(readable_cache):
+    """Test that only the given users are invalidated."""
+    for user_id in (1, 2, 3):
+        readable_cache.set(user_id, READABLE)
+
+    invalidate_readable_genesets([1, 3])
+
+    assert 2 in readable_cache
+    assert 1 not in readable_cache
+    assert 3 not in readable_cache
+
+
+def test_invalidate_every_user(readable_cache):
+    """Test that every user is invalidated by default."""
+    for user_id in (1, 2):
+        readable_cache.set(user_id, READABLE)
+
+    invalidate_readable_genesets()
+
+    assert len(readable_cache) == 0
@@ -0,0 +1 @@
+"""Tests for the pipeline batch execution functions."""
@@ -0,0 +1,88 @@
+"""Test the execute_batch pipeline functions (sync and async)."""
+
+from typing import List
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.db.aio.pipeline import execute_batch as async_execute_batch
+from geneweaver.db.pipeline import execute_batch
+from geneweaver.db.query import geneset as geneset_query
+from geneweaver.db.query import ontology as ontology_query
+from geneweaver.db.query import publication as publication_query
+from psycopg import AsyncCursor, Cursor
+
+QUERIES = [
+    geneset_query.get(gs_id=1),
+    ontology_query.by_geneset(geneset_id=1),
+    publication_query.by_geneset_id(geneset_id=1),
+]
+
+RESULTS = [[{"id": 1}], [{"ont": "a"}, {"ont": "b"}], None]
+
+
+def _batch_cursors(cursor_class, results) -> List[MagicMock]:
+    """Create one mock cursor per expected result."""
+    batch_cursors = []
+    for result in results:
+        batch_cursor = MagicMock(spec=cursor_class)
+        batch_cursor.description = None if result is None else ["column"]
+        batch_cursor.fetchall.return_value = result
+        batch_cursors.append(batch_cursor)
+    return batch_cursors
+
+
+def test_execute_batch(cursor):
+    """Test that each query is run on its own cursor inside a pipeline."""
+    batch_cursors = _batch_cursors(Cursor, RESULTS)
+    cursor.connection.cursor.side_effect = batch_cursors
+
+    results = execute_batch(cursor, QUERIES)
+
+    assert results == RESULTS
+    assert cursor.execute.call_count == 0
+    assert cursor.connection.pipeline.call_count == 1
+    assert cursor.connection.pipeline.return_value.__exit__.call_count == 1
+    for batch_cursor, query in zip(batch_cursors, QUERIES):
+        assert batch_cursor.execute.call_args[0] == query
+        assert batch_cursor.close.call_count == 1
+    for call in cursor.connection.cursor.call_args_list:
+        assert call[1]["row_factory"] == cursor.row_factory
+
+
+def test_execute_batch_empty(cursor):
+    """Test that an empty batch returns an empty list."""
+    assert execute_batch(cursor, []) == []
+
+
+def test_execute_batch_closes_cursors_on_error(cursor, all_psycopg_errors):
+    """Test that batch cursors are closed when the pipeline raises an error."""
+    batch_cursors = _batch_cursors(Cursor, RESULTS)
+    batch_cursors[1].execute.side_effect = all_psycopg_errors("Error message")
+    cursor.connection.cursor.side_effect = batch_cursors
+
+    with pytest.raises(all_psycopg_errors, match="Error message"):
+        execute_batch(cursor, QUERIES)
+
+    for batch_cursor in batch_cursors:
+        assert batch_cursor.close.call_count == 1
+
+
+async def test_async_execute_batch():
+    """Test that each query is run on its own async cursor inside a pipeline."""
+    async_cursor = MagicMock(spec=AsyncCursor)
+    batch_cursors = [
+        AsyncMock(spec=AsyncCursor, description=None if r is None else ["column"])
+        for r in RESULTS
+    ]
+    for batch_cursor, result in zip(batch_cursors, RESULTS):
+        batch_cursor.fetchall.return_value = result
+    async_cursor.connection.cursor.side_effect = batch_cursors
+
+    results = await async_execute_batch(async_cursor, QUERIES)
+
+    assert results == RESULTS
+    assert async_cursor.connection.pipeline.call_count == 1
+    assert async_cursor.connection.pipeline.return_value.__aexit__.await_count == 1
+    for batch_cursor, query in zip(batch_cursors, QUERIES):
+        assert batch_cursor.execute.call_args[0] == query
+        assert batch_cursor.close.await_count == 1
@@ -3,6 +3,9 @@
 import pytest
 from geneweaver.db.aio.project import get as async_get
 from geneweaver.db.project import get
+from geneweaver.db.query.project import PROJECT_KEYSET
+from geneweaver.db.query.utils import decode_page_token, encode_page_token
+from geneweaver.db.utils import Page, RowsWithTotal
 
 from tests.unit.testing_utils import (
     async_create_execute_raises_error_test,
@@ -78,7 +81,7 @@ async def test_async_get(
     """Test the project.get function."""
     async_cursor.fetchall.return_value = projects
 
-    result = await get(
+    result = await async_get(
         cursor=async_cursor,
         project_id=project_id,
         owner_id=owner_id,
@@ -103,3 +106,56 @@ test_get_execute_raises_error = async_create_execute_raises_error_test(async_get
 test_async_get_fetchall_raises_error = async_create_fetchall_raises_error_test(
     async_get, 1
 )
+
+
+@pytest.mark.parametrize("rows", [[(3, 1, "a"), (7, 1, "b")], [(3, 1, "a")]])
+def test_get_keyset_page(rows, cursor):
+    """Test that a keyset page gets the token of its last row, if it is full."""
+    cursor.fetchall.return_value = rows
+
+    result = get(cursor, limit=2, keyset=True)
+
+    assert isinstance(result, Page)
+    assert result.rows == rows
+    if len(rows) == 2:
+        assert decode_page_token(result.next_page_token, PROJECT_KEYSET) == [7]
+    else:
+        assert result.next_page_token is None
+    assert "offset" not in cursor.execute.call_args[0][1]
+
+
+async def test_async_get_keyset_page(async_cursor):
+    """Test that an async page token continues the listing."""
+    async_cursor.fetchall.return_value = [(3, 1, "a"), (7, 1, "b")]
+
+    result = await async_get(async_cursor, limit=2, page_token=encode_page_token([1]))
+
+    assert isinstance(result, Page)
+    assert decode_page_token(result.next_page_token, PROJECT_KEYSET) == [7]
+    assert async_cursor.execute.call_args[0][1]["after_id"] == 1
+
+
+def test_get_without_keyset_returns_rows(cursor):
+    """Test that the results are a plain list when not paging by the keyset."""
+    cursor.fetchall.return_value = [(3, 1, "a"), (7, 1, "b")]
+
+    assert get(cursor, limit=2) == [(3, 1, "a"), (7, 1, "b")]
+
+
+def test_get_with_total(cursor):
+    """Test that the total count is taken out of the rows."""
+    cursor.fetchall.return_value = [(3, 1, "a", 12), (7, 1, "b", 12)]
+
+    result = get(cursor, limit=2, offset=4, with_total=True)
+
+    assert result == RowsWithTotal([(3, 1, "a"), (7, 1, "b")], 12)
+    assert cursor.execute.call_count == 1
+
+
+async def test_async_get_with_total(async_cursor):
+    """Test that the async total count is taken out of the (dict) rows."""
+    async_cursor.fetchall.return_value = [{"id": 3, "total_count": 1}]
+
+    result = await async_get(async_cursor, limit=2, with_total=True)
+
+    assert result == RowsWithTotal([{"id": 3}], 1)
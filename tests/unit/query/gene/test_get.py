@@ -2,7 +2,9 @@
 
 import pytest
 from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.exceptions import GeneweaverValueError
 from geneweaver.db.query.gene import GENE_FIELDS_MAP, GENE_INFO_FIELDS_MAP, get
+from geneweaver.db.query.utils import encode_page_token
 
 
 @pytest.mark.parametrize("gene_id", [None, 1, 12345])
@@ -62,3 +64,25 @@ def test_all_kwargs(
     for key, value in GENE_INFO_FIELDS_MAP.items():
         assert value in str_query
         assert key in str_query
+
+
+@pytest.mark.parametrize("species", [None, Species.HOMO_SAPIENS])
+@pytest.mark.parametrize("page_token", [None, encode_page_token([7, 2, "ENSG1"])])
+def test_keyset(species, page_token):
+    """Test that keyset pages are sorted by gene ID, gene database and ref ID."""
+    query, params = get(species=species, limit=10, keyset=True, page_token=page_token)
+
+    order_by = str(query).split("ORDER BY")[1]
+    assert order_by.index("'ode_gene_id'") < order_by.index("'gdb_id'")
+    assert order_by.index("'gdb_id'") < order_by.index("'ode_ref_id'")
+    assert "offset" not in params
+    if page_token is not None:
+        assert params["after_id"] == 7
+        assert params["after_gene_database"] == 2
+        assert params["after_reference_id"] == "ENSG1"
+
+
+def test_keyset_rejects_token_of_other_listing():
+    """Test that a token with a different key (e.g. a geneset's) is rejected."""
+    with pytest.raises(GeneweaverValueError):
+        get(limit=10, page_token=encode_page_token([7]))
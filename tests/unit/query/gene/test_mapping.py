@@ -0,0 +1,41 @@
+"""Test the gene mapping query generation function."""
+
+from geneweaver.core.enum import GeneIdentifier, Species
+from geneweaver.db.query.gene import aon_mapping, mapping
+from psycopg.sql import Identifier
+
+
+def test_mapping_picks_one_preferred_target_per_gene():
+    """Test that one preferred target is picked per source gene, in one pass."""
+    query, params = mapping(
+        ["a", "b"], Species.MUS_MUSCULUS, GeneIdentifier.ENSEMBLE_GENE
+    )
+    rendered = repr(query)
+    assert "PrefTrueCheck" not in rendered
+    assert "OVER" not in rendered
+    assert "DISTINCT ON (g1.ode_ref_id)" in rendered
+    assert "ORDER BY g1.ode_ref_id, g2.ode_pref IS TRUE DESC" in rendered
+    assert rendered.count("extsrc.gene") == 2
+    assert params == {
+        "source_ids": ["a", "b"],
+        "target_gene_id_type": int(GeneIdentifier.ENSEMBLE_GENE),
+        "species_id": int(Species.MUS_MUSCULUS),
+    }
+
+
+def test_mapping_with_source_table():
+    """Test that a temp table replaces the source ids array parameter."""
+    query, params = mapping(
+        ["a", "b"],
+        Species.MUS_MUSCULUS,
+        GeneIdentifier.ENSEMBLE_GENE,
+        source_table=Identifier("gw_ids_test"),
+    )
+    assert "gw_ids_test" in repr(query)
+    assert "source_ids" not in params
+
+
+def test_aon_mapping_uses_species_target():
+    """Test that the AON mapping targets the species' AON identifier type."""
+    _, params = aon_mapping(["a"], Species.MUS_MUSCULUS)
+    assert params["target_gene_id_type"] == int(GeneIdentifier.MGI)
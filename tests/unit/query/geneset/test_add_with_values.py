@@ -0,0 +1,63 @@
+"""Test the geneset.write.add_with_values query generation function."""
+
+import pytest
+from geneweaver.core.enum import (
+    GeneIdentifier,
+    GenesetTier,
+    Microarray,
+    ScoreType,
+    Species,
+)
+from geneweaver.core.schema.gene import GeneValue
+from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.query.geneset import add, add_with_values
+
+KWARGS = {
+    "user_id": 1,
+    "name": "a name",
+    "abbreviation": "an abbreviation",
+    "tier": GenesetTier.TIER4,
+    "species": Species.MUS_MUSCULUS,
+    "count": 3,
+    "score": GenesetScoreType(score_type=ScoreType.P_VALUE, threshold=0.05),
+    "gene_id_type": GeneIdentifier.GENE_SYMBOL,
+    "values": [
+        GeneValue(symbol="Abc1", value=0.01),
+        GeneValue(symbol='Quo"te', value=0.5),
+        GeneValue(symbol="Abc1", value=0.05),
+    ],
+}
+
+
+def test_inserts_are_chained_in_one_statement():
+    """Test that the file, geneset and value inserts are chained in CTEs."""
+    query, _ = add_with_values(**KWARGS)
+    sql = query.as_string(None)
+
+    assert sql.index("INSERT INTO file") < sql.index("INSERT INTO geneset")
+    assert sql.index("INSERT INTO geneset") < sql.index("INSERT INTO geneset_value")
+    assert "(SELECT file_id FROM new_file)" in sql
+    assert "%(file_id)s" not in sql
+    assert sql.rstrip().endswith("SELECT gs_id FROM new_geneset")
+
+
+def test_params():
+    """Test the file, geneset and value params."""
+    _, params = add_with_values(**KWARGS)
+    _, add_params = add(file_id=1, **{k: v for k, v in KWARGS.items() if k != "values"})
+
+    assert "file_id" not in params
+    assert params["file_contents"] == 'Abc1\t0.01\nQuo"te\t0.5\nAbc1\t0.05'
+    assert {k: v for k, v in params.items() if k in add_params} == {
+        k: v for k, v in add_params.items() if k != "file_id"
+    }
+    assert params["symbols"] == '{"Abc1","Quo\\"te","Abc1"}'
+    assert params["values"] == "{0.01,0.5,0.05}"
+    assert params["in_threshold"] == "{True,False,False}"
+
+
+def test_microarray():
+    """Test that microarray probe IDs are rejected."""
+    with pytest.raises(GeneweaverValueError):
+        add_with_values(**{**KWARGS, "gene_id_type": list(Microarray)[0]})
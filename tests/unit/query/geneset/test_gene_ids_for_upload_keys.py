@@ -0,0 +1,25 @@
+"""Test the geneset.write.gene_ids_for_upload_keys query generation function."""
+
+from geneweaver.db.query.geneset import gene_ids_for_upload_keys
+
+
+def test_keys_are_sent_as_array_literals():
+    """Test that the keys are split into one array literal per column."""
+    query, params = gene_ids_for_upload_keys([("Abc1", 7, 1), ("Def2", 7, 2)])
+
+    assert params == {
+        "symbols": '{"Abc1","Def2"}',
+        "gene_id_types": "{7,7}",
+        "species": "{1,2}",
+    }
+    sql = str(query)
+    for name in ("symbols", "gene_id_types", "species"):
+        assert f"%({name})s" in sql
+    assert "JOIN gene" in sql
+
+
+def test_no_keys():
+    """Test that no keys make empty arrays, which match no genes."""
+    _, params = gene_ids_for_upload_keys([])
+
+    assert params == {"symbols": "{}", "gene_id_types": "{}", "species": "{}"}
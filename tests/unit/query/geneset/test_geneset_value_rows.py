@@ -0,0 +1,90 @@
+"""Test the utilities that build geneset values for bulk geneset uploads."""
+
+import datetime
+from typing import Optional, Tuple, Union
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier, Microarray, ScoreType, Species
+from geneweaver.core.schema.gene import GeneValue
+from geneweaver.core.schema.geneset import GenesetUpload
+from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.query.geneset.utils import (
+    geneset_value_rows,
+    upload_gene_ids,
+    upload_gene_keys,
+)
+
+TODAY = datetime.date(2024, 1, 2)
+
+
+def _upload(
+    *values: Tuple[str, float],
+    species: Species = Species.MUS_MUSCULUS,
+    gene_id_type: Optional[Union[GeneIdentifier, Microarray]] = None,
+) -> GenesetUpload:
+    return GenesetUpload(
+        score=GenesetScoreType(score_type=ScoreType.P_VALUE, threshold=0.05),
+        species=species,
+        gene_id_type=gene_id_type or GeneIdentifier.GENE_SYMBOL,
+        abbreviation="abbr",
+        name="name",
+        values=[GeneValue(symbol=symbol, value=value) for symbol, value in values],
+    )
+
+
+def test_upload_gene_keys_are_distinct():
+    """Test that each symbol is resolved once per gene ID type and species."""
+    first = _upload(("A", 0.01), ("B", 0.2))
+    second = _upload(("B", 0.3), ("C", 0.1))
+    human = _upload(("A", 0.01), species=Species.HOMO_SAPIENS)
+
+    assert upload_gene_keys([first, second, human]) == [
+        ("A", 7, 1),
+        ("B", 7, 1),
+        ("C", 7, 1),
+        ("A", 7, 2),
+    ]
+
+
+def test_upload_gene_keys_rejects_microarrays():
+    """Test that uploads of probe IDs can't be added in bulk."""
+    upload = _upload(("1415670_at", 0.01), gene_id_type=list(Microarray)[0])
+
+    with pytest.raises(GeneweaverValueError):
+        upload_gene_keys([upload])
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [("A", 7, 1, 10), ("A", 7, 1, 11), ("B", 7, 1, 12)],
+        [
+            {"ode_ref_id": "A", "gdb_id": 7, "sp_id": 1, "ode_gene_id": 10},
+            {"ode_ref_id": "A", "gdb_id": 7, "sp_id": 1, "ode_gene_id": 11},
+            {"ode_ref_id": "B", "gdb_id": 7, "sp_id": 1, "ode_gene_id": 12},
+        ],
+    ],
+)
+def test_upload_gene_ids(rows):
+    """Test that the resolved gene IDs are grouped by key, for any row factory."""
+    assert upload_gene_ids(rows) == {("A", 7, 1): [10, 11], ("B", 7, 1): [12]}
+
+
+def test_geneset_value_rows():
+    """Test the rows of resolved, unresolved and shared symbols."""
+    upload = _upload(("A", 0.01), ("Missing", 0.02), ("B", 0.5), ("Syn", 0.03))
+    gene_ids = {("A", 7, 1): [10, 11], ("B", 7, 1): [12], ("Syn", 7, 1): [12]}
+
+    rows = list(geneset_value_rows(99, upload, gene_ids, TODAY))
+
+    assert rows == [
+        (99, 10, 0.01, '{"A"}', "{0.01}", True, 0, TODAY),
+        (99, 11, 0.01, '{"A"}', "{0.01}", True, 0, TODAY),
+        (99, 12, 0.5, '{"B","Syn"}', "{0.5,0.03}", False, 0, TODAY),
+    ]
+
+
+def test_geneset_value_rows_without_genes():
+    """Test that an upload without any resolved symbols has no rows."""
+    assert list(geneset_value_rows(1, _upload(("A", 0.01)), {}, TODAY)) == []
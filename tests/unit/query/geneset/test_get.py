@@ -0,0 +1,142 @@
+"""Test the geneset.read.get query generation function."""
+
+import pytest
+from geneweaver.core.enum import GenesetTier
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.query.geneset.read import get
+from geneweaver.db.query.permissions import ReadableGenesets
+from geneweaver.db.query.utils import compiled_queries, encode_page_token
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        ({"gs_id": 1}, {"gs_id": 2}),
+        ({"owner_id": 1, "limit": 10}, {"owner_id": 5, "limit": 1000}),
+        ({"limit": 10, "offset": 0}, {"limit": 25, "offset": 500}),
+        (
+            {"curation_tier": GenesetTier.TIER1, "search_text": "a"},
+            {
+                "curation_tier": {GenesetTier.TIER2, GenesetTier.TIER3},
+                "search_text": "b",
+            },
+        ),
+        (
+            {"is_readable_by": 1, "pubmed_id": 123},
+            {"is_readable_by": 2, "pubmed_id": 9},
+        ),
+    ],
+)
+def test_same_shape_reuses_query(first, second):
+    """Test that calls with the same filters set share the same query."""
+    first_query, first_params = get(**first)
+    second_query, second_params = get(**second)
+
+    assert first_query is second_query
+    assert first_params != second_params
+    assert first_params.keys() == second_params.keys()
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        ({"gs_id": 1}, {"owner_id": 1}),
+        ({"gs_id": 1}, {"gs_id": 1, "limit": 10}),
+        ({"limit": 10}, {"offset": 10}),
+        ({"pubmed_id": 1}, {"publication_id": 1}),
+        ({"with_publication_info": True}, {"with_publication_info": False}),
+        ({"ontology_term": "GO:0001"}, {}),
+        ({"status": "normal"}, {"status": None}),
+        ({"limit": 10}, {"limit": 10, "keyset": True}),
+        ({"limit": 10}, {"limit": 10, "with_total": True}),
+    ],
+)
+def test_different_shapes_get_different_queries(first, second):
+    """Test that calls with different filters set get different queries."""
+    first_query, _ = get(**first)
+    second_query, _ = get(**second)
+
+    assert first_query != second_query
+
+
+def test_limit_and_offset_are_bound():
+    """Test that the limit and offset are query parameters, not part of the SQL."""
+    query, params = get(limit=12345, offset=67890)
+
+    assert params["limit"] == 12345
+    assert params["offset"] == 67890
+    assert "%(limit)s" in str(query)
+    assert "%(offset)s" in str(query)
+    assert "12345" not in str(query)
+    assert "67890" not in str(query)
+
+
+def test_repeated_calls_hit_the_cache():
+    """Test that repeated calls are served by the compiled query cache."""
+    get(gs_id=1, is_readable_by=1)
+    hits = compiled_queries.info()["hits"]
+
+    get(gs_id=2, is_readable_by=3)
+
+    assert compiled_queries.info()["hits"] == hits + 1
+
+
+def test_keyset_first_page():
+    """Test that the first keyset page is sorted by geneset ID, without an offset."""
+    query, params = get(limit=10, keyset=True)
+
+    assert "ORDER BY" in str(query)
+    assert "'gs_id'" in str(query).split("ORDER BY")[1]
+    assert "OFFSET" not in str(query)
+    assert params == {"gs_status": "normal", "limit": 10}
+
+
+def test_keyset_next_page():
+    """Test that a page token continues after the geneset ID it holds."""
+    query, params = get(limit=10, page_token=encode_page_token([1234]))
+
+    assert params["after_id"] == 1234
+    assert "Placeholder('after_id')" in str(query)
+    assert "ORDER BY" in str(query)
+
+
+def test_keyset_rejects_offset():
+    """Test that an offset can't be combined with a page token."""
+    with pytest.raises(GeneweaverValueError):
+        get(limit=10, offset=10, page_token=encode_page_token([1234]))
+
+
+def test_keyset_rejects_invalid_page_token():
+    """Test that an invalid page token raises an error."""
+    with pytest.raises(GeneweaverValueError):
+        get(limit=10, page_token="not a token")
+
+
+def test_with_total():
+    """Test that the total count is the last field, computed before the limit."""
+    query, params = get(limit=10, offset=20, with_total=True)
+
+    select, after_from = str(query).split("FROM", 1)
+    assert "count(*) OVER ()" in select
+    assert "'total_count'" in select
+    assert select.rindex("'total_count'") > select.rindex("'updated'")
+    assert "LIMIT" in after_from
+    assert params == {"gs_status": "normal", "limit": 10, "offset": 20}
+
+
+def test_with_total_rejects_keyset():
+    """Test that a total count can't be combined with keyset pagination."""
+    with pytest.raises(GeneweaverValueError):
+        get(limit=10, keyset=True, with_total=True)
+
+
+def test_readable_genesets_replace_the_readable_function():
+    """Test that genesets are filtered on the user's materialized groups."""
+    readable = ReadableGenesets(7, False, "{-1,3}")
+
+    query, params = get(is_readable_by=7, readable_genesets=readable)
+
+    assert "readable_group_ids" in str(query)
+    assert "geneset_is_readable2" not in str(query)
+    assert params["readable_group_ids"] == "{-1,3}"
+    assert params["is_readable_by"] == 7
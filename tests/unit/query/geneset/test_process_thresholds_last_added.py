@@ -0,0 +1,12 @@
+"""Test the geneset.write.process_thresholds_last_added query generation function."""
+
+from geneweaver.db.query.geneset.write import process_thresholds_last_added
+
+
+def test_process_thresholds_last_added():
+    """Test that the geneset ID is read from the session's gs_id sequence."""
+    query, params = process_thresholds_last_added()
+
+    assert "production.process_thresholds(" in str(query)
+    assert "currval(pg_get_serial_sequence('geneset', 'gs_id'))" in str(query)
+    assert params == {}
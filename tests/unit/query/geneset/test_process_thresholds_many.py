@@ -0,0 +1,19 @@
+"""Test the geneset.write.process_thresholds_many query generation function."""
+
+from geneweaver.db.query.geneset.write import process_thresholds_many
+
+
+def test_process_thresholds_many():
+    """Test that every geneset is processed by one statement."""
+    query, params = process_thresholds_many([101, 102])
+
+    assert "production.process_thresholds(gs_id)" in str(query)
+    assert "unnest(%(geneset_ids)s::bigint[])" in str(query)
+    assert params == {"geneset_ids": [101, 102]}
+
+
+def test_process_thresholds_many_accepts_iterables():
+    """Test that the IDs are passed to the database as a list."""
+    _, params = process_thresholds_many(iter([7]))
+
+    assert params == {"geneset_ids": [7]}
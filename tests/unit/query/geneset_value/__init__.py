@@ -0,0 +1 @@
+"""Tests for the geneset value query generation functions."""
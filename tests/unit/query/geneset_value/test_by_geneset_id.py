@@ -0,0 +1,75 @@
+"""Test the geneset value query generation functions."""
+
+import pytest
+from geneweaver.core.enum import GeneIdentifier
+from geneweaver.db.query.geneset_value import (
+    REF_ID_SEPARATOR,
+    by_geneset_id_and_identifier,
+    by_geneset_id_as_uploaded,
+    by_geneset_id_columns,
+)
+
+
+@pytest.mark.parametrize("geneset_id", [1, 406756])
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+def test_by_geneset_id_as_uploaded(geneset_id, gsv_in_threshold):
+    """Test the query to get geneset values as they were uploaded."""
+    query, params = by_geneset_id_as_uploaded(geneset_id, gsv_in_threshold)
+    query_str = query.as_string(None)
+
+    assert params["geneset_id"] == geneset_id
+    assert "DISTINCT ON (gv.ode_gene_id)" in query_str
+    if gsv_in_threshold:
+        assert params["gsv_in_threshold"] is True
+        assert "gv.gsv_in_threshold = %(gsv_in_threshold)s" in query_str
+    else:
+        assert "gsv_in_threshold" not in params
+        assert "%(gsv_in_threshold)s" not in query_str
+
+
+@pytest.mark.parametrize("geneset_id", [1, 406756])
+@pytest.mark.parametrize(
+    "identifier", [GeneIdentifier.ENSEMBLE_GENE, GeneIdentifier.GENE_SYMBOL]
+)
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+def test_by_geneset_id_and_identifier(geneset_id, identifier, gsv_in_threshold):
+    """Test the query to get geneset values in a gene identifier."""
+    query, params = by_geneset_id_and_identifier(
+        geneset_id, identifier, gsv_in_threshold
+    )
+    query_str = query.as_string(None)
+
+    assert params["geneset_id"] == geneset_id
+    assert params["gdb_id"] == int(identifier)
+    assert "%(gdb_id)s" in query_str
+    if gsv_in_threshold:
+        assert params["gsv_in_threshold"] is True
+        assert "gsv.gsv_in_threshold = %(gsv_in_threshold)s" in query_str
+    else:
+        assert "gsv_in_threshold" not in params
+        assert "%(gsv_in_threshold)s" not in query_str
+
+
+@pytest.mark.parametrize("geneset_id", [1, 406756])
+@pytest.mark.parametrize("identifier", [None, GeneIdentifier.ENSEMBLE_GENE])
+@pytest.mark.parametrize("gsv_in_threshold", [None, True, False])
+def test_by_geneset_id_columns(geneset_id, identifier, gsv_in_threshold):
+    """Test the query to get geneset values as packed columns."""
+    query, params = by_geneset_id_columns(geneset_id, identifier, gsv_in_threshold)
+    query_str = query.as_string(None)
+
+    if identifier is not None:
+        values_query, values_params = by_geneset_id_and_identifier(
+            geneset_id, identifier, gsv_in_threshold
+        )
+    else:
+        values_query, values_params = by_geneset_id_as_uploaded(
+            geneset_id, gsv_in_threshold
+        )
+
+    assert params == {**values_params, "ref_id_separator": REF_ID_SEPARATOR}
+    assert f"FROM ({values_query.as_string(None)}) AS gsv" in query_str
+    assert "int8send(ode_gene_id::int8)" in query_str
+    assert "float8send(COALESCE(gsv_value::float8, 'NaN'))" in query_str
+    assert "boolsend(COALESCE(gsv_in_threshold, false))" in query_str
+    assert query_str.count("ORDER BY value_position") == 4
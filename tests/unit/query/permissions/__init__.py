@@ -0,0 +1 @@
+"""Test the sql generation code for permissions."""
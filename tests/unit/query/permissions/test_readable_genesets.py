@@ -0,0 +1,58 @@
+"""Test the permissions.readable_genesets query generation functions."""
+
+import pytest
+from geneweaver.db.query.permissions import (
+    ReadableGenesets,
+    readable_filter,
+    readable_genesets,
+    readable_genesets_from_row,
+)
+
+
+def test_readable_genesets_query():
+    """Test that the user's curator status and groups are looked up."""
+    query, params = readable_genesets(7)
+
+    assert params == {"user_id": 7, "public_group_id": -1}
+    sql = query.as_string(None)
+    assert "geneset_is_readable2" not in sql
+    assert "FROM geneset" not in sql
+    assert "usr_admin > 0" in sql
+    assert "FROM usr2grp WHERE usr_id = %(user_id)s" in sql
+
+
+@pytest.mark.parametrize(
+    ("row", "expected"),
+    [
+        ((False, "{-1,3,9}"), ReadableGenesets(7, False, "{-1,3,9}")),
+        ({"admin": True, "group_ids": "{-1}"}, ReadableGenesets(7, True, "{-1}")),
+        # The query always returns a row, but be safe if it doesn't.
+        (None, ReadableGenesets(7, False, "{-1}")),
+    ],
+)
+def test_readable_genesets_from_row(row, expected):
+    """Test that the row is unpacked with any row factory."""
+    assert readable_genesets_from_row(7, row) == expected
+
+
+def test_readable_filter():
+    """Test that genesets are matched on their tier, owner and groups."""
+    query, params = readable_filter(ReadableGenesets(7, False, "{-1,3}"), "gs")
+
+    sql = str(query)
+    assert "Identifier('gs')" in sql
+    assert ".cur_id = ANY(%(readable_public_tiers)s)" in sql
+    assert ".usr_id = %(is_readable_by)s" in sql
+    assert ".gs_groups, ',')::int[]" in sql
+    assert "&& %(readable_group_ids)s::int[]" in sql
+    assert "geneset_is_readable2" not in sql
+    assert params == {
+        "readable_public_tiers": [1, 2, 3],
+        "is_readable_by": 7,
+        "readable_group_ids": "{-1,3}",
+    }
+
+
+def test_readable_filter_for_curators():
+    """Test that curators and admins aren't filtered."""
+    assert readable_filter(ReadableGenesets(7, True, "{-1}")) == (None, {})
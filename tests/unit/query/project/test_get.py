@@ -1,7 +1,9 @@
 """Test the project.get query generation function."""
 
 import pytest
+from geneweaver.db.exceptions import GeneweaverValueError
 from geneweaver.db.query.project import PROJECT_FIELD_MAP, get
+from geneweaver.db.query.utils import encode_page_token
 
 
 @pytest.mark.parametrize("project_id", [None, 12345])
@@ -48,3 +50,41 @@ def test_all_kwargs(project_id, owner_id, name, starred, search_text, limit, off
     for key, value in PROJECT_FIELD_MAP.items():
         assert value in str_query
         assert key in str_query
+
+
+@pytest.mark.parametrize("owner_id", [None, 47])
+@pytest.mark.parametrize("page_token", [None, encode_page_token([12])])
+def test_keyset(owner_id, page_token):
+    """Test that keyset pages are sorted by project ID."""
+    query, params = get(owner_id=owner_id, limit=10, keyset=True, page_token=page_token)
+
+    assert "ORDER BY" in str(query)
+    assert "'pj_id'" in str(query).split("ORDER BY")[1]
+    assert "offset" not in params
+    if page_token is not None:
+        assert params["after_id"] == 12
+    else:
+        assert "after_id" not in params
+
+
+def test_keyset_rejects_offset():
+    """Test that an offset can't be combined with a page token."""
+    with pytest.raises(GeneweaverValueError):
+        get(offset=10, page_token=encode_page_token([12]))
+
+
+def test_with_total():
+    """Test that the total count is added after the project fields."""
+    query, params = get(owner_id=47, limit=10, offset=10, with_total=True)
+
+    select = str(query).split("FROM", 1)[0]
+    assert "count(*) OVER ()" in select
+    assert select.rindex("'total_count'") > select.rindex("'star'")
+    assert params["limit"] == 10
+    assert params["offset"] == 10
+
+
+def test_with_total_rejects_keyset():
+    """Test that a total count can't be combined with keyset pagination."""
+    with pytest.raises(GeneweaverValueError):
+        get(keyset=True, with_total=True)
@@ -0,0 +1,119 @@
+"""Test the search.genesets query generation function."""
+
+import pytest
+from geneweaver.core.enum import Species
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.query.geneset.const import GENESET_FIELDS_MAP, GENESET_KEYSET
+from geneweaver.db.query.permissions import ReadableGenesets
+from geneweaver.db.query.search.search import genesets, genesets_keyset
+from geneweaver.db.query.utils import encode_page_token
+
+
+def test_same_shape_reuses_query():
+    """Test that searches with the same filters set share the same query."""
+    first_query, first_params = genesets("a", species=Species.HOMO_SAPIENS, offset=0)
+    second_query, second_params = genesets("b", species=Species.MUS_MUSCULUS, offset=25)
+
+    assert first_query is second_query
+    assert first_params["search"] == "a"
+    assert second_params["search"] == "b"
+    assert second_params["offset"] == 25
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"is_readable_by": 1},
+        {"pubmed_id": 1},
+        {"limit": None},
+        {"offset": None},
+        {"_status": None},
+        {"keyset": True, "offset": None},
+    ],
+)
+def test_different_shapes_get_different_queries(kwargs):
+    """Test that searches with different filters set get different queries."""
+    default_query, _ = genesets("a")
+    query, _ = genesets("a", **kwargs)
+
+    assert query != default_query
+
+
+def test_limit_and_offset_are_bound():
+    """Test that the limit and offset are query parameters, not part of the SQL."""
+    query, params = genesets("a")
+
+    assert params["limit"] == 25
+    assert params["offset"] == 0
+    assert "%(limit)s" in str(query)
+    assert "%(offset)s" in str(query)
+
+
+def test_genesets_keyset():
+    """Test that searches are paged by rank and geneset ID, best first."""
+    keyset = genesets_keyset("a")
+
+    assert keyset.fields == ("search_rank", "id")
+    assert keyset.indexes == (len(GENESET_FIELDS_MAP), 0)
+    assert keyset.descending
+    assert genesets_keyset(None) is GENESET_KEYSET
+
+
+def test_keyset_first_page():
+    """Test that the first keyset page is sorted by rank, and returns the rank."""
+    query, params = genesets("a", keyset=True)
+
+    assert "AS search_rank" in str(query)
+    assert "ts_rank" in str(query).split("ORDER BY")[1]
+    assert "OFFSET" not in str(query)
+    assert "offset" not in params
+    assert params["limit"] == 25
+
+
+def test_keyset_next_page():
+    """Test that a page token continues after the rank and geneset ID it holds."""
+    query, params = genesets("a", page_token=encode_page_token([0.25, 99]))
+
+    assert params["after_search_rank"] == 0.25
+    assert params["after_id"] == 99
+    assert "Placeholder('after_search_rank')" in str(query)
+    assert "SQL('<')" in str(query)
+
+
+def test_keyset_without_search_text():
+    """Test that results without search text are paged by geneset ID."""
+    query, params = genesets(None, page_token=encode_page_token([99]))
+
+    assert params["after_id"] == 99
+    assert "ts_rank" not in str(query)
+
+
+def test_with_total():
+    """Test that search results can carry the total number of matches."""
+    query, params = genesets("search text", limit=10, with_total=True)
+
+    assert "count(*) OVER ()" in str(query).split("FROM", 1)[0]
+    assert "'total_count'" in str(query)
+    assert params["search"] == "search text"
+
+    plain_query, _ = genesets("search text", limit=10)
+    assert "count(*) OVER ()" not in str(plain_query)
+
+
+def test_with_total_rejects_page_token():
+    """Test that a total count can't be combined with a page token."""
+    with pytest.raises(GeneweaverValueError):
+        genesets("search text", with_total=True, page_token=encode_page_token([1.0, 2]))
+
+
+def test_readable_genesets_replace_the_readable_function():
+    """Test that curators' materialized permissions don't filter the results."""
+    readable = ReadableGenesets(7, True, "{-1}")
+
+    query, params = genesets(
+        "search text", is_readable_by=7, readable_genesets=readable
+    )
+
+    assert "geneset_is_readable2" not in str(query)
+    assert "readable_group_ids" not in str(query)
+    assert "is_readable_by" not in params
@@ -0,0 +1,27 @@
+"""Test the value_in_threshold function."""
+
+import pytest
+from geneweaver.core.enum import ScoreType
+from geneweaver.core.schema.score import GenesetScoreType
+from geneweaver.db.query.threshold import value_in_threshold
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"), [(0.01, True), (0.049, True), (0.05, False), (1, False)]
+)
+def test_upper_threshold(value, expected):
+    """Test that values below the threshold are within it."""
+    score = GenesetScoreType(score_type=ScoreType.P_VALUE, threshold=0.05)
+    assert value_in_threshold(score, value) is expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(-0.6, False), (-0.5, True), (0.0, True), (0.5, True), (0.51, False)],
+)
+def test_threshold_range(value, expected):
+    """Test that values between the low and high thresholds (inclusive) are in it."""
+    score = GenesetScoreType(
+        score_type=ScoreType.CORRELATION, threshold=0.5, threshold_low=-0.5
+    )
+    assert value_in_threshold(score, value) is expected
@@ -0,0 +1 @@
+"""Tests for the query generation utility module."""
@@ -0,0 +1,25 @@
+"""Test the array_literal query utility."""
+
+import pytest
+from geneweaver.db.query.utils import array_literal
+
+
+@pytest.mark.parametrize(
+    ("values", "expected"),
+    [
+        ([], "{}"),
+        (["a", "b"], '{"a","b"}'),
+        (["a,b", "{c}", "d e"], '{"a,b","{c}","d e"}'),
+        (['say "hi"', "back\\slash"], '{"say \\"hi\\"","back\\\\slash"}'),
+        ([1, 2, 3], "{1,2,3}"),
+        ([0.5, -2.25], "{0.5,-2.25}"),
+    ],
+)
+def test_array_literal(values, expected):
+    """Test that strings are quoted and escaped, and numbers are not."""
+    assert array_literal(values) == expected
+
+
+def test_array_literal_accepts_generators():
+    """Test that any iterable can be formatted."""
+    assert array_literal(str(i) for i in range(3)) == '{"0","1","2"}'
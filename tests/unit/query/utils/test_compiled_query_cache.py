@@ -0,0 +1,58 @@
+"""Test the CompiledQueryCache class."""
+
+from unittest.mock import MagicMock
+
+from geneweaver.db.query.utils import CompiledQueryCache
+from psycopg.sql import SQL
+
+
+def test_builds_once_per_key():
+    """Test that a query is only assembled the first time its shape is seen."""
+    cache = CompiledQueryCache()
+    build = MagicMock(return_value=SQL("SELECT 1"))
+
+    first = cache.get_or_build(("builder", "a"), build)
+    second = cache.get_or_build(("builder", "a"), build)
+
+    assert first is second
+    build.assert_called_once()
+    assert cache.info() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_different_keys_are_built_separately():
+    """Test that each shape gets its own query."""
+    cache = CompiledQueryCache()
+
+    first = cache.get_or_build(("builder", "a"), lambda: SQL("SELECT 1"))
+    second = cache.get_or_build(("builder", "b"), lambda: SQL("SELECT 2"))
+
+    assert first != second
+    assert len(cache) == 2
+
+
+def test_evicts_least_recently_used():
+    """Test that the least recently used query is evicted at maxsize."""
+    cache = CompiledQueryCache(maxsize=2)
+    cache.get_or_build("a", lambda: SQL("SELECT 'a'"))
+    cache.get_or_build("b", lambda: SQL("SELECT 'b'"))
+    cache.get_or_build("a", lambda: SQL("SELECT 'a'"))
+    cache.get_or_build("c", lambda: SQL("SELECT 'c'"))
+
+    assert len(cache) == 2
+    build = MagicMock(return_value=SQL("SELECT 'b'"))
+    cache.get_or_build("b", build)
+    build.assert_called_once()
+    build = MagicMock(return_value=SQL("SELECT 'c'"))
+    cache.get_or_build("c", build)
+    build.assert_not_called()
+
+
+def test_clear():
+    """Test that clearing the cache removes queries and resets the counts."""
+    cache = CompiledQueryCache()
+    cache.get_or_build("a", lambda: SQL("SELECT 1"))
+    cache.get_or_build("a", lambda: SQL("SELECT 1"))
+
+    cache.clear()
+
+    assert cache.info() == {"hits": 0, "misses": 0, "size": 0}
@@ -0,0 +1,144 @@
+"""Test the keyset pagination query utilities."""
+
+import base64
+
+import pytest
+from geneweaver.db.exceptions import GeneweaverValueError
+from geneweaver.db.query.utils import (
+    Keyset,
+    add_keyset_filter,
+    check_keyset_offset,
+    decode_page_token,
+    encode_page_token,
+    order_by_keyset,
+)
+from psycopg.sql import SQL
+
+ID_KEYSET = Keyset(columns=(SQL("t.id"),), fields=("id",), indexes=(0,))
+RANK_KEYSET = Keyset(
+    columns=(SQL("rank()"), SQL("t.id")),
+    fields=("rank", "id"),
+    indexes=(3, 0),
+    descending=True,
+)
+
+
+@pytest.mark.parametrize(
+    ("key", "keyset"),
+    [
+        ([1], ID_KEYSET),
+        ([2**62], ID_KEYSET),
+        (["ENSMUSG00000027168"], ID_KEYSET),
+        ([0.06079271, 12], RANK_KEYSET),
+        ([1e-300, 0], RANK_KEYSET),
+        (["Pax6/€", -3], RANK_KEYSET),
+    ],
+)
+def test_page_token_round_trip(key, keyset):
+    """Test that a page token decodes to exactly the key it was created from."""
+    token = encode_page_token(key)
+
+    assert decode_page_token(token, keyset) == key
+    assert token.isascii()
+    assert not set(token) & set("=+/")
+
+
+@pytest.mark.parametrize("key", [[None], [True], [[1]], [{"a": 1}]])
+def test_encode_page_token_rejects_other_types(key):
+    """Test that only ints, floats and strings can be part of a page token."""
+    with pytest.raises(GeneweaverValueError):
+        encode_page_token(key)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not a token!",
+        "%%%%",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        encode_page_token([]),
+        encode_page_token([1, 2]),
+        base64.urlsafe_b64encode(b'{"id": 1}').decode(),
+        base64.urlsafe_b64encode(b"[null]").decode(),
+        base64.urlsafe_b64encode(b"[true]").decode(),
+    ],
+)
+def test_decode_page_token_rejects_invalid_tokens(token):
+    """Test that malformed tokens, or tokens for another keyset, are rejected."""
+    with pytest.raises(GeneweaverValueError, match="Invalid page token"):
+        decode_page_token(token, ID_KEYSET)
+
+
+def test_decode_page_token_rejects_non_strings():
+    """Test that a token that isn't a string is rejected."""
+    with pytest.raises(GeneweaverValueError, match="Invalid page token"):
+        decode_page_token(12, ID_KEYSET)
+
+
+def test_add_keyset_filter_without_token():
+    """Test that the first page isn't filtered."""
+    filters, params = add_keyset_filter([SQL("a = 1")], {"a": 1}, ID_KEYSET)
+
+    assert filters == [SQL("a = 1")]
+    assert params == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    ("keyset", "key", "expected_sql", "expected_params"),
+    [
+        (ID_KEYSET, [12], "(t.id) > (%(after_id)s)", {"after_id": 12}),
+        (
+            RANK_KEYSET,
+            [0.5, 12],
+            "(rank(), t.id) < (%(after_rank)s, %(after_id)s)",
+            {"after_rank": 0.5, "after_id": 12},
+        ),
+    ],
+)
+def test_add_keyset_filter(keyset, key, expected_sql, expected_params):
+    """Test that later pages compare the key as a row value."""
+    filters, params = add_keyset_filter(
+        [SQL("a = 1")], {"a": 1}, keyset, encode_page_token(key)
+    )
+
+    assert len(filters) == 2
+    assert filters[1].as_string(None) == expected_sql
+    assert params == {"a": 1, **expected_params}
+
+
+def test_add_keyset_filter_rejects_invalid_token():
+    """Test that an invalid token raises an error instead of being ignored."""
+    with pytest.raises(GeneweaverValueError):
+        add_keyset_filter([], {}, RANK_KEYSET, encode_page_token([1]))
+
+
+@pytest.mark.parametrize(
+    ("keyset", "expected"),
+    [
+        (ID_KEYSET, "SELECT * FROM t ORDER BY t.id"),
+        (RANK_KEYSET, "SELECT * FROM t ORDER BY rank() DESC, t.id DESC"),
+    ],
+)
+def test_order_by_keyset(keyset, expected):
+    """Test that the query is sorted by every column of the key."""
+    query = order_by_keyset(SQL("SELECT * FROM t") + SQL(""), keyset).join(" ")
+    query_str = " ".join(query.as_string(None).split())
+
+    assert query_str.replace(" ,", ",") == expected
+
+
+@pytest.mark.parametrize(
+    ("keyset", "offset", "expected"),
+    [(False, None, None), (False, 10, 10), (True, None, None), (True, 0, None)],
+)
+def test_check_keyset_offset(keyset, offset, expected):
+    """Test that the offset is dropped when paging by the keyset."""
+    assert check_keyset_offset(keyset, offset) == expected
+
+
+def test_check_keyset_offset_rejects_offset():
+    """Test that an offset can't be combined with keyset pagination."""
+    with pytest.raises(GeneweaverValueError, match="offset"):
+        check_keyset_offset(True, 10)
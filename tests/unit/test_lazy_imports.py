@@ -0,0 +1,44 @@
+"""Test that the package and its settings are loaded lazily."""
+
+import subprocess
+import sys
+
+import geneweaver.db
+import pytest
+
+
+def _modules_after(code: str) -> set:
+    """Get the geneweaver.db modules that are loaded after running some code."""
+    script = (
+        f"import sys\n{code}\n"
+        "print(' '.join(m for m in sys.modules if m.startswith('geneweaver.db')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_importing_the_package_does_not_import_submodules():
+    """Test that `import geneweaver.db` doesn't import any of the submodules."""
+    assert _modules_after("import geneweaver.db") == {"geneweaver.db"}
+
+
+def test_accessing_a_submodule_only_imports_what_it_needs():
+    """Test that accessing one submodule doesn't import the others."""
+    modules = _modules_after("import geneweaver.db\ngeneweaver.db.species")
+
+    assert "geneweaver.db.species" in modules
+    assert "geneweaver.db.aio" not in modules
+    assert "geneweaver.db.geneset" not in modules
+
+
+@pytest.mark.parametrize("package", [geneweaver.db, geneweaver.db.aio])
+def test_lazy_submodules_are_importable(package):
+    """Test that every lazily loaded submodule can be accessed."""
+    for name in package.__all__:
+        assert getattr(package, name).__name__ == f"{package.__name__}.{name}"
+        assert name in dir(package)
+
+    with pytest.raises(AttributeError):
+        _ = package.not_a_submodule
@@ -1,11 +1,11 @@
 """Utilities for testing the database module."""
 
 # ruff: noqa: ANN002, ANN003, ANN101, D102, D107
-from typing import Callable
-from unittest.mock import MagicMock
+from typing import Callable, List
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from psycopg import Cursor
+from psycopg import AsyncConnection, AsyncServerCursor, Cursor, ServerCursor
 
 
 def get_magic_mock_cursor(fetch_result) -> MagicMock:
@@ -16,6 +16,28 @@ def get_magic_mock_cursor(fetch_result) -> MagicMock:
     return cursor
 
 
+def mock_server_cursor(cursor, rows: List) -> MagicMock:
+    """Make the cursor's connection open a server-side cursor that yields rows."""
+    server_cursor = MagicMock(spec=ServerCursor)
+    server_cursor.__enter__.return_value = server_cursor
+    server_cursor.__iter__.return_value = iter(rows)
+    cursor.connection.autocommit = False
+    cursor.connection.cursor.return_value = server_cursor
+    return server_cursor
+
+
+def async_mock_server_cursor(async_cursor, rows: List) -> MagicMock:
+    """Make the async cursor's connection open a server-side cursor yielding rows."""
+    server_cursor = MagicMock(spec=AsyncServerCursor)
+    server_cursor.__aenter__.return_value = server_cursor
+    server_cursor.__aiter__.return_value = rows
+    server_cursor.execute = AsyncMock()
+    async_cursor.connection = MagicMock(spec=AsyncConnection)
+    async_cursor.connection.autocommit = False
+    async_cursor.connection.cursor.return_value = server_cursor
+    return server_cursor
+
+
 def create_execute_raises_error_test(function, *args, **kwargs) -> Callable:
     """Return a test function that tests the execute error path."""
 
@@ -0,0 +1,91 @@
+"""Test the iter_query and aiter_query utility functions."""
+
+import pytest
+from geneweaver.db.core.settings import get_settings
+from geneweaver.db.query import gene as gene_query
+from geneweaver.db.utils import aiter_query, iter_query
+
+from tests.unit.testing_utils import async_mock_server_cursor, mock_server_cursor
+
+ROWS = [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+@pytest.mark.parametrize("itersize", [1, 100, 5000])
+def test_iter_query_streams_from_a_named_cursor(cursor, itersize):
+    """Test that rows are streamed from a named cursor on the same connection."""
+    server_cursor = mock_server_cursor(cursor, ROWS)
+    query, params = gene_query.get(species=1)
+
+    result = iter_query(cursor, query, params, itersize)
+
+    assert server_cursor.execute.call_count == 0
+    assert list(result) == ROWS
+    assert server_cursor.itersize == itersize
+    assert server_cursor.execute.call_args[0] == (query, params)
+    assert cursor.execute.call_count == 0
+    assert cursor.fetchall.call_count == 0
+    assert cursor.connection.cursor.call_args[1]["name"].startswith("gw_iter_")
+    assert cursor.connection.cursor.call_args[1]["row_factory"] == cursor.row_factory
+    assert server_cursor.__exit__.call_count == 1
+
+
+def test_iter_query_uses_unique_cursor_names(cursor):
+    """Test that each call opens a server-side cursor with a new name."""
+    mock_server_cursor(cursor, [])
+    list(iter_query(cursor, *gene_query.get(), 10))
+    list(iter_query(cursor, *gene_query.get(), 10))
+
+    first, second = cursor.connection.cursor.call_args_list
+    assert first[1]["name"] != second[1]["name"]
+
+
+@pytest.mark.parametrize("autocommit", [True, False])
+def test_iter_query_transaction_in_autocommit(cursor, autocommit):
+    """Test that a transaction is only opened on autocommit connections."""
+    mock_server_cursor(cursor, ROWS)
+    cursor.connection.autocommit = autocommit
+
+    list(iter_query(cursor, *gene_query.get(), 10))
+
+    assert cursor.connection.transaction.call_count == int(autocommit)
+
+
+def test_iter_query_default_itersize(cursor, monkeypatch):
+    """Test that the itersize defaults to the ITERSIZE setting."""
+    monkeypatch.setenv("GWDB_SERVER", "test_host")
+    monkeypatch.setenv("GWDB_USERNAME", "test_username")
+    monkeypatch.setenv("GWDB_ITERSIZE", "1234")
+    get_settings.cache_clear()
+    server_cursor = mock_server_cursor(cursor, ROWS)
+
+    list(iter_query(cursor, *gene_query.get()))
+    get_settings.cache_clear()
+
+    assert server_cursor.itersize == 1234
+
+
+@pytest.mark.parametrize("itersize", [1, 100, 5000])
+async def test_aiter_query_streams_from_a_named_cursor(async_cursor, itersize):
+    """Test that rows are streamed from an async named cursor."""
+    server_cursor = async_mock_server_cursor(async_cursor, ROWS)
+    query, params = gene_query.get(species=1)
+
+    result = [row async for row in aiter_query(async_cursor, query, params, itersize)]
+
+    assert result == ROWS
+    assert server_cursor.itersize == itersize
+    assert server_cursor.execute.call_args[0] == (query, params)
+    assert async_cursor.execute.call_count == 0
+    assert async_cursor.connection.cursor.call_args[1]["name"].startswith("gw_iter_")
+    assert server_cursor.__aexit__.call_count == 1
+
+
+@pytest.mark.parametrize("autocommit", [True, False])
+async def test_aiter_query_transaction_in_autocommit(async_cursor, autocommit):
+    """Test that a transaction is only opened on autocommit async connections."""
+    async_mock_server_cursor(async_cursor, ROWS)
+    async_cursor.connection.autocommit = autocommit
+
+    [row async for row in aiter_query(async_cursor, *gene_query.get(), 10)]
+
+    assert async_cursor.connection.transaction.call_count == int(autocommit)
@@ -0,0 +1,41 @@
+"""Test the keyset_page utility function."""
+
+import pytest
+from geneweaver.db.query.utils import Keyset, decode_page_token
+from geneweaver.db.utils import Page, keyset_page
+from psycopg.sql import SQL
+
+KEYSET = Keyset(
+    columns=(SQL("gene_id"), SQL("ref_id")),
+    fields=("gene_id", "ref_id"),
+    indexes=(0, 2),
+)
+
+DICT_ROWS = [
+    {"gene_id": 1, "species": 2, "ref_id": "A"},
+    {"gene_id": 1, "species": 2, "ref_id": "B"},
+    {"gene_id": 4, "species": 1, "ref_id": "C"},
+]
+TUPLE_ROWS = [tuple(row.values()) for row in DICT_ROWS]
+
+
+@pytest.mark.parametrize("rows", [DICT_ROWS, TUPLE_ROWS])
+def test_full_page_has_next_page_token(rows):
+    """Test that a full page gets a token for the key of its last row."""
+    page = keyset_page(rows, KEYSET, 3)
+
+    assert isinstance(page, Page)
+    assert page.rows is rows
+    assert decode_page_token(page.next_page_token, KEYSET) == [4, "C"]
+
+
+@pytest.mark.parametrize("rows", [DICT_ROWS, TUPLE_ROWS])
+@pytest.mark.parametrize("limit", [None, 4, 100])
+def test_last_page_has_no_next_page_token(rows, limit):
+    """Test that a page with fewer rows than the limit (or no limit) is the last."""
+    assert keyset_page(rows, KEYSET, limit) == Page(rows, None)
+
+
+def test_empty_page_has_no_next_page_token():
+    """Test that an empty page is the last page."""
+    assert keyset_page([], KEYSET, 0) == Page([], None)
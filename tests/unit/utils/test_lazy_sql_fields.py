@@ -0,0 +1,36 @@
+"""Test the LazySQLFields utility class."""
+
+from unittest.mock import patch
+
+from geneweaver.db.query.gene import GENE_FIELDS_MAP, GENE_INFO_FIELDS_MAP
+from geneweaver.db.utils import LazySQLFields, format_sql_fields
+from psycopg.sql import SQL
+
+
+def test_lazy_sql_fields_are_formatted_on_first_use():
+    """Test that the fields are only formatted once, when they are first used."""
+    with patch(
+        "geneweaver.db.utils.format_sql_fields", wraps=format_sql_fields
+    ) as mock_format:
+        fields = LazySQLFields(GENE_FIELDS_MAP, query_table="gene")
+        assert mock_format.call_count == 0
+
+        assert len(fields) == len(GENE_FIELDS_MAP)
+        assert list(fields) == format_sql_fields(GENE_FIELDS_MAP, query_table="gene")
+        assert mock_format.call_count == 1
+
+
+def test_lazy_sql_fields_behave_like_a_list():
+    """Test that lazy fields can be used anywhere the formatted list could be."""
+    gene = LazySQLFields(GENE_FIELDS_MAP, query_table="gene")
+    info = LazySQLFields(GENE_INFO_FIELDS_MAP, query_table="gene_info", resp_prefix="i")
+    expected_gene = format_sql_fields(GENE_FIELDS_MAP, query_table="gene")
+    expected_info = format_sql_fields(
+        GENE_INFO_FIELDS_MAP, query_table="gene_info", resp_prefix="i"
+    )
+
+    assert gene == expected_gene
+    assert gene[0] == expected_gene[0]
+    assert gene + info == expected_gene + expected_info
+    assert expected_gene + info == expected_gene + expected_info
+    assert SQL(",").join(gene) == SQL(",").join(expected_gene)
@@ -1,7 +1,7 @@
 """Test the limit_an_offset query generation utility function."""
 
 import pytest
-from geneweaver.db.utils import limit_and_offset
+from geneweaver.db.utils import bind_limit_and_offset, limit_and_offset
 from psycopg.sql import SQL
 
 
@@ -20,3 +20,46 @@ def test_limit_and_offest(limit, offset):
         assert str(offset) in str(result)
     else:
         assert str(offset) not in str(result)
+
+
+@pytest.mark.parametrize("limit", [None, 10, 100, 2000, 45678])
+@pytest.mark.parametrize("offset", [None, 10, 100, 2000, 45678])
+def test_limit_and_offset_with_params(limit, offset):
+    """Test that limit and offset are bound as parameters when params are given."""
+    q = (SQL("SELECT *") + SQL("FROM table")).join(" ")
+    params = {"existing": 1}
+    result = limit_and_offset(q, limit, offset, params)
+    if limit is not None:
+        assert "%(limit)s" in str(result)
+        assert params["limit"] == limit
+    else:
+        assert "limit" not in params
+
+    if offset is not None:
+        assert "%(offset)s" in str(result)
+        assert params["offset"] == offset
+    else:
+        assert "offset" not in params
+
+    assert params["existing"] == 1
+    if limit is not None:
+        assert str(limit) not in str(result)
+
+
+def test_limit_and_offset_query_text_does_not_depend_on_values():
+    """Test that the bound query is the same for different limits and offsets."""
+    q = (SQL("SELECT *") + SQL("FROM table")).join(" ")
+    first = limit_and_offset(q, 10, 20, {})
+    second = limit_and_offset(q, 45678, 0, {})
+    assert first == second
+
+
+@pytest.mark.parametrize("limit", [None, 0, 10])
+@pytest.mark.parametrize("offset", [None, 0, 10])
+def test_bind_limit_and_offset(limit, offset):
+    """Test that bind_limit_and_offset only adds the values that are set."""
+    params = bind_limit_and_offset({}, limit, offset)
+    assert params.get("limit") == limit
+    assert params.get("offset") == offset
+    assert ("limit" in params) is (limit is not None)
+    assert ("offset" in params) is (offset is not None)
@@ -0,0 +1,13 @@
+"""Test the row_value utility function."""
+
+from geneweaver.db.utils import row_value
+
+
+def test_row_value_dict_row():
+    """Test that dict rows are read by key."""
+    assert row_value({"a": 1, "b": 2}, "b", 0) == 2
+
+
+def test_row_value_tuple_row():
+    """Test that tuple rows are read by index."""
+    assert row_value((1, 2), "b", 1) == 2
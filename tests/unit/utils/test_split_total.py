@@ -0,0 +1,40 @@
+"""Test the split_total utility function."""
+
+import pytest
+from geneweaver.db.utils import RowsWithTotal, split_total
+
+DICT_ROWS = [
+    {"id": 1, "name": "a", "total_count": 30},
+    {"id": 2, "name": "b", "total_count": 30},
+]
+TUPLE_ROWS = [tuple(row.values()) for row in DICT_ROWS]
+
+
+def test_dict_rows():
+    """Test that the total count is removed from dict rows."""
+    result = split_total(DICT_ROWS)
+
+    assert isinstance(result, RowsWithTotal)
+    assert result.total == 30
+    assert result.rows == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_tuple_rows():
+    """Test that the total count (the last column) is removed from tuple rows."""
+    result = split_total(TUPLE_ROWS)
+
+    assert result.total == 30
+    assert result.rows == [(1, "a"), (2, "b")]
+
+
+def test_rows_are_not_modified():
+    """Test that the fetched rows are left as they were."""
+    split_total(DICT_ROWS)
+
+    assert all("total_count" in row for row in DICT_ROWS)
+
+
+@pytest.mark.parametrize(("offset", "total"), [(None, 0), (0, 0), (10, None)])
+def test_empty_page(offset, total):
+    """Test that an empty page only has a known total when it starts at the top."""
+    assert split_total([], offset) == RowsWithTotal([], total)
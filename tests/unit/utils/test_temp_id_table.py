@@ -0,0 +1,141 @@
+"""Test the temp id table utilities for large batches of ids."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.db.core.settings_class import Settings
+from geneweaver.db.utils import (
+    async_temp_id_table,
+    ids_filter,
+    is_large_batch,
+    temp_id_table,
+)
+from psycopg.sql import Identifier
+
+
+@pytest.fixture()
+def threshold(monkeypatch) -> Settings:
+    """Set the large batch threshold to 3 ids."""
+    settings = Settings(
+        SERVER="test_host", USERNAME="test_username", LARGE_BATCH_THRESHOLD=3
+    )
+    monkeypatch.setattr("geneweaver.db.utils.get_settings", lambda: settings)
+    return settings
+
+
+def test_is_large_batch(threshold):
+    """Test that batches at or above the threshold are large."""
+    assert not is_large_batch(["a", "b"])
+    assert is_large_batch(["a", "b", "c"])
+    threshold.LARGE_BATCH_THRESHOLD = None
+    assert not is_large_batch(["a"] * 100_000)
+
+
+def test_ids_filter():
+    """Test the array and temp table filters."""
+    assert ids_filter("ids").as_string(None) == "= ANY(%(ids)s)"
+    assert "IN (SELECT id FROM" in repr(ids_filter("ids", Identifier("t")))
+
+
+def test_temp_id_table_small_batch(threshold):
+    """Test that no table is made for a small batch."""
+    cursor = MagicMock()
+    with temp_id_table(cursor, ["a", "b"]) as table:
+        assert table is None
+    cursor.connection.transaction.assert_not_called()
+
+
+def test_temp_id_table_large_batch(threshold):
+    """Test that a large batch is copied into a temp table, which is then dropped."""
+    cursor = MagicMock()
+    temp_cursor = cursor.connection.cursor.return_value.__enter__.return_value
+    temp_cursor.fetchone.return_value = (False,)
+    copier = temp_cursor.copy.return_value.__enter__.return_value
+
+    with temp_id_table(cursor, ["a", "b", "a", "c"]) as table:
+        assert isinstance(table, Identifier)
+        assert repr(table).startswith("Identifier('gw_ids_")
+        cursor.connection.transaction.return_value.__enter__.assert_called_once()
+        statements = [str(call[0][0]) for call in temp_cursor.execute.call_args_list]
+        assert "pg_is_in_recovery()" in statements[0]
+        assert "CREATE TEMPORARY TABLE" in statements[1]
+        assert "ANALYZE" in statements[2]
+
+    assert [call[0][0] for call in copier.write_row.call_args_list] == [
+        ("a",),
+        ("b",),
+        ("c",),
+    ]
+    assert "DROP TABLE" in str(temp_cursor.execute.call_args[0][0])
+
+
+def test_temp_id_table_is_not_dropped_on_error(threshold):
+    """Test that an error leaves the table to the transaction rollback."""
+    cursor = MagicMock()
+    temp_cursor = cursor.connection.cursor.return_value.__enter__.return_value
+    temp_cursor.fetchone.return_value = (False,)
+
+    def run() -> None:
+        with temp_id_table(cursor, ["a", "b", "c"]):
+            raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError):
+        run()
+    assert temp_cursor.execute.call_count == 3
+    cursor.connection.transaction.return_value.__exit__.assert_called_once()
+
+
+def test_temp_id_table_read_only(threshold):
+    """Test that read-only transactions and standbys fall back to the array."""
+    cursor = MagicMock()
+    temp_cursor = cursor.connection.cursor.return_value.__enter__.return_value
+    temp_cursor.fetchone.return_value = (True,)
+
+    with temp_id_table(cursor, ["a", "b", "c"]) as table:
+        assert table is None
+
+    assert temp_cursor.execute.call_count == 1
+    assert "transaction_read_only" in str(temp_cursor.execute.call_args[0][0])
+    temp_cursor.copy.assert_not_called()
+
+
+async def test_async_temp_id_table_large_batch(threshold):
+    """Test that a large batch is copied into a temp table (async)."""
+    cursor = MagicMock()
+    temp_cursor = AsyncMock()
+    temp_cursor.copy = MagicMock()
+    temp_cursor.fetchone.return_value = (False,)
+    copier = AsyncMock()
+    cursor.connection.cursor.return_value.__aenter__.return_value = temp_cursor
+    temp_cursor.copy.return_value.__aenter__.return_value = copier
+
+    async with async_temp_id_table(cursor, ["a", "b", "c", "b"]) as table:
+        assert isinstance(table, Identifier)
+
+    assert copier.write_row.await_count == 3
+    statements = [str(call[0][0]) for call in temp_cursor.execute.call_args_list]
+    assert len(statements) == 4
+    assert "DROP TABLE" in statements[-1]
+
+
+async def test_async_temp_id_table_read_only(threshold):
+    """Test that read-only transactions and standbys fall back to the array (async)."""
+    cursor = MagicMock()
+    temp_cursor = AsyncMock()
+    temp_cursor.copy = MagicMock()
+    temp_cursor.fetchone.return_value = (True,)
+    cursor.connection.cursor.return_value.__aenter__.return_value = temp_cursor
+
+    async with async_temp_id_table(cursor, ["a", "b", "c"]) as table:
+        assert table is None
+
+    assert temp_cursor.execute.await_count == 1
+    temp_cursor.copy.assert_not_called()
+
+
+async def test_async_temp_id_table_small_batch(threshold):
+    """Test that no table is made for a small batch (async)."""
+    cursor = MagicMock()
+    async with async_temp_id_table(cursor, ["a"]) as table:
+        assert table is None
+    cursor.connection.transaction.assert_not_called()
@@ -0,0 +1,125 @@
+"""Test the caller controlled transaction utilities."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from geneweaver.db.geneset import update_date
+from geneweaver.db.geneset_value import insert_file
+from geneweaver.db.utils import (
+    async_transaction,
+    commit,
+    commits_deferred,
+    transaction,
+)
+from psycopg.pq import TransactionStatus
+
+
+def in_transaction_cursor() -> MagicMock:
+    """Get a mock cursor whose connection has an uncommitted transaction."""
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (1,)
+    cursor.connection.info.transaction_status = TransactionStatus.INTRANS
+    return cursor
+
+
+def test_commit_outside_transaction():
+    """Test that commit commits the connection by default."""
+    cursor = MagicMock()
+    commit(cursor)
+    cursor.connection.commit.assert_called_once()
+    assert not commits_deferred(cursor)
+
+
+def test_transaction_commits_once():
+    """Test that the commits of the write functions are deferred to the end."""
+    cursor = in_transaction_cursor()
+
+    with transaction(cursor) as tx_cursor:
+        assert tx_cursor is cursor
+        assert commits_deferred(cursor)
+        insert_file(cursor, "values")
+        update_date(cursor, 1)
+        cursor.connection.commit.assert_not_called()
+
+    cursor.connection.transaction.return_value.__enter__.assert_called_once()
+    cursor.connection.commit.assert_called_once()
+    assert not commits_deferred(cursor)
+
+
+def test_transaction_only_defers_its_own_connection():
+    """Test that other connections still commit inside the block."""
+    cursor, other = in_transaction_cursor(), MagicMock()
+    with transaction(cursor):
+        commit(other)
+    other.connection.commit.assert_called_once()
+
+
+def test_transaction_does_not_commit_on_error():
+    """Test that an error is raised without a commit."""
+    cursor = in_transaction_cursor()
+
+    def run() -> None:
+        with transaction(cursor):
+            insert_file(cursor, "values")
+            raise RuntimeError("write failed")
+
+    with pytest.raises(RuntimeError):
+        run()
+    cursor.connection.commit.assert_not_called()
+    cursor.connection.transaction.return_value.__exit__.assert_called_once()
+    assert not commits_deferred(cursor)
+
+
+def test_nested_transaction_leaves_commit_to_the_outer_block():
+    """Test that a nested block doesn't commit."""
+    cursor = in_transaction_cursor()
+
+    with transaction(cursor):
+        with transaction(cursor):
+            commit(cursor)
+        cursor.connection.commit.assert_not_called()
+        assert commits_deferred(cursor)
+
+    assert cursor.connection.transaction.call_count == 2
+    cursor.connection.commit.assert_called_once()
+
+
+def test_transaction_already_committed():
+    """Test that no extra commit is made once the transaction is closed."""
+    cursor = in_transaction_cursor()
+    cursor.connection.info.transaction_status = TransactionStatus.IDLE
+    with transaction(cursor):
+        commit(cursor)
+    cursor.connection.commit.assert_not_called()
+
+
+async def test_async_transaction_commits_once():
+    """Test that the block is committed once at the end (async)."""
+    cursor = in_transaction_cursor()
+    cursor.connection.commit = AsyncMock()
+    cursor.connection.transaction.return_value = AsyncMock()
+
+    async with async_transaction(cursor) as tx_cursor:
+        assert tx_cursor is cursor
+        assert commits_deferred(cursor)
+        async with async_transaction(cursor):
+            pass
+        cursor.connection.commit.assert_not_awaited()
+
+    cursor.connection.commit.assert_awaited_once()
+    assert not commits_deferred(cursor)
+
+
+async def test_async_transaction_does_not_commit_on_error():
+    """Test that an error is raised without a commit (async)."""
+    cursor = in_transaction_cursor()
+    cursor.connection.commit = AsyncMock()
+    cursor.connection.transaction.return_value = AsyncMock()
+
+    async def run() -> None:
+        async with async_transaction(cursor):
+            raise RuntimeError("write failed")
+
+    with pytest.raises(RuntimeError):
+        await run()
+    cursor.connection.commit.assert_not_awaited()